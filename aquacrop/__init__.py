@@ -1,10 +1,64 @@
-import sys
-if not '-m' in sys.argv:
+"""
+The public classes and functions are imported on first access (PEP 562),
+so importing aquacrop itself does not load pandas or the model.
+"""
+import importlib
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
     from .core import AquaCropModel
     from .entities.soil import Soil
-    from .entities.crop import  Crop
+    from .entities.crop import Crop
     from .entities.inititalWaterContent import InitialWaterContent
     from .entities.irrigationManagement import IrrigationManagement
     from .entities.fieldManagement import FieldMngt
-    from .entities.groundWater import  GroundWater
-    from .entities.co2 import  CO2
+    from .entities.groundWater import GroundWater
+    from .entities.co2 import CO2
+    from .batch import AquaCropBatch
+    from .ensemble import run_ensemble
+    from .optimize import optimize_irrigation
+    from .scenario import ScenarioTemplate
+    from .sensitivity import run_sensitivity
+    from .entities.outputSink import (
+        OutputSink, MemorySink, CSVSink, ParquetSink, CallbackSink, DiscardSink
+    )
+
+# public name -> module it is defined in
+_LAZY = {
+    "AquaCropModel": ".core",
+    "Soil": ".entities.soil",
+    "Crop": ".entities.crop",
+    "InitialWaterContent": ".entities.inititalWaterContent",
+    "IrrigationManagement": ".entities.irrigationManagement",
+    "FieldMngt": ".entities.fieldManagement",
+    "GroundWater": ".entities.groundWater",
+    "CO2": ".entities.co2",
+    "AquaCropBatch": ".batch",
+    "run_ensemble": ".ensemble",
+    "optimize_irrigation": ".optimize",
+    "ScenarioTemplate": ".scenario",
+    "run_sensitivity": ".sensitivity",
+    "OutputSink": ".entities.outputSink",
+    "MemorySink": ".entities.outputSink",
+    "CSVSink": ".entities.outputSink",
+    "ParquetSink": ".entities.outputSink",
+    "CallbackSink": ".entities.outputSink",
+    "DiscardSink": ".entities.outputSink",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
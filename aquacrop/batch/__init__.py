@@ -0,0 +1,5 @@
+"""
+Vectorized model that advances many sites at once, with the state of the
+sites held as NumPy arrays (see aquacrop.batch.core.AquaCropBatch)
+"""
+from .core import AquaCropBatch
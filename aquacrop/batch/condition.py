@@ -0,0 +1,157 @@
+"""
+Struct-of-arrays version of the InitialCondition class
+"""
+import numpy as np
+
+from typing import Dict, Optional, Sequence, TYPE_CHECKING
+
+from ..entities.initParamVariables import InitialCondition
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+
+# attributes that hold a flag of each site
+BOOL_FIELDS = (
+    "pre_adj",
+    "crop_mature",
+    "crop_dead",
+    "germination",
+    "premat_senes",
+    "harvest_flag",
+    "growing_season",
+    "yield_form",
+    "stage2",
+    "wt_in_soil",
+    "protected_seed",
+)
+
+# attributes reset at the start of each growing season (see reset_initial_conditions)
+RESET_FIELDS = (
+    "age_days", "age_days_ns", "aer_days", "irr_cum", "delayed_gdds", "delayed_cds",
+    "pct_lag_phase", "t_early_sen", "gdd_cum", "day_submerged", "irr_net_cum", "dap",
+    "aer_days_comp", "pre_adj", "crop_mature", "crop_dead", "germination",
+    "premat_senes", "harvest_flag", "stage", "f_pre", "f_post", "fpost_dwn",
+    "fpost_upp", "h1_cor_asum", "h1_cor_bsum", "f_pol", "s_cor1", "s_cor2",
+    "growth_stage", "tr_ratio", "r_cor", "canopy_cover", "canopy_cover_adj",
+    "canopy_cover_ns", "canopy_cover_adj_ns", "biomass", "biomass_ns",
+    "harvest_index", "harvest_index_adj", "ccx_act", "ccx_act_ns", "ccx_w",
+    "ccx_w_ns", "ccx_early_sen", "cc_prev", "protected_seed", "sumET0EarlySen",
+    "HIfinal", "DryYield", "FreshYield",
+)
+
+
+class BatchCondition:
+    """
+    The BatchCondition class holds the InitialCondition of every site of a
+    batch as NumPy arrays, with one row per site: flags are boolean arrays
+    of shape (n_sites,), the soil water contents are float arrays of shape
+    (n_sites, n_comp) and every other variable is a float array of shape
+    (n_sites,).
+
+    A water table depth of None (no water table in the profile) is stored as NaN.
+
+    Attributes:
+
+        aliased (numpy.ndarray): True for the sites whose water content is
+            still the initial water content object (`th` is `thini` in the
+            scalar model), so that pre-irrigation also changes `thini`
+
+        clipped (numpy.ndarray): True for the sites whose soil profile has
+            its compartment depths clipped to the curve number depth (the
+            scalar model clips them the first time it adjusts the curve number)
+
+    """
+
+    __slots__ = InitialCondition.__slots__ + ("aliased", "clipped")
+
+    def __init__(self, conditions: Sequence["InitialCondition"]):
+
+        for name in InitialCondition.__slots__:
+            values = [getattr(cond, name) for cond in conditions]
+            if name in BOOL_FIELDS:
+                value = np.array(values, dtype=bool)
+            else:
+                value = np.array(
+                    [np.nan if v is None else v for v in values], dtype=np.float64
+                )
+            setattr(self, name, value)
+
+        self.aliased = np.array(
+            [cond.th is cond.thini for cond in conditions], dtype=bool
+        )
+        self.clipped = np.zeros(len(conditions), dtype=bool)
+
+    @property
+    def n_sites(self) -> int:
+        """
+        Number of sites
+        """
+        return len(self.dap)
+
+    def take(self, sites: "ndarray") -> "BatchCondition":
+        """
+        Return the state of some of the sites
+
+        Arguments:
+
+            sites (numpy.ndarray): indices of the sites
+
+        Returns:
+
+            cond (BatchCondition): copy of the state of the sites, the \
+                batch itself if it holds exactly these sites
+        """
+        if len(sites) == self.n_sites and np.array_equal(sites, np.arange(self.n_sites)):
+            return self
+
+        new = BatchCondition.__new__(BatchCondition)
+        for name in self.__slots__:
+            setattr(new, name, getattr(self, name)[sites])
+        return new
+
+    def put(self, sites: "ndarray", cond: "BatchCondition") -> None:
+        """
+        Write the state of some of the sites back
+
+        Arguments:
+
+            sites (numpy.ndarray): indices of the sites
+
+            cond (BatchCondition): state of the sites, from `take`
+
+        """
+        if cond is self:
+            return
+
+        for name in self.__slots__:
+            getattr(self, name)[sites] = getattr(cond, name)
+
+    def copy(self) -> "BatchCondition":
+        """
+        Return an independent copy of the state
+        """
+        new = BatchCondition.__new__(BatchCondition)
+        for name in self.__slots__:
+            setattr(new, name, getattr(self, name).copy())
+        return new
+
+    def as_dict(self, names: Optional[Sequence[str]] = None) -> Dict[str, "ndarray"]:
+        """
+        Return copies of the state arrays
+
+        Arguments:
+
+            names: names of the InitialCondition attributes, all of them if None
+
+        Returns:
+
+            dict of arrays with one row per site
+        """
+        if names is None:
+            names = InitialCondition.__slots__
+        for name in names:
+            if name not in InitialCondition.__slots__:
+                raise ValueError(f"{name!r} is not a state variable of the model.")
+
+        return {name: getattr(self, name).copy() for name in names}
@@ -0,0 +1,627 @@
+"""
+This file contains the AquaCropBatch class that runs the same model setup
+for many sites at once.
+"""
+import copy
+from typing import Dict, List, Optional, Sequence, Union, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+    from pandas import DataFrame
+    from aquacrop.entities.co2 import CO2
+    from aquacrop.entities.crop import Crop
+    from aquacrop.entities.fieldManagement import FieldMngt
+    from aquacrop.entities.groundWater import GroundWater
+    from aquacrop.entities.inititalWaterContent import InitialWaterContent
+    from aquacrop.entities.irrigationManagement import IrrigationManagement
+    from aquacrop.entities.soil import Soil
+    from aquacrop.entities.soilProfile import SoilProfile
+
+# pylint: disable=wrong-import-position
+from ..core import AquaCropModel
+from ..entities.initParamVariables import InitialCondition
+from ..entities.output import (
+    CROP_GROWTH_COLUMNS,
+    FINAL_STATS_COLUMNS,
+    WATER_FLUX_COLUMNS,
+    water_storage_columns,
+)
+from ..initialize.compute_weather_arrays import compute_weather_arrays
+from ..initialize.read_clocks_parameters import read_clock_parameters
+from ..initialize.read_model_initial_conditions import read_model_initial_conditions
+from ..initialize.read_weather_inputs import read_weather_inputs
+from ..timestep.reset_initial_conditions import reset_initial_conditions
+from .condition import RESET_FIELDS, BatchCondition
+from .timestep import solution_single_time_step
+
+BATCH_OUTPUT_LEVELS = ("daily", "final_only")
+
+
+class AquaCropBatch:
+    """
+    Run one model setup for many sites (e.g. grid cells) in lockstep.
+
+    The sites share the soil, crop, management, groundwater, CO2 and
+    simulation dates, and differ by their weather and initial water
+    content. Their state is held as NumPy arrays with one row per site
+    (see `BatchCondition`), and each day is solved by kernels that advance
+    all the sites in the same season and growing stage in a single call.
+    The results of each site are identical to those of a scalar
+    `AquaCropModel` run with the same inputs and the python backend.
+
+    Sites advance one calendar day at a time: on each batch step all the
+    unfinished sites whose clock is on the earliest current day are solved,
+    while sites that skipped ahead to their next planting date wait for the
+    rest of the batch to catch up.
+
+    Crop calendars in growing degree days depend on the temperatures of
+    each site, so the sites are grouped by their temperature series, and
+    each group gets its own copy of the model parameters.
+
+    Parameters:
+
+        sim_start_time (str): YYYY/MM/DD, Simulation start date
+
+        sim_end_time (str): date YYYY/MM/DD, Simulation end date
+
+        weather_df: list of daily weather dataframes (created using \
+            prepare_weather), one per site
+
+        soil: Soil object shared by all sites
+
+        crop: Crop object shared by all sites
+
+        initial_water_content: InitialWaterContent object, or list with one per site
+
+        irrigation_management: Defines irrigation strategy
+
+        field_management: Defines field management options
+
+        fallow_field_management: Defines field management options during fallow period
+
+        groundwater: Stores information on water table parameters
+
+        co2_concentration: Defines CO2 concentrations
+
+        off_season: (True) simulate off-season or (False) skip ahead to start of
+                    next growing season
+
+        output_level: "daily" (default) keeps the daily outputs of every
+                    site, "final_only" only keeps final_stats
+
+    """
+
+    def __init__(
+        self,
+        sim_start_time: str,
+        sim_end_time: str,
+        weather_df: Sequence["DataFrame"],
+        soil: "Soil",
+        crop: "Crop",
+        initial_water_content: Union["InitialWaterContent", Sequence["InitialWaterContent"]],
+        irrigation_management: Optional["IrrigationManagement"] = None,
+        field_management: Optional["FieldMngt"] = None,
+        fallow_field_management: Optional["FieldMngt"] = None,
+        groundwater: Optional["GroundWater"] = None,
+        co2_concentration: Optional["CO2"] = None,
+        off_season: bool = False,
+        output_level: Optional[str] = None,
+    ) -> None:
+
+        if not isinstance(weather_df, (list, tuple)) or len(weather_df) == 0:
+            raise ValueError("weather_df must be a list with the weather of at least one site.")
+        self.n_sites = len(weather_df)
+
+        for name, value in [
+            ("soil", soil),
+            ("crop", crop),
+            ("irrigation_management", irrigation_management),
+            ("field_management", field_management),
+            ("fallow_field_management", fallow_field_management),
+            ("groundwater", groundwater),
+            ("co2_concentration", co2_concentration),
+        ]:
+            if isinstance(value, (list, tuple)):
+                raise ValueError(
+                    f"{name} is shared by all the sites of a batch, "
+                    + "run a batch for each value instead."
+                )
+
+        if isinstance(initial_water_content, (list, tuple)):
+            if len(initial_water_content) != self.n_sites:
+                raise ValueError(
+                    "initial_water_content must contain one value for each site "
+                    + f"({len(initial_water_content)} given, {self.n_sites} sites)."
+                )
+            initial_water_content = list(initial_water_content)
+        else:
+            initial_water_content = [initial_water_content] * self.n_sites
+
+        if output_level is None:
+            output_level = "daily"
+        if output_level not in BATCH_OUTPUT_LEVELS:
+            raise ValueError(
+                f"output_level must be one of {BATCH_OUTPUT_LEVELS}, got {output_level!r}."
+            )
+
+        self.sim_start_time = sim_start_time
+        self.sim_end_time = sim_end_time
+        self.weather_df = list(weather_df)
+        self.soil = soil
+        self.crop = crop
+        self.initial_water_content = initial_water_content
+        self.irrigation_management = irrigation_management
+        self.field_management = field_management
+        self.fallow_field_management = fallow_field_management
+        self.groundwater = groundwater
+        self.co2_concentration = co2_concentration
+        self.off_season = off_season
+        self.output_level = output_level
+
+        self._is_initialized = False
+        self._has_executed = False
+
+    def _initialize(self) -> None:
+        """
+        Initialise the state of every site
+        """
+        clock = read_clock_parameters(
+            self.sim_start_time, self.sim_end_time, self.off_season
+        )
+
+        weather = []
+        weather_days = None
+        for weather_df in self.weather_df:
+            site_weather, days = compute_weather_arrays(
+                read_weather_inputs(clock, weather_df)
+            )
+            if weather_days is None:
+                weather_days = days
+            elif not np.array_equal(days, weather_days):
+                raise ValueError("The weather of every site must cover the same days.")
+            weather.append(site_weather)
+        # (n_days, n_sites, 4): MinTemp, MaxTemp, Precipitation, ReferenceET
+        self._weather = np.stack(weather, axis=1)
+
+        # the crop calendar only depends on the weather in gdd mode
+        by_temperature = self.crop.CalendarType == 2 or self.crop.SwitchGDD == 1
+        keys = {}
+        template = np.zeros(self.n_sites, dtype=np.int64)
+        for site in range(self.n_sites):
+            key = self._weather[:, site, :2].tobytes() if by_temperature else None
+            template[site] = keys.setdefault(key, len(keys))
+
+        first_sites = [int(np.flatnonzero(template == k)[0]) for k in range(len(keys))]
+        self._calendars = [self._create_calendar(site) for site in first_sites]
+
+        # initial conditions of each (calendar, initial water content)
+        conditions = {}
+        site_conditions = []
+        for site in range(self.n_sites):
+            calendar = self._calendars[template[site]]
+            iwc = self.initial_water_content[site]
+            key = (template[site], id(iwc))
+            if key not in conditions:
+                _, conditions[key] = read_model_initial_conditions(
+                    calendar.param_struct, calendar.clock, iwc, calendar.model.crop
+                )
+            site_conditions.append(conditions[key])
+        self._cond = BatchCondition(site_conditions)
+
+        clock = self._calendars[0].clock
+        self._clock = clock
+        self._template = template
+        self._counter = np.full(self.n_sites, clock.time_step_counter, dtype=np.int64)
+        self._season = np.full(self.n_sites, clock.season_counter, dtype=np.int64)
+        self._finished = np.zeros(self.n_sites, dtype=bool)
+        self._planting_steps = np.array(
+            [c.clock.planting_steps for c in self._calendars], dtype=np.int64
+        ).reshape(len(self._calendars), clock.n_seasons)
+        self._harvest_steps = np.array(
+            [c.clock.harvest_steps for c in self._calendars], dtype=np.int64
+        ).reshape(len(self._calendars), clock.n_seasons)
+
+        self._final_stats = [
+            pd.DataFrame(columns=FINAL_STATS_COLUMNS) for _ in range(self.n_sites)
+        ]
+        n_rows = len(clock.time_span)
+        n_comp = self._cond.th.shape[1]
+        if self.output_level == "daily":
+            self._water_flux = np.zeros((self.n_sites, n_rows, len(WATER_FLUX_COLUMNS)))
+            self._water_storage = np.zeros((self.n_sites, n_rows, 3 + n_comp))
+            self._crop_growth = np.zeros((self.n_sites, n_rows, len(CROP_GROWTH_COLUMNS)))
+        else:
+            self._water_flux = None
+            self._water_storage = None
+            self._crop_growth = None
+
+        self._is_initialized = True
+
+    def _create_calendar(self, site: int) -> "_Calendar":
+        """
+        Read the model parameters with the weather of a site
+
+        Arguments:
+
+            site (int): index of the site
+
+        Returns:
+
+            calendar (_Calendar): parameters shared by the sites with the \
+                same crop calendar
+        """
+        model = AquaCropModel(
+            sim_start_time=self.sim_start_time,
+            sim_end_time=self.sim_end_time,
+            weather_df=self.weather_df[site],
+            soil=copy.deepcopy(self.soil),
+            crop=copy.deepcopy(self.crop),
+            initial_water_content=copy.deepcopy(self.initial_water_content[site]),
+            irrigation_management=copy.deepcopy(self.irrigation_management),
+            field_management=copy.deepcopy(self.field_management),
+            fallow_field_management=copy.deepcopy(self.fallow_field_management),
+            groundwater=copy.deepcopy(self.groundwater),
+            co2_concentration=copy.deepcopy(self.co2_concentration),
+            off_season=self.off_season,
+            backend="python",
+            output_level="final_only",
+        )
+        model._initialize()
+        return _Calendar(model)
+
+    def run_model(
+        self,
+        num_steps: int = 1,
+        till_termination: bool = False,
+        initialize_model: bool = True,
+    ) -> bool:
+        """
+        Advance all the sites of the batch.
+
+        Arguments:
+
+            num_steps: Number of batch steps (calendar days) to be executed.
+
+            till_termination: Run the simulation of every site to completion
+
+            initialize_model: Whether to initialize the model \
+            (i.e., go back to beginning of season)
+
+        Returns:
+            True if every site is finished
+        """
+        if initialize_model or not self._is_initialized:
+            self._initialize()
+
+        if till_termination:
+            while not self._finished.all():
+                self._perform_timestep()
+        else:
+            if num_steps < 1:
+                raise ValueError("num_steps must be equal to or greater than 1.")
+            for _ in range(num_steps):
+                if self._finished.all():
+                    break
+                self._perform_timestep()
+
+        self._has_executed = True
+        return bool(self._finished.all())
+
+    def _perform_timestep(self) -> None:
+        """
+        Solve every unfinished site whose clock is on the earliest current day
+        """
+        cond = self._cond
+        clock = self._clock
+        t = int(self._counter[~self._finished].min())
+        active = np.flatnonzero((self._counter == t) & ~self._finished)
+
+        season = self._season[active]
+        template = self._template[active]
+        season_index = np.maximum(season, 0)
+        growing = (
+            (season >= 0)
+            & (self._planting_steps[template, season_index] <= t)
+            & (self._harvest_steps[template, season_index] >= t)
+            & ~cond.crop_mature[active]
+            & ~cond.crop_dead[active]
+        )
+
+        # sites solved by the same kernel calls
+        keys = np.column_stack([template, season, growing, cond.clipped[active]])
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        for group_index, (k, season_counter, growing_season, _) in enumerate(groups):
+            sites = active[inverse == group_index]
+            self._solve_group(sites, int(k), int(season_counter), bool(growing_season), t)
+
+        # Check model termination
+        harvest_flag = cond.harvest_flag[active]
+        finished = (t + 1 >= clock.n_steps - 1) | (
+            harvest_flag & (season == clock.n_seasons - 1)
+        )
+        self._finished[active] = finished
+
+        # Update time step of the sites that are not finished
+        active = active[~finished]
+        season = season[~finished]
+        template = template[~finished]
+        jump = harvest_flag[~finished] & (clock.sim_off_season is False)
+        has_next = season < clock.n_seasons - 1
+        next_planting = self._planting_steps[
+            template, np.minimum(season + 1, clock.n_seasons - 1)
+        ]
+        counter = np.where(jump, next_planting, t + 1)
+        starts = has_next & (jump | (counter == next_planting))
+        self._counter[active] = counter
+        self._season[active] = np.where(starts, season + 1, season)
+
+        # Reset initial conditions for start of growing season
+        if starts.any():
+            keys = np.column_stack([template[starts], season[starts] + 1])
+            groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            for group_index, (k, season_counter) in enumerate(groups):
+                sites = active[starts][inverse == group_index]
+                self._reset(sites, int(k), int(season_counter))
+
+    def _solve_group(
+        self, sites: "ndarray", k: int, season_counter: int, growing_season: bool, t: int
+    ) -> None:
+        """
+        Solve one day of the sites that share a calendar, season and growing stage
+
+        Arguments:
+
+            sites (numpy.ndarray): indices of the sites
+
+            k (int): index of the calendar of the sites
+
+            season_counter (int): current season, -1 before the first one
+
+            growing_season (bool): is growing season (True or False)
+
+            t (int): current day
+        """
+        calendar = self._calendars[k]
+        param_struct = calendar.param_struct
+
+        # Assign crop, irrigation management, and field management structures
+        if season_counter >= 0:
+            crop = param_struct.Seasonal_Crops.season(season_counter)
+            crop_name = param_struct.CropChoices[season_counter]
+            IrrMngt = param_struct.IrrMngt
+            if growing_season is True:
+                FieldMngt = param_struct.FieldMngt
+            else:
+                FieldMngt = param_struct.FallowFieldMngt
+        else:
+            crop = param_struct.Fallow_Crop
+            IrrMngt = param_struct.FallowIrrMngt
+            FieldMngt = param_struct.FallowFieldMngt
+        param_struct.CO2.current_concentration = calendar.co2[season_counter]
+
+        cond = self._cond.take(sites)
+        water_flux, crop_growth, IrrTot = solution_single_time_step(
+            cond,
+            param_struct,
+            calendar.profiles,
+            t,
+            season_counter,
+            growing_season,
+            crop,
+            IrrMngt,
+            FieldMngt,
+            self._weather[t, sites],
+            self._clock.evap_time_steps,
+            self._clock.sim_off_season,
+        )
+
+        if self._water_flux is not None:
+            self._water_flux[sites, t] = water_flux
+            self._crop_growth[sites, t] = crop_growth
+            self._water_storage[sites, t, 0] = t
+            self._water_storage[sites, t, 1] = growing_season
+            self._water_storage[sites, t, 2] = cond.dap
+            self._water_storage[sites, t, 3:] = cond.th
+
+        # Final output (if at end of growing season)
+        if season_counter > -1:
+            harvested = (
+                cond.crop_mature
+                | cond.crop_dead
+                | (calendar.clock.harvest_steps[season_counter] == t + 1)
+            ) & ~cond.harvest_flag
+            harvest_date = self._clock.time_span[0] + np.timedelta64(t + 1, "D")
+            for i in np.flatnonzero(harvested):
+                self._final_stats[sites[i]].loc[season_counter] = [
+                    season_counter,
+                    crop_name,
+                    harvest_date,
+                    t,
+                    cond.DryYield[i],
+                    cond.FreshYield[i],
+                    cond.YieldPot[i],
+                    IrrTot[i],
+                ]
+            cond.harvest_flag[harvested] = True
+
+        self._cond.put(sites, cond)
+
+    def _reset(self, sites: "ndarray", k: int, season_counter: int) -> None:
+        """
+        Reset the state of sites at the start of a growing season
+
+        Arguments:
+
+            sites (numpy.ndarray): indices of the sites
+
+            k (int): index of the calendar of the sites
+
+            season_counter (int): season that starts
+        """
+        calendar = self._calendars[k]
+        if season_counter not in calendar.resets:
+            clock = copy.copy(calendar.clock)
+            clock.season_counter = season_counter
+            clock.time_step_counter = clock.planting_steps[season_counter]
+            init_cond, _ = reset_initial_conditions(
+                clock,
+                InitialCondition(self._cond.th.shape[1]),
+                calendar.param_struct,
+                calendar.model.crop,
+            )
+            calendar.resets[season_counter] = (
+                {name: getattr(init_cond, name) for name in RESET_FIELDS},
+                init_cond.surface_storage,
+            )
+            calendar.co2[season_counter] = calendar.param_struct.CO2.current_concentration
+
+        values, surface_storage = calendar.resets[season_counter]
+        cond = self._cond
+        for name, value in values.items():
+            getattr(cond, name)[sites] = value
+
+        # Reset soil water conditions (if not running off-season)
+        if self._clock.sim_off_season is False:
+            cond.th[sites] = cond.thini[sites]
+            cond.aliased[sites] = True
+            cond.surface_storage[sites] = surface_storage
+
+    def get_state(self, names: Optional[Sequence[str]] = None) -> Dict[str, "ndarray"]:
+        """
+        Return the current state of every site as a struct of arrays.
+
+        Arguments:
+
+            names: names of the `InitialCondition` attributes to return, all \
+                of them if None
+
+        Returns:
+            dict of arrays with one row per site
+        """
+        if not self._is_initialized:
+            raise ValueError(
+                "You cannot get the state without running the model. "
+                + "Please execute the run_model() method."
+            )
+        return self._cond.as_dict(names)
+
+    def get_simulation_results(self) -> Union[List["DataFrame"], bool]:
+        """
+        Return the final stats of every site, False until every site is finished
+        """
+        self._check_executed()
+        if self._finished.all():
+            return [final_stats.copy() for final_stats in self._final_stats]
+        return False
+
+    def get_water_storage(self) -> List[Optional["DataFrame"]]:
+        """
+        Return water storage in soil results of every site
+        """
+        self._check_executed()
+        columns = water_storage_columns(self._cond.th.shape[1])
+        return _daily_tables(self._water_storage, columns, self.n_sites)
+
+    def get_water_flux(self) -> List[Optional["DataFrame"]]:
+        """
+        Return water flux results of every site
+        """
+        self._check_executed()
+        return _daily_tables(self._water_flux, WATER_FLUX_COLUMNS, self.n_sites)
+
+    def get_crop_growth(self) -> List[Optional["DataFrame"]]:
+        """
+        Return crop growth results of every site
+        """
+        self._check_executed()
+        return _daily_tables(self._crop_growth, CROP_GROWTH_COLUMNS, self.n_sites)
+
+    def _check_executed(self) -> None:
+        """
+        Raise an error if the batch has not been run
+        """
+        if not self._has_executed:
+            raise ValueError(
+                "You cannot get results without running the model. "
+                + "Please execute the run_model() method."
+            )
+
+
+class _Calendar:
+    """
+    Model parameters of the sites that share a crop calendar
+
+    Attributes:
+
+        model (AquaCropModel): initialized model the parameters are read from
+
+        param_struct (ParamStruct): model parameters
+
+        clock (ClockStruct): model time paramaters
+
+        profiles (tuple): soil profile as read and with the compartment depths \
+            clipped to the curve number depth
+
+        resets (dict): values of the state reset at the start of each season
+
+        co2 (dict): CO2 concentration of each season
+
+    """
+
+    def __init__(self, model: "AquaCropModel"):
+
+        self.model = model
+        self.param_struct = model._param_struct
+        self.clock = model._clock_struct
+        self.param_struct.backend = "python"
+
+        # the filler crop of the fallow period before the first season
+        self.param_struct.Fallow_Crop.Aer = 5
+        self.param_struct.Fallow_Crop.Zmin = 0.3
+
+        Soil = self.param_struct.Soil
+        self.profiles = (Soil.Profile, _clipped_profile(Soil.Profile, Soil.z_cn))
+        self.resets = {}
+        concentration = self.param_struct.CO2.current_concentration
+        self.co2 = {-1: concentration, 0: concentration}
+
+
+def _clipped_profile(prof: "SoilProfile", z_cn: float) -> "SoilProfile":
+    """
+    Return a copy of the soil profile with the compartment depths clipped
+    the way the curve number adjustment of rainfall_partition clips them
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        z_cn (float): depth of the curve number adjustment
+
+    Returns:
+
+        prof (SoilProfile): clipped copy of the profile
+    """
+    prof = copy.deepcopy(prof)
+    n_comp = len(prof.dzsum)
+    comp_sto = n_comp - len(prof.dzsum[prof.dzsum >= z_cn]) + 1
+    for ii in range(min(comp_sto, n_comp)):
+        if prof.dzsum[ii] > z_cn:
+            prof.dzsum[ii] = z_cn
+    return prof
+
+
+def _daily_tables(
+    values: Optional["ndarray"], columns: List[str], n_sites: int
+) -> List[Optional["DataFrame"]]:
+    """
+    Return the daily table of each site, None for each site if not kept
+    """
+    if values is None:
+        return [None] * n_sites
+    return [pd.DataFrame(values[site], columns=columns) for site in range(n_sites)]
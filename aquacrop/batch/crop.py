@@ -0,0 +1,1516 @@
+"""
+Crop growth kernels that advance every site of a batch in one call
+
+Each function follows the scalar function of the same name in
+aquacrop.solution, in the same order of operations, with the branches of
+the scalar code taken site by site through boolean masks. The crop
+parameters are shared by the sites, the state of the sites is read from
+and written to a BatchCondition.
+"""
+import numpy as np
+
+from typing import Tuple, TYPE_CHECKING
+
+from .helpers import power, py_max, py_min, py_round
+from .water import root_zone_water
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+    from aquacrop.entities.co2 import CO2
+    from aquacrop.entities.crop import Crop
+    from aquacrop.entities.soilProfile import SoilProfile
+    from .condition import BatchCondition
+
+
+def growing_degree_day(
+    GDDmethod: int,
+    Tupp: float,
+    Tbase: float,
+    temp_max: "ndarray",
+    temp_min: "ndarray",
+) -> "ndarray":
+    """
+    Growing degree days of each site on the current day
+
+    Arguments:
+
+        GDDmethod (int): growing degree day calculation method
+
+        Tupp (float): upper temperature (degC) above which crop development no longer increases
+
+        Tbase (float): base temperature (degC) below which growth does not progress
+
+        temp_max (numpy.ndarray): maximum temperature of each site
+
+        temp_min (numpy.ndarray): minimum temperature of each site
+
+    Returns:
+
+        gdd (numpy.ndarray): growing degree days of each site
+    """
+    if GDDmethod == 1:
+        Tmean = (temp_max + temp_min) / 2
+        Tmean = py_min(Tmean, Tupp)
+        Tmean = py_max(Tmean, Tbase)
+        gdd = Tmean - Tbase
+    elif GDDmethod == 2:
+        temp_max = py_max(py_min(temp_max, Tupp), Tbase)
+        temp_min = py_max(py_min(temp_min, Tupp), Tbase)
+        Tmean = (temp_max + temp_min) / 2
+        gdd = Tmean - Tbase
+    elif GDDmethod == 3:
+        temp_max = py_max(py_min(temp_max, Tupp), Tbase)
+        temp_min = py_min(temp_min, Tupp)
+        Tmean = (temp_max + temp_min) / 2
+        Tmean = py_max(Tmean, Tbase)
+        gdd = Tmean - Tbase
+    return gdd
+
+
+def _adjusted_time(Crop: "Crop", cond: "BatchCondition") -> "ndarray":
+    """
+    Time after planting of each site, less the delay of germination
+    """
+    if Crop.CalendarType == 1:
+        return cond.dap - cond.delayed_cds
+    return cond.gdd_cum - cond.delayed_gdds
+
+
+def _root_depth(Crop: "Crop", t: "ndarray", Zini: float, t0: float) -> "ndarray":
+    """
+    Potential rooting depth of each site at time t after planting
+    """
+    tmax = Crop.MaxRooting
+    X = (t - t0) / (tmax - t0)
+    Zr = np.where(
+        t >= tmax,
+        Crop.Zmax,
+        np.where(
+            t <= t0, Zini, Zini + (Crop.Zmax - Zini) * np.power(X, 1 / Crop.fshape_r)
+        ),
+    )
+    return np.where(Zr < Crop.Zmin, Crop.Zmin, Zr)
+
+
+def root_development(
+    Crop: "Crop",
+    prof: "SoilProfile",
+    cond: "BatchCondition",
+    gdd: "ndarray",
+    growing_season: bool,
+    water_table_presence: int,
+) -> Tuple["ndarray", "ndarray"]:
+    """
+    Root zone expansion of each site
+
+    Arguments:
+
+        Crop (Crop): crop paramaters
+
+        prof (SoilProfile): soil profile paramaters
+
+        cond (BatchCondition): state of the sites
+
+        gdd (numpy.ndarray): growing degree days of each site on the current day
+
+        growing_season (bool): is growing season (True or False)
+
+        water_table_presence (int): water table present (1) or not (0)
+
+    Returns:
+
+        z_root (numpy.ndarray): rooting depth of each site
+
+        r_cor (numpy.ndarray): root water extraction correction of each site
+    """
+    n_sites = cond.n_sites
+    Zroot_init = cond.z_root.copy()
+    if growing_season is False:
+        return np.zeros(n_sites), cond.r_cor.copy()
+
+    Soil_nLayer = np.unique(prof.Layer).shape[0]
+    Zroot_init = np.where(cond.dap == 1, float(Crop.Zmin) * 1.0, Zroot_init)
+
+    tAdj = _adjusted_time(Crop, cond)
+    Zini = Crop.Zmin * (Crop.PctZmin / 100)
+    t0 = round((Crop.Emergence / 2))
+    if Crop.CalendarType == 1:
+        tOld = tAdj - 1
+    elif Crop.CalendarType == 2:
+        tOld = tAdj - gdd
+    ZrOld = _root_depth(Crop, tOld, Zini, t0)
+    Zr = _root_depth(Crop, tAdj, Zini, t0)
+    ZrPot = Zr
+    dZr = Zr - ZrOld
+
+    # restrictive soil layers, crossed by all the sites in the same order
+    deep = Zr > Crop.Zmin
+    if deep.any():
+        layeri = 1
+        l_idx = np.argwhere(prof.Layer == layeri).flatten()
+        Zsoil = prof.dz[l_idx].sum()
+        while (round(Zsoil, 2) <= Crop.Zmin) and (layeri < Soil_nLayer):
+            layeri = layeri + 1
+            l_idx = np.argwhere(prof.Layer == layeri).flatten()
+            Zsoil = Zsoil + prof.dz[l_idx].sum()
+        layer_comp = l_idx[0]
+        ZrAdj = Crop.Zmin
+        ZrRemain = Zr - Crop.Zmin
+        deltaZ = Zsoil - Crop.Zmin
+        ZrOUT = np.zeros(n_sites)
+        todo = deep.copy()
+        while todo.any():
+            ZrTest = ZrAdj + (ZrRemain * (prof.Penetrability[layer_comp] / 100))
+            if (layeri == Soil_nLayer) or (prof.Penetrability[layer_comp] == 0):
+                end = todo
+            else:
+                end = todo & (ZrTest <= Zsoil)
+            ZrOUT = np.where(end, ZrTest, ZrOUT)
+            todo = todo & ~end
+            if not todo.any():
+                break
+            ZrAdj = Zsoil
+            ZrRemain = ZrRemain - (deltaZ / (prof.Penetrability[layer_comp] / 100))
+            layeri = layeri + 1
+            l_idx = np.argwhere(prof.Layer == layeri).flatten()
+            layer_comp = l_idx[0]
+            soil_layer_dz = prof.dz[l_idx].sum()
+            Zsoil = Zsoil + soil_layer_dz
+            deltaZ = soil_layer_dz
+        Zr = np.where(deep, py_max(ZrOUT, ZrOld), Zr)
+        dZr = np.where(deep, Zr - ZrOld, dZr)
+
+    # reduced expansion under transpiration stress
+    stressed = cond.tr_ratio < 0.9999
+    if Crop.fshape_ex >= 0:
+        dZr = np.where(stressed, dZr * cond.tr_ratio, dZr)
+    else:
+        fAdj = (np.exp(cond.tr_ratio * Crop.fshape_ex) - 1) / (np.exp(Crop.fshape_ex) - 1)
+        dZr = np.where(stressed, dZr * fAdj, dZr)
+
+    # dry soil at the root front
+    expanding = dZr > 0.001
+    if expanding.any():
+        pZexp = Crop.p_up[1] + ((1 - Crop.p_up[1]) / 2)
+        ZiTmp = Zroot_init + dZr
+        idx = np.searchsorted(prof.dzsum, ZiTmp, side="left")
+        idx = np.minimum(idx, len(prof.dzsum) - 1)
+        th = cond.th[np.arange(n_sites), idx]
+        TAWprof = prof.th_fc[idx] - prof.th_wp[idx]
+        thThr = prof.th_fc[idx] - (pZexp * TAWprof)
+        dry = expanding & (th < thThr)
+        Wrel = (prof.th_fc[idx] - th) / TAWprof
+        Drel = 1 - ((1 - Wrel) / (1 - pZexp))
+        Ks = 1 - (
+            (np.exp(Drel * Crop.fshape_w[1]) - 1) / (np.exp(Crop.fshape_w[1]) - 1)
+        )
+        dZr = np.where(dry, np.where(th <= prof.th_wp[idx], 0.0, dZr * Ks), dZr)
+
+    # no expansion before germination or once the canopy has died back
+    dZr = np.where((cond.canopy_cover <= 0) & (cond.canopy_cover_ns > 0.5), 0.0, dZr)
+    dZr = np.where(cond.germination == False, 0.0, dZr)
+
+    Zroot = Zroot_init + dZr
+    rCor = (
+        2 * (ZrPot / Zroot) * ((Crop.SxTop + Crop.SxBot) / 2) - Crop.SxTop
+    ) / Crop.SxBot
+    transpiring = cond.t_pot > 0
+    rCor = np.where(transpiring, rCor * cond.tr_ratio, rCor)
+    rCor = np.where(transpiring & (rCor < 1), 1.0, rCor)
+    r_cor = np.where(Zroot < ZrPot, rCor, 1.0)
+
+    # roots do not grow into the water table
+    if water_table_presence == 1:
+        capped = (cond.z_gw > 0) & (Zroot > cond.z_gw)
+        Zroot = np.where(capped, cond.z_gw, Zroot)
+        Zroot = np.where(capped & (Zroot < Crop.Zmin), float(Crop.Zmin), Zroot)
+
+    return Zroot, r_cor
+
+
+def germination(
+    cond: "BatchCondition",
+    Soil_zGerm: float,
+    prof: "SoilProfile",
+    Crop_GermThr: float,
+    Crop_PlantMethod: bool,
+    gdd: "ndarray",
+    growing_season: bool,
+) -> None:
+    """
+    Check if the crop of each site has germinated
+
+    Arguments:
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        Soil_zGerm (float): soil depth affecting germination
+
+        prof (SoilProfile): soil profile paramaters
+
+        Crop_GermThr (float): crop paramaters
+
+        Crop_PlantMethod (bool): sown as seedling True or False
+
+        gdd (numpy.ndarray): growing degree days of each site
+
+        growing_season (bool): is growing season (True or False)
+
+    """
+    if growing_season is False:
+        cond.germination[:] = False
+        cond.protected_seed[:] = False
+        cond.delayed_cds[:] = 0
+        cond.delayed_gdds[:] = 0
+        return
+
+    waiting = cond.germination == False
+    if not waiting.any():
+        return
+
+    comp_sto = np.argwhere(prof.dzsum >= Soil_zGerm).flatten()[0]
+    Wr = 0
+    WrFC = 0
+    WrWP = 0
+    for ii in range(comp_sto + 1):
+        if prof.dzsum[ii] > Soil_zGerm:
+            factor = 1 - ((prof.dzsum[ii] - Soil_zGerm) / prof.dz[ii])
+        else:
+            factor = 1
+        Wr = Wr + np.round(factor * 1000 * cond.th[:, ii] * prof.dz[ii], 3)
+        WrFC = WrFC + round(factor * 1000 * prof.th_fc[ii] * prof.dz[ii], 3)
+        WrWP = WrWP + round(factor * 1000 * prof.th_wp[ii] * prof.dz[ii], 3)
+    Wr = np.where(Wr < 0, 0.0, Wr)
+
+    WcProp = 1 - ((WrFC - Wr) / (WrFC - WrWP))
+    germinated = waiting & (WcProp >= Crop_GermThr)
+    delayed = waiting & ~germinated
+    cond.germination[germinated] = True
+    cond.protected_seed[germinated] = Crop_PlantMethod == True
+    cond.delayed_cds[:] = np.where(delayed, cond.delayed_cds + 1, cond.delayed_cds)
+    cond.delayed_gdds[:] = np.where(delayed, cond.delayed_gdds + gdd, cond.delayed_gdds)
+    cond.protected_seed[delayed] = False
+
+
+def growth_stage(Crop: "Crop", cond: "BatchCondition", growing_season: bool) -> None:
+    """
+    Growth stage of the crop of each site
+
+    Arguments:
+
+        Crop (Crop): crop paramaters
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        growing_season (bool): is growing season (True or False)
+
+    """
+    if growing_season is False:
+        cond.growth_stage[:] = 0
+        return
+
+    tAdj = _adjusted_time(Crop, cond)
+    cond.growth_stage[:] = np.where(
+        tAdj <= Crop.Canopy10Pct,
+        1,
+        np.where(
+            tAdj <= Crop.MaxCanopy,
+            2,
+            np.where(tAdj <= Crop.Senescence, 3, np.where(tAdj > Crop.Senescence, 4, cond.growth_stage)),
+        ),
+    )
+
+
+def water_stress(
+    Crop: "Crop",
+    InitCond_tEarlySen: "ndarray",
+    Dr: "ndarray",
+    taw: "ndarray",
+    et0: "ndarray",
+    beta: bool,
+) -> Tuple["ndarray", "ndarray", "ndarray", "ndarray", "ndarray"]:
+    """
+    Water stress coefficients of each site
+
+    Arguments:
+
+        Crop (Crop): crop paramaters
+
+        InitCond_tEarlySen (numpy.ndarray): days of early senescence of each site
+
+        Dr (numpy.ndarray): root zone depletion
+
+        taw (numpy.ndarray): root zone total available water
+
+        et0 (numpy.ndarray): reference evapotranspiration
+
+        beta (bool): adjust the senescence threshold for early senescence
+
+    Returns:
+
+        Ksw_Exp, Ksw_Sto, Ksw_Sen, Ksw_Pol, Ksw_StoLin (numpy.ndarray): \
+            water stress coefficients for canopy expansion, stomatal \
+            closure, senescence, pollination and linear stomatal closure
+    """
+    n_sites = len(Dr)
+    nstress = len(Crop.p_up)
+    p_up = np.ones((n_sites, nstress)) * Crop.p_up
+    p_lo = np.ones((n_sites, nstress)) * Crop.p_lo
+    if Crop.ETadj == 1:
+        for ii in range(3):
+            p_up[:, ii] = p_up[:, ii] + (0.04 * (5 - et0)) * (np.log10(10 - 9 * p_up[:, ii]))
+            p_lo[:, ii] = p_lo[:, ii] + (0.04 * (5 - et0)) * (np.log10(10 - 9 * p_lo[:, ii]))
+
+    if beta == True:
+        early = InitCond_tEarlySen > 0
+        p_up[early, 2] = p_up[early, 2] * (1 - Crop.beta / 100)
+
+    p_up = np.minimum(np.maximum(p_up, 0.0), 1.0)
+    p_lo = np.minimum(np.maximum(p_lo, 0.0), 1.0)
+
+    Dr = Dr[:, None]
+    taw = taw[:, None]
+    Drel = np.where(
+        Dr <= (p_up * taw),
+        0.0,
+        np.where(
+            (Dr > (p_up * taw)) & (Dr < (p_lo * taw)),
+            1 - ((p_lo - (Dr / taw)) / (p_lo - p_up)),
+            np.where(Dr >= (p_lo * taw), 1.0, 0.0),
+        ),
+    )
+
+    fshape_w = np.asarray(Crop.fshape_w)[:3]
+    Ks = 1 - ((np.exp(Drel[:, :3] * fshape_w) - 1) / (np.exp(fshape_w) - 1))
+    return Ks[:, 0], Ks[:, 1], Ks[:, 2], 1 - Drel[:, 3], 1 - Drel[:, 1]
+
+
+def _root_zone_stress_water(
+    prof: "SoilProfile", Soil_zTop: float, Crop: "Crop", cond: "BatchCondition"
+) -> Tuple["ndarray", "ndarray", Tuple["ndarray", ...]]:
+    """
+    Depletion and total available water of the top soil or root zone of
+    each site, whichever is relatively drier, and the root zone water
+    """
+    rz = root_zone_water(
+        prof, cond.z_root, cond.th, Soil_zTop, float(Crop.Zmin), Crop.Aer
+    )
+    _, Dr_Zt, Dr_Rz, TAW_Zt, TAW_Rz = rz[:5]
+    root_zone = (Dr_Rz / TAW_Rz) <= (Dr_Zt / TAW_Zt)
+    Dr = np.where(root_zone, Dr_Rz, Dr_Zt)
+    taw = np.where(root_zone, TAW_Rz, TAW_Zt)
+    return Dr, taw, rz
+
+
+def cc_development(CCo, CCx, CGC, CDC, dt, Mode: str, CCx0) -> "ndarray":
+    """
+    Canopy cover of each site by the end of the current day
+
+    Arguments:
+
+        CCo, CCx, CGC, CDC, dt, CCx0 (numpy.ndarray or float): see \
+            aquacrop.solution.cc_development
+
+        Mode (str): stage of canopy development (Growth or Decline)
+
+    Returns:
+
+        canopy_cover (numpy.ndarray): canopy cover
+    """
+    if Mode == "Growth":
+        canopy_cover = CCo * np.exp(CGC * dt)
+        canopy_cover = np.where(
+            canopy_cover > (CCx / 2),
+            CCx - 0.25 * (CCx / CCo) * CCx * np.exp(-CGC * dt),
+            canopy_cover,
+        )
+        canopy_cover = np.where(canopy_cover > CCx, CCx, canopy_cover)
+    elif Mode == "Decline":
+        canopy_cover = np.where(
+            CCx < 0.001,
+            0.0,
+            CCx
+            * (
+                1
+                - 0.05
+                * (np.exp(dt * CDC * 3.33 * ((CCx + 2.29) / (CCx0 + 2.29)) / (CCx + 2.29)) - 1)
+            ),
+        )
+    return np.where(canopy_cover > 1, 1.0, np.where(canopy_cover < 0, 0.0, canopy_cover))
+
+
+def cc_required_time(cc_prev, CCo, CCx, CGC) -> "ndarray":
+    """
+    Time required to reach the canopy cover of the previous day with the
+    canopy growth coefficient CGC (mode "CGC" of the scalar function)
+    """
+    CGCx = np.where(
+        cc_prev <= (CCx / 2),
+        np.log(cc_prev / CCo),
+        np.log((0.25 * CCx * CCx / CCo) / (CCx - cc_prev)),
+    )
+    return CGCx / CGC
+
+
+def adjust_CCx(cc_prev, CCo, CCx, CGC, CDC, dt, tSum, Crop_CanopyDevEnd, Crop_CCx) -> "ndarray":
+    """
+    Maximum canopy cover of each site adjusted for the water stress
+    reduction of the canopy growth coefficient
+
+    Arguments:
+
+        cc_prev, CCo, CCx, CGC, CDC, dt, tSum, Crop_CanopyDevEnd, Crop_CCx: \
+            see aquacrop.solution.adjust_CCx
+
+    Returns:
+
+        CCxAdj (numpy.ndarray): adjusted maximum canopy cover
+    """
+    tCCtmp = cc_required_time(cc_prev, CCo, CCx, CGC)
+    later = tCCtmp > 0
+    tCCtmp = tCCtmp + (Crop_CanopyDevEnd - tSum) + dt
+    CCxAdj = cc_development(CCo, CCx, CGC, CDC, tCCtmp, "Growth", Crop_CCx)
+    return np.where(later, CCxAdj, 0.0)
+
+
+def update_CCx_CDC(cc_prev, CDC, CCx, dt) -> Tuple["ndarray", "ndarray"]:
+    """
+    Maximum canopy cover and canopy decline coefficient of each site for
+    the rewatering of an early declining canopy
+
+    Arguments:
+
+        cc_prev, CDC, CCx, dt: see aquacrop.solution.update_CCx_CDC
+
+    Returns:
+
+        CCXadj (numpy.ndarray): adjusted maximum canopy cover
+
+        CDCadj (numpy.ndarray): adjusted canopy decline coefficient
+    """
+    CCXadj = cc_prev / (1 - 0.05 * (np.exp(dt * ((CDC * 3.33) / (CCx + 2.29))) - 1))
+    CDCadj = CDC * ((CCXadj + 2.29) / (CCx + 2.29))
+    return CCXadj, CDCadj
+
+
+def canopy_cover(
+    Crop: "Crop",
+    prof: "SoilProfile",
+    Soil_zTop: float,
+    cond: "BatchCondition",
+    gdd: "ndarray",
+    et0: "ndarray",
+    growing_season: bool,
+) -> None:
+    """
+    Canopy growth and decline of each site
+
+    Arguments:
+
+        Crop (Crop): crop paramaters
+
+        prof (SoilProfile): soil profile paramaters
+
+        Soil_zTop (float): top soil depth
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        gdd (numpy.ndarray): growing degree days of each site
+
+        et0 (numpy.ndarray): reference evapotranspiration of each site
+
+        growing_season (bool): is growing season (True or False)
+
+    """
+    InitCond_CC_NS = cond.canopy_cover_ns.copy()
+    InitCond_CC = cond.canopy_cover.copy()
+    InitCond_ProtectedSeed = cond.protected_seed.copy()
+    InitCond_CCxAct = cond.ccx_act.copy()
+    InitCond_CropDead = cond.crop_dead.copy()
+    InitCond_tEarlySen = cond.t_early_sen.copy()
+    InitCond_CCxW = cond.ccx_w.copy()
+    cond.cc_prev[:] = InitCond_CC
+
+    if growing_season is False:
+        for name in (
+            "canopy_cover",
+            "canopy_cover_adj",
+            "canopy_cover_ns",
+            "canopy_cover_adj_ns",
+            "ccx_w",
+            "ccx_act",
+            "ccx_w_ns",
+            "ccx_act_ns",
+        ):
+            getattr(cond, name)[:] = 0
+        return
+
+    Dr, taw, _ = _root_zone_stress_water(prof, Soil_zTop, Crop, cond)
+    Ksw_Exp, _, Ksw_Sen, _, _ = water_stress(
+        Crop, cond.t_early_sen, Dr, taw, et0, True
+    )
+
+    if Crop.CalendarType == 1:
+        dtCC = 1
+    elif Crop.CalendarType == 2:
+        dtCC = gdd
+    tCCadj = _adjusted_time(Crop, cond)
+
+    CC = InitCond_CC.copy()
+    CC_NS = InitCond_CC_NS.copy()
+    CCxAct = InitCond_CCxAct.copy()
+    CCxAct_NS = cond.ccx_act_ns.copy()
+    CCxW = InitCond_CCxW.copy()
+    CCxW_NS = cond.ccx_w_ns.copy()
+    CC0adj = cond.cc0_adj.copy()
+    ProtectedSeed = InitCond_ProtectedSeed.copy()
+    CropDead = InitCond_CropDead.copy()
+
+    outside = (tCCadj < Crop.Emergence) | (np.round(tCCadj) > Crop.Maturity)
+    developing = ~outside & (tCCadj < Crop.CanopyDevEnd)
+    developed = ~outside & (tCCadj > Crop.CanopyDevEnd)
+    before_sen = developed & (tCCadj < Crop.Senescence)
+    senescent = developed & ~(tCCadj < Crop.Senescence)
+
+    # potential canopy cover (no water stress)
+    CC_NS = np.where(outside, 0.0, CC_NS)
+    small = developing & (InitCond_CC_NS <= Crop.CC0)
+    CC_NS = np.where(small, Crop.CC0 * np.exp(Crop.CGC * dtCC), CC_NS)
+    CC_NS = np.where(
+        developing & ~small,
+        cc_development(
+            Crop.CC0,
+            0.98 * Crop.CCx,
+            Crop.CGC,
+            Crop.CDC,
+            tCCadj - Crop.Emergence,
+            "Growth",
+            Crop.CCx,
+        ),
+        CC_NS,
+    )
+    CCxAct_NS = np.where(developing, CC_NS, CCxAct_NS)
+    CCxW_NS = np.where(developed, CCxAct_NS, CCxW_NS)
+    CC_NS = np.where(before_sen, InitCond_CC_NS, CC_NS)
+    CCxAct_NS = np.where(before_sen, CC_NS, CCxAct_NS)
+    CC_NS = np.where(
+        senescent,
+        cc_development(
+            Crop.CC0,
+            CCxAct_NS,
+            Crop.CGC,
+            Crop.CDC,
+            tCCadj - Crop.Senescence,
+            "Decline",
+            CCxAct_NS,
+        ),
+        CC_NS,
+    )
+
+    # actual canopy cover, before emergence or after maturity
+    CC = np.where(outside, 0.0, CC)
+    CC0adj = np.where(outside, Crop.CC0, CC0adj)
+
+    # canopy development
+    CCdev = cc_development(
+        Crop.CC0, Crop.CCx, Crop.CGC, Crop.CDC, tCCadj - Crop.Emergence, "Growth", Crop.CCx
+    )
+    starting = developing & (
+        (InitCond_CC <= CC0adj)
+        | ((InitCond_ProtectedSeed == True) & (InitCond_CC <= (1.25 * CC0adj)))
+    )
+    protected = starting & (InitCond_ProtectedSeed == True)
+    CC = np.where(protected, CCdev, CC)
+    ProtectedSeed = np.where(protected & (CC > (1.25 * CC0adj)), False, ProtectedSeed)
+    CC = np.where(starting & ~protected, CC0adj * np.exp(Crop.CGC * dtCC), CC)
+
+    growing = developing & ~starting
+    below_max = growing & (InitCond_CC < (0.9799 * Crop.CCx))
+    CGCadj = Crop.CGC * Ksw_Exp
+    expanding = below_max & (CGCadj > 0)
+    CCXadj = adjust_CCx(
+        InitCond_CC,
+        CC0adj,
+        Crop.CCx,
+        CGCadj,
+        Crop.CDC,
+        dtCC,
+        tCCadj,
+        Crop.CanopyDevEnd,
+        Crop.CCx,
+    )
+    shrunk = expanding & (CCXadj < 0)
+    CC = np.where(shrunk, InitCond_CC, CC)
+    near_max = expanding & ~shrunk & (np.abs(InitCond_CC - (0.9799 * Crop.CCx)) < 0.001)
+    CC = np.where(near_max, CCdev, CC)
+    adjusted = expanding & ~shrunk & ~near_max
+    tReq = cc_required_time(InitCond_CC, CC0adj, CCXadj, CGCadj)
+    CC = np.where(
+        adjusted & (tReq > 0),
+        cc_development(CC0adj, CCXadj, CGCadj, Crop.CDC, tReq + dtCC, "Growth", Crop.CCx),
+        CC,
+    )
+    CC = np.where(adjusted & ~(tReq > 0), InitCond_CC, CC)
+    stopped = below_max & ~(CGCadj > 0)
+    CC = np.where(stopped, InitCond_CC, CC)
+    CC0adj = np.where(stopped, np.where(CC > CC0adj, Crop.CC0, CC), CC0adj)
+    at_max = growing & ~below_max
+    CC = np.where(at_max, CCdev, CC)
+    CC0adj = np.where(at_max, Crop.CC0, CC0adj)
+    CCxAct = np.where(developing & (CC > InitCond_CCxAct), CC, CCxAct)
+
+    # canopy at its maximum, then senescence
+    CC = np.where(before_sen, InitCond_CC, CC)
+    CCxAct = np.where(before_sen & (CC > InitCond_CCxAct), CC, CCxAct)
+    CDCadj = Crop.CDC * ((CCxAct + 2.29) / (Crop.CCx + 2.29))
+    CC = np.where(
+        senescent,
+        cc_development(
+            CC0adj, CCxAct, Crop.CGC, CDCadj, tCCadj - Crop.Senescence, "Decline", CCxAct
+        ),
+        CC,
+    )
+    dead = developed & (CC < 0.001) & (InitCond_CropDead == False)
+    CC = np.where(dead, 0.0, CC)
+    CropDead = CropDead | dead
+
+    # early senescence due to water stress
+    emerged = tCCadj >= Crop.Emergence
+    checked = emerged & ((tCCadj < Crop.Senescence) | (InitCond_tEarlySen > 0))
+    stressed = checked & (Ksw_Sen < 1) & (InitCond_ProtectedSeed == False)
+    relieved = checked & ~stressed
+    if stressed.any():
+        cond.premat_senes[stressed] = True
+        cond.ccx_early_sen[:] = np.where(
+            stressed & (InitCond_tEarlySen == 0), InitCond_CC, cond.ccx_early_sen
+        )
+        cond.t_early_sen[:] = np.where(
+            stressed, InitCond_tEarlySen + dtCC, cond.t_early_sen
+        )
+        _, _, Ksw_Sen, _, _ = water_stress(Crop, cond.t_early_sen, Dr, taw, et0, False)
+        CDCadj = np.where(
+            Ksw_Sen > 0.99999, 0.0001, (1 - power(Ksw_Sen, 8)) * Crop.CDC
+        )
+        CCxEarlySen = cond.ccx_early_sen
+        tReq = (np.log(1 + (1 - InitCond_CC / CCxEarlySen) / 0.05)) / (
+            (CDCadj * 3.33) / (CCxEarlySen + 2.29)
+        )
+        tmp_tCC = tReq + dtCC
+        CCsen = CCxEarlySen * (
+            1 - 0.05 * (np.exp(tmp_tCC * ((CDCadj * 3.33) / (CCxEarlySen + 2.29))) - 1)
+        )
+        CCsen = np.where(CCsen < 0, 0.0, CCsen)
+        CCsen = np.where(CCxEarlySen < 0.001, 0.0, CCsen)
+
+        early = stressed & (tCCadj < Crop.Senescence)
+        CC = np.where(early, np.where(CCsen > Crop.CCx, Crop.CCx, CCsen), CC)
+        CC = np.where(early & (CC > InitCond_CC), InitCond_CC, CC)
+        CCxAct = np.where(early, CC, CCxAct)
+        CC0adj = np.where(early, np.where(CC < Crop.CC0, CC, Crop.CC0), CC0adj)
+        CC = np.where(stressed & ~early & (CCsen < CC), CCsen, CC)
+        dead = stressed & (CC < 0.001) & (InitCond_CropDead == False)
+        CC = np.where(dead, 0.0, CC)
+        CropDead = CropDead | dead
+
+    if relieved.any():
+        cond.premat_senes[relieved] = False
+        rewatered = relieved & (tCCadj > Crop.Senescence) & (InitCond_tEarlySen > 0)
+        CCXadj, CDCadj = update_CCx_CDC(
+            InitCond_CC, Crop.CDC, Crop.CCx, tCCadj - dtCC - Crop.Senescence
+        )
+        CCxAct = np.where(rewatered, CCXadj, CCxAct)
+        CC = np.where(
+            rewatered,
+            cc_development(
+                CC0adj, CCXadj, Crop.CGC, CDCadj, tCCadj - Crop.Senescence, "Decline", CCXadj
+            ),
+            CC,
+        )
+        dead = rewatered & (CC < 0.001) & (InitCond_CropDead == False)
+        CC = np.where(dead, 0.0, CC)
+        CropDead = CropDead | dead
+        cond.t_early_sen[relieved] = 0
+
+    CCxW = np.where(checked & (CC > InitCond_CCxW), CC, CCxW)
+
+    # potential canopy cover is never below the actual canopy cover
+    lifted = CC_NS < CC
+    CC_NS = np.where(lifted, CC, CC_NS)
+    CCxAct_NS = np.where(lifted & (tCCadj < Crop.CanopyDevEnd), CC_NS, CCxAct_NS)
+
+    cond.canopy_cover[:] = CC
+    cond.canopy_cover_ns[:] = CC_NS
+    cond.ccx_act[:] = CCxAct
+    cond.ccx_act_ns[:] = CCxAct_NS
+    cond.ccx_w[:] = CCxW
+    cond.ccx_w_ns[:] = CCxW_NS
+    cond.cc0_adj[:] = CC0adj
+    cond.protected_seed[:] = ProtectedSeed
+    cond.crop_dead[:] = CropDead
+    cond.canopy_cover_adj[:] = (1.72 * CC) - power(CC, 2) + (0.3 * power(CC, 3))
+    cond.canopy_cover_adj_ns[:] = (
+        (1.72 * CC_NS) - power(CC_NS, 2) + (0.3 * power(CC_NS, 3))
+    )
+
+
+def aeration_stress(
+    NewCond_AerDays: "ndarray",
+    Crop_LagAer: float,
+    thRZ_Act: "ndarray",
+    thRZ_S: "ndarray",
+    thRZ_Aer: "ndarray",
+) -> Tuple["ndarray", "ndarray"]:
+    """
+    Aeration stress coefficient of each site
+
+    Arguments:
+
+        NewCond_AerDays (numpy.ndarray): number of aeration stress days
+
+        Crop_LagAer (float): lag days before aeration stress
+
+        thRZ_Act, thRZ_S, thRZ_Aer (numpy.ndarray): root zone water content, \
+            at saturation and at the aeration stress threshold
+
+    Returns:
+
+        Ksa_Aer (numpy.ndarray): aeration stress coefficient
+
+        NewCond_AerDays (numpy.ndarray): number of aeration stress days
+    """
+    wet = thRZ_Act > thRZ_Aer
+    stress = 1 - ((thRZ_S - thRZ_Act) / (thRZ_S - thRZ_Aer))
+    Ksa_Aer = np.where(
+        NewCond_AerDays < Crop_LagAer,
+        1 - ((NewCond_AerDays / 3) * stress),
+        (thRZ_S - thRZ_Act) / (thRZ_S - thRZ_Aer),
+    )
+    Ksa_Aer = np.where(wet, Ksa_Aer, 1.0)
+    AerDays = NewCond_AerDays + 1
+    AerDays = np.where(AerDays > Crop_LagAer, Crop_LagAer, AerDays)
+    return Ksa_Aer, np.where(wet, AerDays, 0.0)
+
+
+def _root_water_extraction(
+    prof: "SoilProfile",
+    cond: "BatchCondition",
+    Crop: "Crop",
+    IrrMngt_IrrMethod: int,
+    et0: "ndarray",
+    TrPot: "ndarray",
+) -> Tuple["ndarray", "ndarray", "ndarray"]:
+    """
+    Extract the transpiration of each site from its root zone, the water
+    content and aeration days of the compartments are updated in place
+    """
+    dz = prof.dz
+    dzsum = prof.dzsum
+    th_fc = prof.th_fc
+    th_wp = prof.th_wp
+    th_s = prof.th_s
+    th = cond.th
+    n_sites, n_comp = th.shape
+
+    rootdepth = py_round(py_max(cond.z_root, float(Crop.Zmin)), 2)[:, None]
+    comp_sto = np.minimum(np.sum(dzsum < rootdepth, axis=1) + 1, n_comp)
+    within = np.arange(n_comp) < comp_sto[:, None]
+    RootFact = np.where(
+        within, np.where(dzsum > rootdepth, 1 - ((dzsum - rootdepth) / dz), 1.0), 0.0
+    )
+
+    if IrrMngt_IrrMethod == 4:
+        SxComp = np.where(within, (Crop.SxTop + Crop.SxBot) / 2, 0.0)
+    else:
+        rCor = cond.r_cor[:, None]
+        SxCompBot = np.where(
+            dzsum <= rootdepth,
+            Crop.SxBot * rCor + (
+                (Crop.SxTop - Crop.SxBot * rCor) * ((rootdepth - dzsum) / rootdepth)
+            ),
+            Crop.SxBot * rCor,
+        )
+        SxCompTop = np.empty((n_sites, n_comp))
+        SxCompTop[:, 0] = Crop.SxTop
+        SxCompTop[:, 1:] = SxCompBot[:, :-1]
+        SxComp = np.where(within, (SxCompTop + SxCompBot) / 2, 0.0)
+
+    # water stress of each compartment
+    if Crop.ETadj == 1:
+        p_up_sto = Crop.p_up[1] + (0.04 * (5 - et0)) * (np.log10(10 - 9 * Crop.p_up[1]))
+    else:
+        p_up_sto = np.full(n_sites, Crop.p_up[1])
+    thTAW = th_fc - th_wp
+    thCrit = th_fc - (thTAW * p_up_sto[:, None])
+    KsComp = np.where(th >= thCrit, 1.0, 0.0)
+    stressed = (th < thCrit) & (th > th_wp)
+    Wrel = (th_fc - th) / (th_fc - th_wp)
+    pRel = (Wrel - Crop.p_up[1]) / (Crop.p_lo[1] - Crop.p_up[1])
+    KsStressed = 1 - (
+        (np.exp(pRel * Crop.fshape_w[1]) - 1) / (np.exp(Crop.fshape_w[1]) - 1)
+    )
+    KsStressed = np.where(pRel <= 0, 1.0, np.where(pRel >= 1, 0.0, KsStressed))
+    KsComp = np.where(stressed, np.minimum(np.maximum(KsStressed, 0.0), 1.0), KsComp)
+
+    # aeration stress of each compartment
+    submerged = (cond.day_submerged >= Crop.LagAer)[:, None]
+    aerated = th > (th_s - (Crop.Aer / 100))
+    days = cond.aer_days_comp + 1
+    fAer = np.where(days >= Crop.LagAer, 0.0, 1.0)
+    days = np.where(days >= Crop.LagAer, float(Crop.LagAer), days)
+    AerAerated = (th_s - th) / (th_s - (th_s - (Crop.Aer / 100)))
+    AerAerated = np.maximum(AerAerated, 0.0)
+    AerComp = np.where(
+        submerged,
+        0.0,
+        np.where(aerated, (fAer + (days - 1) * AerAerated) / (fAer + days - 1), 1.0),
+    )
+    aer_days_new = np.where(
+        submerged, cond.aer_days_comp, np.where(aerated, days, 0.0)
+    )
+
+    if IrrMngt_IrrMethod == 4:
+        SinkComp = AerComp * SxComp * RootFact
+    else:
+        SinkComp = np.minimum(KsComp, AerComp) * SxComp * RootFact
+
+    # extract from the top of the root zone downwards
+    ToExtract = TrPot.copy()
+    TrAct = np.zeros(n_sites)
+    extracting = np.ones(n_sites, dtype=bool)
+    last = np.full(n_sites, -1)
+    for comp in range(n_comp):
+        extracting = extracting & (ToExtract > 0) & (comp < comp_sto)
+        if not extracting.any():
+            break
+        ThToExtract = (ToExtract / 1000) / dz[comp]
+        Sink = SinkComp[:, comp]
+        Sink = np.where(ThToExtract < Sink, ThToExtract, Sink)
+        dry = (th[:, comp] - Sink) < prof.th_dry[comp]
+        Sink = np.where(dry, th[:, comp] - prof.th_dry[comp], Sink)
+        Sink = np.where(dry & (Sink < 0), 0.0, Sink)
+        th[extracting, comp] = (th[:, comp] - Sink)[extracting]
+        ToExtract = np.where(extracting, ToExtract - (Sink * 1000 * dz[comp]), ToExtract)
+        TrAct = np.where(extracting, TrAct + (Sink * 1000 * dz[comp]), TrAct)
+        last = np.where(extracting, comp, last)
+
+    updated = np.arange(n_comp) <= last[:, None]
+    cond.aer_days_comp[:] = np.where(updated, aer_days_new, cond.aer_days_comp)
+    return TrAct, comp_sto, RootFact
+
+
+def transpiration(
+    prof: "SoilProfile",
+    Soil_nComp: int,
+    Soil_zTop: float,
+    Crop: "Crop",
+    IrrMngt_IrrMethod: int,
+    IrrMngt_NetIrrSMT: float,
+    cond: "BatchCondition",
+    et0: "ndarray",
+    CO2: "CO2",
+    growing_season: bool,
+    gdd: "ndarray",
+) -> Tuple["ndarray", "ndarray", "ndarray", "ndarray"]:
+    """
+    Crop transpiration of each site on the current day
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        Soil_nComp (int): number of compartments
+
+        Soil_zTop (float): top soil depth
+
+        Crop (Crop): crop paramaters
+
+        IrrMngt_IrrMethod (int): irrigation method
+
+        IrrMngt_NetIrrSMT (float): net irrigation threshold
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        et0 (numpy.ndarray): reference evapotranspiration of each site
+
+        CO2 (CO2): CO2 concentration of the current season
+
+        growing_season (bool): is growing season (True or False)
+
+        gdd (numpy.ndarray): growing degree days of each site
+
+    Returns:
+
+        TrAct (numpy.ndarray): actual transpiration
+
+        TrPot_NS (numpy.ndarray): potential transpiration (no water stress)
+
+        TrPot0 (numpy.ndarray): potential transpiration
+
+        IrrNet (numpy.ndarray): net irrigation (if required)
+    """
+    n_sites = cond.n_sites
+    if growing_season is False:
+        cond.irr_net_cum[:] = 0
+        cond.t_pot[:] = 0
+        zeros = np.zeros(n_sites)
+        return zeros, zeros.copy(), zeros.copy(), zeros.copy()
+
+    # potential transpiration (no water stress)
+    DAPadj = cond.dap - cond.delayed_cds
+    cond.age_days_ns[:] = np.where(
+        DAPadj > Crop.MaxCanopyCD, DAPadj - Crop.MaxCanopyCD, cond.age_days_ns
+    )
+    Kcb_NS = np.where(
+        cond.age_days_ns > 5,
+        Crop.Kcb - ((cond.age_days_ns - 5) * (Crop.fage / 100)) * cond.ccx_w_ns,
+        Crop.Kcb,
+    )
+    CO2CurrentConc = CO2.current_concentration
+    CO2RefConc = CO2.ref_concentration
+    if CO2CurrentConc > CO2RefConc:
+        Kcb_NS = Kcb_NS * (1 - 0.05 * ((CO2CurrentConc - CO2RefConc) / (550 - CO2RefConc)))
+    TrPot_NS = Kcb_NS * (cond.canopy_cover_adj_ns) * et0
+    partial = (
+        (cond.canopy_cover_ns < cond.ccx_w_ns)
+        & (cond.ccx_w_ns > 0.001)
+        & (cond.canopy_cover_ns > 0.001)
+    )
+    ratio = np.where(partial, cond.canopy_cover_ns / cond.ccx_w_ns, 1.0)
+    TrPot_NS = np.where(partial, TrPot_NS * power(ratio, Crop.a_Tr), TrPot_NS)
+
+    # potential transpiration
+    cond.age_days[:] = np.where(
+        DAPadj > Crop.MaxCanopyCD, DAPadj - Crop.MaxCanopyCD, cond.age_days
+    )
+    Kcb = np.where(
+        cond.age_days > 5,
+        Crop.Kcb - ((cond.age_days - 5) * (Crop.fage / 100)) * cond.ccx_w,
+        Crop.Kcb,
+    )
+    if CO2CurrentConc > CO2RefConc:
+        Kcb = Kcb * (1 - 0.05 * ((CO2CurrentConc - CO2RefConc) / (550 - CO2RefConc)))
+    TrPot0 = Kcb * (cond.canopy_cover_adj) * et0
+    partial = (
+        (cond.canopy_cover < cond.ccx_w)
+        & (cond.ccx_w > 0.001)
+        & (cond.canopy_cover > 0.001)
+    )
+    ratio = np.where(partial, cond.canopy_cover / cond.ccx_w, 1.0)
+    TrPot0 = np.where(partial, TrPot0 * power(ratio, Crop.a_Tr), TrPot0)
+
+    # cold stress
+    if Crop.TrColdStress == 1:
+        KsTr_up = 1
+        KsTr_lo = 0.02
+        fshapeb = (-1) * (
+            np.log(((KsTr_lo * KsTr_up) - 0.98 * KsTr_lo) / (0.98 * (KsTr_up - KsTr_lo)))
+        )
+        GDDrel = (gdd - Crop.GDD_lo) / (Crop.GDD_up - Crop.GDD_lo)
+        KsCold = (KsTr_up * KsTr_lo) / (
+            KsTr_lo + (KsTr_up - KsTr_lo) * np.exp(-fshapeb * GDDrel)
+        )
+        KsCold = KsCold - KsTr_lo * (1 - GDDrel)
+        KsCold = np.where(gdd >= Crop.GDD_up, 1, np.where(gdd <= Crop.GDD_lo, 0, KsCold))
+        TrPot0 = TrPot0 * KsCold
+        TrPot_NS = TrPot_NS * KsCold
+
+    # transpiration from surface storage when the soil is waterlogged
+    submerged = (cond.surface_storage > 0) & (cond.day_submerged < Crop.LagAer)
+    TrPot = TrPot0
+    TrAct0 = np.zeros(n_sites)
+    if submerged.any():
+        cond.day_submerged[:] = np.where(
+            submerged, cond.day_submerged + 1, cond.day_submerged
+        )
+        for ii in range(int(Soil_nComp)):
+            days = cond.aer_days_comp[:, ii] + 1
+            days = np.where(days > Crop.LagAer, Crop.LagAer, days)
+            cond.aer_days_comp[:, ii] = np.where(submerged, days, cond.aer_days_comp[:, ii])
+        fSub = 1 - (cond.day_submerged / Crop.LagAer)
+        enough = submerged & (cond.surface_storage > (fSub * TrPot0))
+        cond.surface_storage[:] = np.where(
+            enough, cond.surface_storage - (fSub * TrPot0), cond.surface_storage
+        )
+        TrAct0 = np.where(enough, fSub * TrPot0, 0.0)
+        TrPot = np.where(
+            submerged,
+            np.where(TrAct0 < (fSub * TrPot0), (fSub * TrPot0) - TrAct0, 0.0),
+            TrPot0,
+        )
+
+    # water and aeration stress
+    Dr, taw, rz = _root_zone_stress_water(prof, Soil_zTop, Crop, cond)
+    thRZ_Act, thRZ_S = rz[5], rz[6]
+    thRZ_Aer = rz[10]
+    _, _, _, _, Ksw_StoLin = water_stress(Crop, cond.t_early_sen, Dr, taw, et0, True)
+    Ksa_Aer, cond.aer_days[:] = aeration_stress(
+        cond.aer_days, Crop.LagAer, thRZ_Act, thRZ_S, thRZ_Aer
+    )
+    Ks = py_min(Ksw_StoLin, Ksa_Aer)
+    if IrrMngt_IrrMethod != 4:
+        TrPot = TrPot * Ks
+
+    TrAct, comp_sto, RootFact = _root_water_extraction(
+        prof, cond, Crop, IrrMngt_IrrMethod, et0, TrPot
+    )
+
+    # net irrigation to keep the root zone above the threshold
+    IrrNet = np.zeros(n_sites)
+    if IrrMngt_IrrMethod == 4:
+        transpiring = TrPot > 0
+        rz = root_zone_water(
+            prof, cond.z_root, cond.th, Soil_zTop, float(Crop.Zmin), Crop.Aer
+        )
+        cond.depletion[:] = np.where(transpiring, rz[2], cond.depletion)
+        cond.taw[:] = np.where(transpiring, rz[4], cond.taw)
+        thRZ_Act, thRZ_FC, thRZ_WP = rz[5], rz[7], rz[8]
+        thCrit = thRZ_WP + ((IrrMngt_NetIrrSMT / 100) * (thRZ_FC - thRZ_WP))
+        dry = transpiring & (thRZ_Act < thCrit)
+        if dry.any():
+            prelayer = 0
+            for ii in range(int(comp_sto[dry].max())):
+                layeri = prof.Layer[ii]
+                if layeri > prelayer:
+                    thCrit = prof.th_wp[ii] + (
+                        (IrrMngt_NetIrrSMT / 100) * (prof.th_fc[ii] - prof.th_wp[ii])
+                    )
+                    prelayer = layeri
+                filled = dry & (ii < comp_sto)
+                dWC = RootFact[:, ii] * (thCrit - cond.th[:, ii]) * 1000 * prof.dz[ii]
+                cond.th[filled, ii] = (cond.th[:, ii] + (dWC / (1000 * prof.dz[ii])))[filled]
+                IrrNet = np.where(filled, IrrNet + dWC, IrrNet)
+        cond.irr_net_cum[:] = np.where(
+            transpiring, cond.irr_net_cum + IrrNet, cond.irr_net_cum
+        )
+    else:
+        cond.irr_net_cum[:] = 0
+
+    TrAct = TrAct + TrAct0
+
+    # no canopy growth without transpiration
+    cond.canopy_cover[:] = np.where(
+        ((cond.canopy_cover - cond.cc_prev) > 0.005) & (TrAct == 0),
+        cond.cc_prev,
+        cond.canopy_cover,
+    )
+
+    tr_ratio = np.where(
+        TrPot0 > 0, np.where(TrAct < TrPot0, TrAct / TrPot0, 1.0), 1.0
+    )
+    cond.tr_ratio[:] = np.where(tr_ratio < 0, 0.0, np.where(tr_ratio > 1, 1.0, tr_ratio))
+    cond.t_pot[:] = TrPot0
+    return TrAct, TrPot_NS, TrPot0, IrrNet
+
+
+def HIref_current_day(
+    cond: "BatchCondition", Crop: "Crop", growing_season: bool
+) -> None:
+    """
+    Reference harvest index (no adjustment for stress effects) of each site
+
+    Arguments:
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        Crop (Crop): crop paramaters
+
+        growing_season (bool): is growing season (True or False)
+
+    """
+    if growing_season is False:
+        cond.hi_ref[:] = 0
+        return
+
+    tAdj = cond.dap - cond.delayed_cds
+    cond.yield_form[:] = tAdj > Crop.HIstartCD
+
+    HIt = cond.dap - cond.delayed_cds - Crop.HIstartCD - 1
+    if (Crop.CropType == 1) or (Crop.CropType == 2):
+        PctLagPhase = np.full(cond.n_sites, 100.0)
+        HIref = (Crop.HIini * Crop.HI0) / (
+            Crop.HIini + (Crop.HI0 - Crop.HIini) * np.exp(-Crop.HIGC * HIt)
+        )
+        HIref = np.where(HIref >= (0.9799 * Crop.HI0), Crop.HI0, HIref)
+    elif Crop.CropType == 3:
+        lag = HIt < Crop.tLinSwitch
+        PctLagPhase = np.where(lag, 100 * (HIt / Crop.tLinSwitch), 100.0)
+        HIlag = (Crop.HIini * Crop.HI0) / (
+            Crop.HIini + (Crop.HI0 - Crop.HIini) * np.exp(-Crop.HIGC * HIt)
+        )
+        HIlinear = (Crop.HIini * Crop.HI0) / (
+            Crop.HIini + (Crop.HI0 - Crop.HIini) * np.exp(-Crop.HIGC * Crop.tLinSwitch)
+        )
+        HIlinear = HIlinear + (Crop.dHILinear * (HIt - Crop.tLinSwitch))
+        HIref = np.where(lag, HIlag, HIlinear)
+
+    HIref = np.where(
+        HIref > Crop.HI0,
+        Crop.HI0,
+        np.where(
+            HIref <= (Crop.HIini + 0.004),
+            0.0,
+            np.where((Crop.HI0 - HIref) < 0.004, Crop.HI0, HIref),
+        ),
+    )
+
+    # the final harvest index of the day is not kept (as in the scalar model)
+    HIfinal = cond.HIfinal
+    if (Crop.CropType == 2) or (Crop.CropType == 3):
+        HIfinal = np.where(
+            (cond.HIfinal == Crop.HI0)
+            & (HIt <= Crop.YldFormCD)
+            & (cond.canopy_cover <= 0.05)
+            & (cond.ccx_w > 0)
+            & (cond.canopy_cover < cond.ccx_w),
+            HIref,
+            HIfinal,
+        )
+    HIref = np.where(HIref > HIfinal, HIfinal, HIref)
+
+    started = HIt > 0
+    cond.hi_ref[:] = np.where(started, HIref, 0.0)
+    cond.pct_lag_phase[:] = np.where(started, PctLagPhase, 0.0)
+
+
+def biomass_accumulation(
+    Crop: "Crop",
+    cond: "BatchCondition",
+    Tr: "ndarray",
+    TrPot: "ndarray",
+    et0: "ndarray",
+    growing_season: bool,
+) -> None:
+    """
+    Biomass accumulation of each site
+
+    Arguments:
+
+        Crop (Crop): crop paramaters
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        Tr (numpy.ndarray): actual transpiration
+
+        TrPot (numpy.ndarray): potential transpiration (no water stress)
+
+        et0 (numpy.ndarray): reference evapotranspiration
+
+        growing_season (bool): is growing season (True or False)
+
+    """
+    if growing_season is False:
+        cond.biomass[:] = 0
+        cond.biomass_ns[:] = 0
+        return
+
+    HIt = cond.dap - cond.delayed_cds - Crop.HIstartCD - 1
+    if (Crop.CropType == 2) or (Crop.CropType == 3):
+        if Crop.Determinant == 1:
+            fswitch = cond.pct_lag_phase / 100
+        else:
+            fswitch = np.where(
+                HIt < (Crop.YldFormCD / 3), HIt / (Crop.YldFormCD / 3), 1.0
+            )
+        WPadj = np.where(
+            cond.hi_ref > 0, Crop.WP * (1 - (1 - Crop.WPy / 100) * fswitch), Crop.WP
+        )
+    else:
+        WPadj = Crop.WP
+
+    WPadj = WPadj * Crop.fCO2
+    dB_NS = WPadj * (TrPot / et0)
+    dB = WPadj * (Tr / et0)
+    dB = np.where(np.isnan(dB), 0.0, dB)
+    cond.biomass[:] = cond.biomass + dB
+    cond.biomass_ns[:] = cond.biomass_ns + dB_NS
+
+
+def temperature_stress(
+    Crop: "Crop", temp_max: "ndarray", temp_min: "ndarray"
+) -> Tuple["ndarray", "ndarray"]:
+    """
+    Temperature stress coefficients of pollination of each site
+
+    Arguments:
+
+        Crop (Crop): crop paramaters
+
+        temp_max (numpy.ndarray): maximum temperature
+
+        temp_min (numpy.ndarray): minimum temperature
+
+    Returns:
+
+        Kst_PolH (numpy.ndarray): heat stress coefficient
+
+        Kst_PolC (numpy.ndarray): cold stress coefficient
+    """
+    KsPol_up = 1
+    KsPol_lo = 0.001
+
+    Kst_PolH = np.ones(len(temp_max))
+    if Crop.PolHeatStress == 1:
+        Trel = (temp_max - Crop.Tmax_lo) / (Crop.Tmax_up - Crop.Tmax_lo)
+        Kst = (KsPol_up * KsPol_lo) / (
+            KsPol_lo + (KsPol_up - KsPol_lo) * np.exp(-Crop.fshape_b * (1 - Trel))
+        )
+        Kst_PolH = np.where(
+            temp_max <= Crop.Tmax_lo, 1.0, np.where(temp_max >= Crop.Tmax_up, 0.0, Kst)
+        )
+
+    Kst_PolC = np.ones(len(temp_min))
+    if Crop.PolColdStress == 1:
+        Trel = (Crop.Tmin_up - temp_min) / (Crop.Tmin_up - Crop.Tmin_lo)
+        Kst = (KsPol_up * KsPol_lo) / (
+            KsPol_lo + (KsPol_up - KsPol_lo) * np.exp(-Crop.fshape_b * (1 - Trel))
+        )
+        Kst_PolC = np.where(
+            temp_min >= Crop.Tmin_up, 1.0, np.where(temp_min <= Crop.Tmin_lo, 0.0, Kst)
+        )
+
+    return Kst_PolH, Kst_PolC
+
+
+def HIadj_pre_anthesis(
+    NewCond_B: "ndarray",
+    NewCond_B_NS: "ndarray",
+    NewCond_CC: "ndarray",
+    Crop_dHI_pre: float,
+) -> "ndarray":
+    """
+    Adjustment of the harvest index of each site for pre-anthesis water stress
+
+    Arguments:
+
+        NewCond_B (numpy.ndarray): biomass
+
+        NewCond_B_NS (numpy.ndarray): biomass (no water stress)
+
+        NewCond_CC (numpy.ndarray): canopy cover
+
+        Crop_dHI_pre (float): maximum increase of the harvest index
+
+    Returns:
+
+        NewCond_Fpre (numpy.ndarray): adjustment factor
+    """
+    NewCond_Fpre = np.ones(len(NewCond_B))
+    if Crop_dHI_pre > 0:
+        Br = NewCond_B / NewCond_B_NS
+        Br_range = np.log(Crop_dHI_pre) / 5.62
+        Br_upp = 1
+        Br_low = 1 - Br_range
+        Br_top = Br_upp - (Br_range / 3)
+        ratio_low = (Br - Br_low) / (Br_top - Br_low)
+        ratio_upp = (Br - Br_top) / (Br_upp - Br_top)
+        NewCond_Fpre = np.where(
+            (Br >= Br_low) & (Br < Br_top),
+            1 + (((1 + np.sin((1.5 - ratio_low) * np.pi)) / 2) * (Crop_dHI_pre / 100)),
+            np.where(
+                (Br > Br_top) & (Br <= Br_upp),
+                1 + (((1 + np.sin((0.5 + ratio_upp) * np.pi)) / 2) * (Crop_dHI_pre / 100)),
+                1.0,
+            ),
+        )
+    return np.where(NewCond_CC <= 0.01, 0.0, NewCond_Fpre)
+
+
+def _flowering_fraction(t: "ndarray", Crop_FloweringCD: float) -> "ndarray":
+    """
+    Fraction of the flowers open after t days of flowering
+    """
+    tPct = 100 * (t / Crop_FloweringCD)
+    tPct = np.where(tPct > 100, 100.0, tPct)
+    F = 0.00558 * np.exp(0.63 * np.log(tPct)) - (0.000969 * tPct) - 0.00383
+    F = np.where(t == 0, 0.0, F)
+    return np.where(F < 0, 0.0, F)
+
+
+def HIadj_pollination(
+    NewCond_CC: "ndarray",
+    NewCond_Fpol: "ndarray",
+    Crop: "Crop",
+    Ksw_Pol: "ndarray",
+    Kst_PolC: "ndarray",
+    Kst_PolH: "ndarray",
+    HIt: "ndarray",
+) -> "ndarray":
+    """
+    Adjustment of the harvest index of each site for failure of pollination
+    due to water or temperature stress, on the days of flowering (HIt > 0)
+
+    Arguments:
+
+        NewCond_CC (numpy.ndarray): canopy cover
+
+        NewCond_Fpol (numpy.ndarray): adjustment factor of the previous day
+
+        Crop (Crop): crop paramaters
+
+        Ksw_Pol (numpy.ndarray): water stress coefficient of pollination
+
+        Kst_PolC, Kst_PolH (numpy.ndarray): cold and heat stress coefficients
+
+        HIt (numpy.ndarray): days since the start of yield formation
+
+    Returns:
+
+        NewCond_Fpol (numpy.ndarray): adjustment factor
+    """
+    F1 = _flowering_fraction(HIt - 1, Crop.FloweringCD)
+    F2 = _flowering_fraction(HIt, Crop.FloweringCD)
+    FracFlow = np.where(
+        np.abs(F1 - F2) < 0.0000001, 0.0, 100 * ((F1 + F2) / 2) / Crop.FloweringCD
+    )
+    Ks = py_min(py_min(Ksw_Pol, Kst_PolC), Kst_PolH)
+    dFpol = np.where(
+        NewCond_CC < Crop.CCmin, 0.0, Ks * FracFlow * (1 + (Crop.exc / 100))
+    )
+    NewCond_Fpol = NewCond_Fpol + dFpol
+    return np.where(NewCond_Fpol > 1, 1.0, NewCond_Fpol)
+
+
+def HIadj_post_anthesis(
+    cond: "BatchCondition", Crop: "Crop", Ksw_Exp: "ndarray", Ksw_Sto: "ndarray", sites: "ndarray"
+) -> None:
+    """
+    Adjustment of the harvest index of some sites for post-anthesis water stress
+
+    Arguments:
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        Crop (Crop): crop paramaters
+
+        Ksw_Exp, Ksw_Sto (numpy.ndarray): water stress coefficients of \
+            canopy expansion and stomatal closure
+
+        sites (numpy.ndarray): sites to adjust
+
+    """
+    dap = cond.dap - cond.delayed_cds
+    tmax1 = Crop.CanopyDevEndCD - Crop.HIstartCD
+    if (tmax1 > 0) and (Crop.a_HI > 0):
+        upper = (
+            sites
+            & (dap <= (Crop.CanopyDevEndCD + 1))
+            & (cond.f_pre > 0.99)
+            & (cond.canopy_cover > 0.001)
+        )
+        dCor = 1 + (1 - Ksw_Exp) / Crop.a_HI
+        cond.s_cor1[:] = np.where(upper, cond.s_cor1 + (dCor / tmax1), cond.s_cor1)
+        DayCor = dap - 1 - Crop.HIstartCD
+        cond.fpost_upp[:] = np.where(upper, (tmax1 / DayCor) * cond.s_cor1, cond.fpost_upp)
+
+    tmax2 = Crop.YldFormCD
+    if (tmax2 > 0) and (Crop.b_HI > 0):
+        lower = (
+            sites
+            & (dap <= (Crop.HIendCD + 1))
+            & (cond.f_pre > 0.99)
+            & (cond.canopy_cover > 0.001)
+        )
+        dCor = np.power(Ksw_Sto, 0.1) * (1 - (1 - Ksw_Sto) / Crop.b_HI)
+        cond.s_cor2[:] = np.where(lower, cond.s_cor2 + (dCor / tmax2), cond.s_cor2)
+        DayCor = dap - 1 - Crop.HIstartCD
+        cond.fpost_dwn[:] = np.where(lower, (tmax2 / DayCor) * cond.s_cor2, cond.fpost_dwn)
+
+    if (tmax1 == 0) and (tmax2 == 0):
+        Fpost = 1
+    elif tmax2 == 0:
+        Fpost = cond.fpost_upp
+    elif tmax1 == 0:
+        Fpost = cond.fpost_dwn
+    elif tmax1 <= tmax2:
+        Fpost = cond.fpost_dwn * (((tmax1 * cond.fpost_upp) + (tmax2 - tmax1)) / tmax2)
+    else:
+        Fpost = cond.fpost_upp * (((tmax2 * cond.fpost_dwn) + (tmax1 - tmax2)) / tmax1)
+    cond.f_post[:] = np.where(sites, Fpost, cond.f_post)
+
+
+def harvest_index(
+    prof: "SoilProfile",
+    Soil_zTop: float,
+    Crop: "Crop",
+    cond: "BatchCondition",
+    et0: "ndarray",
+    temp_max: "ndarray",
+    temp_min: "ndarray",
+    growing_season: bool,
+) -> None:
+    """
+    Build up of the harvest index of each site
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        Soil_zTop (float): top soil depth
+
+        Crop (Crop): crop paramaters
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        et0 (numpy.ndarray): reference evapotranspiration
+
+        temp_max (numpy.ndarray): maximum temperature
+
+        temp_min (numpy.ndarray): minimum temperature
+
+        growing_season (bool): is growing season (True or False)
+
+    """
+    if growing_season is False:
+        cond.harvest_index[:] = 0
+        cond.harvest_index_adj[:] = 0
+        return
+
+    HIi = cond.hi_ref
+    HIt = cond.dap - cond.delayed_cds - Crop.HIstartCD - 1
+    forming = (cond.yield_form == True) & (HIt >= 0)
+    if not forming.any():
+        return
+
+    if Crop.CropType == 1:
+        cond.harvest_index[:] = np.where(forming, HIi, cond.harvest_index)
+        cond.harvest_index_adj[:] = np.where(forming, HIi, cond.harvest_index_adj)
+        return
+
+    Dr, taw, _ = _root_zone_stress_water(prof, Soil_zTop, Crop, cond)
+    Ksw_Exp, Ksw_Sto, _, Ksw_Pol, _ = water_stress(
+        Crop, cond.t_early_sen, Dr, taw, et0, True
+    )
+    Kst_PolH, Kst_PolC = temperature_stress(Crop, temp_max, temp_min)
+
+    first = forming & (cond.pre_adj == False)
+    if first.any():
+        cond.pre_adj[first] = True
+        cond.f_pre[:] = np.where(
+            first,
+            HIadj_pre_anthesis(cond.biomass, cond.biomass_ns, cond.canopy_cover, Crop.dHI_pre),
+            cond.f_pre,
+        )
+
+    if Crop.CropType == 3:
+        flowering = forming & (HIt > 0) & (HIt <= Crop.FloweringCD)
+        if flowering.any():
+            cond.f_pol[:] = np.where(
+                flowering,
+                HIadj_pollination(
+                    cond.canopy_cover, cond.f_pol, Crop, Ksw_Pol, Kst_PolC, Kst_PolH, HIt
+                ),
+                cond.f_pol,
+            )
+        HImax = cond.f_pol * Crop.HI0
+    else:
+        HImax = Crop.HI0
+
+    HIadj_post_anthesis(cond, Crop, Ksw_Exp, Ksw_Sto, forming & (HIt > 0))
+
+    HImult = cond.f_pre * cond.f_post
+    HImult = np.where(HImult > 1 + (Crop.dHI0 / 100), 1 + (Crop.dHI0 / 100), HImult)
+    harvest_index_adj = np.where(HImax >= HIi, HImult * HIi, HImult * HImax)
+
+    cond.harvest_index[:] = np.where(forming, HIi, cond.harvest_index)
+    cond.harvest_index_adj[:] = np.where(forming, harvest_index_adj, cond.harvest_index_adj)
@@ -0,0 +1,95 @@
+"""
+Element-wise versions of the Python scalar operations used by the kernels
+
+The batch kernels must give the same floating point results as the scalar
+model, which works on Python floats and NumPy scalars. Most operations give
+the same result on arrays, but these do not:
+
+- `x ** y` on a Python float or NumPy scalar calls the C library pow,
+  while NumPy arrays use faster special cases (e.g. x * x for y = 2)
+- `round(x, n)` on a Python float rounds the exact decimal value, while
+  NumPy scales by 10 ** n first
+- `max(a, b)` and `min(a, b)` return their first argument on ties and
+  never propagate NaN
+"""
+import numpy as np
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+
+
+def power(x: "ndarray", y: float) -> "ndarray":
+    """
+    Return x ** y of each element as computed on a Python float
+
+    Arguments:
+
+        x (numpy.ndarray): bases
+
+        y (float): exponent
+
+    Returns:
+
+        result (numpy.ndarray): x ** y
+    """
+    return np.power(np.asarray(x, dtype=np.float64).astype(object), y).astype(np.float64)
+
+
+def py_round(x: "ndarray", ndigits: int) -> "ndarray":
+    """
+    Return round(x, ndigits) of each element as computed on a Python float
+
+    NumPy rounding only differs from Python rounding for the values that
+    are (nearly) halfway between two decimals, which are rounded again
+    with Python.
+
+    Arguments:
+
+        x (numpy.ndarray): values
+
+        ndigits (int): number of decimals
+
+    Returns:
+
+        result (numpy.ndarray): rounded values
+    """
+    x = np.asarray(x, dtype=np.float64)
+    result = np.round(x, ndigits)
+    scaled = x * 10.0 ** ndigits
+    halfway = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if halfway.any():
+        result[halfway] = [round(float(value), ndigits) for value in x[halfway]]
+    return result
+
+
+def py_max(a, b) -> "ndarray":
+    """
+    Return max(a, b) of each element as computed by Python
+
+    Arguments:
+
+        a, b (numpy.ndarray or float): values
+
+    Returns:
+
+        result (numpy.ndarray): b where b > a, otherwise a
+    """
+    return np.where(b > a, b, a)
+
+
+def py_min(a, b) -> "ndarray":
+    """
+    Return min(a, b) of each element as computed by Python
+
+    Arguments:
+
+        a, b (numpy.ndarray or float): values
+
+    Returns:
+
+        result (numpy.ndarray): b where b < a, otherwise a
+    """
+    return np.where(b < a, b, a)
@@ -0,0 +1,322 @@
+"""
+Daily time-step of a group of sites that share the same season and crop
+"""
+import numpy as np
+
+from typing import Tuple, TYPE_CHECKING
+
+from ..solution.check_groundwater_table import check_groundwater_table
+from .crop import (
+    HIref_current_day,
+    biomass_accumulation,
+    canopy_cover,
+    germination,
+    growing_degree_day,
+    growth_stage,
+    harvest_index,
+    root_development,
+    transpiration,
+)
+from .water import (
+    capillary_rise,
+    drainage,
+    groundwater_inflow,
+    infiltration,
+    irrigation,
+    pre_irrigation,
+    rainfall_partition,
+    root_zone_water,
+    soil_evaporation,
+)
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+    from aquacrop.entities.crop import Crop
+    from aquacrop.entities.fieldManagement import FieldMngtStruct
+    from aquacrop.entities.irrigationManagement import IrrMngtStruct
+    from aquacrop.entities.paramStruct import ParamStruct
+    from aquacrop.entities.soilProfile import SoilProfile
+    from .condition import BatchCondition
+
+
+def solution_single_time_step(
+    cond: "BatchCondition",
+    param_struct: "ParamStruct",
+    profiles: Tuple["SoilProfile", "SoilProfile"],
+    time_step_counter: int,
+    season_counter: int,
+    growing_season: bool,
+    crop: "Crop",
+    IrrMngt: "IrrMngtStruct",
+    FieldMngt: "FieldMngtStruct",
+    weather_step: "ndarray",
+    evap_time_steps: int,
+    sim_off_season: bool,
+) -> Tuple["ndarray", "ndarray", "ndarray"]:
+    """
+    Advance a group of sites by one day, in the same steps as
+    aquacrop.timestep.run_single_timestep.solution_single_time_step
+
+    Arguments:
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        param_struct (ParamStruct): model paramaters shared by the sites
+
+        profiles (tuple): soil profile as read and with the compartment depths \
+            clipped to the curve number depth, the sites use the clipped \
+            profile once their curve number has been adjusted (`cond.clipped`)
+
+        time_step_counter (int): current day
+
+        season_counter (int): current season, -1 before the first one
+
+        growing_season (bool): is growing season (True or False)
+
+        crop (Crop): crop paramaters of the season
+
+        IrrMngt (IrrMngtStruct): irrigation management paramaters
+
+        FieldMngt (FieldMngtStruct): field management paramaters
+
+        weather_step (numpy.ndarray): MinTemp, MaxTemp, Precipitation and \
+            ReferenceET of each site, of shape (n_sites, 4)
+
+        evap_time_steps (int): number of sub-steps of stage 2 evaporation
+
+        sim_off_season (bool): simulate the off-season
+
+    Returns:
+
+        water_flux (numpy.ndarray): row of the water fluxes of each site
+
+        crop_growth (numpy.ndarray): row of the crop growth of each site
+
+        IrrTot (numpy.ndarray): seasonal irrigation of each site
+    """
+    Soil = param_struct.Soil
+    CO2 = param_struct.CO2
+    n_sites = cond.n_sites
+    prof = profiles[1] if cond.clipped[0] else profiles[0]
+
+    temp_min = weather_step[:, 0]
+    temp_max = weather_step[:, 1]
+    precipitation = weather_step[:, 2]
+    et0 = weather_step[:, 3]
+
+    if param_struct.water_table == 1:
+        GroundWater = param_struct.z_gw[time_step_counter]
+    else:
+        GroundWater = 0
+
+    # Increment time counters
+    if growing_season is True:
+        cond.dap[:] = cond.dap + 1
+        gdd = growing_degree_day(crop.GDDmethod, crop.Tupp, crop.Tbase, temp_max, temp_min)
+        cond.gdd[:] = gdd
+        cond.gdd_cum[:] = cond.gdd_cum + gdd
+        cond.growing_season[:] = True
+    else:
+        cond.growing_season[:] = False
+        cond.dap[:] = 0
+        gdd = np.full(n_sites, 0.3)
+        cond.gdd_cum[:] = 0
+
+    cond.time_step_counter[:] = time_step_counter
+    cond.precipitation[:] = precipitation
+    cond.temp_max[:] = temp_max
+    cond.temp_min[:] = temp_min
+    cond.et0[:] = et0
+
+    # 1. Check for groundwater table, the same for all the sites
+    if param_struct.water_table == 1:
+        th_fc_Adj, wt_in_soil, z_gw = check_groundwater_table(
+            prof,
+            None,
+            cond.th[0],
+            cond.th_fc_Adj[0],
+            param_struct.water_table,
+            GroundWater,
+        )
+        cond.th_fc_Adj[:] = th_fc_Adj
+        cond.wt_in_soil[:] = wt_in_soil
+        cond.z_gw[:] = z_gw
+    else:
+        cond.wt_in_soil[:] = False
+        cond.z_gw[:] = np.nan
+
+    # 2. Root development
+    cond.z_root[:], cond.r_cor[:] = root_development(
+        crop, prof, cond, gdd, growing_season, param_struct.water_table
+    )
+
+    # 3. Pre-irrigation
+    PreIrr = pre_irrigation(prof, crop, cond, growing_season, IrrMngt)
+
+    # 4. Drainage
+    th, DeepPerc, FluxOut = drainage(prof, cond.th, cond.th_fc_Adj)
+    cond.th[:] = th
+    cond.aliased[:] = False
+
+    # 5. Surface runoff
+    Runoff, Infl, clipped = rainfall_partition(precipitation, cond, FieldMngt, Soil, prof)
+    if clipped:
+        cond.clipped[:] = True
+        prof = profiles[1]
+
+    # 6. Irrigation
+    Irr = irrigation(
+        IrrMngt, cond, crop, prof, Soil.z_top, growing_season, precipitation, Runoff
+    )
+
+    # 7. Infiltration
+    DeepPerc, Runoff, Infl, FluxOut = infiltration(
+        prof,
+        cond,
+        Infl,
+        Irr,
+        IrrMngt.AppEff,
+        FieldMngt.bunds,
+        FieldMngt.z_bund,
+        FluxOut,
+        DeepPerc,
+        Runoff,
+        growing_season,
+    )
+
+    # 8. Capillary rise
+    CR = capillary_rise(
+        prof, Soil.nLayer, Soil.fshape_cr, cond, FluxOut, param_struct.water_table
+    )
+
+    # 9. Check germination
+    germination(
+        cond, Soil.z_germ, prof, crop.GermThr, crop.PlantMethod, gdd, growing_season
+    )
+
+    # 10. Update growth stage
+    growth_stage(crop, cond, growing_season)
+
+    # 11. Canopy cover development
+    canopy_cover(crop, prof, Soil.z_top, cond, gdd, et0, growing_season)
+
+    # 12. Soil evaporation
+    Es, EsPot = soil_evaporation(
+        evap_time_steps,
+        sim_off_season,
+        time_step_counter,
+        prof,
+        Soil,
+        crop,
+        IrrMngt,
+        FieldMngt,
+        cond,
+        et0,
+        Infl,
+        precipitation,
+        Irr,
+        growing_season,
+    )
+
+    # 13. Crop transpiration
+    Tr, TrPot_NS, TrPot, IrrNet = transpiration(
+        prof,
+        Soil.nComp,
+        Soil.z_top,
+        crop,
+        IrrMngt.irrigation_method,
+        IrrMngt.NetIrrSMT,
+        cond,
+        et0,
+        CO2,
+        growing_season,
+        gdd,
+    )
+
+    # 14. Groundwater inflow
+    GwIn = groundwater_inflow(prof, cond)
+
+    # 15. Reference harvest index
+    HIref_current_day(cond, crop, growing_season)
+
+    # 16. Biomass accumulation
+    biomass_accumulation(crop, cond, Tr, TrPot_NS, et0, growing_season)
+
+    # 17. Harvest index
+    harvest_index(prof, Soil.z_top, crop, cond, et0, temp_max, temp_min, growing_season)
+
+    # 18. Yield potential
+    cond.YieldPot[:] = (cond.biomass_ns / 100) * cond.harvest_index
+
+    # 19. Crop yield (dry and fresh)
+    if growing_season is True:
+        cond.DryYield[:] = (cond.biomass / 100) * cond.harvest_index_adj
+        cond.FreshYield[:] = cond.DryYield / (crop.YldWC / 100)
+        if crop.CalendarType == 1:
+            cond.crop_mature[cond.dap >= crop.Maturity] = True
+        elif crop.CalendarType == 2:
+            cond.crop_mature[cond.gdd_cum >= crop.Maturity] = True
+    else:
+        cond.DryYield[:] = 0
+        cond.FreshYield[:] = 0
+
+    # 20. Root zone water
+    rz = root_zone_water(
+        prof, cond.z_root, cond.th, Soil.z_top, float(crop.Zmin), crop.Aer
+    )
+    Wr = rz[0]
+
+    # 21. Update net irrigation to add any pre irrigation
+    IrrNet = IrrNet + PreIrr
+    cond.irr_net_cum[:] = cond.irr_net_cum + PreIrr
+
+    if growing_season is True:
+        if IrrMngt.irrigation_method == 4:
+            IrrDay = IrrNet
+            IrrTot = cond.irr_net_cum.copy()
+        else:
+            IrrDay = Irr
+            IrrTot = cond.irr_cum.copy()
+    else:
+        IrrDay = np.zeros(n_sites)
+        IrrTot = np.zeros(n_sites)
+        cond.depletion[:] = rz[2]
+        cond.taw[:] = rz[4]
+
+    water_flux = np.column_stack([
+        np.full(n_sites, time_step_counter),
+        np.full(n_sites, season_counter),
+        cond.dap,
+        Wr,
+        cond.z_gw,
+        cond.surface_storage,
+        IrrDay,
+        Infl,
+        Runoff,
+        DeepPerc,
+        CR,
+        GwIn,
+        Es,
+        EsPot,
+        Tr,
+        TrPot,
+    ])
+    crop_growth = np.column_stack([
+        np.full(n_sites, time_step_counter),
+        np.full(n_sites, season_counter),
+        cond.dap,
+        gdd,
+        cond.gdd_cum,
+        cond.z_root,
+        cond.canopy_cover,
+        cond.canopy_cover_ns,
+        cond.biomass,
+        cond.biomass_ns,
+        cond.harvest_index,
+        cond.harvest_index_adj,
+        cond.DryYield,
+        cond.FreshYield,
+        cond.YieldPot,
+    ])
+    return water_flux, crop_growth, IrrTot
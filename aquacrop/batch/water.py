@@ -0,0 +1,1207 @@
+"""
+Soil water balance kernels that advance every site of a batch in one call
+
+Each function follows the scalar function of the same name in
+aquacrop.solution, in the same order of operations, with the branches of
+the scalar code taken site by site through boolean masks. Parameters
+shared by the sites (soil profile, crop, management) stay scalars, the
+state of the sites is read from and written to a BatchCondition.
+"""
+import numpy as np
+
+from typing import Tuple, TYPE_CHECKING
+
+from .helpers import power, py_max, py_min, py_round
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+    from aquacrop.entities.crop import Crop
+    from aquacrop.entities.fieldManagement import FieldMngtStruct
+    from aquacrop.entities.irrigationManagement import IrrMngtStruct
+    from aquacrop.entities.soil import Soil
+    from aquacrop.entities.soilProfile import SoilProfile
+    from .condition import BatchCondition
+
+
+def root_zone_water(
+    prof: "SoilProfile",
+    z_root: "ndarray",
+    th: "ndarray",
+    Soil_zTop: float,
+    Crop_Zmin: float,
+    Crop_Aer: float,
+) -> Tuple["ndarray", ...]:
+    """
+    Actual and total available water in the root zone of each site
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        z_root (numpy.ndarray): rooting depth of each site
+
+        th (numpy.ndarray): water content of each site and compartment
+
+        Soil_zTop (float): top soil depth
+
+        Crop_Zmin (float): crop minimum rooting depth
+
+        Crop_Aer (float): aeration stress threshold (%)
+
+    Returns:
+
+        WrAct, Dr_Zt, Dr_Rz, TAW_Zt, TAW_Rz, thRZ_Act, thRZ_S, thRZ_FC, \
+            thRZ_WP, thRZ_Dry, thRZ_Aer (numpy.ndarray): see \
+            aquacrop.solution.root_zone_water
+    """
+    storage = prof.root_zone_storage(Crop_Aer)
+    sites = np.arange(th.shape[0])
+
+    rootdepth = np.round(np.maximum(z_root, Crop_Zmin), 2)
+    comp_sto = np.searchsorted(prof.dzsum, rootdepth, side="left")
+
+    # compartments fully within the root zone, summed one after the other
+    within = np.arange(th.shape[1]) < comp_sto[:, None]
+    WrAct = np.cumsum(np.where(within, np.round(1000 * th * prof.dz, 2), 0.0), axis=1)[:, -1]
+    WrS = storage[0, comp_sto]
+    WrFC = storage[1, comp_sto]
+    WrWP = storage[2, comp_sto]
+    WrDry = storage[3, comp_sto]
+    WrAer = storage[4, comp_sto]
+
+    # compartment partly within the root zone
+    dzsum = prof.dzsum[comp_sto]
+    dz = prof.dz[comp_sto]
+    factor = np.where(dzsum > rootdepth, 1 - ((dzsum - rootdepth) / dz), 1.0)
+    WrAct = WrAct + np.round(factor * 1000 * th[sites, comp_sto] * dz, 2)
+    WrS = WrS + np.round(factor * 1000 * prof.th_s[comp_sto] * dz, 2)
+    WrFC = WrFC + np.round(factor * 1000 * prof.th_fc[comp_sto] * dz, 2)
+    WrWP = WrWP + np.round(factor * 1000 * prof.th_wp[comp_sto] * dz, 2)
+    WrDry = WrDry + np.round(factor * 1000 * prof.th_dry[comp_sto] * dz, 2)
+    WrAer = WrAer + np.round(
+        factor * 1000 * (prof.th_s[comp_sto] - (Crop_Aer / 100)) * dz, 2
+    )
+
+    WrAct = np.where(WrAct < 0, 0.0, WrAct)
+    TAW_Rz = py_max(WrFC - WrWP, 0.0)
+    Dr_Rz = py_min(WrFC - WrAct, TAW_Rz)
+
+    thRZ_Act = WrAct / (rootdepth * 1000)
+    thRZ_S = WrS / (rootdepth * 1000)
+    thRZ_FC = WrFC / (rootdepth * 1000)
+    thRZ_WP = WrWP / (rootdepth * 1000)
+    thRZ_Dry = WrDry / (rootdepth * 1000)
+    thRZ_Aer = WrAer / (rootdepth * 1000)
+
+    # top soil, where the root zone is deeper
+    Dr_Zt = Dr_Rz
+    TAW_Zt = TAW_Rz
+    deeper = rootdepth > Soil_zTop
+    if deeper.any():
+        ztopdepth = round(Soil_zTop, 2)
+        comp_top = np.sum(prof.dzsum <= ztopdepth)
+        assert comp_top > 0
+        WrAct_Zt = 0
+        for ii in range(comp_top):
+            WrAct_Zt = WrAct_Zt + (1000 * th[:, ii] * prof.dz[ii])
+        WrFC_Zt = storage[5, comp_top]
+        WrWP_Zt = storage[6, comp_top]
+        WrAct_Zt = np.where(WrAct_Zt < 0, 0.0, WrAct_Zt)
+        TAW_top = max(WrFC_Zt - WrWP_Zt, 0)
+        Dr_Zt = np.where(deeper, py_min(WrFC_Zt - WrAct_Zt, TAW_top), Dr_Rz)
+        TAW_Zt = np.where(deeper, TAW_top, TAW_Rz)
+
+    return (
+        WrAct,
+        Dr_Zt,
+        Dr_Rz,
+        TAW_Zt,
+        TAW_Rz,
+        thRZ_Act,
+        thRZ_S,
+        thRZ_FC,
+        thRZ_WP,
+        thRZ_Dry,
+        thRZ_Aer,
+    )
+
+
+def pre_irrigation(
+    prof: "SoilProfile",
+    Crop: "Crop",
+    cond: "BatchCondition",
+    growing_season: bool,
+    IrrMngt: "IrrMngtStruct",
+) -> "ndarray":
+    """
+    Pre-irrigation of each site when in net irrigation mode
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        Crop (Crop): crop paramaters
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        growing_season (bool): is growing season (True or False)
+
+        IrrMngt (IrrMngtStruct): irrigation management paramaters
+
+    Returns:
+
+        PreIrr (numpy.ndarray): pre-irrigation applied on current day (mm)
+    """
+    PreIrr = np.zeros(cond.n_sites)
+    if (growing_season is False) or (IrrMngt.irrigation_method != 4):
+        return PreIrr
+
+    first = cond.dap == 1
+    if not first.any():
+        return PreIrr
+
+    rootdepth = py_round(py_max(cond.z_root, Crop.Zmin), 2)
+    compRz = np.searchsorted(prof.dzsum, rootdepth, side="left")
+    for ii in range(int(compRz[first].max())):
+        thCrit = prof.th_wp[ii] + (
+            (IrrMngt.NetIrrSMT / 100) * (prof.th_fc[ii] - prof.th_wp[ii])
+        )
+        low = first & (ii < compRz) & (cond.th[:, ii] < thCrit)
+        PreIrr = np.where(
+            low, PreIrr + ((thCrit - cond.th[:, ii]) * 1000 * prof.dz[ii]), PreIrr
+        )
+        cond.th[low, ii] = thCrit
+        # the water content is still the initial water content object
+        cond.thini[low & cond.aliased, ii] = thCrit
+
+    return PreIrr
+
+
+def _drainage_rate(
+    th: "ndarray",
+    th_fc_Adj: "ndarray",
+    th_fc: float,
+    th_s: float,
+    drain_sat: float,
+    exp_sat: float,
+) -> "ndarray":
+    """
+    Drainage ability of a compartment at water content th (see drainage)
+    """
+    dthdt = np.where(
+        th >= th_s, drain_sat, drain_sat * ((np.exp(th - th_fc) - 1) / exp_sat)
+    )
+    dthdt = np.where((th - dthdt) < th_fc_Adj, th - th_fc_Adj, dthdt)
+    return np.where(th <= th_fc_Adj, 0.0, dthdt)
+
+
+def drainage(
+    prof: "SoilProfile",
+    th_init: "ndarray",
+    th_fc_Adj_init: "ndarray",
+) -> Tuple["ndarray", "ndarray", "ndarray"]:
+    """
+    Redistribute the stored soil water of each site
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        th_init (numpy.ndarray): water content of each site and compartment
+
+        th_fc_Adj_init (numpy.ndarray): adjusted water content at field capacity
+
+    Returns:
+
+        thnew (numpy.ndarray): updated water content
+
+        DeepPerc (numpy.ndarray): deep percolation of each site
+
+        FluxOut (numpy.ndarray): flux of water out of each compartment
+    """
+    th_fc = prof.th_fc
+    th_s = prof.th_s
+    dz = prof.dz
+    drain_sat = prof.drain_sat
+    exp_sat = prof.exp_sat
+    n_sites, n_comp = th_init.shape
+
+    thnew = np.zeros((n_sites, n_comp))
+    FluxOut = np.zeros((n_sites, n_comp))
+
+    # the top compartments that drain freely are solved together
+    drainable = th_init > th_fc_Adj_init
+    saturated = th_init >= th_s
+    dthdt_init = np.where(
+        saturated,
+        drain_sat,
+        drain_sat * ((np.exp(th_init - th_fc) - 1) / exp_sat),
+    )
+    dthdt_init = np.where(
+        (th_init - dthdt_init) < th_fc_Adj_init, th_init - th_fc_Adj_init, dthdt_init
+    )
+    dthdt_init = np.where(drainable, dthdt_init, 0.0)
+    draincomp_init = dthdt_init * dz * 1000
+    prethick_init = prof.dzsum - dz
+    drainmax_init = dthdt_init * 1000 * prethick_init
+    drainsum_init = np.cumsum(draincomp_init, axis=1)
+    drainsum_above = np.zeros((n_sites, n_comp))
+    drainsum_above[:, 1:] = drainsum_init[:, :-1]
+    sequential = (drainsum_above > drainmax_init) | (drainsum_init > prof.Ksat)
+    first = np.where(sequential.any(axis=1), sequential.argmax(axis=1), n_comp)
+
+    drainsum = np.zeros(n_sites)
+    for ii in range(n_comp):
+        free = ii < first
+        thnew[:, ii] = th_init[:, ii] - dthdt_init[:, ii]
+        FluxOut[:, ii] = drainsum_init[:, ii]
+        seq = ~free
+        if not seq.any():
+            drainsum = drainsum_init[:, ii]
+            continue
+
+        cth_fc = th_fc[ii]
+        cth_s = th_s[ii]
+        cdz = dz[ii]
+        cKsat = prof.Ksat[ii]
+        cdrain_sat = drain_sat[ii]
+        cexp_sat = exp_sat[ii]
+        fc_adj = th_fc_Adj_init[:, ii]
+        th0 = th_init[:, ii]
+        prethick = prethick_init[ii]
+        excess = np.zeros(n_sites)
+        new_sum = drainsum.copy()
+        new_th = thnew[:, ii].copy()
+
+        # compartment can drain what comes from above
+        able = seq & (drainsum <= drainmax_init[:, ii])
+        ds = drainsum + draincomp_init[:, ii]
+        over = able & (ds > cKsat)
+        excess = np.where(over, excess + ds - cKsat, excess)
+        new_sum = np.where(able, np.where(over, cKsat, ds), new_sum)
+        new_th = np.where(able, th0 - dthdt_init[:, ii], new_th)
+
+        # water from above is stored in the compartment first
+        unable = seq & ~able
+        dthdt = drainsum / (1000 * prethick)
+        if prof.tau[ii] > 0:
+            A = 1 + ((dthdt * cexp_sat) / cdrain_sat)
+            thX = cth_fc + np.log(A)
+            thX = np.where(thX < fc_adj, fc_adj, thX)
+        else:
+            thX = np.full(n_sites, cth_s + 0.01)
+        thX = np.where(dthdt <= 0, fc_adj, thX)
+        tn = th0 + (drainsum / (1000 * cdz))
+
+        below = unable & (thX <= cth_s)
+        # stored above the drainage equilibrium
+        above_x = below & (tn > thX)
+        d = _drainage_rate(thX, fc_adj, cth_fc, cth_s, cdrain_sat, cexp_sat)
+        ds = ((tn - thX) * 1000 * cdz) + (d * 1000 * cdz)
+        over = above_x & (ds > cKsat)
+        excess = np.where(over, excess + ds - cKsat, excess)
+        new_sum = np.where(above_x, np.where(over, cKsat, ds), new_sum)
+        new_th = np.where(above_x, thX - d, new_th)
+        # stored above field capacity
+        above_fc = below & ~(tn > thX) & (tn > fc_adj)
+        d = _drainage_rate(tn, fc_adj, cth_fc, cth_s, cdrain_sat, cexp_sat)
+        ds = d * 1000 * cdz
+        over = above_fc & (ds > cKsat)
+        excess = np.where(over, excess + ds - cKsat, excess)
+        new_sum = np.where(above_fc, np.where(over, cKsat, ds), new_sum)
+        new_th = np.where(above_fc, tn - d, new_th)
+        # all the water is stored
+        kept = below & ~(tn > thX) & ~(tn > fc_adj)
+        new_sum = np.where(kept, 0.0, new_sum)
+        new_th = np.where(kept, tn, new_th)
+
+        beyond = unable & (thX > cth_s)
+        # the compartment is not saturated
+        unsat = beyond & (tn <= cth_s)
+        above_fc = unsat & (tn > fc_adj)
+        ds = d * 1000 * cdz
+        over = above_fc & (ds > cKsat)
+        excess = np.where(over, excess + ds - cKsat, excess)
+        new_sum = np.where(above_fc, np.where(over, cKsat, ds), new_sum)
+        new_th = np.where(above_fc, tn - d, new_th)
+        kept = unsat & ~(tn > fc_adj)
+        new_sum = np.where(kept, 0.0, new_sum)
+        new_th = np.where(kept, tn, new_th)
+        # the compartment is saturated
+        sat = beyond & (tn > cth_s)
+        sat_excess = (tn - cth_s) * 1000 * cdz
+        draincomp = d * 1000 * cdz
+        drainmax = d * 1000 * prethick
+        drainmax = np.where(drainmax > sat_excess, sat_excess, drainmax)
+        sat_excess = sat_excess - drainmax
+        ds = draincomp + drainmax
+        over = sat & (ds > cKsat)
+        excess = np.where(sat, np.where(over, sat_excess + ds - cKsat, sat_excess), excess)
+        new_sum = np.where(sat, np.where(over, cKsat, ds), new_sum)
+        new_th = np.where(sat, cth_s - d, new_th)
+
+        drainsum = np.where(seq, new_sum, drainsum_init[:, ii])
+        thnew[seq, ii] = new_th[seq]
+        FluxOut[seq, ii] = drainsum[seq]
+
+        # water that cannot drain is stored in the compartments above
+        excess = np.where(seq, excess, 0.0)
+        precomp = ii + 1
+        while (excess > 0).any() and (precomp != 0):
+            precomp = precomp - 1
+            wet = excess > 0
+            if precomp < ii:
+                FluxOut[wet, precomp] = FluxOut[wet, precomp] - excess[wet]
+            thnew[wet, precomp] = thnew[wet, precomp] + (excess[wet] / (1000 * dz[precomp]))
+            full = wet & (thnew[:, precomp] > th_s[precomp])
+            excess = np.where(
+                full,
+                (thnew[:, precomp] - th_s[precomp]) * 1000 * dz[precomp],
+                np.where(wet, 0.0, excess),
+            )
+            thnew[full, precomp] = th_s[precomp]
+
+    DeepPerc = drainsum
+    return thnew, DeepPerc, FluxOut
+
+
+def rainfall_partition(
+    precipitation: "ndarray",
+    cond: "BatchCondition",
+    FieldMngt: "FieldMngtStruct",
+    Soil: "Soil",
+    prof: "SoilProfile",
+) -> Tuple["ndarray", "ndarray", bool]:
+    """
+    Partition the rainfall of each site into surface runoff and infiltration
+
+    The scalar function clips the depths of the top compartments of the
+    soil profile to the curve number depth when it adjusts the curve
+    number, the batch reports it instead and leaves the profile unchanged.
+
+    Arguments:
+
+        precipitation (numpy.ndarray): precipitation of each site
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        FieldMngt (FieldMngtStruct): field management paramaters
+
+        Soil (Soil): soil paramaters
+
+        prof (SoilProfile): soil profile paramaters
+
+    Returns:
+
+        Runoff (numpy.ndarray): surface runoff
+
+        Infl (numpy.ndarray): infiltration
+
+        clipped (bool): the compartment depths were clipped to the curve number depth
+    """
+    if (FieldMngt.sr_inhb == False) and (
+        (FieldMngt.bunds == False) or (FieldMngt.z_bund < 0.001)
+    ):
+        cond.day_submerged[:] = 0
+        cn = Soil.cn * (1 + (FieldMngt.curve_number_adj_pct / 100))
+        clipped = False
+        if Soil.adj_cn == 1:
+            CNbot = round(
+                1.4 * (np.exp(-14 * np.log(10)))
+                + (0.507 * cn)
+                - (0.00374 * cn ** 2)
+                + (0.0000867 * cn ** 3)
+            )
+            CNtop = round(
+                5.6 * (np.exp(-14 * np.log(10)))
+                + (2.33 * cn)
+                - (0.0209 * cn ** 2)
+                + (0.000076 * cn ** 3)
+            )
+            dzsum = prof.dzsum.copy()
+            comp_sto_array = dzsum[dzsum >= Soil.z_cn]
+            if comp_sto_array.shape[0] == 0:
+                comp_sto = int(Soil.nComp)
+            else:
+                comp_sto = int(Soil.nComp - comp_sto_array.shape[0])
+            comp_sto += 1
+            xx = 0
+            wrel = np.zeros(comp_sto)
+            for ii in range(comp_sto):
+                if dzsum[ii] > Soil.z_cn:
+                    dzsum[ii] = Soil.z_cn
+                wx = 1.016 * (1 - np.exp(-4.16 * (dzsum[ii] / Soil.z_cn)))
+                wrel[ii] = wx - xx
+                if wrel[ii] < 0:
+                    wrel[ii] = 0
+                elif wrel[ii] > 1:
+                    wrel[ii] = 1
+                xx = wx
+            clipped = True
+
+            wet_top = 0
+            for ii in range(comp_sto):
+                th = py_max(prof.th_wp[ii], cond.th[:, ii])
+                wet_top = wet_top + (
+                    wrel[ii] * ((th - prof.th_wp[ii]) / (prof.th_fc[ii] - prof.th_wp[ii]))
+                )
+            wet_top = np.where(wet_top > 1, 1.0, np.where(wet_top < 0, 0.0, wet_top))
+            cn = np.round(CNbot + (CNtop - CNbot) * wet_top)
+
+        S = (25400 / cn) - 254
+        term = precipitation - ((5 / 100) * S)
+        wet = term > 0
+        Runoff = np.where(
+            wet, power(term, 2) / (precipitation + (1 - (5 / 100)) * S), 0.0
+        )
+        Infl = np.where(wet, precipitation - Runoff, precipitation)
+        return Runoff, Infl, clipped
+
+    return np.zeros(cond.n_sites), precipitation.copy(), False
+
+
+def irrigation(
+    IrrMngt: "IrrMngtStruct",
+    cond: "BatchCondition",
+    Crop: "Crop",
+    prof: "SoilProfile",
+    Soil_zTop: float,
+    growing_season: bool,
+    Rain: "ndarray",
+    Runoff: "ndarray",
+) -> "ndarray":
+    """
+    Irrigation depth of each site on the current day
+
+    Arguments:
+
+        IrrMngt (IrrMngtStruct): irrigation management paramaters
+
+        cond (BatchCondition): state of the sites, the depletion, total \
+            available water and seasonal irrigation are updated in place
+
+        Crop (Crop): crop paramaters
+
+        prof (SoilProfile): soil profile paramaters
+
+        Soil_zTop (float): top soil depth
+
+        growing_season (bool): is growing season (True or False)
+
+        Rain (numpy.ndarray): precipitation of each site
+
+        Runoff (numpy.ndarray): surface runoff of each site
+
+    Returns:
+
+        Irr (numpy.ndarray): irrigation applied on the current day (mm)
+    """
+    n_sites = cond.n_sites
+    if growing_season is True:
+        rz = root_zone_water(
+            prof, cond.z_root, cond.th, Soil_zTop, float(Crop.Zmin), Crop.Aer
+        )
+        Dr = rz[2]
+        taw = rz[4]
+        thRZ_Act = rz[5]
+        thRZ_FC = rz[7]
+        rootdepth = py_max(cond.z_root, Crop.Zmin)
+        AbvFc = np.where(
+            thRZ_Act > thRZ_FC, (thRZ_Act - thRZ_FC) * 1000 * rootdepth, 0.0
+        )
+        WCadj = cond.t_pot + cond.e_pot - Rain + Runoff - AbvFc
+        cond.depletion[:] = Dr + WCadj
+        cond.taw[:] = taw
+        GrowthStage = np.where(cond.dap == 1, 1, cond.growth_stage)
+
+        method = IrrMngt.irrigation_method
+        if method == 1:
+            Dr = cond.depletion / cond.taw
+            index = GrowthStage.astype(int) - 1
+            threshold = 1 - np.asarray(IrrMngt.SMT)[index] / 100
+            EffAdj = ((100 - IrrMngt.AppEff) + 100) / 100
+            IrrReq = py_max(0, cond.depletion) * EffAdj
+            Irr = np.where(Dr > threshold, py_min(IrrMngt.MaxIrr, IrrReq), 0.0)
+        elif method == 2:
+            nDays = cond.dap - 1
+            EffAdj = ((100 - IrrMngt.AppEff) + 100) / 100
+            IrrReq = py_max(0, cond.depletion) * EffAdj
+            Irr = np.where(
+                nDays % IrrMngt.IrrInterval == 0, py_min(IrrMngt.MaxIrr, IrrReq), 0.0
+            )
+        elif method == 3:
+            Irr = IrrMngt.Schedule[int(cond.time_step_counter[0])]
+            assert Irr >= 0
+            Irr = np.full(n_sites, min(IrrMngt.MaxIrr, Irr), dtype=np.float64)
+        elif method == 5:
+            Irr = np.full(
+                n_sites, min(IrrMngt.MaxIrr, IrrMngt.depth), dtype=np.float64
+            )
+        else:
+            Irr = np.zeros(n_sites)
+        Irr = py_max(0, Irr)
+    else:
+        Irr = np.zeros(n_sites)
+        cond.irr_cum[:] = 0.
+        cond.depletion[:] = 0.
+        cond.taw[:] = 0.
+
+    Irr = np.where(
+        cond.irr_cum + Irr > IrrMngt.MaxIrrSeason,
+        py_max(0, IrrMngt.MaxIrrSeason - cond.irr_cum),
+        Irr,
+    )
+    cond.irr_cum[:] = cond.irr_cum + Irr
+    return Irr
+
+
+def infiltration(
+    prof: "SoilProfile",
+    cond: "BatchCondition",
+    Infl: "ndarray",
+    Irr: "ndarray",
+    IrrMngt_AppEff: float,
+    FieldMngt_Bunds: bool,
+    FieldMngt_zBund: float,
+    FluxOut: "ndarray",
+    DeepPerc0: "ndarray",
+    Runoff0: "ndarray",
+    growing_season: bool,
+) -> Tuple["ndarray", "ndarray", "ndarray", "ndarray"]:
+    """
+    Infiltrate the incoming water (rainfall and irrigation) of each site
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        cond (BatchCondition): state of the sites, the water content and \
+            surface storage are updated in place
+
+        Infl (numpy.ndarray): infiltration from rainfall partition
+
+        Irr (numpy.ndarray): irrigation
+
+        IrrMngt_AppEff (float): irrigation application efficiency
+
+        FieldMngt_Bunds (bool): are bunds present
+
+        FieldMngt_zBund (float): bund height
+
+        FluxOut (numpy.ndarray): flux of water out of each compartment, \
+            updated in place
+
+        DeepPerc0 (numpy.ndarray): deep percolation from drainage
+
+        Runoff0 (numpy.ndarray): surface runoff from rainfall partition
+
+        growing_season (bool): is growing season (True or False)
+
+    Returns:
+
+        DeepPerc (numpy.ndarray): total deep percolation
+
+        RunoffTot (numpy.ndarray): total surface runoff
+
+        Infl (numpy.ndarray): infiltration
+
+        FluxOut (numpy.ndarray): flux of water out of each compartment
+    """
+    n_sites, n_comp = cond.th.shape
+    Ksat = prof.Ksat
+    dz = prof.dz
+    th_s = prof.th_s
+    InitCond_SurfaceStorage = cond.surface_storage.copy()
+    InitCond_th_fc_Adj = cond.th_fc_Adj.copy()
+    InitCond_th = cond.th.copy()
+    thnew = cond.th.copy()
+    SurfaceStorage = cond.surface_storage.copy()
+
+    Infl = py_max(Infl, 0.)
+    if growing_season is True:
+        Infl = Infl + (Irr * (IrrMngt_AppEff / 100))
+    assert (Infl >= 0).all()
+
+    if FieldMngt_Bunds:
+        if FieldMngt_zBund > 0.001:
+            InflTot = Infl + SurfaceStorage
+            wet = InflTot > 0
+            fast = InflTot > Ksat[0]
+            ToStore = np.where(wet, np.where(fast, Ksat[0], InflTot), 0.0)
+            SurfaceStorage = np.where(
+                wet, np.where(fast, InflTot - Ksat[0], 0.0), SurfaceStorage
+            )
+            spill = wet & (SurfaceStorage > FieldMngt_zBund)
+            RunoffIni = np.where(spill, SurfaceStorage - FieldMngt_zBund, 0.0)
+            SurfaceStorage = np.where(spill, FieldMngt_zBund * 1, SurfaceStorage)
+        else:
+            raise ValueError("Bund height must be greater than 0.001 mm when bunds are present")
+    else:
+        fast = Infl > Ksat[0]
+        ToStore = np.where(fast, Ksat[0], Infl)
+        RunoffIni = np.where(fast, Infl - Ksat[0], 0.0)
+        SurfaceStorage = np.zeros(n_sites)
+        RunoffIni = RunoffIni + InitCond_SurfaceStorage
+
+    stored = ToStore > 0
+    Runoff = np.zeros(n_sites)
+    for ii in range(n_comp):
+        active = stored & (ToStore > 0)
+        if not active.any():
+            break
+
+        dthdtS = prof.drain_sat[ii]
+        factor = prof.infl_factor[ii]
+        fc_adj = InitCond_th_fc_Adj[:, ii]
+        dthdt0 = ToStore / (1000 * dz[ii])
+        slow = dthdt0 < dthdtS
+        A = 1 + ((dthdt0 * prof.exp_sat[ii]) / prof.drain_sat[ii])
+        theta0 = np.where(dthdt0 <= 0, fc_adj, prof.th_fc[ii] + np.log(A))
+        at_fc = ~(theta0 > th_s[ii]) & (theta0 <= fc_adj)
+        theta0 = np.where(
+            slow,
+            np.where(theta0 > th_s[ii], th_s[ii], np.where(at_fc, fc_adj, theta0)),
+            th_s[ii],
+        )
+        dthdt0 = np.where(slow, np.where(at_fc, 0.0, dthdt0), dthdtS)
+
+        drainmax = factor * dthdt0 * 1000 * dz[ii]
+        drain = drainmax + FluxOut[:, ii]
+        drainmax = np.where(drain > Ksat[ii], Ksat[ii] - FluxOut[:, ii], drainmax)
+
+        diff = theta0 - InitCond_th[:, ii]
+        room = active & (diff > 0)
+        th_room = thnew[:, ii] + (ToStore / (1000 * dz[ii]))
+        full = room & (th_room > theta0)
+        thnew[room, ii] = np.where(full, theta0, th_room)[room]
+        ToStore = np.where(
+            room, np.where(full, (th_room - theta0) * 1000 * dz[ii], 0.0), ToStore
+        )
+
+        FluxOut[active, ii] = FluxOut[active, ii] + ToStore[active]
+        excess = ToStore - drainmax
+        excess = np.where(active & (excess > 0), excess, 0.0)
+        ToStore = np.where(active, ToStore - excess, ToStore)
+
+        # water that cannot drain is stored in the compartments above
+        precomp = ii + 1
+        while (excess > 0).any() and (precomp != 0):
+            precomp = precomp - 1
+            wet = excess > 0
+            FluxOut[wet, precomp] = FluxOut[wet, precomp] - excess[wet]
+            thnew[wet, precomp] = thnew[wet, precomp] + (excess[wet] / (dz[precomp] * 1000))
+            full = wet & (thnew[:, precomp] > th_s[precomp])
+            excess = np.where(
+                full,
+                (thnew[:, precomp] - th_s[precomp]) * 1000 * dz[precomp],
+                np.where(wet, 0.0, excess),
+            )
+            thnew[full, precomp] = th_s[precomp]
+        Runoff = np.where(excess > 0, Runoff + excess, Runoff)
+
+    DeepPerc = np.where(stored, ToStore, 0.0)
+    Runoff = Runoff + RunoffIni
+
+    # water that runs off is kept between the bunds
+    if FieldMngt_Bunds and (FieldMngt_zBund > 0.001):
+        ponded = Runoff > RunoffIni
+        SurfaceStorage = np.where(ponded, SurfaceStorage + (Runoff - RunoffIni), SurfaceStorage)
+        spill = ponded & (SurfaceStorage > FieldMngt_zBund)
+        Runoff = np.where(
+            ponded,
+            np.where(spill, RunoffIni + (SurfaceStorage - FieldMngt_zBund), RunoffIni),
+            Runoff,
+        )
+        SurfaceStorage = np.where(spill, FieldMngt_zBund, SurfaceStorage)
+
+    cond.th[:] = thnew
+    cond.surface_storage[:] = SurfaceStorage
+    DeepPerc = DeepPerc + DeepPerc0
+    Infl = Infl - Runoff
+    RunoffTot = Runoff + Runoff0
+    return DeepPerc, RunoffTot, Infl, FluxOut
+
+
+def capillary_rise(
+    prof: "SoilProfile",
+    Soil_nLayer: int,
+    Soil_fshape_cr: float,
+    cond: "BatchCondition",
+    FluxOut: "ndarray",
+    water_table_presence: int,
+) -> "ndarray":
+    """
+    Capillary rise of each site from a shallow groundwater table
+
+    The groundwater depth of the current day is the same for all the sites.
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        Soil_nLayer (int): number of soil layers
+
+        Soil_fshape_cr (float): capillary rise shape factor
+
+        cond (BatchCondition): state of the sites, the water content is \
+            updated in place
+
+        FluxOut (numpy.ndarray): flux of water out of each compartment
+
+        water_table_presence (int): water table present (1) or not (0)
+
+    Returns:
+
+        CrTot (numpy.ndarray): capillary rise of each site
+    """
+    n_sites, n_comp = cond.th.shape
+    CrTot = np.zeros(n_sites)
+    if water_table_presence == 0:
+        return CrTot
+
+    z_gw = float(cond.z_gw[0])
+    zBot = prof.dzsum[-1]
+    zBotMid = prof.zMid[-1]
+    if (prof.Ksat[-1] > 0) and (z_gw > 0) and ((z_gw - zBotMid) < 4):
+        if zBotMid >= z_gw:
+            MaxCR = 99
+        else:
+            MaxCR = np.exp((np.log(z_gw - zBotMid) - prof.bCR[-1]) / prof.aCR[-1])
+            if MaxCR > 99:
+                MaxCR = 99
+    else:
+        MaxCR = 0
+    assert prof.Layer[-1] == Soil_nLayer
+
+    th = cond.th
+    th_fc_Adj = cond.th_fc_Adj
+    th_wp = prof.th_wp
+    dz = prof.dz
+    MaxCR = np.full(n_sites, MaxCR, dtype=np.float64)
+    active = np.ones(n_sites, dtype=bool)
+    for compi in range(n_comp - 1, -1, -1):
+        active = active & (np.rint(MaxCR * 1000) > 0) & (np.rint(FluxOut[:, compi] * 1000) == 0)
+        if not active.any():
+            break
+
+        # driving force
+        if Soil_fshape_cr > 0:
+            Df = 1 - power(
+                (th[:, compi] - th_wp[compi]) / (th_fc_Adj[:, compi] - th_wp[compi]),
+                Soil_fshape_cr,
+            )
+            Df = np.where(Df > 1, 1.0, np.where(Df < 0, 0.0, Df))
+            Df = np.where(th[:, compi] >= th_wp[compi], Df, 1.0)
+        else:
+            Df = np.ones(n_sites)
+
+        # relative hydraulic conductivity
+        thThr = prof.th_thr[compi]
+        if thThr <= th_wp[compi]:
+            Krel = np.where(th[:, compi] < thThr, 0.0, 1.0)
+        else:
+            Krel = np.where(
+                th[:, compi] < thThr,
+                np.where(
+                    th[:, compi] <= th_wp[compi],
+                    0.0,
+                    (th[:, compi] - th_wp[compi]) / (thThr - th_wp[compi]),
+                ),
+                1.0,
+            )
+
+        # store water if room is available
+        dth = np.round(th_fc_Adj[:, compi] - th[:, compi], 4)
+        if (zBot - dz[compi] / 2) < z_gw:
+            room = active & (dth > 0)
+            dthMax = Krel * Df * MaxCR / (1000 * dz[compi])
+            fill = room & (dth >= dthMax)
+            CRcomp = np.where(fill, dthMax * 1000 * dz[compi], dth * 1000 * dz[compi])
+            th[room, compi] = np.where(
+                fill, th[:, compi] + dthMax, th_fc_Adj[:, compi]
+            )[room]
+            MaxCR = np.where(
+                room, np.where(fill, 0.0, (Krel * MaxCR) - CRcomp), MaxCR
+            )
+            CrTot = np.where(room, CrTot + CRcomp, CrTot)
+
+        zBot = zBot - dz[compi]
+        if compi > 0:
+            zBotMid = zBot - (dz[compi - 1] / 2)
+            if (prof.Ksat[compi - 1] > 0) and (z_gw > 0) and ((z_gw - zBotMid) < 4):
+                if zBotMid >= z_gw:
+                    LimCR = 99
+                else:
+                    LimCR = np.exp(
+                        (np.log(z_gw - zBotMid) - prof.bCR[compi - 1]) / prof.aCR[compi - 1]
+                    )
+                    if LimCR > 99:
+                        LimCR = 99
+            else:
+                LimCR = 0
+            MaxCR = np.where(active & (MaxCR > LimCR), LimCR, MaxCR)
+
+    return CrTot
+
+
+def evap_layer_water_content(
+    th: "ndarray",
+    EvapZ: "ndarray",
+    prof: "SoilProfile",
+) -> Tuple["ndarray", "ndarray", "ndarray", "ndarray", "ndarray"]:
+    """
+    Water contents of the evaporation layer of each site
+
+    Arguments:
+
+        th (numpy.ndarray): water content of each site and compartment
+
+        EvapZ (numpy.ndarray): depth of the evaporation layer of each site
+
+        prof (SoilProfile): soil profile paramaters
+
+    Returns:
+
+        Wevap_Sat, Wevap_Fc, Wevap_Wp, Wevap_Dry, Wevap_Act (numpy.ndarray): \
+            water in the evaporation layer at saturation, field capacity, \
+            wilting point, air dry and actual water content (mm)
+    """
+    comp_sto = np.sum(prof.dzsum < EvapZ[:, None], axis=1) + 1
+    Wevap_Sat = 0
+    Wevap_Fc = 0
+    Wevap_Wp = 0
+    Wevap_Dry = 0
+    Wevap_Act = 0
+    for ii in range(int(comp_sto.max())):
+        within = ii < comp_sto
+        factor = np.where(
+            prof.dzsum[ii] > EvapZ, 1 - ((prof.dzsum[ii] - EvapZ) / prof.dz[ii]), 1.0
+        )
+        Wevap_Act = np.where(within, Wevap_Act + factor * 1000 * th[:, ii] * prof.dz[ii], Wevap_Act)
+        Wevap_Sat = np.where(within, Wevap_Sat + factor * 1000 * prof.th_s[ii] * prof.dz[ii], Wevap_Sat)
+        Wevap_Fc = np.where(within, Wevap_Fc + factor * 1000 * prof.th_fc[ii] * prof.dz[ii], Wevap_Fc)
+        Wevap_Wp = np.where(within, Wevap_Wp + factor * 1000 * prof.th_wp[ii] * prof.dz[ii], Wevap_Wp)
+        Wevap_Dry = np.where(within, Wevap_Dry + factor * 1000 * prof.th_dry[ii] * prof.dz[ii], Wevap_Dry)
+    Wevap_Act = np.where(Wevap_Act < 0, 0.0, Wevap_Act)
+    return Wevap_Sat, Wevap_Fc, Wevap_Wp, Wevap_Dry, Wevap_Act
+
+
+def _stage_two_weight(
+    prof: "SoilProfile", th: "ndarray", EvapZ: "ndarray", Wstage2: "ndarray", REW: float
+) -> Tuple["ndarray", "ndarray", "ndarray", "ndarray"]:
+    """
+    Upper and lower limits and relative water content of the evaporation layer
+    """
+    Wevap_Sat, Wevap_Fc, Wevap_Wp, Wevap_Dry, Wevap_Act = evap_layer_water_content(
+        th, EvapZ, prof
+    )
+    Wupper = Wstage2 * (Wevap_Sat - (Wevap_Fc - REW)) + (Wevap_Fc - REW)
+    Wlower = Wevap_Dry
+    Wrel = (Wevap_Act - Wlower) / (Wupper - Wlower)
+    return Wupper, Wlower, Wrel
+
+
+def _stage_two_evaporation(
+    evap_time_steps: int,
+    prof: "SoilProfile",
+    Soil: "Soil",
+    th: "ndarray",
+    EvapZ: "ndarray",
+    Wstage2: "ndarray",
+    ToExtract: "ndarray",
+    EsAct: "ndarray",
+) -> Tuple["ndarray", "ndarray"]:
+    """
+    Stage 2 evaporation of the sites with water left to extract, in fixed
+    sub-steps (see soil_evaporation)
+    """
+    EvapZmin = Soil.evap_z_min
+    EvapZmax = Soil.evap_z_max
+    dz = prof.dz
+    dzsum = prof.dzsum
+    n_sites, n_comp = th.shape
+
+    Edt = ToExtract / evap_time_steps
+    for _ in range(int(evap_time_steps)):
+        Wupper, Wlower, Wrel = _stage_two_weight(prof, th, EvapZ, Wstage2, Soil.rew)
+        if EvapZmax > EvapZmin:
+            Wcheck = Soil.f_wrel_exp * ((EvapZmax - EvapZ) / (EvapZmax - EvapZmin))
+            expand = (Wrel < Wcheck) & (EvapZ < EvapZmax)
+            while expand.any():
+                sites = np.flatnonzero(expand)
+                EvapZ[sites] = EvapZ[sites] + 0.001
+                Wupper[sites], Wlower[sites], Wrel[sites] = _stage_two_weight(
+                    prof, th[sites], EvapZ[sites], Wstage2[sites], Soil.rew
+                )
+                Wcheck[sites] = Soil.f_wrel_exp * (
+                    (EvapZmax - EvapZ[sites]) / (EvapZmax - EvapZmin)
+                )
+                expand[sites] = (Wrel[sites] < Wcheck[sites]) & (EvapZ[sites] < EvapZmax)
+
+        Kr = (np.exp(Soil.f_evap * Wrel) - 1) / (np.exp(Soil.f_evap) - 1)
+        Kr = np.where(Kr > 1, 1.0, Kr)
+        ToExtractStg2 = Kr * Edt * 1
+
+        comp_sto = np.sum(dzsum < EvapZ[:, None], axis=1) + 1
+        for comp in range(min(int(comp_sto.max()) + 1, n_comp)):
+            active = (ToExtractStg2 > 0) & (comp <= comp_sto)
+            if not active.any():
+                break
+            factor = np.where(dzsum[comp] > EvapZ, 1 - ((dzsum[comp] - EvapZ) / dz[comp]), 1.0)
+            Wdry = 1000 * prof.th_dry[comp] * dz[comp]
+            W = 1000 * th[:, comp] * dz[comp]
+            AvW = (W - Wdry) * factor
+            enough = AvW >= ToExtractStg2
+            taken = np.where(enough, ToExtractStg2, AvW)
+            EsAct = np.where(active, EsAct + taken, EsAct)
+            W = W - taken
+            ToExtractStg2 = np.where(
+                active, np.where(enough, 0.0, ToExtractStg2 - AvW), ToExtractStg2
+            )
+            th[active, comp] = (W / (1000 * dz[comp]))[active]
+
+    return EvapZ, EsAct
+
+
+def soil_evaporation(
+    evap_time_steps: int,
+    sim_off_season: bool,
+    time_step_counter: int,
+    prof: "SoilProfile",
+    Soil: "Soil",
+    Crop: "Crop",
+    IrrMngt: "IrrMngtStruct",
+    FieldMngt: "FieldMngtStruct",
+    cond: "BatchCondition",
+    et0: "ndarray",
+    Infl: "ndarray",
+    Rain: "ndarray",
+    Irr: "ndarray",
+    growing_season: bool,
+) -> Tuple["ndarray", "ndarray"]:
+    """
+    Daily soil evaporation of each site
+
+    Arguments:
+
+        evap_time_steps (int): number of sub-steps of stage 2 evaporation
+
+        sim_off_season (bool): simulate the off-season
+
+        time_step_counter (int): current day
+
+        prof (SoilProfile): soil profile paramaters
+
+        Soil (Soil): soil paramaters
+
+        Crop (Crop): crop paramaters
+
+        IrrMngt (IrrMngtStruct): irrigation management paramaters
+
+        FieldMngt (FieldMngtStruct): field management paramaters
+
+        cond (BatchCondition): state of the sites, updated in place
+
+        et0 (numpy.ndarray): reference evapotranspiration of each site
+
+        Infl (numpy.ndarray): infiltration
+
+        Rain (numpy.ndarray): precipitation
+
+        Irr (numpy.ndarray): irrigation
+
+        growing_season (bool): is growing season (True or False)
+
+    Returns:
+
+        EsAct (numpy.ndarray): actual surface evaporation
+
+        EsPot (numpy.ndarray): potential surface evaporation
+    """
+    REW = Soil.rew
+    EvapZmin = Soil.evap_z_min
+    th = cond.th
+
+    # prepare stage 2 evaporation at the start of the simulation or season
+    if time_step_counter == 0:
+        reset = np.ones(cond.n_sites, dtype=bool)
+    elif sim_off_season is False:
+        reset = cond.dap == 1
+    else:
+        reset = np.zeros(cond.n_sites, dtype=bool)
+    if reset.any():
+        cond.w_surf[reset] = 0
+        cond.evap_z[reset] = EvapZmin
+        cond.stage2[reset] = True
+        cond.w_stage_2[:] = np.where(reset, _stage_two_start(prof, th, cond.evap_z, REW), cond.w_stage_2)
+
+    # rain or irrigation wets the surface
+    wetted = ((Rain > 0) | ((Irr > 0) & (IrrMngt.irrigation_method != 4))) & (Infl > 0)
+    cond.w_surf[:] = np.where(wetted, np.where(Infl > REW, REW, Infl), cond.w_surf)
+    cond.w_stage_2[wetted] = 0
+    cond.evap_z[wetted] = EvapZmin
+    cond.stage2[wetted] = False
+
+    # potential evaporation
+    if growing_season is True:
+        if Crop.CalendarType == 1:
+            tAdj = cond.dap - cond.delayed_cds
+        elif Crop.CalendarType == 2:
+            tAdj = cond.gdd_cum - cond.delayed_gdds
+        EsPotMax = Soil.kex * et0 * (1 - cond.ccx_w * (Soil.fwcc / 100))
+        EsPot = Soil.kex * (1 - cond.canopy_cover_adj) * et0
+        late = (tAdj > Crop.Senescence) & (cond.ccx_act > 0)
+        if late.any():
+            CCxAct = cond.ccx_act
+            CC = cond.canopy_cover
+            mult = np.where(
+                CC > (CCxAct / 2),
+                np.where(CC > CCxAct, 0.0, (CCxAct - CC) / (CCxAct / 2)),
+                1.0,
+            )
+            EsPotLate = EsPot * (1 - CCxAct * (Soil.fwcc / 100) * mult)
+            CCxActAdj = (1.72 * CCxAct) - power(CCxAct, 2) + 0.3 * power(CCxAct, 3)
+            EsPotMin = Soil.kex * (1 - CCxActAdj) * et0
+            EsPotMin = np.where(EsPotMin < 0, 0.0, EsPotMin)
+            EsPotLate = np.where(
+                EsPotLate < EsPotMin,
+                EsPotMin,
+                np.where(EsPotLate > EsPotMax, EsPotMax, EsPotLate),
+            )
+            EsPot = np.where(late, EsPotLate, EsPot)
+        EsPot = np.where(cond.premat_senes & (EsPot > EsPotMax), EsPotMax, EsPot)
+    else:
+        EsPot = Soil.kex * et0
+
+    # mulches and partial wetting by irrigation
+    if FieldMngt.mulches:
+        EsPotMul = np.where(
+            cond.surface_storage < 0.000001,
+            EsPot * (1 - FieldMngt.f_mulch * (FieldMngt.mulch_pct / 100)),
+            EsPot,
+        )
+    else:
+        EsPotMul = EsPot
+    partial = ((Irr > 0) & (IrrMngt.irrigation_method != 4)) & ~(
+        (Rain > 1) | (cond.surface_storage > 0)
+    )
+    EsPotIrr = np.where(partial, EsPot * (IrrMngt.WetSurf / 100), EsPot)
+    EsPot = py_min(EsPotIrr, EsPotMul)
+
+    # evaporation of the water between the bunds
+    EsAct = np.zeros(cond.n_sites)
+    ponded = cond.surface_storage > 0
+    deep = ponded & (cond.surface_storage > EsPot)
+    shallow = ponded & ~deep
+    EsAct = np.where(deep, EsPot, np.where(shallow, cond.surface_storage, EsAct))
+    cond.surface_storage[:] = np.where(
+        deep, cond.surface_storage - EsAct, np.where(shallow, 0.0, cond.surface_storage)
+    )
+    cond.w_surf[shallow] = REW
+    cond.w_stage_2[shallow] = 0
+    cond.evap_z[shallow] = EvapZmin
+    cond.stage2[shallow] = False
+
+    # stage 1 evaporation
+    ToExtract = EsPot - EsAct
+    ExtractPotStg1 = py_min(ToExtract, cond.w_surf)
+    stage1 = ExtractPotStg1 > 0
+    if stage1.any():
+        comp_sto = np.sum(prof.dzsum < EvapZmin) + 1
+        for comp in range(min(comp_sto + 1, th.shape[1])):
+            active = stage1 & (ExtractPotStg1 > 0)
+            if not active.any():
+                break
+            if prof.dzsum[comp] > EvapZmin:
+                factor = 1 - ((prof.dzsum[comp] - EvapZmin) / prof.dz[comp])
+            else:
+                factor = 1
+            Wdry = 1000 * prof.th_dry[comp] * prof.dz[comp]
+            W = 1000 * th[:, comp] * prof.dz[comp]
+            AvW = (W - Wdry) * factor
+            AvW = np.where(AvW < 0, 0.0, AvW)
+            enough = AvW >= ExtractPotStg1
+            taken = np.where(enough, ExtractPotStg1, AvW)
+            EsAct = np.where(active, EsAct + taken, EsAct)
+            W = W - taken
+            ToExtract = np.where(active, ToExtract - taken, ToExtract)
+            ExtractPotStg1 = np.where(
+                active, np.where(enough, 0.0, ExtractPotStg1 - AvW), ExtractPotStg1
+            )
+            th[active, comp] = (W / (1000 * prof.dz[comp]))[active]
+
+        w_surf = cond.w_surf - EsAct
+        w_surf = np.where((w_surf < 0) | (ExtractPotStg1 > 0.0001), 0.0, w_surf)
+        cond.w_surf[stage1] = w_surf[stage1]
+        dry = stage1 & (cond.w_surf < 0.0001)
+        if dry.any():
+            cond.w_stage_2[:] = np.where(
+                dry, _stage_two_start(prof, th, cond.evap_z, REW), cond.w_stage_2
+            )
+
+    # stage 2 evaporation
+    stage2 = ToExtract > 0
+    if stage2.any():
+        cond.stage2[stage2] = True
+        sites = np.flatnonzero(stage2)
+        th_sites = th[sites]
+        cond.evap_z[sites], EsAct[sites] = _stage_two_evaporation(
+            evap_time_steps,
+            prof,
+            Soil,
+            th_sites,
+            cond.evap_z[sites],
+            cond.w_stage_2[sites],
+            ToExtract[sites],
+            EsAct[sites],
+        )
+        th[sites] = th_sites
+
+    cond.e_pot[:] = EsPot
+    return EsAct, EsPot
+
+
+def _stage_two_start(
+    prof: "SoilProfile", th: "ndarray", EvapZ: "ndarray", REW: float
+) -> "ndarray":
+    """
+    Proportional water storage of the evaporation layer for the start of stage 2
+    """
+    Wevap_Sat, Wevap_Fc, Wevap_Wp, Wevap_Dry, Wevap_Act = evap_layer_water_content(
+        th, EvapZ, prof
+    )
+    Wstage2 = np.round(
+        (Wevap_Act - (Wevap_Fc - REW)) / (Wevap_Sat - (Wevap_Fc - REW)), 2
+    )
+    return np.where(Wstage2 < 0, 0.0, Wstage2)
+
+
+def groundwater_inflow(prof: "SoilProfile", cond: "BatchCondition") -> "ndarray":
+    """
+    Inflow of each site from a groundwater table within the soil profile
+
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        cond (BatchCondition): state of the sites, the water content is \
+            updated in place
+
+    Returns:
+
+        GwIn (numpy.ndarray): groundwater inflow
+    """
+    GwIn = np.zeros(cond.n_sites)
+    in_soil = cond.wt_in_soil
+    if not in_soil.any():
+        return GwIn
+
+    idx = np.argwhere(prof.zMid >= cond.z_gw[in_soil][0]).flatten()[0]
+    th = cond.th
+    for ii in range(idx, th.shape[1]):
+        low = in_soil & (th[:, ii] < prof.th_s[ii])
+        dth = prof.th_s[ii] - th[:, ii]
+        th[low, ii] = prof.th_s[ii]
+        GwIn = np.where(low, GwIn + (dth * 1000 * prof.dz[ii]), GwIn)
+    return GwIn
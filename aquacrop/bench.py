@@ -0,0 +1,604 @@
+"""
+Benchmarks of the bundled scenarios.
+
+Run from the command line with::
+
+    python -m aquacrop.bench --output results.json
+    python -m aquacrop.bench --scenarios tunis_wheat paddy_bunds --compare results.json
+
+Each scenario is timed in three parts: initialization (`_initialize`),
+stepping (the daily time-step loop) and output conversion (turning the
+daily arrays into DataFrames). Results are saved as JSON so that runs on
+different commits can be compared.
+
+`python -m aquacrop.bench --import-time` times the import of the package
+in fresh interpreters (the start-up cost of a short-lived worker).
+
+`python -m aquacrop.bench --evap-accuracy` compares adaptive soil
+evaporation sub-steps (AquaCropModel(evap_tolerance=...)) with the fixed
+20 sub-steps on the cases of the Windows/MATLAB comparison.
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .core import AquaCropModel
+from .entities.co2 import CO2
+from .entities.crop import Crop
+from .entities.fieldManagement import FieldMngt
+from .entities.groundWater import GroundWater
+from .entities.inititalWaterContent import InitialWaterContent
+from .entities.irrigationManagement import IrrigationManagement
+from .entities.soil import Soil
+from .utils.data import get_filepath
+from .utils.prepare_weather import prepare_weather
+
+RESULTS_VERSION = 1
+
+
+def _tunis_wheat() -> List[dict]:
+    return [
+        dict(
+            sim_start_time="1979/10/01",
+            sim_end_time="1985/05/30",
+            weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+            soil=Soil("SandyLoam"),
+            crop=Crop("Wheat", planting_date="10/01"),
+            initial_water_content=InitialWaterContent(value=["FC"]),
+        )
+    ]
+
+
+def _paddy_bunds() -> List[dict]:
+    return [
+        dict(
+            sim_start_time="2000/08/01",
+            sim_end_time="2010/12/31",
+            weather_df=prepare_weather(get_filepath("hyderabad_climate.txt")),
+            soil=Soil("Paddy"),
+            crop=Crop("localpaddy", planting_date="08/01"),
+            initial_water_content=InitialWaterContent(value=["FC"]),
+            field_management=FieldMngt(bunds=True, z_bund=0.20),
+        )
+    ]
+
+
+def _potato() -> List[dict]:
+    return [
+        dict(
+            sim_start_time="1976/01/01",
+            sim_end_time="1985/12/31",
+            weather_df=prepare_weather(get_filepath("brussels_climate.txt")),
+            soil=Soil("Loam"),
+            crop=Crop("PotatoLocalGDD", planting_date="04/25"),
+            initial_water_content=InitialWaterContent(),
+        )
+    ]
+
+
+def _tunis_wheat_gw15() -> List[dict]:
+    return [
+        dict(
+            sim_start_time="1979/10/15",
+            sim_end_time="1985/05/30",
+            weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+            soil=Soil("SandyLoam"),
+            crop=Crop("Wheat", planting_date="10/15"),
+            initial_water_content=InitialWaterContent(value=["FC"]),
+            groundwater=GroundWater(water_table="Y", dates=["1979/10/15"], values=[1.5]),
+        )
+    ]
+
+
+def _long_run() -> List[dict]:
+    return [
+        dict(
+            sim_start_time="1979/10/01",
+            sim_end_time="2002/05/30",
+            weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+            soil=Soil("SandyLoam"),
+            crop=Crop("Wheat", planting_date="10/01"),
+            initial_water_content=InitialWaterContent(value=["FC"]),
+        )
+    ]
+
+
+def _cmip6_woolpit(quick: bool = False) -> List[dict]:
+    pattern = "*_historical_*.csv" if quick else "*.csv"
+    configs = []
+    for path in sorted(glob.glob(os.path.join(get_filepath("cmip6_woolpit"), "*", pattern))):
+        weather = pd.read_csv(path, index_col=0, parse_dates=["Date"])
+        co2 = weather.groupby(weather.Date.dt.year).co2ppm.mean().reset_index()
+        co2.columns = ["year", "ppm"]
+        first_year, last_year = weather.Date.dt.year.iloc[[0, -1]]
+        configs.append(
+            dict(
+                sim_start_time=f"{first_year}/10/15",
+                sim_end_time=f"{last_year}/08/31",
+                weather_df=weather[["MinTemp", "MaxTemp", "Precipitation", "ReferenceET", "Date"]],
+                soil=Soil("SandyLoam"),
+                crop=Crop("WheatGDD", planting_date="10/15", harvest_date="08/31"),
+                initial_water_content=InitialWaterContent(value=["FC"]),
+                co2_concentration=CO2(co2_data=co2),
+            )
+        )
+    return configs
+
+
+def _comparison_cases() -> Dict[str, dict]:
+    tunis = prepare_weather(get_filepath("tunis_climate.txt"))
+    iwc = InitialWaterContent("Num", "Depth", [0.3, 0.9], [0.3, 0.15])
+    wheat = Crop("WheatGDD", planting_date="10/15")
+    paddy_management = FieldMngt(bunds=True, z_bund=0.2)
+    return {
+        "tunis_test_1": dict(
+            sim_start_time="1979/10/15",
+            sim_end_time="2002/05/30",
+            weather_df=tunis,
+            soil=Soil("ac_TunisLocal"),
+            crop=wheat,
+            initial_water_content=iwc,
+        ),
+        "tunis_test_1_SandyLoam": dict(
+            sim_start_time="1979/01/01",
+            sim_end_time="2002/05/30",
+            weather_df=tunis,
+            soil=Soil("SandyLoam"),
+            crop=wheat,
+            initial_water_content=iwc,
+        ),
+        "tunis_test_2_long": dict(
+            sim_start_time="1979/01/01",
+            sim_end_time="2002/05/31",
+            weather_df=tunis,
+            soil=Soil("SandyLoam"),
+            crop=Crop(
+                "WheatGDD",
+                planting_date="10/15",
+                Emergence=289,
+                MaxRooting=1322,
+                Senescence=2835,
+                Maturity=3390,
+                HIstart=2252,
+                Flowering=264,
+                YldForm=1073,
+                PlantPop=3_500_000,
+                CCx=0.9,
+                CDC=0.003888,
+                CGC=0.002734,
+            ),
+            initial_water_content=iwc,
+        ),
+        "tunis_test_3_30taw": dict(
+            sim_start_time="1979/01/01",
+            sim_end_time="2002/05/31",
+            weather_df=tunis,
+            soil=Soil("SandyLoam"),
+            crop=wheat,
+            initial_water_content=InitialWaterContent("Pct", "Layer", [1], [30]),
+        ),
+        "tunis_test_6": dict(
+            sim_start_time="1979/08/15",
+            sim_end_time="2001/07/30",
+            weather_df=tunis,
+            soil=Soil("SandyLoam"),
+            crop=Crop("WheatGDD", planting_date="12/01", harvest_date="07/30"),
+            initial_water_content=InitialWaterContent(value=["WP"]),
+            irrigation_management=IrrigationManagement(irrigation_method=4, net_irr=78.26),
+        ),
+        "paddyrice_hyderabad": dict(
+            sim_start_time="2000/01/01",
+            sim_end_time="2010/12/31",
+            weather_df=prepare_weather(get_filepath("hyderabad_climate.txt")),
+            soil=Soil("Paddy"),
+            crop=Crop("localpaddy", planting_date="08/01"),
+            initial_water_content=InitialWaterContent(depth_layer=[1, 2], value=["FC", "FC"]),
+            field_management=paddy_management,
+            fallow_field_management=paddy_management,
+        ),
+        "potato": dict(
+            sim_start_time="1976/01/01",
+            sim_end_time="2005/12/31",
+            weather_df=prepare_weather(get_filepath("brussels_climate.txt")),
+            soil=Soil("Loam"),
+            crop=Crop("PotatoLocalGDD", planting_date="04/25"),
+            initial_water_content=InitialWaterContent(),
+        ),
+    }
+
+
+SCENARIOS: Dict[str, Callable[..., List[dict]]] = {
+    "tunis_wheat": _tunis_wheat,
+    "paddy_bunds": _paddy_bunds,
+    "potato": _potato,
+    "tunis_wheat_gw15": _tunis_wheat_gw15,
+    "long_run": _long_run,
+    "cmip6_woolpit": _cmip6_woolpit,
+}
+
+
+def time_model(config: dict, backend: Optional[str] = None) -> Dict[str, float]:
+    """
+    Run one model and time its initialization, stepping and output conversion
+
+    Arguments:
+
+        config (dict): AquaCropModel arguments
+
+        backend (str): backend of the solution kernels
+
+    Returns:
+
+        timings (dict): seconds spent in each part, days and seasons simulated
+    """
+    model = AquaCropModel(**config, backend=backend)
+
+    start = time.perf_counter()
+    model._initialize()
+    init_time = time.perf_counter() - start
+
+    outputs = model._outputs
+    finish = outputs.finish
+    counters = {"days": 0, "output": 0.0}
+
+    def timed_finish(*args):
+        counters["days"] += 1
+        start_finish = time.perf_counter()
+        finish(*args)
+        counters["output"] += time.perf_counter() - start_finish
+
+    outputs.finish = timed_finish
+    start = time.perf_counter()
+    model.run_model(till_termination=True, initialize_model=False)
+    run_time = time.perf_counter() - start
+
+    return {
+        "init": init_time,
+        "step": run_time - counters["output"],
+        "output": counters["output"],
+        "days": counters["days"],
+        "seasons": len(model.get_simulation_results()),
+    }
+
+
+def run_benchmarks(
+    names: Optional[Sequence[str]] = None,
+    repeat: int = 1,
+    backend: Optional[str] = None,
+    quick: bool = False,
+    verbose: bool = False,
+) -> dict:
+    """
+    Time the bundled scenarios
+
+    Arguments:
+
+        names: scenarios to run, all of SCENARIOS if None
+
+        repeat (int): number of times each scenario is run, the fastest run is kept
+
+        backend (str): backend of the solution kernels
+
+        quick (bool): only run the historical period of the CMIP6 sets
+
+        verbose (bool): print each scenario as it finishes
+
+    Returns:
+
+        results (dict): metadata and timings of each scenario
+    """
+    names = list(SCENARIOS) if names is None else list(names)
+    for name in names:
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}', choose from {list(SCENARIOS)}")
+    if repeat < 1:
+        raise ValueError("repeat must be equal to or greater than 1.")
+
+    results = {"metadata": _metadata(backend), "scenarios": {}}
+    for name in names:
+        if name == "cmip6_woolpit":
+            configs = SCENARIOS[name](quick=quick)
+        else:
+            configs = SCENARIOS[name]()
+
+        best = None
+        for _ in range(repeat):
+            runs = [time_model(config, backend) for config in configs]
+            total = {key: sum(run[key] for run in runs) for key in runs[0]}
+            if best is None or _total_time(total) < _total_time(best):
+                best = total
+
+        best["runs"] = len(configs)
+        best["total"] = _total_time(best)
+        best["us_per_day"] = 1e6 * best["step"] / best["days"]
+        best["days_per_s"] = best["days"] / best["step"]
+        best["seasons_per_s"] = best["seasons"] / best["total"]
+        results["scenarios"][name] = best
+        if verbose:
+            print(_format_row(name, best), flush=True)
+
+    return results
+
+
+# statements timed by import_times, each in a fresh interpreter
+IMPORTS = {
+    "aquacrop": "import aquacrop",
+    "Crop": "from aquacrop import Crop",
+    "AquaCropModel": "from aquacrop import AquaCropModel",
+    "public_api": "from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent, "
+    + "IrrigationManagement, FieldMngt, GroundWater, CO2; from aquacrop.utils import prepare_weather",
+}
+
+
+def import_times(names: Optional[Sequence[str]] = None, repeat: int = 5, verbose: bool = False) -> dict:
+    """
+    Time the import of the package, each import in a fresh interpreter
+
+    Arguments:
+
+        names: statements of IMPORTS to time, all if None
+
+        repeat (int): number of interpreters started for each statement, the fastest is kept
+
+        verbose (bool): print each statement as it finishes
+
+    Returns:
+
+        results (dict): metadata and import time (s) of each statement
+    """
+    names = list(IMPORTS) if names is None else list(names)
+    for name in names:
+        if name not in IMPORTS:
+            raise ValueError(f"Unknown import '{name}', choose from {list(IMPORTS)}")
+    if repeat < 1:
+        raise ValueError("repeat must be equal to or greater than 1.")
+
+    results = {"metadata": _metadata(None), "imports": {}}
+    for name in names:
+        code = (
+            "import time; start = time.perf_counter(); "
+            + IMPORTS[name]
+            + "; print(time.perf_counter() - start)"
+        )
+        best = None
+        for _ in range(repeat):
+            seconds = float(
+                subprocess.run(
+                    [sys.executable, "-c", code], capture_output=True, text=True, check=True
+                ).stdout
+            )
+            if best is None or seconds < best:
+                best = seconds
+
+        results["imports"][name] = best
+        if verbose:
+            print(f"{name:<18}{1000 * best:>10.1f}", flush=True)
+
+    return results
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1) -> List[str]:
+    """
+    Compare two benchmark results
+
+    Arguments:
+
+        baseline (dict): results of the reference commit
+
+        current (dict): results to check
+
+        threshold (float): relative slowdown of the total time reported as a regression
+
+    Returns:
+
+        regressions (list): names of the scenarios slower than the threshold
+    """
+    regressions = []
+    print(f"{'scenario':<18}{'baseline s':>12}{'current s':>12}{'ratio':>8}")
+    for name, result in current["scenarios"].items():
+        if name not in baseline["scenarios"]:
+            continue
+        before = baseline["scenarios"][name]["total"]
+        ratio = result["total"] / before
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<18}{before:>12.3f}{result['total']:>12.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def evaporation_accuracy(
+    tolerances: Sequence[float] = (0.001, 0.01),
+    names: Optional[Sequence[str]] = None,
+    backend: Optional[str] = None,
+) -> "pd.DataFrame":
+    """
+    Compare adaptive soil evaporation sub-steps with the fixed 20 sub-steps
+
+    Each case of the Windows/MATLAB comparison is run with fixed sub-steps
+    (the reference) and with every tolerance.
+
+    Arguments:
+
+        tolerances: evap_tolerance values (mm/day) to check
+
+        names: comparison cases to run, all if None
+
+        backend (str): backend of the solution kernels
+
+    Returns:
+
+        report (DataFrame): for each case and tolerance (NaN for the fixed
+            sub-steps), the run time, the largest change of seasonal yield
+            (tonne/ha) and soil evaporation (mm) from the fixed sub-steps, and
+            the mean absolute yield error from the Windows and MATLAB outputs
+    """
+    cases = _comparison_cases()
+    names = list(cases) if names is None else list(names)
+    rows = []
+    for name in names:
+        windows, matlab = _reference_yields(name)
+        reference = None
+        for tolerance in [None] + list(tolerances):
+            model = AquaCropModel(**cases[name], backend=backend, evap_tolerance=tolerance)
+            start = time.perf_counter()
+            model.run_model(till_termination=True)
+            run_time = time.perf_counter() - start
+
+            yields = model.get_simulation_results()["Dry yield (tonne/ha)"].to_numpy(dtype=float)
+            flux = model.get_water_flux()
+            evaporation = flux.groupby("season_counter").Es.sum().to_numpy()
+            if reference is None:
+                reference = (yields, evaporation)
+
+            rows.append(
+                {
+                    "case": name,
+                    "evap_tolerance": np.nan if tolerance is None else tolerance,
+                    "time (s)": run_time,
+                    "max yield change": np.abs(yields - reference[0]).max(),
+                    "max seasonal Es change (mm)": np.abs(evaporation - reference[1]).max(),
+                    "yield MAE windows": _mean_absolute_error(yields, windows),
+                    "yield MAE matlab": _mean_absolute_error(yields, matlab),
+                }
+            )
+
+    return pd.DataFrame(rows)
+
+
+def _reference_yields(name: str):
+    """
+    Seasonal yields of a comparison case from the Windows and MATLAB outputs
+    """
+    windows = pd.read_csv(
+        get_filepath(name + "_windows.OUT"),
+        skiprows=5,
+        sep=r"\s+",
+        header=None,
+        encoding="ISO-8859-1",
+    )
+    matlab = pd.read_csv(get_filepath(name + "_matlab.txt"), sep=r"\s+", header=None)
+    # Yield is the 33rd column of the Windows output, the 7th of the MATLAB one
+    return windows[32].to_numpy(dtype=float), matlab[6].to_numpy(dtype=float)
+
+
+def _mean_absolute_error(values, reference) -> float:
+    n_seasons = min(len(values), len(reference))
+    return float(np.abs(values[:n_seasons] - reference[:n_seasons]).mean())
+
+
+def _total_time(timings: Dict[str, float]) -> float:
+    return timings["init"] + timings["step"] + timings["output"]
+
+
+def _format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<18}{result['runs']:>5}{result['seasons']:>8}{result['days']:>8}"
+        + f"{result['init']:>9.3f}{result['step']:>9.3f}{result['output']:>9.3f}"
+        + f"{result['us_per_day']:>10.1f}{result['seasons_per_s']:>10.2f}"
+    )
+
+
+def _metadata(backend: Optional[str]) -> dict:
+    # pylint: disable=import-outside-toplevel
+    from .solution.backend import resolve_backend
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "version": RESULTS_VERSION,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "backend": resolve_backend(backend),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point, returns 1 if a regression was found
+    """
+    parser = argparse.ArgumentParser(prog="python -m aquacrop.bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), help="scenarios to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario, the fastest is kept")
+    parser.add_argument("--backend", choices=["python", "numba"], help="backend of the solution kernels")
+    parser.add_argument("--quick", action="store_true", help="only run the historical CMIP6 period")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as a regression")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    parser.add_argument(
+        "--import-time", action="store_true", help="time the import of the package and exit"
+    )
+    parser.add_argument(
+        "--evap-accuracy",
+        action="store_true",
+        help="compare adaptive soil evaporation sub-steps with the fixed sub-steps and exit",
+    )
+    parser.add_argument(
+        "--tolerances", nargs="+", type=float, default=[0.001, 0.01], help="evap_tolerance values to compare"
+    )
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(SCENARIOS))
+        return 0
+
+    if args.import_time:
+        print(f"{'import':<18}{'ms':>10}")
+        results = import_times(repeat=max(args.repeat, 5), verbose=True)
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent=2)
+        return 0
+
+    if args.evap_accuracy:
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(evaporation_accuracy(args.tolerances, backend=args.backend).round(4).to_string(index=False))
+        return 0
+
+    print(
+        f"{'scenario':<18}{'runs':>5}{'seasons':>8}{'days':>8}{'init s':>9}{'step s':>9}"
+        + f"{'output s':>9}{'us/day':>10}{'season/s':>10}"
+    )
+    results = run_benchmarks(args.scenarios, args.repeat, args.backend, args.quick, verbose=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        print()
+        if compare_results(baseline, results, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
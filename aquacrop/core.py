@@ -1,21 +1,25 @@
 """
 This file contains the AquacropModel class that runs the simulation.
 """
+import copy
 import time
 import datetime
 import os
 import logging
+import pickle
 import warnings
-from typing import Dict, Union, Optional, Tuple, TYPE_CHECKING
+from typing import Dict, List, Union, Optional, Sequence, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
     from pandas import DataFrame
     from aquacrop.entities.clockStruct import ClockStruct
     from aquacrop.entities.co2 import CO2
     from aquacrop.entities.crop import Crop
     from aquacrop.entities.initParamVariables import InitialCondition
     from aquacrop.entities.inititalWaterContent import InitialWaterContent
+    from aquacrop.entities.outputSink import OutputSink
     from aquacrop.entities.paramStruct import ParamStruct
     from aquacrop.entities.soil import Soil
 
@@ -26,7 +30,10 @@ from .entities.fieldManagement import FieldMngt
 from .entities.groundWater import GroundWater
 from .entities.irrigationManagement import IrrigationManagement
 from .entities.output import Output
+from .entities.outputSink import resolve_output_sink
 from .initialize.compute_variables import compute_variables
+from .initialize.compute_gdd_cache import GDDCache
+from .initialize.compute_weather_arrays import compute_weather_arrays
 from .initialize.create_soil_profile import create_soil_profile
 from .initialize.read_clocks_parameters import read_clock_parameters
 from .initialize.read_field_managment import read_field_management
@@ -38,7 +45,9 @@ from .initialize.read_weather_inputs import read_weather_inputs
 from .timestep.check_if_model_is_finished import check_model_is_finished
 from .timestep.run_single_timestep import solution_single_time_step
 from .timestep.update_time import update_time
-from .timestep.outputs_when_model_is_finished import outputs_when_model_is_finished
+from .solution.backend import resolve_backend
+
+CHECKPOINT_VERSION = 1
 
 class AquaCropModel:
     """
@@ -74,6 +83,29 @@ class AquaCropModel:
         off_season: (True) simulate off-season or (False) skip ahead to start of 
                     next growing season
 
+        backend: "python" or "numba" to JIT-compile the hot solution kernels.
+                    Defaults to the AQUACROP_BACKEND environment variable, or
+                    "python" if it is not set. Falls back to "python" when
+                    numba is not installed.
+
+        output_sink: Destination of the daily outputs (water_flux, water_storage,
+                    crop_growth), see aquacrop.entities.outputSink. Defaults to
+                    keeping them in memory.
+
+        output_level: "daily" (default) keeps the daily outputs, "final_only"
+                    only keeps final_stats, "seasonal_aggregates" keeps
+                    final_stats and the growing season totals of the water
+                    fluxes (get_seasonal_aggregates). A dict such as
+                    {"water_flux": ["dap", "Tr"]} keeps only these daily
+                    tables and columns in memory. Daily rows that are not kept
+                    are never built.
+
+        evap_tolerance: Error tolerance (mm/day) of the stage 2 soil evaporation.
+                    None (default) solves every day in 20 fixed sub-steps. A
+                    positive value merges sub-steps while the evaporation
+                    reduction coefficient barely changes, see
+                    aquacrop.bench --evap-accuracy for the effect on the results.
+
 
     """
 
@@ -88,7 +120,8 @@ class AquaCropModel:
     _param_struct: "ParamStruct"
     _init_cond: "InitialCondition"
     _outputs: "Output"
-    _weather: "DataFrame"
+    _weather: "ndarray"
+    _weather_days: "ndarray"
 
     def __init__(
         self,
@@ -104,6 +137,10 @@ class AquaCropModel:
         groundwater: Optional["GroundWater"] = None,
         co2_concentration: Optional["CO2"] = None,
         off_season: bool=False,
+        backend: Optional[str] = None,
+        output_sink: Optional["OutputSink"] = None,
+        output_level: Optional[Union[str, Dict[str, List[str]]]] = None,
+        evap_tolerance: Optional[float] = None,
     ) -> None:
 
         self.sim_start_time = sim_start_time
@@ -114,6 +151,14 @@ class AquaCropModel:
         self.initial_water_content = initial_water_content   
         self.co2_concentration = co2_concentration
         self.off_season = off_season
+        self.backend = resolve_backend(backend)
+        self.output_sink = output_sink
+        self.output_level = output_level
+        # check the output options before the model is run
+        resolve_output_sink(output_level, output_sink)
+        if evap_tolerance is not None and evap_tolerance < 0:
+            raise ValueError("evap_tolerance must be equal to or greater than 0.")
+        self.evap_tolerance = evap_tolerance
       
         self.irrigation_management = irrigation_management
         self.field_management = field_management
@@ -187,22 +232,37 @@ class AquaCropModel:
 
         self._weather_df = value
 
-    def _initialize(self) -> None:
+    def _initialize(self, gdd_cache: Optional["GDDCache"] = None) -> None:
         """
         Initialise all model variables
+
+        Arguments:
+
+            gdd_cache: growing degree days (and crop calendars) of the same \
+                weather and simulation period, shared with other models, \
+                built for this model if None
         """
 
         # Initialize ClockStruct object
         self._clock_struct = read_clock_parameters(
             self.sim_start_time, self.sim_end_time, self.off_season
         )
+        if self.evap_tolerance is not None:
+            self._clock_struct.evap_tolerance = self.evap_tolerance
 
         # get _weather data
         self.weather_df = read_weather_inputs(self._clock_struct, self.weather_df)
 
+        # numeric weather matrix and day index read by the time-step
+        self._weather, self._weather_days = compute_weather_arrays(self.weather_df)
+
         # read model params
         self._clock_struct, self._param_struct = read_model_parameters(
-            self._clock_struct, self.soil, self.crop, self.weather_df
+            self._clock_struct,
+            self.soil,
+            self.crop,
+            self.weather_df,
+            gdd_cache if gdd_cache is not None else GDDCache(self._weather, self._weather_days),
         )
 
         # read irrigation management
@@ -234,10 +294,19 @@ class AquaCropModel:
         self._param_struct = create_soil_profile(self._param_struct)
 
         # Outputs results (water_flux, crop_growth, final_stats)
-        self._outputs = Output(self._clock_struct.time_span, self._init_cond.th)
+        self._outputs = self._create_outputs()
 
-        # save model _weather to _init_cond
-        self._weather = self.weather_df.values
+    def _create_outputs(self) -> "Output":
+        """
+        Create the empty outputs of an initialized model
+        """
+        return Output(
+            self._clock_struct.time_span,
+            self._init_cond.th,
+            resolve_output_sink(self.output_level, self.output_sink),
+            n_seasons=self._clock_struct.n_seasons,
+            seasonal=self.output_level == "seasonal_aggregates",
+        )
 
     def run_model(
         self,
@@ -268,6 +337,9 @@ class AquaCropModel:
         if initialize_model:
             self._initialize()
 
+        # the kernels of this model run on its own backend
+        self._param_struct.backend = self.backend
+
         if till_termination:
             self.__start_model_execution = time.time()
             while self._clock_struct.model_is_finished is False:
@@ -333,8 +405,8 @@ class AquaCropModel:
         # Check model termination
         clock_struct = self._clock_struct
         clock_struct.model_is_finished = check_model_is_finished(
-            self._clock_struct.step_end_time,
-            self._clock_struct.simulation_end_date,
+            self._clock_struct.time_step_counter + 1,
+            self._clock_struct.n_steps - 1,
             self._clock_struct.model_is_finished,
             self._clock_struct.season_counter,
             self._clock_struct.n_seasons,
@@ -343,27 +415,178 @@ class AquaCropModel:
 
         # Update time step
         clock_struct, _init_cond, param_struct = update_time(
-            clock_struct, new_cond, param_struct, self._weather, self.crop
+            clock_struct,
+            new_cond,
+            param_struct,
+            self.crop,
         )
 
         # Create  _outputsdataframes when model is finished
-        final_water_flux_growth_outputs = outputs_when_model_is_finished(
-            clock_struct.model_is_finished,
-            outputs.water_flux,
-            outputs.water_storage,
-            outputs.crop_growth,
-            self.__steps_are_finished,
-        )
-
-        if final_water_flux_growth_outputs is not False:
-            (
-                outputs.water_flux,
-                outputs.water_storage,
-                outputs.crop_growth,
-            ) = final_water_flux_growth_outputs
+        outputs.finish(clock_struct.model_is_finished, self.__steps_are_finished)
 
         return clock_struct, _init_cond, param_struct, outputs
 
+    def checkpoint(self, path: Optional[Union[str, "os.PathLike"]] = None) -> Optional[bytes]:
+        """
+        Save the state of a running simulation.
+
+        The blob holds everything the time-step reads and writes (clock,
+        parameters, initial conditions, outputs and weather arrays), so a
+        model restored from it carries on exactly where this one stopped.
+
+        Arguments:
+
+            path: file to write the checkpoint to, if None the checkpoint is returned
+
+        Returns:
+            checkpoint as bytes, or None if it was written to path
+        """
+        if not self.__has_model_executed:
+            raise ValueError(
+                "You cannot checkpoint the model without running it. "
+                + "Please execute the run_model() method."
+            )
+
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "clock_struct": self._clock_struct,
+            "param_struct": self._param_struct,
+            "init_cond": self._init_cond,
+            "outputs": self._outputs,
+            "weather": self._weather,
+            "weather_days": self._weather_days,
+            "steps_are_finished": self.__steps_are_finished,
+            "has_model_finished": self.__has_model_finished,
+        }
+        blob = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if path is None:
+            return blob
+        with open(path, "wb") as file:
+            file.write(blob)
+        return None
+
+    def restore(self, checkpoint: Union[bytes, str, "os.PathLike"]) -> None:
+        """
+        Load the state saved by checkpoint() into this model.
+
+        The model is not initialized again: continue the simulation with
+        `run_model(..., initialize_model=False)`.
+
+        A model that streams its daily outputs (CSVSink, ParquetSink,
+        CallbackSink...) writes them to its own output_sink, which receives
+        the days simulated after the restore, never to the sink of the
+        model that was checkpointed. A checkpoint of a model that streams
+        its daily outputs cannot be restored into a model that keeps them
+        in memory, as the days before the checkpoint are not in it.
+
+        Arguments:
+
+            checkpoint: bytes returned by checkpoint(), or the file it was written to
+        """
+        if not isinstance(checkpoint, (bytes, bytearray)):
+            with open(checkpoint, "rb") as file:
+                checkpoint = file.read()
+
+        state = pickle.loads(checkpoint)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Checkpoint version {state.get('version')} is not supported "
+                + f"(expected {CHECKPOINT_VERSION})."
+            )
+
+        outputs = state["outputs"]
+        sink = resolve_output_sink(self.output_level, self.output_sink)
+        if not sink.in_memory:
+            outputs = outputs.copy(sink)
+        elif not outputs.sink.in_memory and len(outputs.sink.tables) > 0:
+            raise ValueError(
+                "The checkpoint of a model that streams its daily outputs can only "
+                + "be restored into a model with its own output_sink."
+            )
+
+        self._clock_struct = state["clock_struct"]
+        self._param_struct = state["param_struct"]
+        self._init_cond = state["init_cond"]
+        self._outputs = outputs
+        self._weather = state["weather"]
+        self._weather_days = state["weather_days"]
+        self.__steps_are_finished = state["steps_are_finished"]
+        self.__has_model_finished = state["has_model_finished"]
+        self.__has_model_executed = True
+
+    def fork(
+        self, n: int = 1, output_sinks: Optional[Sequence["OutputSink"]] = None
+    ) -> List["AquaCropModel"]:
+        """
+        Clone a running simulation into independent branches.
+
+        Only the state that changes from one day to the next is copied: the
+        initial conditions, the clock counters, the outputs, the CO2
+        concentration (updated at the start of each season) and the
+        irrigation management (so each branch can be given its own
+        `_param_struct.IrrMngt.depth`). The soil profile, crop parameters,
+        weather arrays and the rest of the parameters are shared with this
+        model. Continue each branch with
+        `run_model(..., initialize_model=False)`.
+
+        A model that has been initialized (`_initialize()`) but not run yet
+        can be forked too, so that runs differing only by their irrigation
+        management share the initialization.
+
+        A model that streams its daily outputs (CSVSink, ParquetSink,
+        CallbackSink...) cannot share its sink with the branches: each
+        branch needs its own sink, given by output_sinks, which receives
+        the days simulated by that branch after the fork.
+
+        Arguments:
+
+            n: number of branches
+
+            output_sinks: one sink per branch, not kept in memory, None to \
+                share the model's sink (only if it is kept in memory or \
+                writes nothing)
+
+        Returns:
+            list of n models
+        """
+        if not self.__has_model_executed and "_init_cond" not in self.__dict__:
+            raise ValueError(
+                "You cannot fork the model without running it. "
+                + "Please execute the run_model() method."
+            )
+        if n < 1:
+            raise ValueError("n must be equal to or greater than 1.")
+        sink = self._outputs.sink
+        if output_sinks is None:
+            if not sink.in_memory and len(sink.tables) > 0:
+                raise ValueError(
+                    "The branches cannot share the model's output_sink, "
+                    + "give each one its own sink with output_sinks."
+                )
+            output_sinks = [None] * n
+        elif len(output_sinks) != n or len({id(s) for s in output_sinks}) != n:
+            raise ValueError("output_sinks must contain a different sink for each branch.")
+
+        forks = []
+        for branch_sink in output_sinks:
+            model = copy.copy(self)
+            model._clock_struct = copy.copy(self._clock_struct)
+            model._init_cond = self._init_cond.copy()
+            model._outputs = self._outputs.copy(branch_sink)
+            if branch_sink is not None:
+                model.output_sink = branch_sink
+            model._param_struct = copy.copy(self._param_struct)
+            model._param_struct.Seasonal_Crops = self._param_struct.Seasonal_Crops.copy()
+            model._param_struct.CO2 = copy.copy(self._param_struct.CO2)
+            model._param_struct.IrrMngt = copy.deepcopy(self._param_struct.IrrMngt)
+            model._param_struct.FallowIrrMngt = copy.deepcopy(
+                self._param_struct.FallowIrrMngt
+            )
+            forks.append(model)
+
+        return forks
+
     def get_simulation_results(self):
         """
         Return all the simulation results
@@ -415,6 +638,18 @@ class AquaCropModel:
                 + "Please execute the run_model() method."
             )
 
+    def get_seasonal_aggregates(self):
+        """
+        Return growing season totals of the water fluxes (output_level="seasonal_aggregates")
+        """
+        if self.__has_model_executed:
+            return self._outputs.seasonal_aggregates
+        else:
+            raise ValueError(
+                "You cannot get results without running the model. "
+                + "Please execute the run_model() method."
+            )
+
     def get_additional_information(self) -> Dict[str, Union[bool, float]]:
         """
         Additional model information.
@@ -477,5 +712,7 @@ def _sim_date_format_is_correct(date: str) -> bool:
 def _weather_data_current_timestep(_weather, time_step_counter):
     """
     Extract _weather data for current timestep
+
+    Returns MinTemp, MaxTemp, Precipitation and ReferenceET as python floats
     """
-    return _weather[time_step_counter]
+    return _weather[time_step_counter].tolist()
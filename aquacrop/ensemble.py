@@ -0,0 +1,303 @@
+"""
+This file contains run_ensemble, which runs many model scenarios on a pool
+of worker processes.
+"""
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from pandas import DataFrame
+
+OUTPUTS = ("final_stats", "water_flux", "water_storage", "crop_growth", "seasonal_aggregates")
+
+# weather dataframes rebuilt from shared memory, one entry per worker process
+_worker_weather: Dict[int, "DataFrame"] = {}
+_worker_blocks: List[shared_memory.SharedMemory] = []
+
+
+class EnsembleResult:
+    """
+    Results of one scenario of an ensemble.
+
+    Attributes:
+
+        key: name of the scenario (its index if the configs were given as a list)
+
+        final_stats (DataFrame): final stats of the scenario
+
+        water_flux (DataFrame): daily water flux, if requested
+
+        water_storage (DataFrame): daily water storage, if requested
+
+        crop_growth (DataFrame): daily crop growth, if requested
+
+        seasonal_aggregates (DataFrame): growing season totals, if requested
+
+        error (str): traceback of the exception raised by the scenario, None if it succeeded
+
+    """
+
+    def __init__(self, key, outputs: Optional[Dict[str, "DataFrame"]] = None, error: Optional[str] = None):
+        self.key = key
+        self.error = error
+        outputs = outputs or {}
+        for name in OUTPUTS:
+            setattr(self, name, outputs.get(name))
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        True if the scenario ran without raising an exception
+        """
+        return self.error is None
+
+    def __repr__(self):
+        status = "succeeded" if self.succeeded else "failed"
+        return f"EnsembleResult(key={self.key!r}, {status})"
+
+
+def run_ensemble(
+    configs: Union[Sequence[Dict[str, Any]], Mapping[Any, Dict[str, Any]]],
+    workers: Optional[int] = None,
+    outputs: Sequence[str] = OUTPUTS,
+    mp_context=None,
+) -> Iterator[EnsembleResult]:
+    """
+    Run many scenarios on a pool of worker processes.
+
+    Each config is a dict of `AquaCropModel` arguments and is run with
+    `run_model(till_termination=True)`. Weather dataframes are copied once
+    into shared memory and attached by every worker, so scenarios that use
+    the same weather dataframe object do not pickle it again for each task.
+    Results are yielded as soon as each scenario finishes (not in the order
+    of the configs). A scenario that raises an exception, or that kills its
+    worker process, gives a failed result and does not stop the others.
+
+    Arguments:
+
+        configs: list of dicts of AquaCropModel arguments, or dict mapping \
+            a scenario name to such a dict
+
+        workers (int): number of worker processes, number of CPUs if None
+
+        outputs: names of the outputs returned for each scenario, \
+            any of "final_stats", "water_flux", "water_storage", "crop_growth", \
+            "seasonal_aggregates"
+
+        mp_context: multiprocessing context used to start the workers
+
+    Returns:
+
+        iterator of EnsembleResult, in order of completion
+    """
+    if isinstance(configs, Mapping):
+        items = list(configs.items())
+    else:
+        items = list(enumerate(configs))
+
+    for name in outputs:
+        if name not in OUTPUTS:
+            raise ValueError(f"outputs must be in {OUTPUTS}, not '{name}'")
+
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be equal to or greater than 1.")
+
+    return _run_ensemble(items, workers, tuple(outputs), mp_context)
+
+
+def _run_ensemble(
+    items: List[Tuple[Any, Dict[str, Any]]],
+    workers: Optional[int],
+    outputs: Tuple[str, ...],
+    mp_context,
+) -> Iterator[EnsembleResult]:
+    """
+    Generator behind run_ensemble, owns the shared memory and the pool
+    """
+    blocks = []
+    try:
+        specs, tasks = _share_weather(items, blocks)
+        broken = yield from _run_pool(tasks, specs, workers, outputs, mp_context)
+        # a worker died and took the scenarios it shared the pool with down
+        # with it: re-run these one at a time so only the faulty one fails
+        while broken:
+            broken = yield from _run_pool(broken, specs, 1, outputs, mp_context, serial=True)
+            if broken:
+                yield EnsembleResult(broken.pop(0)[0], error="Worker process terminated abruptly.")
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _run_pool(tasks, specs, workers, outputs, mp_context, serial=False):
+    """
+    Run tasks on a new pool and yield their results.
+
+    Returns the tasks that could not finish because the pool broke. With
+    serial=True tasks are submitted one by one, so that the first task
+    returned is the one that broke the pool.
+    """
+    tasks = list(tasks)
+    broken = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(specs,),
+    ) as pool:
+        futures = {}
+        try:
+            while tasks or futures:
+                if not serial or not futures:
+                    submit = tasks[:1] if serial else tasks[:]
+                    del tasks[: len(submit)]
+                    for task in submit:
+                        futures[pool.submit(_run_scenario, task, outputs)] = task
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken.append(task)
+                        continue
+                    yield result
+                if broken:
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+
+    return broken + list(futures.values()) + tasks
+
+
+def _share_weather(
+    items: List[Tuple[Any, Dict[str, Any]]],
+    blocks: List[shared_memory.SharedMemory],
+) -> Tuple[Dict[int, tuple], List[Tuple[Any, Dict[str, Any]]]]:
+    """
+    Copy every distinct weather dataframe into shared memory.
+
+    Arguments:
+
+        items: (key, config) of each scenario
+
+        blocks: list the shared memory blocks are appended to
+
+    Returns:
+
+        specs: description of each shared weather, by weather id
+
+        tasks: (key, config) of each scenario, with weather_df replaced by its id \
+            (dataframes with non-numeric columns are left to be pickled)
+    """
+    specs = {}
+    tasks = []
+    for key, config in items:
+        config = dict(config)
+        weather_df = config.get("weather_df")
+        if isinstance(weather_df, pd.DataFrame) and _is_shareable(weather_df):
+            weather_id = id(weather_df)
+            if weather_id not in specs:
+                specs[weather_id] = _share_dataframe(weather_df, blocks)
+            config["weather_df"] = _SharedWeather(weather_id)
+        tasks.append((key, config))
+
+    return specs, tasks
+
+
+def _is_shareable(weather_df: "DataFrame") -> bool:
+    """
+    True if every column of the dataframe is numeric or datetime
+    """
+    return all(
+        pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype)
+        for dtype in weather_df.dtypes
+    )
+
+
+def _share_dataframe(weather_df: "DataFrame", blocks: List[shared_memory.SharedMemory]) -> tuple:
+    """
+    Copy the columns of a weather dataframe into one shared memory block.
+
+    Datetime columns are stored as int64 nanoseconds, every other column as float64.
+
+    Returns:
+
+        (block name, number of rows, column names, datetime columns)
+    """
+    columns = list(weather_df.columns)
+    dates = [
+        name for name in columns if pd.api.types.is_datetime64_any_dtype(weather_df[name])
+    ]
+    n_rows = len(weather_df)
+
+    block = shared_memory.SharedMemory(create=True, size=max(1, 8 * n_rows * len(columns)))
+    blocks.append(block)
+    data = np.ndarray((len(columns), n_rows), dtype=np.float64, buffer=block.buf)
+    for i, name in enumerate(columns):
+        if name in dates:
+            data[i].view(np.int64)[:] = weather_df[name].values.astype("datetime64[ns]").view(np.int64)
+        else:
+            data[i] = weather_df[name].to_numpy(dtype=np.float64)
+
+    return block.name, n_rows, columns, dates
+
+
+class _SharedWeather:
+    """
+    Placeholder for a weather dataframe held in shared memory
+    """
+
+    def __init__(self, weather_id: int):
+        self.weather_id = weather_id
+
+
+def _init_worker(specs: Dict[int, tuple]) -> None:
+    """
+    Attach the shared weather in a worker process
+    """
+    _worker_weather.clear()
+    for weather_id, (name, n_rows, columns, dates) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(block)
+        data = np.ndarray((len(columns), n_rows), dtype=np.float64, buffer=block.buf)
+        data.flags.writeable = False
+        _worker_weather[weather_id] = pd.DataFrame(
+            {
+                column: (
+                    pd.to_datetime(data[i].view(np.int64).view("datetime64[ns]"))
+                    if column in dates
+                    else data[i]
+                )
+                for i, column in enumerate(columns)
+            }
+        )
+
+
+def _run_scenario(task: Tuple[Any, Dict[str, Any]], outputs: Tuple[str, ...]) -> EnsembleResult:
+    """
+    Run one scenario in a worker process
+    """
+    # pylint: disable=import-outside-toplevel
+    from .core import AquaCropModel
+
+    key, config = task
+    try:
+        if isinstance(config.get("weather_df"), _SharedWeather):
+            config = dict(config, weather_df=_worker_weather[config["weather_df"].weather_id])
+        model = AquaCropModel(**config)
+        model.run_model(till_termination=True)
+        results = {name: getattr(model._outputs, name) for name in outputs}
+    except Exception:  # pylint: disable=broad-except
+        return EnsembleResult(key, error=traceback.format_exc())
+
+    return EnsembleResult(key, results)
@@ -2,6 +2,7 @@
 Contains model information regarding dates and step times etc.
 
 """
+import numpy as np
 
 
 class ClockStruct:
@@ -10,7 +11,7 @@ class ClockStruct:
 
     Attributes:
 
-        time_step_counter (int): Keeps track of current timestep
+        time_step_counter (int): Keeps track of current timestep (day index from the start of simulation)
 
         model_is_finished (Bool): False unless model has finished
 
@@ -24,18 +25,24 @@ class ClockStruct:
 
         time_span (np.array): all dates that lie within the start and end dates of simulation
 
-        step_start_time (np.Datetime64): Date at start of timestep
+        step_start_time (pd.Timestamp): Date at start of timestep (read-only, from time_step_counter)
 
-        step_end_time (np.Datetime64): Date at end of timestep
+        step_end_time (pd.Timestamp): Date at end of timestep (read-only, from time_step_counter)
 
         evap_time_steps (int): Number of time-steps (per day) for soil evaporation calculation
 
+        evap_tolerance (float): Error tolerance (mm) of adaptive soil evaporation time-steps, 0 for fixed time-steps
+
         sim_off_season (str): 'Y' if you want to simulate the off season,'N' otherwise
 
         planting_dates (list-like): list of planting dates in datetime format
 
         harvest_dates (list-like): list of harvest dates in datetime format
 
+        planting_steps (list): day index (from the start of simulation) of each planting date
+
+        harvest_steps (list): day index (from the start of simulation) of each harvest date
+
         n_seasons (int): Total number of seasons to be simulated
 
         season_counter (int): counter to keep track of which season we are currenlty simulating
@@ -54,10 +61,10 @@ class ClockStruct:
         self.time_span = (
             0  # all dates that lie within the start and end dates of simulation
         )
-        self.step_start_time = 0  # Date at start of timestep
-        self.step_end_time = 0  # Date at start of timestep
         # Number of time-steps (per day) for soil evaporation calculation
         self.evap_time_steps = 20
+        # Error tolerance (mm) of adaptive soil evaporation time-steps (0 = fixed)
+        self.evap_tolerance = 0
         self.sim_off_season = (
             "N"  # 'Yes' if you want to simulate the off season, 'N' otherwise
         )
@@ -65,5 +72,21 @@ class ClockStruct:
             []
         )  # list of crop planting dates during simulation
         self.harvest_dates = []  # list of crop planting dates during simulation
+        self.planting_steps = []  # day index of each planting date
+        self.harvest_steps = []  # day index of each harvest date
         self.n_seasons = 0  # total number of seasons (plant and harvest)
         self.season_counter = -1  # running counter of seasons
+
+    @property
+    def step_start_time(self):
+        """
+        Date at start of timestep
+        """
+        return self.time_span[0] + np.timedelta64(self.time_step_counter, "D")
+
+    @property
+    def step_end_time(self):
+        """
+        Date at end of timestep
+        """
+        return self.time_span[0] + np.timedelta64(self.time_step_counter + 1, "D")
@@ -1,4 +1,5 @@
 import pandas as pd
+from functools import lru_cache
 from os.path import dirname, abspath
 
 acfp: str = dirname(dirname(abspath(__file__)))
@@ -18,6 +19,11 @@ class CO2(object):
 
         co2_data (DataFrame): CO2 timeseries (2 columns: 'year' and 'ppm')
 
+        co2_data_processed (numpy.ndarray): CO2 concentration of each simulated year \
+            (set when the model is initialized)
+
+        co2_data_years (numpy.ndarray): years of co2_data_processed
+
     """
 
     def __init__(
@@ -33,11 +39,20 @@ class CO2(object):
         if co2_data is not None:
             self.co2_data = co2_data
         else:
-            self.co2_data = pd.read_csv(
-                    f"{acfp}/data/MaunaLoaCO2.txt",
-                    header=1,
-                    sep='\s+',
-                    names=["year", "ppm"],
-    )
+            self.co2_data = _mauna_loa_co2().copy()
         self.co2_data_processed = None
+        self.co2_data_years = None
+
+
+@lru_cache(maxsize=None)
+def _mauna_loa_co2():
+    """
+    Read the default CO2 timeseries (once)
+    """
+    return pd.read_csv(
+        f"{acfp}/data/MaunaLoaCO2.txt",
+        header=1,
+        sep='\s+',
+        names=["year", "ppm"],
+    )
 
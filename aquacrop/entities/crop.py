@@ -4,13 +4,13 @@ Crop class module
 import numpy as np
 import typing
 
-from .crops.crop_params import crop_params
+from .crops.crop_registry import crop_names, get_crop_record
 
 class Crop:
     """
     The Crop Class contains paramaters and variables of the crop used in the simulation
 
-    Most Crop attributes can be found in the `crops.crop_params.py` file
+    Most Crop attributes can be found in the `crops/crop_params.json` table
     
     A number of default program properties of type float are also specified during initialisation
 
@@ -182,19 +182,18 @@ class Crop:
             self.planting_date = planting_date  # Planting Date (mm/dd)
             self.harvest_date = harvest_date  # Latest Harvest Date (mm/dd)
 
-        elif c_name in crop_params.keys():
-            self.__dict__.update(
-                (k, v) for k, v in crop_params[c_name].items()
-            )
+        elif c_name in crop_names():
+            # copy the (read-only) parameter record of the crop
+            self.__dict__.update(get_crop_record(c_name))
             self.planting_date = planting_date  # Planting Date (mm/dd)
             self.harvest_date = harvest_date  # Latest Harvest Date (mm/dd)
 
         else:
             assert (
-                c_name in crop_params.keys()
+                c_name in crop_names()
             ), f"Crop name not defined in crop_params dictionary, \
         if defining a custom crop please use crop name 'custom'. Otherwise use one of the \
-        pre-defined crops: {crop_params.keys()}"
+        pre-defined crops: {crop_names()}"
 
         # overide any pre-defined paramater with any passed by the user
         allowed_keys = {
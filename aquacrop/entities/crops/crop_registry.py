@@ -0,0 +1,115 @@
+"""
+Registry of the parameters of the built-in crops.
+
+The parameters are stored as a table in crop_params.json (one row per crop,
+one column per parameter). The table is read the first time a crop is
+looked up, and each crop's parameters are validated once and kept as a
+read-only record that Crop copies its attributes from.
+"""
+import json
+import os
+
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+CROP_TABLE = os.path.join(os.path.dirname(__file__), "crop_params.json")
+
+# parameters every built-in crop defines, the others default to the values
+# set in Crop.__init__
+REQUIRED_PARAMS = (
+    "Name",
+    "CropType",
+    "CalendarType",
+    "PlantMethod",
+    "GDDmethod",
+    "Tbase",
+    "Tupp",
+    "Emergence",
+    "MaxRooting",
+    "Senescence",
+    "Maturity",
+    "HIstart",
+    "Flowering",
+    "YldForm",
+    "Zmin",
+    "Zmax",
+    "CCx",
+    "CGC",
+    "CDC",
+    "Kcb",
+    "WP",
+    "HI0",
+)
+
+_table: Optional[Dict[str, Tuple[Any, ...]]] = None
+_columns: Tuple[str, ...] = ()
+_records: Dict[str, Mapping[str, Any]] = {}
+
+
+def _load_table() -> Dict[str, Tuple[Any, ...]]:
+    """
+    Read the crop table (once) and return its rows by crop name
+    """
+    global _table, _columns
+    if _table is None:
+        with open(CROP_TABLE) as f:
+            table = json.load(f)
+        _columns = tuple(table["columns"])
+        _table = {row[0]: tuple(row) for row in table["crops"]}
+
+    return _table
+
+
+def crop_names() -> Tuple[str, ...]:
+    """
+    Return the names of the built-in crops
+    """
+    return tuple(_load_table())
+
+
+def get_crop_record(c_name: str) -> Mapping[str, Any]:
+    """
+    Return the parameters of a built-in crop
+
+    Arguments:
+
+        c_name (str): crop name, one of crop_names()
+
+    Returns:
+
+        record (Mapping): read-only mapping of parameter name to value, \
+            parameters the crop does not define are left out
+
+    """
+    record = _records.get(c_name)
+    if record is None:
+        table = _load_table()
+        if c_name not in table:
+            raise KeyError(f"'{c_name}' is not a built-in crop, use one of {crop_names()}")
+
+        params = {
+            column: value
+            for column, value in zip(_columns, table[c_name])
+            if value is not None
+        }
+        _validate(c_name, params)
+        record = MappingProxyType(params)
+        _records[c_name] = record
+
+    return record
+
+
+def _validate(c_name: str, params: Dict[str, Any]):
+    """
+    Check that a crop defines the required parameters with numeric values
+    """
+    missing = [param for param in REQUIRED_PARAMS if param not in params]
+    if missing:
+        raise ValueError(f"crop '{c_name}' is missing the parameters {missing}")
+
+    if params["Name"] != c_name:
+        raise ValueError(f"crop '{c_name}' is named '{params['Name']}' in {CROP_TABLE}")
+
+    for param, value in params.items():
+        if param != "Name" and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"parameter {param} of crop '{c_name}' is not a number: {value!r}")
@@ -9,9 +9,28 @@ class InitialCondition:
 
     updated each timestep with the name NewCond
 
-
+    The attributes are declared in __slots__, so instances have no __dict__
+    and a model keeps a small, fixed footprint in memory.
     """
 
+    __slots__ = (
+        "age_days", "age_days_ns", "aer_days", "aer_days_comp", "irr_cum",
+        "delayed_gdds", "delayed_cds", "pct_lag_phase", "t_early_sen", "gdd_cum",
+        "day_submerged", "irr_net_cum", "dap", "e_pot", "t_pot", "pre_adj",
+        "crop_mature", "crop_dead", "germination", "premat_senes", "harvest_flag",
+        "growing_season", "yield_form", "stage2", "wt_in_soil", "stage", "f_pre",
+        "f_post", "fpost_dwn", "fpost_upp", "h1_cor_asum", "h1_cor_bsum", "f_pol",
+        "s_cor1", "s_cor2", "hi_ref", "HIfinal", "growth_stage", "tr_ratio",
+        "r_cor", "canopy_cover", "canopy_cover_adj", "canopy_cover_ns",
+        "canopy_cover_adj_ns", "biomass", "biomass_ns", "YieldPot",
+        "harvest_index", "harvest_index_adj", "ccx_act", "ccx_act_ns", "ccx_w",
+        "ccx_w_ns", "ccx_early_sen", "cc_prev", "protected_seed", "DryYield",
+        "FreshYield", "z_root", "cc0_adj", "surface_storage", "z_gw", "th_fc_Adj",
+        "th", "thini", "time_step_counter", "precipitation", "temp_max",
+        "temp_min", "et0", "sumET0EarlySen", "gdd", "w_surf", "evap_z",
+        "w_stage_2", "depletion", "taw",
+    )
+
     def __init__(self, num_comp):
         # counters
         self.age_days = 0
@@ -110,3 +129,15 @@ class InitialCondition:
 
         self.depletion = 0
         self.taw = 0
+
+    def copy(self) -> "InitialCondition":
+        """
+        Return an independent copy of the state (arrays are copied)
+        """
+        new = InitialCondition.__new__(InitialCondition)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, np.ndarray):
+                value = value.copy()
+            setattr(new, name, value)
+        return new
@@ -1,6 +1,81 @@
 import pandas as pd
 import numpy as np
 
+from .outputSink import MemorySink
+
+WATER_FLUX_COLUMNS = [
+    "time_step_counter",
+    "season_counter",
+    "dap",
+    "Wr",
+    "z_gw",
+    "surface_storage",
+    "IrrDay",
+    "Infl",
+    "Runoff",
+    "DeepPerc",
+    "CR",
+    "GwIn",
+    "Es",
+    "EsPot",
+    "Tr",
+    "TrPot",
+]
+
+CROP_GROWTH_COLUMNS = [
+    "time_step_counter",
+    "season_counter",
+    "dap",
+    "gdd",
+    "gdd_cum",
+    "z_root",
+    "canopy_cover",
+    "canopy_cover_ns",
+    "biomass",
+    "biomass_ns",
+    "harvest_index",
+    "harvest_index_adj",
+    "DryYield",
+    "FreshYield",
+    "YieldPot",
+]
+
+
+FINAL_STATS_COLUMNS = [
+    "Season",
+    "crop Type",
+    "Harvest Date (YYYY/MM/DD)",
+    "Harvest Date (Step)",
+    "Dry yield (tonne/ha)",
+    "Fresh yield (tonne/ha)",
+    "Yield potential (tonne/ha)",
+    "Seasonal irrigation (mm)",
+]
+
+
+SEASONAL_AGGREGATES_COLUMNS = [
+    "growing_days",
+    "IrrDay",
+    "Infl",
+    "Runoff",
+    "DeepPerc",
+    "CR",
+    "GwIn",
+    "Es",
+    "EsPot",
+    "Tr",
+    "TrPot",
+]
+
+
+def water_storage_columns(num_comp):
+    """
+    Return the columns of water_storage for a profile of num_comp compartments
+    """
+    return ["time_step_counter", "growing_season", "dap"] + [
+        "th" + str(i) for i in range(1, num_comp + 1)
+    ]
+
 
 class Output:
     """
@@ -9,8 +84,11 @@ class Output:
     During Simulation these are numpy arrays and are converted to pandas dataframes
     at the end of the simulation
 
+    With a sink that is not kept in memory, the daily arrays only hold one
+    block of days, which is handed to the sink when it is full.
+
     Atributes:
-    
+
         water_flux (pandas.DataFrame, numpy.array): Daily water flux changes
 
         water_storage (pandas.DataFrame, numpy array): daily water content of each soil compartment
@@ -19,22 +97,160 @@ class Output:
 
         final_stats (pandas.DataFrame, numpy array): final stats at end of each season
 
+        seasonal_aggregates (pandas.DataFrame, numpy array): growing season totals of
+            the water fluxes for each season, None unless requested
+
+        sink (OutputSink): destination of the daily outputs
+
+        daily (bool): True if any daily table is kept (tables that are not
+            kept are None and their rows are never built)
+
     """
 
-    def __init__(self, time_span, initial_th):
-
-        self.water_storage = np.zeros((len(time_span), 3 + len(initial_th)))
-        self.water_flux = np.zeros((len(time_span), 16))
-        self.crop_growth = np.zeros((len(time_span), 15))
-        self.final_stats = pd.DataFrame(
-            columns=[
-                "Season",
-                "crop Type",
-                "Harvest Date (YYYY/MM/DD)",
-                "Harvest Date (Step)",
-                "Dry yield (tonne/ha)",
-                "Fresh yield (tonne/ha)",
-                "Yield potential (tonne/ha)",
-                "Seasonal irrigation (mm)",
-            ]
-        )
\ No newline at end of file
+    def __init__(self, time_span, initial_th, sink=None, n_seasons=0, seasonal=False):
+
+        self.sink = MemorySink() if sink is None else sink
+        self.columns = {
+            "water_flux": WATER_FLUX_COLUMNS,
+            "water_storage": water_storage_columns(len(initial_th)),
+            "crop_growth": CROP_GROWTH_COLUMNS,
+        }
+        self.sink.open(self.columns)
+
+        n_rows = len(time_span) if self.sink.in_memory else self.sink.block_size
+        self.n_buffered = 0
+
+        self.daily = len(self.sink.tables) > 0
+        self.water_storage = self._allocate("water_storage", n_rows)
+        self.water_flux = self._allocate("water_flux", n_rows)
+        self.crop_growth = self._allocate("crop_growth", n_rows)
+        self.seasonal_aggregates = (
+            np.zeros((n_seasons, len(SEASONAL_AGGREGATES_COLUMNS))) if seasonal else None
+        )
+        self.final_stats = pd.DataFrame(columns=FINAL_STATS_COLUMNS)
+
+    def _allocate(self, table, n_rows):
+        """
+        Allocate the array of a daily table, None if the table is not kept
+        """
+        if table not in self.sink.tables:
+            return None
+        return np.zeros((n_rows, len(self.columns[table])))
+
+    def row(self, time_step_counter):
+        """
+        Return the row of the daily arrays the current day is written to
+        """
+        if self.sink.in_memory:
+            return time_step_counter
+
+        if self.n_buffered == self.sink.block_size:
+            self.flush()
+        self.n_buffered = self.n_buffered + 1
+        return self.n_buffered - 1
+
+    def flush(self):
+        """
+        Hand the buffered days to the sink
+        """
+        if self.sink.in_memory or self.n_buffered == 0:
+            return
+
+        for table in self.sink.tables:
+            block = pd.DataFrame(
+                getattr(self, table)[: self.n_buffered], columns=self.columns[table]
+            )
+            self.sink.write(table, self.sink.select(table, block))
+        self.n_buffered = 0
+
+    def finish(self, model_is_finished, steps_are_finished):
+        """
+        Process the daily outputs once the model (or the requested steps) are finished
+
+        In memory, the arrays of the kept tables are turned into DataFrames
+        with the selected columns. Otherwise the buffered days are flushed,
+        and the sink is closed when the model is finished.
+        """
+        # pylint: disable=import-outside-toplevel
+        from ..timestep.outputs_when_model_is_finished import (
+            outputs_when_model_is_finished,
+        )
+
+        if not self.sink.in_memory:
+            if model_is_finished is True or steps_are_finished is True:
+                self.flush()
+            if model_is_finished is True:
+                self.sink.close()
+                self.water_flux = None
+                self.water_storage = None
+                self.crop_growth = None
+        elif self.daily is True:
+            final_outputs = outputs_when_model_is_finished(
+                model_is_finished,
+                self.water_flux,
+                self.water_storage,
+                self.crop_growth,
+                steps_are_finished,
+            )
+            if final_outputs is not False:
+                for table, value in zip(
+                    ["water_flux", "water_storage", "crop_growth"], final_outputs
+                ):
+                    if value is not None:
+                        setattr(self, table, self.sink.select(table, value))
+
+        if self.seasonal_aggregates is not None and (
+            model_is_finished is True or steps_are_finished is True
+        ):
+            self.seasonal_aggregates = pd.DataFrame(
+                self.seasonal_aggregates, columns=SEASONAL_AGGREGATES_COLUMNS
+            )
+            self.seasonal_aggregates.insert(
+                0, "Season", np.arange(len(self.seasonal_aggregates))
+            )
+
+    def copy(self, sink=None) -> "Output":
+        """
+        Return an independent copy of the outputs
+
+        Arguments:
+
+            sink (OutputSink): new sink of the copy, which receives the days \
+                written from now on (the days before stay with this output's \
+                sink). The copy shares this output's sink if None, which is \
+                only safe when it is kept in memory or writes nothing
+
+        Returns:
+
+            output (Output): copy of the outputs
+        """
+        new = Output.__new__(Output)
+        new.columns = self.columns
+        new.seasonal_aggregates = _copy(self.seasonal_aggregates)
+        new.final_stats = self.final_stats.copy()
+        if sink is None:
+            new.sink = self.sink
+            new.n_buffered = self.n_buffered
+            new.water_storage = _copy(self.water_storage)
+            new.water_flux = _copy(self.water_flux)
+            new.crop_growth = _copy(self.crop_growth)
+            new.daily = self.daily
+            return new
+
+        if sink.in_memory:
+            raise ValueError("the sink of a copy cannot be kept in memory.")
+        new.sink = sink
+        new.sink.open(self.columns)
+        new.n_buffered = 0
+        new.daily = len(sink.tables) > 0
+        new.water_storage = new._allocate("water_storage", sink.block_size)
+        new.water_flux = new._allocate("water_flux", sink.block_size)
+        new.crop_growth = new._allocate("crop_growth", sink.block_size)
+        return new
+
+
+def _copy(value):
+    """
+    Copy an array or DataFrame, None stays None
+    """
+    return None if value is None else value.copy()
@@ -0,0 +1,300 @@
+import os
+
+from typing import Callable, Dict, List, Optional, Sequence, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from pandas import DataFrame
+
+TABLES = ("water_flux", "water_storage", "crop_growth")
+OUTPUT_LEVELS = ("daily", "final_only", "seasonal_aggregates")
+
+
+class OutputSink:
+    """
+    Base class of the destinations of the daily outputs (water_flux,
+    water_storage and crop_growth).
+
+    Daily rows are buffered by the model and handed to the sink in blocks of
+    block_size days, as DataFrames. Days skipped between seasons (when the
+    off-season is not simulated) are not written. final_stats is always kept
+    in memory.
+
+    Subclasses implement write (and optionally open and close).
+
+    Attributes:
+
+        tables (list): daily tables to keep, any of "water_flux", "water_storage", "crop_growth"
+
+        columns (dict): columns to keep for each table, all columns of a table if it is not a key
+
+        block_size (int): number of days in each block
+
+    """
+
+    in_memory = False
+
+    def __init__(
+        self,
+        tables: Sequence[str] = TABLES,
+        columns: Optional[Dict[str, List[str]]] = None,
+        block_size: int = 365,
+    ):
+        for table in tables:
+            if table not in TABLES:
+                raise ValueError(f"tables must be in {TABLES}, not '{table}'")
+        if block_size < 1:
+            raise ValueError("block_size must be equal to or greater than 1.")
+
+        self.tables = list(tables)
+        self.columns = dict(columns) if columns is not None else {}
+        self.block_size = block_size
+
+    def open(self, columns: Dict[str, List[str]]) -> None:
+        """
+        Called when the model is initialized
+
+        Arguments:
+
+            columns (dict): all the columns of each table
+        """
+        for table, selected in self.columns.items():
+            unknown = set(selected) - set(columns[table])
+            if unknown:
+                raise ValueError(f"Unknown {table} columns: {sorted(unknown)}")
+
+    def select(self, table: str, block: "DataFrame") -> "DataFrame":
+        """
+        Keep the selected columns of a block
+        """
+        if table in self.columns:
+            return block[self.columns[table]]
+        return block
+
+    def write(self, table: str, block: "DataFrame") -> None:
+        """
+        Receive a block of daily rows
+
+        Arguments:
+
+            table (str): name of the table
+
+            block (DataFrame): daily rows, selected columns only
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Called when the model is finished
+        """
+
+
+class MemorySink(OutputSink):
+    """
+    Keep the full daily tables in memory (default).
+
+    The tables are returned as DataFrames by get_water_flux, get_water_storage
+    and get_crop_growth once the model is finished.
+    """
+
+    in_memory = True
+
+
+class DiscardSink(OutputSink):
+    """
+    Drop all the daily rows, only final_stats is kept
+    """
+
+    def __init__(self):
+        super().__init__(tables=())
+
+    def write(self, table: str, block: "DataFrame") -> None:
+        pass
+
+
+class CallbackSink(OutputSink):
+    """
+    Pass every block of daily rows to a function
+
+    Attributes:
+
+        callback (Callable): called as callback(table, block)
+
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str, "DataFrame"], None],
+        tables: Sequence[str] = TABLES,
+        columns: Optional[Dict[str, List[str]]] = None,
+        block_size: int = 365,
+    ):
+        super().__init__(tables, columns, block_size)
+        self.callback = callback
+
+    def write(self, table: str, block: "DataFrame") -> None:
+        self.callback(table, block)
+
+
+class CSVSink(OutputSink):
+    """
+    Append the daily rows of each table to a CSV file, {directory}/{prefix}{table}.csv
+
+    Existing files are overwritten when the model is initialized.
+
+    Attributes:
+
+        directory (str): folder the files are written to
+
+        prefix (str): prefix of the file names
+
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "",
+        tables: Sequence[str] = TABLES,
+        columns: Optional[Dict[str, List[str]]] = None,
+        block_size: int = 365,
+    ):
+        super().__init__(tables, columns, block_size)
+        self.directory = directory
+        self.prefix = prefix
+        self._has_header = {}
+
+    def path(self, table: str) -> str:
+        """
+        Return the file of a table
+        """
+        return os.path.join(self.directory, f"{self.prefix}{table}.csv")
+
+    def open(self, columns: Dict[str, List[str]]) -> None:
+        super().open(columns)
+        os.makedirs(self.directory, exist_ok=True)
+        for table in self.tables:
+            if os.path.exists(self.path(table)):
+                os.remove(self.path(table))
+        self._has_header = {table: False for table in self.tables}
+
+    def write(self, table: str, block: "DataFrame") -> None:
+        block.to_csv(
+            self.path(table), mode="a", header=not self._has_header[table], index=False
+        )
+        self._has_header[table] = True
+
+
+class ParquetSink(OutputSink):
+    """
+    Write the daily rows of each table to a Parquet file, {directory}/{prefix}{table}.parquet,
+    one row group per block.
+
+    Needs pyarrow (pip install aquacrop[parquet]).
+
+    Attributes:
+
+        directory (str): folder the files are written to
+
+        prefix (str): prefix of the file names
+
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "",
+        tables: Sequence[str] = TABLES,
+        columns: Optional[Dict[str, List[str]]] = None,
+        block_size: int = 365,
+    ):
+        super().__init__(tables, columns, block_size)
+        self.directory = directory
+        self.prefix = prefix
+        self._writers = {}
+        _import_pyarrow()
+
+    def path(self, table: str) -> str:
+        """
+        Return the file of a table
+        """
+        return os.path.join(self.directory, f"{self.prefix}{table}.parquet")
+
+    def open(self, columns: Dict[str, List[str]]) -> None:
+        super().open(columns)
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def write(self, table: str, block: "DataFrame") -> None:
+        pyarrow = _import_pyarrow()
+        arrow_table = pyarrow.Table.from_pandas(block, preserve_index=False)
+        if table not in self._writers:
+            self._writers[table] = pyarrow.parquet.ParquetWriter(
+                self.path(table), arrow_table.schema
+            )
+        self._writers[table].write_table(arrow_table)
+
+    def close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def __getstate__(self):
+        # open writers cannot be pickled (e.g. when sent to a worker process)
+        state = self.__dict__.copy()
+        state["_writers"] = {}
+        return state
+
+
+def resolve_output_sink(
+    output_level: Optional[Union[str, Dict[str, List[str]]]],
+    output_sink: Optional[OutputSink],
+) -> OutputSink:
+    """
+    Return the sink that matches the output level of a model
+
+    Arguments:
+
+        output_level: "daily", "final_only", "seasonal_aggregates", a dict of \
+            the columns to keep for each daily table, or None for "daily"
+
+        output_sink: sink given by the user, None to keep the outputs in memory
+
+    Returns:
+
+        sink (OutputSink): sink used by the model
+    """
+    if output_level is None:
+        output_level = "daily"
+
+    if isinstance(output_level, dict):
+        if output_sink is not None:
+            raise ValueError(
+                "Select the columns with the tables and columns of the output_sink "
+                + "instead of output_level."
+            )
+        return MemorySink(tables=list(output_level), columns=output_level)
+
+    if output_level not in OUTPUT_LEVELS:
+        raise ValueError(f"output_level must be a dict or one of {OUTPUT_LEVELS}, not '{output_level}'")
+
+    if output_level == "daily":
+        return MemorySink() if output_sink is None else output_sink
+
+    if output_sink is not None:
+        raise ValueError(f"output_sink cannot be used with output_level '{output_level}'.")
+    return DiscardSink()
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow and pyarrow.parquet
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "ParquetSink needs pyarrow, install it with `pip install aquacrop[parquet]`."
+        ) from error
+    return pyarrow
@@ -36,7 +36,7 @@ class ParamStruct:
 
         python_fallow_crop (Crop): Crop object for off season
 
-        Seasonal_Crop_List (list): List of Crop objects, one for each season
+        Seasonal_Crops (SeasonalCrops): crop parameters of each season
 
         crop_name_list (list): List of crop names, one for each season
 
@@ -44,6 +44,10 @@ class ParamStruct:
 
         Fallow_Crop_Name (str): name of fallow crop
 
+        gdd_cache (GDDCache): daily growing degree days of the simulation weather
+
+        backend (str): backend of the compiled solution kernels of the model, "python" or "numba"
+
         """
 
     def __init__(self):
@@ -74,7 +78,13 @@ class ParamStruct:
         self.CropList = []
         self.python_crop_list = []
         self.python_fallow_crop = 0
-        self.Seasonal_Crop_List = []
+        self.Seasonal_Crops = None
         self.crop_name_list = []
         self.Fallow_Crop = 0
-        self.Fallow_Crop_Name = ""
\ No newline at end of file
+        self.Fallow_Crop_Name = ""
+
+        # growing degree days
+        self.gdd_cache = None
+
+        # backend of the compiled solution kernels (set by the model)
+        self.backend = "python"
\ No newline at end of file
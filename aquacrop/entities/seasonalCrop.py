@@ -0,0 +1,113 @@
+"""
+Crop parameters of each simulated growing season
+"""
+import copy
+
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from aquacrop.entities.crop import Crop
+
+# crop parameters set again at the start of each growing season (reset_initial_conditions)
+SEASON_PARAMS = (
+    "fCO2",
+    "MaturityCD",
+    "MaxCanopyCD",
+    "CanopyDevEndCD",
+    "HIstartCD",
+    "HIendCD",
+    "YldFormCD",
+    "FloweringCD",
+    "HIGC",
+    "tLinSwitch",
+    "dHILinear",
+)
+
+
+class SeasonalCrops:
+    """
+    Crop parameters of every growing season, stored as one read-only base record
+    shared by all seasons plus, for each season, the few parameters (SEASON_PARAMS)
+    computed when the season starts.
+
+    A single Crop object is used for all the seasons, season() sets it up with
+    the parameters of the requested season.
+
+    Attributes:
+
+        base (Mapping): read-only crop parameters shared by all seasons
+
+        overrides (list): parameters of each season that replace the base ones
+
+        crop (Crop): crop object set up for the current season
+
+        current (int): season the crop object is set up for
+
+    """
+
+    def __init__(self, crop: "Crop", n_seasons: int):
+        self.base = MappingProxyType(dict(crop.__dict__))
+        self.overrides = [{} for _ in range(n_seasons)]
+        self.crop = copy.copy(crop)
+        self.current = 0
+
+    def __len__(self) -> int:
+        return len(self.overrides)
+
+    def season(self, season: int) -> "Crop":
+        """
+        Return the crop of a growing season
+
+        Arguments:
+
+            season (int): season number
+
+        Returns:
+
+            crop (Crop): crop object holding the parameters of the season
+
+        """
+        if season != self.current:
+            params = self.crop.__dict__
+            for name in SEASON_PARAMS:
+                if name in self.base:
+                    params[name] = self.base[name]
+            params.update(self.overrides[season])
+            self.current = season
+
+        return self.crop
+
+    def save_season(self, season: int):
+        """
+        Keep the season parameters of the crop object, after they have been
+        updated for the start of a growing season
+
+        Arguments:
+
+            season (int): season the crop object is set up for
+
+        """
+        params = self.season(season).__dict__
+        self.overrides[season] = {name: params[name] for name in SEASON_PARAMS if name in params}
+
+    def copy(self) -> "SeasonalCrops":
+        """
+        Return a copy that can be moved to other seasons independently
+        (the base record is shared)
+        """
+        new = SeasonalCrops.__new__(SeasonalCrops)
+        new.__dict__.update(self.__dict__)
+        new.overrides = [dict(params) for params in self.overrides]
+        new.crop = copy.copy(self.crop)
+        return new
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["base"] = dict(self.base)
+        return state
+
+    def __setstate__(self, state):
+        state["base"] = MappingProxyType(state["base"])
+        self.__dict__.update(state)
@@ -12,7 +12,8 @@ class Soil:
 
     Attributes:
 
-        profile (pandas.DataFrame): holds soil profile information
+        profile (pandas.DataFrame): holds soil profile information, one row per compartment \
+            (the columns are kept as numpy arrays and only put in a DataFrame when accessed)
 
         Profile (SoilProfile): jit class object holdsing soil profile information
 
@@ -48,6 +49,10 @@ class Soil:
 
         self.Name = soil_type
 
+        # profile columns (numpy arrays), or the DataFrame handed out by self.profile
+        self._columns = {}
+        self._profile = None
+
         self.zSoil = sum(dz)  # Total thickness of soil profile (m)
         self.nComp = len(dz)  # Total number of soil compartments
         self.nLayer = 0  # Total number of soil layers
@@ -200,24 +205,121 @@ class Soil:
 
     def __repr__(self):
         for key in self.__dict__:
-            if key != "profile":
+            if key not in ("_columns", "_profile"):
                 print(f"{key}: {getattr(self,key)}")
 
         return " "
 
-    def create_df(self, dz):
+    @property
+    def profile(self) -> pd.DataFrame:
+        """
+        Soil profile as a DataFrame, one row per compartment
+        """
+        if self._profile is None:
+            self._profile = pd.DataFrame(self._columns)
+            self._columns = None
 
-        self.profile = pd.DataFrame(
-            np.empty((len(dz), 4)), columns=["Comp", "Layer", "dz", "dzsum"]
-        )
-        self.profile.dz = dz
-        self.profile.dzsum = np.cumsum(self.profile.dz).round(2)
-        self.profile.Comp = np.arange(len(dz))
-        self.profile.Layer = np.nan
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile: pd.DataFrame):
+        self._profile = profile
+        self._columns = None
+
+    @property
+    def Hydrology(self) -> pd.DataFrame:
+        """
+        Soil hydrology as a DataFrame, one row per layer
+        """
+        profile = self.profile
+        hydrology = profile.groupby("Layer").mean().drop(["dz", "dzsum"], axis=1)
+        hydrology["dz"] = profile.groupby("Layer").sum().dz
+        return hydrology
+
+    def _arrays(self) -> dict:
+        """
+        Return the profile columns to be changed, taking them back from
+        the DataFrame if it has been handed out
+        """
+        if self._columns is None:
+            self._columns = {
+                name: self._profile[name].to_numpy(copy=True)
+                for name in self._profile.columns
+            }
+            self._profile = None
+
+        return self._columns
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Return a column of the soil profile (one value per compartment)
+
+        Arguments:
+
+            name (str): column name, e.g. 'th_fc'
+
+        Returns:
+
+            values (numpy.ndarray): values of the column, not copied
+
+        """
+        if self._columns is None:
+            return self._profile[name].to_numpy()
+
+        return self._columns[name]
+
+    def set_column(self, name: str, values):
+        """
+        Set (or add) a column of the soil profile
 
-        self.profile["zBot"] = self.profile.dzsum
-        self.profile["z_top"] = self.profile["zBot"] - self.profile.dz
-        self.profile["zMid"] = (self.profile["z_top"] + self.profile["zBot"]) / 2
+        Arguments:
+
+            name (str): column name
+
+            values (array-like): one value per compartment
+
+        """
+        self._arrays()[name] = np.asarray(values)
+
+    def layer_means(self, name: str) -> dict:
+        """
+        Average a column of the soil profile over each soil layer
+        (missing values are skipped)
+
+        Arguments:
+
+            name (str): column name
+
+        Returns:
+
+            means (dict): mean value by layer number
+
+        """
+        layers = self.column("Layer")
+        values = self.column(name)
+        means = {}
+        for layer in np.unique(layers[~np.isnan(layers)]):
+            in_layer = values[(layers == layer) & ~np.isnan(values)]
+            if len(in_layer) > 0:
+                means[int(layer)] = float(np.mean(in_layer))
+        return means
+
+    def create_df(self, dz):
+
+        dz = np.array(dz, dtype=np.float64)
+        dzsum = np.cumsum(dz).round(2)
+        z_top = dzsum - dz
+
+        self._columns = {
+            "Comp": np.arange(len(dz)),
+            "Layer": np.full(len(dz), np.nan),
+            "dz": dz,
+            "dzsum": dzsum,
+            "zBot": dzsum.copy(),
+            "z_top": z_top,
+            "zMid": (z_top + dzsum) / 2,
+        }
+        self._profile = None
 
     def calculate_soil_hydraulic_properties(self, Sand, Clay, OrgMat, DF=1):
 
@@ -310,39 +412,24 @@ class Soil:
 
         self.nLayer += 1
 
-        num_layers = len(self.profile.dropna().Layer.unique())
+        cols = self._arrays()
+        layer = cols["Layer"]
+        dzsum = cols["dzsum"]
+
+        # count the layers of the compartments with all their properties set
+        complete = np.ones(len(layer), dtype=bool)
+        for values in cols.values():
+            if values.dtype.kind == "f":
+                complete &= ~np.isnan(values)
+        num_layers = len(np.unique(layer[complete]))
 
         new_layer = num_layers + 1
 
         if new_layer == 1:
-            self.profile.loc[
-                (round(thickness, 2) >= round(self.profile.dzsum, 2)), "Layer"
-            ] = new_layer
+            layer[round(thickness, 2) >= np.round(dzsum, 2)] = new_layer
         else:
-            last = self.profile[self.profile.Layer == new_layer - 1].dzsum.values[-1]
-            self.profile.loc[
-                (thickness + last >= self.profile.dzsum) & (self.profile.Layer.isna()),
-                "Layer",
-            ] = new_layer
-
-        self.profile.loc[
-            self.profile.Layer == new_layer, "th_dry"
-        ] = self.profile.Layer.map({new_layer: thWP / 2})
-        self.profile.loc[
-            self.profile.Layer == new_layer, "th_wp"
-        ] = self.profile.Layer.map({new_layer: thWP})
-        self.profile.loc[
-            self.profile.Layer == new_layer, "th_fc"
-        ] = self.profile.Layer.map({new_layer: thFC})
-        self.profile.loc[
-            self.profile.Layer == new_layer, "th_s"
-        ] = self.profile.Layer.map({new_layer: thS})
-        self.profile.loc[
-            self.profile.Layer == new_layer, "Ksat"
-        ] = self.profile.Layer.map({new_layer: Ksat})
-        self.profile.loc[
-            self.profile.Layer == new_layer, "penetrability"
-        ] = self.profile.Layer.map({new_layer: penetrability})
+            last = dzsum[layer == new_layer - 1][-1]
+            layer[(thickness + last >= dzsum) & np.isnan(layer)] = new_layer
 
         # Calculate drainage characteristic (tau)
         # Calculations use equation given by Raes et al. 2012
@@ -352,25 +439,40 @@ class Soil:
         elif tau < 0:
             tau = 0
 
-        self.profile.loc[
-            self.profile.Layer == new_layer, "tau"
-        ] = self.profile.Layer.map({new_layer: tau})
+        in_layer = layer == new_layer
+        for name, value in [
+            ("th_dry", thWP / 2),
+            ("th_wp", thWP),
+            ("th_fc", thFC),
+            ("th_s", thS),
+            ("Ksat", Ksat),
+            ("penetrability", penetrability),
+            ("tau", tau),
+        ]:
+            if name not in cols:
+                cols[name] = np.full(len(layer), np.nan)
+            cols[name][in_layer] = value
 
     def fill_nan(
         self,
     ):
 
-        self.profile = self.profile.ffill()
+        cols = self._arrays()
+        for name, values in cols.items():
+            if values.dtype.kind == "f":
+                cols[name] = _ffill(values)
 
-        self.profile.dz = self.profile.dz.round(2)
+        cols["dz"] = cols["dz"].round(2)
 
-        self.profile.dzsum = self.profile.dz.cumsum().round(2)
+        cols["dzsum"] = np.cumsum(cols["dz"]).round(2)
 
-        self.zSoil = round(self.profile.dz.sum(), 2)
+        self.zSoil = round(cols["dz"].sum(), 2)
 
-        self.nComp = len(self.profile)
+        self.nComp = len(cols["dz"])
 
-        self.profile.Layer = self.profile.Layer.astype(int)
+        if np.isnan(cols["Layer"]).any():
+            raise ValueError("the soil layers must start at the top of the soil profile")
+        cols["Layer"] = cols["Layer"].astype(np.int64)
 
     def add_capillary_rise_params(
         self,
@@ -378,22 +480,21 @@ class Soil:
         # Calculate capillary rise parameters for all soil layers
         # Only do calculation if water table is present. Calculations use equations
         # described in Raes et al. (2012)
-        prof = self.profile
-
-        hydf = prof.groupby("Layer").mean().drop(["dz", "dzsum"], axis=1)
-
-        hydf["aCR"] = 0
-        hydf["bCR"] = 0
+        layers = self.column("Layer")
+        th_wp = self.layer_means("th_wp")
+        th_fc = self.layer_means("th_fc")
+        th_s = self.layer_means("th_s")
+        k_sat = self.layer_means("Ksat")
 
-        for layer in hydf.index.unique():
-            layer = int(layer)
+        a_cr = np.full(len(layers), np.nan)
+        b_cr = np.full(len(layers), np.nan)
 
-            soil = hydf.loc[layer]
+        for layer in th_wp:
 
-            thwp = soil.th_wp
-            thfc = soil.th_fc
-            ths = soil.th_s
-            Ksat = soil.Ksat
+            thwp = th_wp[layer]
+            thfc = th_fc[layer]
+            ths = th_s[layer]
+            Ksat = k_sat[layer]
 
             # usually just initialise here (both 0), but temporarily hard-coding for sandy-loam for testing
             aCR =  0
@@ -530,7 +631,21 @@ class Soil:
             assert aCR != 0
             assert bCR != 0
 
-            prof.loc[prof.Layer == layer, "aCR"] = prof.Layer.map({layer: aCR})
-            prof.loc[prof.Layer == layer, "bCR"] = prof.Layer.map({layer: bCR})
+            a_cr[layers == layer] = aCR
+            b_cr[layers == layer] = bCR
+
+        self.set_column("aCR", a_cr)
+        self.set_column("bCR", b_cr)
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """
+    Fill missing values with the last value above them, as DataFrame.ffill
+    """
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
 
-        self.profile = prof
+    idx = np.where(missing, 0, np.arange(len(values)))
+    np.maximum.accumulate(idx, out=idx)
+    return values[idx]
@@ -21,6 +21,22 @@ class SoilProfile:
 
     `zMid` : `list` :
 
+    `drain_sat` : `list` : drainage ability at saturation, tau * (th_s - th_fc)
+
+    `exp_sat` : `list` : exp(th_s - th_fc) - 1, denominator of the drainage ability
+
+    `infl_factor` : `list` : ratio of Ksat to the drainage at saturation (mm) of each compartment
+
+    `th_thr` : `list` : water content threshold of the relative hydraulic conductivity in capillary rise
+
+    `z_top_layer` : `float` : depth of the bottom of the modelled soil layers
+
+    `xmax` : `list` : height above a water table up to which field capacity of each compartment is raised (m)
+
+    `derive_constants` : `method` : compute the derived constants above from the soil hydraulic properties
+
+    `root_zone_storage` : `method` : cumulative water storage of the compartments at the static water contents
+
     """
 
     def __init__(self, length):
@@ -42,3 +58,87 @@ class SoilProfile:
         self.th_fc_Adj = np.zeros(length, dtype=np.float64)
         self.aCR = np.zeros(length, dtype=np.float64)
         self.bCR = np.zeros(length, dtype=np.float64)
+
+        # constants derived from the above, see derive_constants
+        self.drain_sat = np.zeros(length, dtype=np.float64)
+        self.exp_sat = np.zeros(length, dtype=np.float64)
+        self.infl_factor = np.zeros(length, dtype=np.float64)
+        self.th_thr = np.zeros(length, dtype=np.float64)
+        self.z_top_layer = 0.0
+        self.xmax = np.zeros(length, dtype=np.float64)
+
+        # cumulative storage tables (one per aeration stress threshold) and
+        # last root zone water result, see root_zone_water
+        self._root_zone_storage = {}
+        self._root_zone_memo = None
+
+        # adjusted field capacity profiles by groundwater depth, see check_groundwater_table
+        self._fc_adj_cache = {}
+
+    def derive_constants(self):
+        """
+        Compute the per-compartment constants used every day by drainage,
+        infiltration and capillary rise from the soil hydraulic properties.
+        Must be called again if dz, th_s, th_fc, th_wp, tau, Ksat or Layer change.
+        """
+        self._fc_adj_cache = {}
+        self.drain_sat = self.tau * (self.th_s - self.th_fc)
+        self.exp_sat = np.exp(self.th_s - self.th_fc) - 1
+        # compartments that cannot drain (tau = 0) have an infinite factor,
+        # as they would when computed day by day
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.infl_factor = self.Ksat / (self.drain_sat * 1000 * self.dz)
+        self.th_thr = (self.th_wp + self.th_fc) / 2
+
+        # computed compartment by compartment, as in check_groundwater_table
+        self.xmax = np.zeros(len(self.th_fc), dtype=np.float64)
+        for compi, th_fc in enumerate(self.th_fc):
+            if th_fc <= 0.1:
+                self.xmax[compi] = 1
+            elif th_fc >= 0.3:
+                self.xmax[compi] = 2
+            else:
+                pF = 2 + 0.3 * (th_fc - 0.1) / 0.2
+                self.xmax[compi] = (np.exp(pF * np.log(10))) / 100
+
+        self.z_top_layer = 0
+        for layeri in np.sort(np.unique(self.Layer)):
+            # Calculate layer thickness
+            l_idx = np.argwhere(self.Layer == layeri).flatten()
+            self.z_top_layer = self.z_top_layer + self.dz[l_idx].sum()
+
+    def root_zone_storage(self, aer: float) -> np.ndarray:
+        """
+        Cumulative water storage (mm) of the compartments at the static water contents
+
+        Each row holds the storage summed over the first i compartments,
+        for i = 0 to the number of compartments. Rows 0 to 4 are the rounded
+        storages at saturation, field capacity, wilting point, air dry and
+        aeration stress threshold (as summed in the root zone), rows 5 and 6
+        the unrounded storages at field capacity and wilting point (as summed
+        in the top soil). The table is computed once per aeration threshold.
+
+        Arguments:
+
+            aer (float): aeration stress threshold of the crop (%)
+
+        Returns:
+
+            storage (numpy.ndarray): 7 x (number of compartments + 1) table
+
+        """
+        if aer not in self._root_zone_storage:
+            rows = np.array([
+                np.round(1000 * self.th_s * self.dz, 2),
+                np.round(1000 * self.th_fc * self.dz, 2),
+                np.round(1000 * self.th_wp * self.dz, 2),
+                np.round(1000 * self.th_dry * self.dz, 2),
+                np.round(1000 * (self.th_s - (aer / 100)) * self.dz, 2),
+                1000 * self.th_fc * self.dz,
+                1000 * self.th_wp * self.dz,
+            ])
+            storage = np.zeros((rows.shape[0], rows.shape[1] + 1))
+            storage[:, 1:] = np.cumsum(rows, axis=1)
+            self._root_zone_storage[aer] = storage
+
+        return self._root_zone_storage[aer]
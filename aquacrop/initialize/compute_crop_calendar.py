@@ -1,9 +1,11 @@
 import numpy as np
-import pandas as pd
 
 from ..entities.modelConstants import ModelConstants
 from ..utils.prepare_gdd import prepare_gdd
-from typing import TYPE_CHECKING
+from .compute_gdd_cache import GDDCache, calendar_days
+from .compute_weather_arrays import compute_weather_arrays, day_ordinal
+from .parse_dates import parse_date
+from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     # Important: classes are only imported when types are checked, not in production.
@@ -11,6 +13,21 @@ if TYPE_CHECKING:
     from pandas import DatetimeIndex, DataFrame
 
 
+# crop parameters read by the crop calendar (including prepare_gdd): two
+# crops with the same values, planting date and simulation period have the
+# same calendar
+CALENDAR_PARAMS = (
+    "CalendarType", "SwitchGDD", "SwitchGDDType", "CropType", "Determinant",
+    "GDDmethod", "Tbase", "Tupp", "CC0", "CCx", "CGC", "CGC_CD", "CDC_CD",
+    "Emergence", "MaxRooting", "Senescence", "Maturity", "HIstart", "Flowering",
+    "YldForm", "EmergenceCD", "MaxRootingCD", "SenescenceCD", "MaturityCD",
+    "HIstartCD", "FloweringCD", "YldFormCD", "planting_date",
+)
+
+# number of calendars kept by a GDDCache, the oldest is dropped first
+CALENDAR_CACHE_SIZE = 256
+
+
 def compute_crop_calendar(
     crop: "Crop",
     clock_struct_planting_dates: "DatetimeIndex",
@@ -18,6 +35,7 @@ def compute_crop_calendar(
     clock_struct_simulation_end_date: str,
     clock_struct_time_span: "DatetimeIndex",
     weather_df: "DataFrame",
+    gdd_cache: Optional["GDDCache"] = None,
 ) -> "Crop":
     """
     Function to compute additional parameters needed to define crop phenological calendar
@@ -37,6 +55,10 @@ def compute_crop_calendar(
 
         weather_df (DataFrame):  weather data for simulation period
 
+        gdd_cache (GDDCache):  daily gdd of weather_df, built from weather_df if None. \
+            The calendars computed with a cache are kept by it and reused \
+            for crops with the same CALENDAR_PARAMS
+
 
     Returns:
 
@@ -44,17 +66,72 @@ def compute_crop_calendar(
 
 
 
+    """
+
+    if gdd_cache is None:
+        return _crop_calendar(
+            crop,
+            clock_struct_planting_dates,
+            clock_struct_simulation_start_date,
+            clock_struct_simulation_end_date,
+            clock_struct_time_span,
+            weather_df,
+        )
+
+    # a calendar computed for the same inputs (by this model, or by another
+    # model sharing the gdd cache) is copied instead of computed again
+    key = (
+        str(clock_struct_simulation_start_date),
+        str(clock_struct_simulation_end_date),
+        clock_struct_planting_dates[0] if len(clock_struct_planting_dates) else None,
+        tuple(getattr(crop, name, None) for name in CALENDAR_PARAMS),
+    )
+    calendars = gdd_cache.calendars
+    if key in calendars:
+        crop.__dict__.update(calendars[key])
+        return crop
+
+    before = dict(crop.__dict__)
+    crop = _crop_calendar(
+        crop,
+        clock_struct_planting_dates,
+        clock_struct_simulation_start_date,
+        clock_struct_simulation_end_date,
+        clock_struct_time_span,
+        weather_df,
+        gdd_cache,
+    )
+    if len(calendars) >= CALENDAR_CACHE_SIZE:
+        del calendars[next(iter(calendars))]
+    calendars[key] = {
+        name: value for name, value in crop.__dict__.items()
+        if name not in before or before[name] is not value
+    }
+    return crop
+
+
+def _crop_calendar(
+    crop: "Crop",
+    clock_struct_planting_dates: "DatetimeIndex",
+    clock_struct_simulation_start_date: str,
+    clock_struct_simulation_end_date: str,
+    clock_struct_time_span: "DatetimeIndex",
+    weather_df: "DataFrame",
+    gdd_cache: Optional["GDDCache"] = None,
+) -> "Crop":
+    """
+    Compute the crop calendar (see compute_crop_calendar)
     """
 
     if len(clock_struct_planting_dates) == 0:
-        plant_year = pd.DatetimeIndex([clock_struct_simulation_start_date]).year[0]
+        plant_year = clock_struct_simulation_start_date.year
         if (
-            pd.to_datetime(str(plant_year) + "/" + crop.planting_date)
-            < clock_struct_simulation_start_date
+            parse_date(str(plant_year) + "/" + crop.planting_date)
+            < np.datetime64(clock_struct_simulation_start_date)
         ):
-            pl_date = str(plant_year + 1) + "/" + crop.planting_date
+            pl_date = parse_date(str(plant_year + 1) + "/" + crop.planting_date)
         else:
-            pl_date = str(plant_year) + "/" + crop.planting_date
+            pl_date = parse_date(str(plant_year) + "/" + crop.planting_date)
     else:
         pl_date = clock_struct_planting_dates[0]
 
@@ -122,35 +199,13 @@ def compute_crop_calendar(
             #                     idx = -1
             #             assert idx > -1
 
-            date_range = pd.date_range(pl_date, clock_struct_time_span[-1])
-            weather_df = weather_df.copy()
-            weather_df.index = weather_df.Date
-            weather_df = weather_df.loc[date_range]
-            temp_min = weather_df.MinTemp
-            temp_max = weather_df.MaxTemp
-
-            # Calculate gdd's
-            if crop.GDDmethod == 1:
-
-                Tmean = (temp_max + temp_min) / 2
-                Tmean = Tmean.clip(lower=crop.Tbase, upper=crop.Tupp)
-                gdd = Tmean - crop.Tbase
+            # gdd's from the first planting date to the end of the simulation
+            if gdd_cache is None:
+                gdd_cache = GDDCache(*compute_weather_arrays(weather_df))
+            start = gdd_cache.day_index(day_ordinal(pl_date))
+            gdd = gdd_cache.daily(crop)[start:]
+            weather_df = weather_df.iloc[start:].reset_index(drop=True)
 
-            elif crop.GDDmethod == 2:
-
-                temp_max = temp_max.clip(lower=crop.Tbase, upper=crop.Tupp)
-                temp_min = temp_min.clip(lower=crop.Tbase, upper=crop.Tupp)
-                Tmean = (temp_max + temp_min) / 2
-                gdd = Tmean - crop.Tbase
-
-            elif crop.GDDmethod == 3:
-
-                temp_max = temp_max.clip(lower=crop.Tbase, upper=crop.Tupp)
-                temp_min = temp_min.clip(upper=crop.Tupp)
-                Tmean = (temp_max + temp_min) / 2
-                Tmean = Tmean.clip(lower=crop.Tbase)
-                gdd = Tmean - crop.Tbase
-                
             crop = prepare_gdd(weather_df, 
                                clock_struct_simulation_start_date,
                                clock_struct_simulation_end_date, 
@@ -225,59 +280,36 @@ def compute_crop_calendar(
         #             else:
         #                 idx = -1
         #         assert idx> -1
-        date_range = pd.date_range(pl_date, clock_struct_time_span[-1])
-        weather_df = weather_df.copy()
-        weather_df.index = weather_df.Date
-
-        weather_df = weather_df.loc[date_range]
-        temp_min = weather_df.MinTemp
-        temp_max = weather_df.MaxTemp
-
-        # Calculate gdd's
-        if crop.GDDmethod == 1:
-
-            Tmean = (temp_max + temp_min) / 2
-            Tmean = Tmean.clip(lower=crop.Tbase, upper=crop.Tupp)
-            gdd = Tmean - crop.Tbase
-
-        elif crop.GDDmethod == 2:
-
-            temp_max = temp_max.clip(lower=crop.Tbase, upper=crop.Tupp)
-            temp_min = temp_min.clip(lower=crop.Tbase, upper=crop.Tupp)
-            Tmean = (temp_max + temp_min) / 2
-            gdd = Tmean - crop.Tbase
-
-        elif crop.GDDmethod == 3:
-
-            temp_max = temp_max.clip(lower=crop.Tbase, upper=crop.Tupp)
-            temp_min = temp_min.clip(upper=crop.Tupp)
-            Tmean = (temp_max + temp_min) / 2
-            Tmean = Tmean.clip(lower=crop.Tbase)
-            gdd = Tmean - crop.Tbase
-
-        gdd_cum = np.cumsum(gdd).reset_index(drop=True)
+        # Cumulative gdd's from the first planting date
+        if gdd_cache is None:
+            gdd_cache = GDDCache(*compute_weather_arrays(weather_df))
+        start = gdd_cache.day_index(day_ordinal(pl_date))
+        targets = [crop.Maturity, crop.MaxCanopy, crop.CanopyDevEnd, crop.HIstart, crop.HIend]
+        if crop.CropType == 3:
+            targets.append(crop.FloweringEnd)
+        gdd_cum = gdd_cache.season_gdd_cum(start, crop, targets)
 
         assert (
-            gdd_cum.values[-1] > crop.Maturity
-        ), f"not enough growing degree days in simulation ({gdd_cum.values[-1]}) to reach maturity ({crop.Maturity})"
+            gdd_cum[-1] > crop.Maturity
+        ), f"not enough growing degree days in simulation ({gdd_cum[-1]}) to reach maturity ({crop.Maturity})"
 
-        crop.MaturityCD = (gdd_cum > crop.Maturity).idxmax() + 1
+        crop.MaturityCD = calendar_days(gdd_cum, crop.Maturity)
 
         assert crop.MaturityCD < 365, "crop will take longer than 1 year to mature"
 
         # 1. gdd's from sowing to maximum canopy cover
-        crop.MaxCanopyCD = (gdd_cum > crop.MaxCanopy).idxmax() + 1
+        crop.MaxCanopyCD = calendar_days(gdd_cum, crop.MaxCanopy)
         # 2. gdd's from sowing to end of vegetative growth
-        crop.CanopyDevEndCD = (gdd_cum > crop.CanopyDevEnd).idxmax() + 1
+        crop.CanopyDevEndCD = calendar_days(gdd_cum, crop.CanopyDevEnd)
         # 3. Calendar days from sowing to start of yield_ formation
-        crop.HIstartCD = (gdd_cum > crop.HIstart).idxmax() + 1
+        crop.HIstartCD = calendar_days(gdd_cum, crop.HIstart)
         # 4. Calendar days from sowing to end of yield_ formation
-        crop.HIendCD = (gdd_cum > crop.HIend).idxmax() + 1
+        crop.HIendCD = calendar_days(gdd_cum, crop.HIend)
         # 5. Duration of yield_ formation in calendar days
         crop.YldFormCD = crop.HIendCD - crop.HIstartCD
         if crop.CropType == 3:
             # 1. Calendar days from sowing to end of flowering
-            FloweringEnd = (gdd_cum > crop.FloweringEnd).idxmax() + 1
+            FloweringEnd = calendar_days(gdd_cum, crop.FloweringEnd)
             # 2. Duration of flowering in calendar days
             crop.FloweringCD = FloweringEnd - crop.HIstartCD
         else:
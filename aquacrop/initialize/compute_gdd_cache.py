@@ -0,0 +1,147 @@
+"""
+Daily growing degree days and their prefix sums, computed once per run
+"""
+import numpy as np
+
+from typing import Any, Dict, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+    from aquacrop.entities.crop import Crop
+
+# margin (in growing degree days) added to the targets when the prefix sums
+# bound the season window, far larger than their rounding error
+_WINDOW_MARGIN = 1.0
+
+
+def growing_degree_days(
+    temp_min: "ndarray",
+    temp_max: "ndarray",
+    GDDmethod: int,
+    Tbase: float,
+    Tupp: float,
+) -> "ndarray":
+    """
+    Vectorised growing degree days of a series of days
+
+    Same methods as `growing_degree_day`, applied to whole arrays.
+
+    Arguments:
+
+        temp_min (numpy.ndarray): daily minimum temperatures
+
+        temp_max (numpy.ndarray): daily maximum temperatures
+
+        GDDmethod (int): gdd calculation method (1, 2 or 3)
+
+        Tbase (float): base temperature
+
+        Tupp (float): upper temperature
+
+    Returns:
+
+        gdd (numpy.ndarray): growing degree days of each day
+
+    """
+    if GDDmethod == 1:
+        Tmean = np.clip((temp_max + temp_min) / 2, Tbase, Tupp)
+    elif GDDmethod == 2:
+        Tmean = (np.clip(temp_max, Tbase, Tupp) + np.clip(temp_min, Tbase, Tupp)) / 2
+    elif GDDmethod == 3:
+        Tmean = (np.clip(temp_max, Tbase, Tupp) + np.minimum(temp_min, Tupp)) / 2
+        Tmean = np.maximum(Tmean, Tbase)
+    else:
+        raise ValueError(f"GDDmethod must be 1, 2 or 3, not {GDDmethod}")
+
+    return Tmean - Tbase
+
+
+class GDDCache:
+    """
+    Daily growing degree days of the simulation weather, with their prefix sums.
+
+    The series of each (GDDmethod, Tbase, Tupp) is computed the first time
+    it is needed and reused by every season of the run. Because daily gdd
+    are never negative the prefix sums are sorted, so the span of days a
+    season needs to reach a gdd target is found by binary search instead of
+    summing all the remaining weather.
+
+    Attributes:
+
+        weather (numpy.ndarray): weather matrix (MinTemp, MaxTemp, ...), one row per day
+
+        weather_days (numpy.ndarray): day ordinal of each row of weather
+
+        calendars (dict): crop calendars computed with this cache (see \
+            compute_crop_calendar), by crop parameters, planting date and \
+            simulation period
+
+    """
+
+    def __init__(self, weather: "ndarray", weather_days: "ndarray"):
+        self.weather = weather
+        self.weather_days = weather_days
+        self._gdd: Dict[Tuple[int, float, float], "ndarray"] = {}
+        self._prefix: Dict[Tuple[int, float, float], "ndarray"] = {}
+        self.calendars: Dict[tuple, Dict[str, Any]] = {}
+
+    def daily(self, crop: "Crop") -> "ndarray":
+        """
+        Return the gdd of every day of the weather for the temperatures of a crop
+        """
+        key = (crop.GDDmethod, crop.Tbase, crop.Tupp)
+        if key not in self._gdd:
+            self._gdd[key] = growing_degree_days(
+                self.weather[:, 0], self.weather[:, 1], *key
+            )
+        return self._gdd[key]
+
+    def prefix_sums(self, crop: "Crop") -> "ndarray":
+        """
+        Return the gdd summed over the first i days, for i = 0 to the number of days
+        """
+        key = (crop.GDDmethod, crop.Tbase, crop.Tupp)
+        if key not in self._prefix:
+            self._prefix[key] = np.concatenate(([0.0], np.cumsum(self.daily(crop))))
+        return self._prefix[key]
+
+    def day_index(self, day: int) -> int:
+        """
+        Return the row of the first day of weather on or after a day ordinal
+        """
+        return int(np.searchsorted(self.weather_days, day))
+
+    def season_gdd_cum(self, start: int, crop: "Crop", targets: Sequence[float]) -> "ndarray":
+        """
+        Cumulative gdd from a row of weather, until every target is exceeded
+
+        The cumulative sum is taken over the days found from the prefix sums
+        only, so it is identical to the first days of the cumulative sum of
+        all the remaining weather.
+
+        Arguments:
+
+            start (int): row of weather of the first day (e.g. planting date)
+
+            crop (Crop): crop whose GDDmethod, Tbase and Tupp are used
+
+            targets: gdd targets that must be reached (e.g. crop.Maturity)
+
+        Returns:
+
+            gdd_cum (numpy.ndarray): cumulative gdd of each day from start
+
+        """
+        prefix = self.prefix_sums(crop)
+        target = prefix[start] + max(targets) + _WINDOW_MARGIN
+        end = int(np.searchsorted(prefix, target, side="right")) + 1
+
+        return np.cumsum(self.daily(crop)[start:end])
+
+
+def calendar_days(gdd_cum: "ndarray", target: float) -> int:
+    """
+    Return the calendar day (from 1) on which gdd_cum first exceeds target
+    """
+    return int(np.argmax(gdd_cum > target)) + 1
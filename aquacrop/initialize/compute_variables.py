@@ -1,12 +1,11 @@
 import numpy as np
-import pandas as pd
 
 from .compute_crop_calendar import compute_crop_calendar
 from .calculate_HIGC import calculate_HIGC
 from .calculate_HI_linear import calculate_HI_linear
 from ..entities.co2 import CO2
-from ..entities.crop import Crop
-from copy import deepcopy
+from ..entities.seasonalCrop import SeasonalCrops
+from copy import copy
 from os.path import dirname, abspath
 
 from typing import TYPE_CHECKING
@@ -54,8 +53,8 @@ def compute_variables(
             (
                 1000
                 * (
-                    param_struct.Soil.profile.th_fc.iloc[0]
-                    - param_struct.Soil.profile.th_dry.iloc[0]
+                    param_struct.Soil.column("th_fc")[0]
+                    - param_struct.Soil.column("th_dry")[0]
                 )
                 * param_struct.Soil.evap_z_surf
             ),
@@ -64,7 +63,7 @@ def compute_variables(
 
     if param_struct.Soil.calc_cn == 1:
         # adjust curve number
-        ksat = param_struct.Soil.profile.Ksat.iloc[0]
+        ksat = param_struct.Soil.column("Ksat")[0]
         if ksat > 864:
             param_struct.Soil.cn = 46
         elif ksat > 347:
@@ -89,9 +88,12 @@ def compute_variables(
             clock_struct.simulation_end_date,
             clock_struct.time_span,
             weather_df,
+            param_struct.gdd_cache,
         )
 
-        # Harvest index param_struct.Seasonal_Crop_List[clock_struct.season_counter].Paramsgrowth coefficient
+        # Harvest index growth coefficient: the base record of
+        # param_struct.Seasonal_Crops keeps this value, and the per-season
+        # overrides replace it for seasons in gdd mode
         crop.HIGC = calculate_HIGC(
             crop.YldFormCD,
             crop.HI0,
@@ -116,19 +118,21 @@ def compute_variables(
     co2Data = param_struct.CO2.co2_data
 
     # Years
-    start_year, end_year = pd.DatetimeIndex(
-        [clock_struct.simulation_start_date, clock_struct.simulation_end_date]
-    ).year
+    start_year = clock_struct.simulation_start_date.year
+    end_year = clock_struct.simulation_end_date.year
     sim_years = np.arange(start_year, end_year + 1)
 
     # Interpolate data
-    CO2conc_interp = np.interp(sim_years, co2Data.year, co2Data.ppm)
+    CO2conc_interp = np.interp(
+        sim_years, co2Data.year.to_numpy(dtype=float), co2Data.ppm.to_numpy(dtype=float)
+    )
 
-    # Store data
-    param_struct.CO2.co2_data_processed = pd.Series(CO2conc_interp, index=sim_years)  # maybe get rid of this
+    # Store data (concentration of each simulated year)
+    param_struct.CO2.co2_data_processed = CO2conc_interp
+    param_struct.CO2.co2_data_years = sim_years
 
     # Get CO2 concentration for first year
-    CO2conc = param_struct.CO2.co2_data_processed.iloc[0]
+    CO2conc = param_struct.CO2.co2_data_processed[0]
 
     # param_struct.CO2 = param_struct.co2_concentration_adj
 
@@ -137,7 +141,7 @@ def compute_variables(
         if param_struct.CO2.current_concentration > 0.:
             CO2conc = param_struct.CO2.current_concentration
         else:
-            CO2conc = param_struct.CO2.co2_data_processed.iloc[0]
+            CO2conc = param_struct.CO2.co2_data_processed[0]
 
     param_struct.CO2.current_concentration = CO2conc
 
@@ -200,36 +204,13 @@ def compute_variables(
     param_struct.CropList[i] = crop
 
 
-    # change this later
-    if param_struct.NCrops == 1:
-        crop_list = [
-            deepcopy(param_struct.CropList[0])
-            for i in range(len(param_struct.CropChoices))
-        ]
-        # param_struct.Seasonal_Crop_List = [deepcopy(param_struct.CropList[0]) for i in range(len(param_struct.CropChoices))]
-
-    else:
-        crop_list = param_struct.CropList
+    # crop of each season (only one crop type, no rotations): the crop parameters
+    # are shared, each season only keeps the parameters set when it starts
+    param_struct.Seasonal_Crops = SeasonalCrops(
+        param_struct.CropList[0], len(param_struct.CropChoices)
+    )
 
     # add crop for out of growing season
-    # param_struct.Fallow_Crop = deepcopy(param_struct.Seasonal_Crop_List[0])
-    Fallow_Crop = deepcopy(crop_list[0])
-
-    param_struct.Seasonal_Crop_List = []
-
-    for crop in crop_list:
-        #crop_struct = Crop(crop.Name, crop.planting_date) # changed from CropStruct to Crop during removal of numba AOT/JIT compilation
-        #for a, v in crop.__dict__.items():
-        #    if hasattr(crop_struct, a):
-        #        crop_struct.__setattr__(a, v)
-
-        param_struct.Seasonal_Crop_List.append(crop)
-
-    fallow_struct = Crop(crop.Name, crop.planting_date) # changed from CropStruct to Crop during removal of numba AOT/JIT compilation
-    for a, v in Fallow_Crop.__dict__.items():
-        if hasattr(fallow_struct, a):
-            fallow_struct.__setattr__(a, v)
-
-    param_struct.Fallow_Crop = fallow_struct
+    param_struct.Fallow_Crop = copy(param_struct.CropList[0])
 
     return param_struct
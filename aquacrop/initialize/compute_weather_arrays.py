@@ -0,0 +1,51 @@
+"""
+Build the numeric weather arrays used by the daily time-step
+"""
+import numpy as np
+
+from typing import Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+    from pandas import DataFrame
+
+WEATHER_COLUMNS = ["MinTemp", "MaxTemp", "Precipitation", "ReferenceET"]
+
+
+def compute_weather_arrays(weather_df: "DataFrame") -> Tuple["ndarray", "ndarray"]:
+    """
+    Split the clipped weather dataframe into a float matrix and a day index
+
+    Arguments:
+
+        weather_df (DataFrame): weather clipped to the simulation dates
+
+    Returns:
+
+        weather (numpy.ndarray): C-contiguous float64 matrix with one row per \
+            day and columns MinTemp, MaxTemp, Precipitation, ReferenceET
+
+        weather_days (numpy.ndarray): int64 day ordinal (days since 1970-01-01) of each row
+
+    """
+    weather = np.ascontiguousarray(weather_df[WEATHER_COLUMNS].to_numpy(dtype=np.float64))
+    weather_days = day_ordinal(weather_df.Date.values)
+
+    return weather, weather_days
+
+
+def day_ordinal(dates) -> "ndarray":
+    """
+    Convert dates to int64 day ordinals (days since 1970-01-01)
+
+    Arguments:
+
+        dates: date, array of dates or DatetimeIndex
+
+    Returns:
+
+        days (numpy.ndarray): day ordinal of each date
+
+    """
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
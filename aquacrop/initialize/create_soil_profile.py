@@ -25,35 +25,40 @@ def create_soil_profile(param_struct: "ParamStruct") -> "ParamStruct":
 
     """
 
-    profile = SoilProfile(int(param_struct.Soil.profile.shape[0]))
+    soil = param_struct.Soil
+    profile = SoilProfile(len(soil.column("dz")))
 
-    pdf = param_struct.Soil.profile.astype("float64")
+    def column(name):
+        return np.array(soil.column(name), dtype=np.float64)
 
-    profile.dz = pdf.dz.values
-    profile.dzsum = pdf.dzsum.values
-    profile.zBot = pdf.zBot.values
-    profile.z_top = pdf.z_top.values
-    profile.zMid = pdf.zMid.values
+    profile.dz = column("dz")
+    profile.dzsum = column("dzsum")
+    profile.zBot = column("zBot")
+    profile.z_top = column("z_top")
+    profile.zMid = column("zMid")
 
-    profile.Comp = np.int64(pdf.Comp.values)
-    profile.Layer = np.int64(pdf.Layer.values)
+    profile.Comp = np.int64(column("Comp"))
+    profile.Layer = np.int64(column("Layer"))
     # profile.Layer_dz = pdf.Layer_dz.values
-    profile.th_wp = pdf.th_wp.values
-    profile.th_fc = pdf.th_fc.values
-    profile.th_s = pdf.th_s.values
+    profile.th_wp = column("th_wp")
+    profile.th_fc = column("th_fc")
+    profile.th_s = column("th_s")
 
-    profile.Ksat = pdf.Ksat.values
-    profile.Penetrability = pdf.penetrability.values
-    profile.th_dry = pdf.th_dry.values
-    profile.tau = pdf.tau.values
-    profile.th_fc_Adj = pdf.th_fc_Adj.values
+    profile.Ksat = column("Ksat")
+    profile.Penetrability = column("penetrability")
+    profile.th_dry = column("th_dry")
+    profile.tau = column("tau")
+    profile.th_fc_Adj = column("th_fc_Adj")
 
     if param_struct.water_table == 1:
-        profile.aCR = pdf.aCR.values
-        profile.bCR = pdf.bCR.values
+        profile.aCR = column("aCR")
+        profile.bCR = column("bCR")
     else:
-        profile.aCR = pdf.dz.values * 0.0
-        profile.bCR = pdf.dz.values * 0.0
+        profile.aCR = profile.dz * 0.0
+        profile.bCR = profile.dz * 0.0
+
+    # constants used by the daily soil water kernels
+    profile.derive_constants()
 
     # param_struct.Soil.profile = profile
 
@@ -0,0 +1,51 @@
+"""
+Parse the dates given to the model without going through pandas
+"""
+import numpy as np
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import datetime64
+
+
+def parse_date(date: str) -> "datetime64":
+    """
+    Convert a 'YYYY/MM/DD' date (month and day may have a single digit) to a datetime64
+
+    Other formats fall back to pandas.to_datetime
+
+    Arguments:
+
+        date (str): date string, e.g. '1979/10/01'
+
+    Returns:
+
+        date (numpy.datetime64): day of the date
+
+    """
+    try:
+        year, month, day = (int(part) for part in date.split("/"))
+        return np.datetime64(f"{year:04d}-{month:02d}-{day:02d}", "D")
+    except ValueError:
+        import pandas as pd
+
+        return np.datetime64(pd.to_datetime(date), "D")
+
+
+def month_day(date: "datetime64") -> str:
+    """
+    Format the month and day of a date as 'M/D'
+
+    Arguments:
+
+        date (numpy.datetime64): date
+
+    Returns:
+
+        month_day (str): month and day, without leading zeros
+
+    """
+    day = date.astype("datetime64[D]").item()
+    return f"{day.month}/{day.day}"
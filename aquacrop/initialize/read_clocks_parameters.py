@@ -1,8 +1,10 @@
 """
 Inititalize clocks parameters
 """
+import numpy as np
 import pandas as pd
 from ..entities.clockStruct import ClockStruct
+from .parse_dates import parse_date
 
 
 def read_clock_parameters(
@@ -29,25 +31,22 @@ def read_clock_parameters(
     """
     check_max_simulation_days(sim_start_time, sim_end_time)
 
-    # Extract data and put into pandas datetime format
-    pandas_sim_start_time = pd.to_datetime(sim_start_time)
-    pandas_sim_end_time = pd.to_datetime(sim_end_time)
+    # Extract data and put into datetime64 format
+    start_date = parse_date(sim_start_time)
+    end_date = parse_date(sim_end_time)
 
     # create ClockStruct object
     clock_struct = ClockStruct()
 
     # Add variables
-    clock_struct.simulation_start_date = pandas_sim_start_time
-    clock_struct.simulation_end_date = pandas_sim_end_time
+    clock_struct.simulation_start_date = pd.Timestamp(start_date)
+    clock_struct.simulation_end_date = pd.Timestamp(end_date)
 
-    clock_struct.n_steps = (pandas_sim_end_time - pandas_sim_start_time).days + 1
-    clock_struct.time_span = pd.date_range(
-        freq="D", start=pandas_sim_start_time, end=pandas_sim_end_time
+    clock_struct.n_steps = int((end_date - start_date).astype(int)) + 1
+    clock_struct.time_span = pd.DatetimeIndex(
+        np.arange(start_date, end_date + 1, dtype="datetime64[D]")
     )
 
-    clock_struct.step_start_time = clock_struct.time_span[0]
-    clock_struct.step_end_time = clock_struct.time_span[1]
-
     clock_struct.sim_off_season = off_season
 
     return clock_struct
@@ -44,65 +44,39 @@ def read_groundwater_table(
     elif WT == "Y":
         ParamStruct.water_table = 1
 
-        df = pd.DataFrame([GwStruct.dates, GwStruct.values]).T
-        df.columns = ["Date", "Depth(mm)"]
-
-        # get date in correct format
-        df.Date = pd.DatetimeIndex(df.Date)
-        # print(f'DF length: {len(df)}')
-        # print(f'Index length: {len(df.index)}')
-
-        if len(df) == 1:
-            
-            # if only 1 watertable depth then set that value to be constant
-            # accross whole simulation            
-            z_gw = pd.DataFrame(
-                data=df["Depth(mm)"].iloc[0]*np.ones(len(ClockStruct.time_span)),
-                index=pd.to_datetime(ClockStruct.time_span),
-                columns=['Depth(mm)']
-            )['Depth(mm)']
-
-        elif len(df) > 1:
-            # check water table method
-            if WTMethod == "Constant":
-
-                # No interpolation between dates
-
-                # create daily depths for each simulation day
-                z_gw = pd.Series(
-                    np.nan * np.ones(len(ClockStruct.time_span)), index=ClockStruct.time_span
-                )
-
-                # assign constant depth for all dates in between
-                for row in range(len(df)):
-                    date = df.Date.iloc[row]
-                    depth = df["Depth(mm)"].iloc[row]
-                    z_gw.loc[z_gw.index >= date] = depth
-                    if row == 0:
-                        z_gw.loc[z_gw.index <= date] = depth
-
-            elif WTMethod == "Variable":
-
-                # Linear interpolation between dates
-
-                # create daily depths for each simulation day
-                # fill unspecified days with NaN
-                z_gw = pd.Series(
-                    np.nan * np.ones(len(ClockStruct.time_span)), index=ClockStruct.time_span
-                )
-
-                for row in range(len(df)):
-                    date = df.Date.iloc[row]
-                    depth = df["Depth(mm)"].iloc[row]
-                    z_gw.loc[date] = depth
-
-                # Interpolate daily groundwater depths
-                z_gw = z_gw.interpolate()
+        # observations as day offsets from the simulation start, in date
+        # order, keeping the last depth given for a date
+        start = np.datetime64(ClockStruct.time_span[0], "D")
+        obs_days = (
+            pd.DatetimeIndex(GwStruct.dates).values.astype("datetime64[D]") - start
+        ).astype(np.int64)
+        obs_depths = np.asarray(GwStruct.values, dtype=np.float64)
+        order = np.argsort(obs_days, kind="stable")
+        obs_days, obs_depths = obs_days[order], obs_depths[order]
+        last = np.append(obs_days[1:] != obs_days[:-1], True)
+        obs_days, obs_depths = obs_days[last], obs_depths[last]
+
+        # day offset of each simulation step
+        steps = np.arange(len(ClockStruct.time_span), dtype=np.float64)
+
+        # check water table method (a single depth is constant accross
+        # the whole simulation with either method)
+        if WTMethod == "Constant":
+
+            # No interpolation between dates: each depth holds from its
+            # date to the next observation, the first one also before it
+            idx = np.searchsorted(obs_days, steps, side="right") - 1
+            z_gw = obs_depths[np.maximum(idx, 0)]
+
+        elif WTMethod == "Variable":
+
+            # Linear interpolation between dates, the first and last
+            # depths hold before and after the observations
+            z_gw = np.interp(steps, obs_days.astype(np.float64), obs_depths)
 
         # assign values to Paramstruct object
-        ParamStruct.z_gw = z_gw.values
-        ParamStruct.zGW_dates = z_gw.index.values
+        ParamStruct.z_gw = z_gw
+        ParamStruct.zGW_dates = ClockStruct.time_span.values
         ParamStruct.WTMethod = WTMethod
 
     return ParamStruct
-
@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 
 from ..entities.irrigationManagement import IrrMngtStruct
+from .compute_weather_arrays import day_ordinal
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -37,31 +38,21 @@ def read_irrigation_management(
     # If specified, read input irrigation time-series
     if IrrMngt.irrigation_method == 3:
 
-        df = IrrMngt.Schedule.copy()
-        # change the index to the date
-        df.index = pd.DatetimeIndex(df.Date)
-
-        try:
-            # create a dateframe containing the daily irrigation to
-            # be applied for every day in the simulation
-            df = df.reindex(ClockStruct.time_span, fill_value=0).drop("Date", axis=1)
-
-            IrrMngt.Schedule = np.array(df.values, dtype=float).flatten()
-            
-        except TypeError:
-            # older version of pandas with not reindex
-
-            # create new dataframe for whole simulation
-            # populate new dataframe with old values
-            new_df = pd.DataFrame(data=np.zeros(len(ClockStruct.time_span)),
-                index=pd.to_datetime(ClockStruct.time_span),
-                columns=['Depth']
-                )
-                
-            # fill in the new dataframe with irrigation schedule
-            new_df.loc[df.index]=df.Depth.values
-
-            IrrMngt.Schedule = np.array(new_df.values, dtype=float).flatten()
+        df = IrrMngt.Schedule
+        schedule_days = day_ordinal(pd.DatetimeIndex(df.Date))
+        if len(np.unique(schedule_days)) < len(schedule_days):
+            raise ValueError("irrigation schedule has more than one row for the same date")
+
+        # daily irrigation to be applied for every day in the simulation
+        # (0 on the days missing from the schedule)
+        depths = df.drop("Date", axis=1).to_numpy(dtype=float)
+        steps = schedule_days - day_ordinal(ClockStruct.simulation_start_date)
+        in_simulation = (steps >= 0) & (steps < len(ClockStruct.time_span))
+
+        schedule = np.zeros((len(ClockStruct.time_span), depths.shape[1]))
+        schedule[steps[in_simulation]] = depths[in_simulation]
+
+        IrrMngt.Schedule = schedule.flatten()
 
     else:
 
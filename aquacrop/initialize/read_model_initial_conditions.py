@@ -44,7 +44,8 @@ def read_model_initial_conditions(
     # creat initial condition class
     ###################
 
-    InitCond = InitialCondition(len(ParamStruct.Soil.profile))
+    soil = ParamStruct.Soil
+    InitCond = InitialCondition(len(soil.column("dz")))
 
     # class_args = {key:value for key, value in InitCond_class.__dict__.items() if not key.startswith('__') and not callable(key)}
     # InitCond = InitCondStruct(**class_args)
@@ -54,8 +55,8 @@ def read_model_initial_conditions(
         InitCond.cc0_adj = 0.
 
     elif ClockStruct.season_counter == 0:
-        InitCond.z_root = ParamStruct.Seasonal_Crop_List[0].Zmin
-        InitCond.cc0_adj = ParamStruct.Seasonal_Crop_List[0].CC0
+        InitCond.z_root = ParamStruct.Seasonal_Crops.season(0).Zmin
+        InitCond.cc0_adj = ParamStruct.Seasonal_Crops.season(0).CC0
 
     # Set HIfinal to crop's reference harvest index
     InitCond.HIfinal = crop.HI0
@@ -65,37 +66,16 @@ def read_model_initial_conditions(
     ##################
 
     # Initial surface storage between any soil bunds
-    if ClockStruct.season_counter == -1:
-        # First day of simulation is in fallow period
-        if (ParamStruct.FallowFieldMngt.bunds) and (
-            float(ParamStruct.FallowFieldMngt.z_bund) > 0.001
-        ):
-            # Get initial storage between surface bunds
-            InitCond.surface_storage = float(ParamStruct.FallowFieldMngt.bund_water)
-            if InitCond.surface_storage > float(ParamStruct.FallowFieldMngt.z_bund):
-                InitCond.surface_storage = float(ParamStruct.FallowFieldMngt.z_bund)
-        else:
-            # No surface bunds
-            InitCond.surface_storage = 0
-
-    elif ClockStruct.season_counter == 0:
-        # First day of simulation is in first growing season
-        # Get relevant field management structure parameters
-        FieldMngtTmp = ParamStruct.FieldMngt
-        if (FieldMngtTmp.bunds) and (float(FieldMngtTmp.z_bund) > 0.001):
-            # Get initial storage between surface bunds
-            InitCond.surface_storage = float(FieldMngtTmp.bund_water)
-            if InitCond.surface_storage > float(FieldMngtTmp.z_bund):
-                InitCond.surface_storage = float(FieldMngtTmp.z_bund)
-        else:
-            # No surface bunds
-            InitCond.surface_storage = 0
+    InitCond.surface_storage = initial_surface_storage(ParamStruct, ClockStruct)
 
     ############
     # watertable
     ############
 
-    profile = ParamStruct.Soil.profile
+    th_fc = np.asarray(soil.column("th_fc"), dtype=np.float64)
+    th_s = np.asarray(soil.column("th_s"), dtype=np.float64)
+    layers = soil.column("Layer")
+    dzsum = soil.column("dzsum")
 
     # Check for presence of groundwater table
     if ParamStruct.water_table == 0:  # No water table present
@@ -103,64 +83,62 @@ def read_model_initial_conditions(
         InitCond.z_gw = ModelConstants.NO_VALUE
         InitCond.wt_in_soil = False
         # Set adjusted field capacity to default field capacity
-        InitCond.th_fc_Adj = profile.th_fc.values
+        InitCond.th_fc_Adj = th_fc.copy()
     elif ParamStruct.water_table == 1:  # Water table is present
         # Set initial groundwater level
         InitCond.z_gw = float(ParamStruct.z_gw[ClockStruct.time_step_counter])
         # Find compartment mid-points
-        zMid = profile.zMid
+        zMid = np.asarray(soil.column("zMid"), dtype=np.float64)
         # Check if water table is within modelled soil profile
         if InitCond.z_gw >= 0:
-            idx = zMid[zMid >= InitCond.z_gw].index
-            if idx.shape[0] == 0:
-                InitCond.wt_in_soil = False
-            else:
-                InitCond.wt_in_soil = True
+            InitCond.wt_in_soil = bool((zMid >= InitCond.z_gw).any())
         else:
             InitCond.wt_in_soil = False
 
         # Adjust compartment field capacity
-        compi = int(len(profile)) - 1
+        compi = len(th_fc) - 1
         thfcAdj = np.zeros(compi + 1)
         while compi >= 0:
             # get soil layer of compartment
-            compdf = profile.loc[compi]
-            if compdf.th_fc <= 0.1:
+            if th_fc[compi] <= 0.1:
                 Xmax = 1
             else:
-                if compdf.th_fc >= 0.3:
+                if th_fc[compi] >= 0.3:
                     Xmax = 2
                 else:
-                    pF = 2 + 0.3 * (compdf.th_fc - 0.1) / 0.2
+                    pF = 2 + 0.3 * (th_fc[compi] - 0.1) / 0.2
                     Xmax = (np.exp(pF * np.log(10))) / 100
 
-            if (InitCond.z_gw < 0) or ((InitCond.z_gw - zMid.iloc[compi]) >= Xmax):
-                for ii in range(compi+1):
-                    compdfii = profile.loc[ii]
-                    thfcAdj[ii] = compdfii.th_fc
+            if (InitCond.z_gw < 0) or ((InitCond.z_gw - zMid[compi]) >= Xmax):
+                thfcAdj[:compi + 1] = th_fc[:compi + 1]
 
                 compi = -1
             else:
-                if compdf.th_fc >= compdf.th_s:
-                    thfcAdj[compi] = compdf.th_fc
+                if th_fc[compi] >= th_s[compi]:
+                    thfcAdj[compi] = th_fc[compi]
                 else:
-                    if zMid.iloc[compi] >= InitCond.z_gw:
-                        thfcAdj[compi] = compdf.th_s
+                    if zMid[compi] >= InitCond.z_gw:
+                        thfcAdj[compi] = th_s[compi]
                     else:
-                        dV = compdf.th_s - compdf.th_fc
-                        dFC = (dV / (Xmax ** 2)) * ((zMid.iloc[compi] - (InitCond.z_gw - Xmax)) ** 2)
-                        thfcAdj[compi] = compdf.th_fc + dFC
+                        dV = th_s[compi] - th_fc[compi]
+                        dFC = (dV / (Xmax ** 2)) * ((zMid[compi] - (InitCond.z_gw - Xmax)) ** 2)
+                        thfcAdj[compi] = th_fc[compi] + dFC
 
                 compi = compi - 1
 
         # Store adjusted field capacity values
         InitCond.th_fc_Adj = np.round(thfcAdj, 3)
 
-    profile["th_fc_Adj"] = np.round(InitCond.th_fc_Adj, 3)
+    soil.set_column("th_fc_Adj", np.round(InitCond.th_fc_Adj, 3))
 
-    # create hydrology df to group by layer instead of compartment
-    ParamStruct.Soil.Hydrology = profile.groupby("Layer").mean().drop(["dz", "dzsum"], axis=1)
-    ParamStruct.Soil.Hydrology["dz"] = profile.groupby("Layer").sum().dz
+    # soil hydraulic properties by layer instead of compartment
+    layer_th_wp = soil.layer_means("th_wp")
+    layer_th_fc = soil.layer_means("th_fc")
+    layer_th_s = soil.layer_means("th_s")
+    hydf = {
+        layer: {"th_wp": layer_th_wp[layer], "th_fc": layer_th_fc[layer], "th_s": layer_th_s[layer]}
+        for layer in layer_th_wp
+    }
 
     ###################
     # initial water contents
@@ -174,8 +152,6 @@ def read_model_initial_conditions(
 
     values = np.zeros(len(datapoints))
 
-    hydf = ParamStruct.Soil.Hydrology
-
     # Assign data
     if typestr == "Num":
         # Values are defined as numbers (m3/m3) so no calculation required
@@ -194,23 +170,23 @@ def read_model_initial_conditions(
                 value = datapoints[ii]
 
                 # Find layer at specified depth
-                if depth < profile.dzsum.iloc[-1]:
-                    layer = profile.query(f"{depth}<dzsum").Layer.iloc[0]
+                if depth < dzsum[-1]:
+                    layer = layers[np.argmax(depth < dzsum)]
                 else:
-                    layer = profile.Layer.iloc[-1]
+                    layer = layers[-1]
 
-                compdf = hydf.loc[layer]
+                compdf = hydf[int(layer)]
 
                 # Calculate moisture content at specified depth
-                values[ii] = compdf.th_wp + ((value / 100) * (compdf.th_fc - compdf.th_wp))
+                values[ii] = compdf['th_wp'] + ((value / 100) * (compdf['th_fc'] - compdf['th_wp']))
             elif methodstr == "Layer":
                 # Calculate moisture content at specified layer
                 layer = depth_layer[ii]
                 value = datapoints[ii]
 
-                compdf = hydf.loc[layer]
+                compdf = hydf[int(layer)]
 
-                values[ii] = compdf.th_wp + ((value / 100) * (compdf.th_fc - compdf.th_wp))
+                values[ii] = compdf['th_wp'] + ((value / 100) * (compdf['th_fc'] - compdf['th_wp']))
 
     elif typestr == "Prop":
         # Values are specified as soil hydraulic properties (SAT, FC, or WP).
@@ -225,46 +201,44 @@ def read_model_initial_conditions(
                 value = datapoints[ii]
 
                 # Find layer at specified depth
-                if depth < profile.dzsum.iloc[-1]:
-                    layer = profile.query(f"{depth}<dzsum").Layer.iloc[0]
+                if depth < dzsum[-1]:
+                    layer = layers[np.argmax(depth < dzsum)]
                 else:
-                    layer = profile.Layer.iloc[-1]
+                    layer = layers[-1]
 
-                compdf = hydf.loc[layer]
+                compdf = hydf[int(layer)]
 
                 # Calculate moisture content at specified depth
                 if value == "SAT":
-                    values[ii] = compdf.th_s
+                    values[ii] = compdf['th_s']
                 if value == "FC":
-                    values[ii] = compdf.th_fc
+                    values[ii] = compdf['th_fc']
                 if value == "WP":
-                    values[ii] = compdf.th_wp
+                    values[ii] = compdf['th_wp']
 
             elif methodstr == "Layer":
                 # Calculate moisture content at specified layer
                 layer = depth_layer[ii]
                 value = datapoints[ii]
 
-                compdf = hydf.loc[layer]
+                compdf = hydf[int(layer)]
 
                 if value == "SAT":
-                    values[ii] = compdf.th_s
+                    values[ii] = compdf['th_s']
                 if value == "FC":
-                    values[ii] = compdf.th_fc
+                    values[ii] = compdf['th_fc']
                 if value == "WP":
-                    values[ii] = compdf.th_wp
+                    values[ii] = compdf['th_wp']
 
     # Interpolate values to all soil compartments
 
-    thini = np.zeros(int(profile.shape[0]))
+    thini = np.zeros(len(layers))
     if methodstr == "Layer":
         for ii in range(len(values)):
             layer = depth_layer[ii]
             value = values[ii]
 
-            idx = profile.query(f"Layer=={int(layer)}").index
-
-            thini[idx] = value
+            thini[layers == int(layer)] = value
 
         InitCond.th = thini
 
@@ -282,7 +256,7 @@ def read_model_initial_conditions(
             values = np.append(values, [values[-1]])
 
         # Find centroids of compartments
-        SoilDepths = profile.dzsum.values
+        SoilDepths = dzsum
         comp_top = np.append([0], SoilDepths[:-1])
         comp_bot = SoilDepths
         comp_mid = (comp_top + comp_bot) / 2
@@ -301,19 +275,51 @@ def read_model_initial_conditions(
     # contents below the water table to saturation
     if InitCond.wt_in_soil is True:
         # Find compartment mid-points
-        SoilDepths = profile.dzsum.values
+        SoilDepths = dzsum
         comp_top = np.append([0], SoilDepths[:-1])
         comp_bot = SoilDepths
         comp_mid = (comp_top + comp_bot) / 2
         idx = np.where(comp_mid >= InitCond.z_gw)[0][0]
-        for ii in range(idx, len(profile)):
-            layeri = profile.loc[ii].Layer
-            InitCond.th[ii] = hydf.th_s.loc[layeri]
+        for ii in range(idx, len(layers)):
+            InitCond.th[ii] = hydf[int(layers[ii])]['th_s']
 
     InitCond.thini = InitCond.th
 
-    ParamStruct.Soil.profile = profile
-    ParamStruct.Soil.Hydrology = hydf
-
     return ParamStruct, InitCond
 
+
+
+def initial_surface_storage(
+    ParamStruct: "ParamStruct",
+    ClockStruct: "ClockStruct") -> float:
+    """
+    Function to get the water stored between soil bunds on the first day of the simulation
+
+    Arguments:
+
+        ParamStruct (ParamStruct):  Contains model paramaters
+
+        ClockStruct (ClockStruct):  time paramaters
+
+    Returns:
+
+        surface_storage (float):  initial surface storage (mm)
+
+    """
+    if ClockStruct.season_counter == -1:
+        # First day of simulation is in fallow period
+        FieldMngtTmp = ParamStruct.FallowFieldMngt
+    else:
+        # First day of simulation is in first growing season
+        FieldMngtTmp = ParamStruct.FieldMngt
+
+    if (FieldMngtTmp.bunds) and (float(FieldMngtTmp.z_bund) > 0.001):
+        # Get initial storage between surface bunds
+        surface_storage = float(FieldMngtTmp.bund_water)
+        if surface_storage > float(FieldMngtTmp.z_bund):
+            surface_storage = float(FieldMngtTmp.z_bund)
+    else:
+        # No surface bunds
+        surface_storage = 0
+
+    return surface_storage
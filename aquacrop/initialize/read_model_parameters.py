@@ -2,7 +2,9 @@ import numpy as np
 import pandas as pd
 from ..entities.paramStruct import ParamStruct
 from .compute_crop_calendar import compute_crop_calendar
-from typing import TYPE_CHECKING
+from .compute_weather_arrays import day_ordinal
+from .parse_dates import month_day, parse_date
+from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     # Important: classes are only imported when types are checked, not in production.
@@ -11,12 +13,14 @@ if TYPE_CHECKING:
     from aquacrop.entities.crop import Crop
     from aquacrop.entities.inititalWaterContent import InitialWaterContent
     from aquacrop.entities.soil import Soil
+    from aquacrop.initialize.compute_gdd_cache import GDDCache
 
 def read_model_parameters(
     clock_struct: "ClockStruct",
     soil: "Soil",
     crop: "Crop",
-    weather_df: "DataFrame"):
+    weather_df: "DataFrame",
+    gdd_cache: Optional["GDDCache"] = None):
 
     """
     Finalise soil and crop paramaters including planting and harvest dates
@@ -33,6 +37,8 @@ def read_model_parameters(
 
         weather_df (DataFrame): list of datetimes
 
+        gdd_cache (GDDCache): daily growing degree days of weather_df
+
     Returns:
 
         clock_struct (ClockStruct): updated time paramaters
@@ -42,18 +48,22 @@ def read_model_parameters(
     """
     # create param_struct object
     param_struct = ParamStruct()
+    param_struct.gdd_cache = gdd_cache
 
     soil.fill_nan()
 
     # Assign soil object to param_struct
     param_struct.Soil = soil
 
+    # deepen the lowest thin compartment until the soil is deeper than the roots
     while soil.zSoil < crop.Zmax + 0.1:
-        for i in soil.profile.index[::-1]:
-            if soil.profile.loc[i, "dz"] < 0.25:
-                soil.profile.loc[i, "dz"] += 0.1
-                soil.fill_nan()
-                break
+        dz = soil.column("dz").copy()
+        thin = np.flatnonzero(dz < 0.25)
+        if len(thin) == 0:
+            raise ValueError("soil profile is too shallow for the maximum rooting depth")
+        dz[thin[-1]] += 0.1
+        soil.set_column("dz", dz)
+        soil.fill_nan()
 
     # TODO: Why all these commented lines? The model does not allow rotations now?
     ###########
@@ -113,19 +123,19 @@ def read_model_parameters(
             clock_struct.simulation_end_date,
             clock_struct.time_span,
             weather_df,
+            gdd_cache,
         )
         mature = int(crop.MaturityCD + 30)
-        plant = pd.to_datetime("1990/" + crop.planting_date)
+        plant = parse_date("1990/" + crop.planting_date)
         harv = plant + np.timedelta64(mature, "D")
-        new_harvest_date = str(harv.month) + "/" + str(harv.day)
-        crop.harvest_date = new_harvest_date
+        crop.harvest_date = month_day(harv)
 
     # extract years from simulation start and end date
     start_end_years = [sim_start_date.year, sim_end_date.year]
 
     # check if crop growing season runs over calander year
     # Planting and harvest dates are in days/months format so just add arbitrary year
-    single_year = pd.to_datetime("1990/" + crop.planting_date) < pd.to_datetime(
+    single_year = parse_date("1990/" + crop.planting_date) < parse_date(
         "1990/" + crop.harvest_date
     )
 
@@ -133,8 +143,8 @@ def read_model_parameters(
         # if normal year
 
         # Check if the simulation in the following year does not exceed planting date.
-        mock_simulation_end_date = pd.to_datetime("1990/" + f'{sim_end_date.month}' + "/" + f'{sim_end_date.day}')
-        mock_simulation_start_date = pd.to_datetime("1990/" + crop.planting_date)
+        mock_simulation_end_date = parse_date("1990/" + f'{sim_end_date.month}' + "/" + f'{sim_end_date.day}')
+        mock_simulation_start_date = parse_date("1990/" + crop.planting_date)
         last_simulation_year_does_not_start = mock_simulation_end_date <= mock_simulation_start_date
 
         if last_simulation_year_does_not_start:
@@ -148,8 +158,8 @@ def read_model_parameters(
         # and harvest year starts 1 year after sim start
 
         if (
-            pd.to_datetime(str(start_end_years[1] + 2) + "/" + crop.harvest_date)
-            < sim_end_date
+            parse_date(str(start_end_years[1] + 2) + "/" + crop.harvest_date)
+            < np.datetime64(sim_end_date)
         ):
 
             # specify shifted planting and harvest years
@@ -163,8 +173,8 @@ def read_model_parameters(
     # Correct for partial first growing season (may occur when simulating
     # off-season soil water balance)
     if (
-        pd.to_datetime(str(plant_years[0]) + "/" + crop.planting_date)
-        < clock_struct.simulation_start_date
+        parse_date(str(plant_years[0]) + "/" + crop.planting_date)
+        < np.datetime64(clock_struct.simulation_start_date)
     ):
         # shift everything by 1 year
         plant_years = plant_years[1:]
@@ -192,12 +202,21 @@ def read_model_parameters(
     param_struct.CropChoices = list(crop_choices)
 
     # save clock paramaters
-    clock_struct.planting_dates = pd.to_datetime(planting_dates)
-    clock_struct.harvest_dates = pd.to_datetime(harvest_dates)
+    clock_struct.planting_dates = pd.DatetimeIndex(
+        np.array([parse_date(date) for date in planting_dates], dtype="datetime64[D]")
+    )
+    clock_struct.harvest_dates = pd.DatetimeIndex(
+        np.array([parse_date(date) for date in harvest_dates], dtype="datetime64[D]")
+    )
     clock_struct.n_seasons = len(planting_dates)
 
+    # planting and harvest dates as day indices of the time-step loop
+    start_day = day_ordinal(clock_struct.simulation_start_date)
+    clock_struct.planting_steps = (day_ordinal(clock_struct.planting_dates) - start_day).tolist()
+    clock_struct.harvest_steps = (day_ordinal(clock_struct.harvest_dates) - start_day).tolist()
+
     # Initialise growing season counter
-    if pd.to_datetime(clock_struct.step_start_time) == clock_struct.planting_dates[0]:
+    if clock_struct.planting_steps[0] == clock_struct.time_step_counter:
         clock_struct.season_counter = 0
     else:
         clock_struct.season_counter = -1
@@ -1,6 +1,8 @@
 """
 Initialize weather data
 """
+import numpy as np
+
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -26,21 +28,22 @@ def read_weather_inputs(
     """
 
     # get the start and end dates of simulation
-    start_date = clock_sctruct.simulation_start_date
-    end_date = clock_sctruct.simulation_end_date
+    start_date = np.datetime64(clock_sctruct.simulation_start_date)
+    end_date = np.datetime64(clock_sctruct.simulation_end_date)
+
+    dates = weather_df.Date.to_numpy()
 
-    if weather_df.Date.iloc[0] > start_date:
+    if dates[0] > start_date:
         raise ValueError(
             "The first date of the climate data cannot be longer than the start date of the model."
         )
 
-    if weather_df.Date.iloc[-1] < end_date:
+    if dates[-1] < end_date:
         raise ValueError(
             "The model end date cannot be longer than the last date of climate data."
         )
 
     # remove weather data outside of simulation dates
-    weather_df = weather_df[weather_df.Date >= start_date]
-    weather_df = weather_df[weather_df.Date <= end_date]
+    weather_df = weather_df[(dates >= start_date) & (dates <= end_date)]
 
     return weather_df
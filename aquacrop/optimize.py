@@ -0,0 +1,450 @@
+"""
+This file contains optimize_irrigation, which searches the irrigation
+management parameters that maximise an objective with differential evolution.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from .entities.irrigationManagement import IrrigationManagement
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+    from pandas import DataFrame
+    from aquacrop.core import AquaCropModel
+
+# irrigation management parameters that can be searched, and the irrigation
+# method they require (None if any irrigation method applies)
+SEARCH_PARAMS = {"SMT": 1, "IrrInterval": 2, "MaxIrrSeason": None}
+
+# initialized model shared by the candidates evaluated in a worker process
+_worker_model: Optional["AquaCropModel"] = None
+
+
+def mean_yield(final_stats: "DataFrame") -> float:
+    """
+    Default objective: mean dry yield (tonne/ha) of the simulated seasons
+    """
+    return float(final_stats["Dry yield (tonne/ha)"].mean())
+
+
+class OptimizationResult:
+    """
+    Best irrigation management found by optimize_irrigation.
+
+    Attributes:
+
+        params (dict): best value of each searched parameter
+
+        objective (float): objective of the best parameters
+
+        final_stats (DataFrame): final stats of the run with the best parameters
+
+        history (DataFrame): every candidate evaluated, with its generation, \
+            parameters, objective (NaN if it was stopped early) and whether \
+            it was stopped early
+
+        n_evaluations (int): number of candidates run
+
+        n_pruned (int): number of candidates stopped before the end of the simulation
+
+    """
+
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        objective: float,
+        final_stats: "DataFrame",
+        history: "DataFrame",
+    ):
+        self.params = params
+        self.objective = objective
+        self.final_stats = final_stats
+        self.history = history
+        self.n_evaluations = len(history)
+        self.n_pruned = int(history["pruned"].sum())
+
+    def __repr__(self):
+        return f"OptimizationResult(params={self.params!r}, objective={self.objective!r})"
+
+
+def optimize_irrigation(
+    config: Dict[str, Any],
+    space: Mapping[str, Any],
+    objective: Callable[["DataFrame"], float] = mean_yield,
+    popsize: int = 10,
+    maxiter: int = 20,
+    tol: float = 0.01,
+    mutation: float = 0.8,
+    recombination: float = 0.9,
+    early_stopping: Optional[float] = 0.1,
+    check_every: int = 10,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    mp_context=None,
+) -> OptimizationResult:
+    """
+    Search the irrigation management parameters that maximise an objective.
+
+    The search uses differential evolution (rand/1/bin), a derivative-free
+    method: each generation builds one trial candidate per member of the
+    population, and a trial replaces its member if its objective is at
+    least as good. The model is initialized once, every candidate is a
+    fork of it with its own irrigation management (see
+    `AquaCropModel.fork`), and the candidates of a generation are run on a
+    pool of worker processes.
+
+    With early_stopping, a trial is compared every check_every days with
+    the run of the member it competes with, and is stopped as soon as it
+    is clearly dominated: it has applied at least as much irrigation, has
+    no more yield from the finished seasons and no more biomass in the
+    current season, and is short of one of these by more than the
+    early_stopping fraction. This assumes the objective increases with
+    yield and does not increase with irrigation (as do yield, profit or
+    water productivity), set early_stopping to None otherwise.
+
+    Arguments:
+
+        config (dict): AquaCropModel arguments. The daily outputs are not \
+            kept (output_level="final_only"). The irrigation_management, if \
+            given, provides the irrigation method and the parameters that \
+            are not searched
+
+        space (dict): bounds of the searched parameters: "SMT" maps to a list \
+            of 4 (low, high) pairs (%TAW, one per growth stage, irrigation \
+            method 1), "IrrInterval" to a (low, high) pair in days (irrigation \
+            method 2) and "MaxIrrSeason" to a (low, high) pair in mm
+
+        objective: function of the final stats of a run, to maximise
+
+        popsize (int): number of candidates in the population, at least 4
+
+        maxiter (int): maximum number of generations
+
+        tol (float): relative spread of the population objectives at which \
+            the search stops
+
+        mutation (float): differential weight, between 0 and 2
+
+        recombination (float): crossover probability, between 0 and 1
+
+        early_stopping (float): fraction by which a trial must fall short \
+            of the member it competes with to be stopped, None to run every \
+            candidate to the end
+
+        check_every (int): number of days between the early stopping checks
+
+        seed (int): seed of the random number generator
+
+        workers (int): number of worker processes, number of CPUs if None, \
+            candidates are run in this process if 1
+
+        mp_context: multiprocessing context used to start the workers
+
+    Returns:
+
+        OptimizationResult
+    """
+    # pylint: disable=import-outside-toplevel
+    from .core import AquaCropModel
+
+    names, lower, upper = _search_bounds(space)
+    method = _irrigation_method(space, config.get("irrigation_management"))
+
+    if popsize < 4:
+        raise ValueError("popsize must be equal to or greater than 4.")
+    if maxiter < 0:
+        raise ValueError("maxiter must be equal to or greater than 0.")
+    if not 0 <= mutation <= 2:
+        raise ValueError("mutation must be between 0 and 2.")
+    if not 0 <= recombination <= 1:
+        raise ValueError("recombination must be between 0 and 1.")
+    if early_stopping is not None and not 0 <= early_stopping < 1:
+        raise ValueError("early_stopping must be between 0 and 1, or None.")
+    if check_every < 1:
+        raise ValueError("check_every must be equal to or greater than 1.")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be equal to or greater than 1.")
+
+    config = dict(config, output_level="final_only", output_sink=None)
+    if config.get("irrigation_management") is None:
+        config["irrigation_management"] = IrrigationManagement(irrigation_method=method)
+    base = AquaCropModel(**config)
+    base._initialize()
+
+    rng = np.random.default_rng(seed)
+    population = lower + rng.random((popsize, len(lower))) * (upper - lower)
+    history = []
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(base,),
+        )
+
+    try:
+        runs = _evaluate_all(base, pool, names, population, [None] * popsize, check_every)
+        fitness = np.array([objective(final_stats) for final_stats, _ in runs])
+        _record(history, 0, names, population, fitness, [False] * popsize)
+
+        for generation in range(1, maxiter + 1):
+            if np.std(fitness) <= tol * abs(np.mean(fitness)):
+                break
+
+            trials = _trials(rng, population, lower, upper, mutation, recombination)
+            references = [
+                (trajectory, early_stopping) if early_stopping is not None else None
+                for _, trajectory in runs
+            ]
+            trial_runs = _evaluate_all(base, pool, names, trials, references, check_every)
+
+            trial_fitness = np.full(popsize, np.nan)
+            for i, (final_stats, _) in enumerate(trial_runs):
+                if final_stats is None:
+                    continue
+                trial_fitness[i] = objective(final_stats)
+                if trial_fitness[i] >= fitness[i]:
+                    population[i] = trials[i]
+                    fitness[i] = trial_fitness[i]
+                    runs[i] = trial_runs[i]
+            _record(
+                history, generation, names, trials, trial_fitness,
+                [final_stats is None for final_stats, _ in trial_runs],
+            )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best = int(np.argmax(fitness))
+    return OptimizationResult(
+        _decode(names, population[best]),
+        float(fitness[best]),
+        runs[best][0],
+        pd.DataFrame(history),
+    )
+
+
+def _search_bounds(space: Mapping[str, Any]) -> Tuple[List[str], "ndarray", "ndarray"]:
+    """
+    Flatten the bounds of the searched parameters.
+
+    Returns:
+
+        names: name of each searched value ("SMT" is repeated for each growth stage)
+
+        lower: lower bound of each value
+
+        upper: upper bound of each value
+    """
+    if len(space) == 0:
+        raise ValueError("space must contain at least one parameter.")
+
+    names, bounds = [], []
+    for name, value in space.items():
+        if name not in SEARCH_PARAMS:
+            raise ValueError(f"space parameters must be in {tuple(SEARCH_PARAMS)}, not '{name}'")
+        if name == "SMT":
+            if len(value) != 4:
+                raise ValueError("SMT bounds must be given for the 4 growth stages.")
+            names.extend(["SMT"] * 4)
+            bounds.extend(value)
+        else:
+            names.append(name)
+            bounds.append(value)
+
+    lower, upper = np.array(bounds, dtype=float).T
+    if (lower > upper).any():
+        raise ValueError("the lower bound of a parameter is greater than its upper bound.")
+    if "IrrInterval" in space and lower[names.index("IrrInterval")] < 1:
+        raise ValueError("IrrInterval must be equal to or greater than 1.")
+
+    return names, lower, upper
+
+
+def _irrigation_method(space: Mapping[str, Any], irrigation_management) -> int:
+    """
+    Irrigation method of the candidates, checked against the searched parameters
+    """
+    methods = {SEARCH_PARAMS[name] for name in space} - {None}
+    if len(methods) > 1:
+        raise ValueError("SMT and IrrInterval belong to different irrigation methods.")
+
+    if irrigation_management is not None:
+        method = irrigation_management.irrigation_method
+        if methods and method not in methods:
+            raise ValueError(
+                f"the irrigation_management method ({method}) does not use "
+                + f"the searched parameters (method {methods.pop()})."
+            )
+    elif methods:
+        method = methods.pop()
+    else:
+        method = 0
+
+    if method == 0:
+        raise ValueError(
+            "MaxIrrSeason alone needs an irrigation_management with an irrigation method."
+        )
+    return method
+
+
+def _decode(names: Sequence[str], values: "ndarray") -> Dict[str, Any]:
+    """
+    Irrigation management parameters of a candidate
+    """
+    params = {}
+    for name, value in zip(names, values):
+        if name == "SMT":
+            params.setdefault("SMT", []).append(float(value))
+        elif name == "IrrInterval":
+            params[name] = int(round(value))
+        else:
+            params[name] = float(value)
+    return params
+
+
+def _trials(rng, population, lower, upper, mutation, recombination) -> "ndarray":
+    """
+    Build one trial candidate per member of the population (rand/1/bin)
+    """
+    popsize, n_values = population.shape
+    trials = population.copy()
+    for i in range(popsize):
+        others = [j for j in range(popsize) if j != i]
+        a, b, c = rng.choice(others, 3, replace=False)
+        mutant = population[a] + mutation * (population[b] - population[c])
+        crossover = rng.random(n_values) < recombination
+        # at least one value comes from the mutant
+        crossover[rng.integers(n_values)] = True
+        trials[i] = np.where(crossover, mutant, population[i])
+
+    return np.clip(trials, lower, upper)
+
+
+def _record(history, generation, names, candidates, fitness, pruned) -> None:
+    """
+    Append the evaluated candidates to the history
+    """
+    for values, value, stopped in zip(candidates, fitness, pruned):
+        row = {"generation": generation}
+        for name, param in _decode(names, values).items():
+            if name == "SMT":
+                row.update({f"SMT{stage + 1}": smt for stage, smt in enumerate(param)})
+            else:
+                row[name] = param
+        row["objective"] = value
+        row["pruned"] = stopped
+        history.append(row)
+
+
+def _evaluate_all(base, pool, names, candidates, references, check_every) -> List[tuple]:
+    """
+    Run the candidates, in this process or on the pool (results in the order of the candidates)
+    """
+    tasks = [
+        (_decode(names, values), reference, check_every)
+        for values, reference in zip(candidates, references)
+    ]
+    if pool is None:
+        return [_evaluate(base, *task) for task in tasks]
+    return list(pool.map(_evaluate_in_worker, tasks))
+
+
+def _init_worker(model: "AquaCropModel") -> None:
+    """
+    Keep the initialized model in a worker process
+    """
+    global _worker_model  # pylint: disable=global-statement
+    _worker_model = model
+
+
+def _evaluate_in_worker(task: tuple) -> tuple:
+    """
+    Run one candidate in a worker process
+    """
+    return _evaluate(_worker_model, *task)
+
+
+def _evaluate(
+    base: "AquaCropModel",
+    params: Dict[str, Any],
+    reference: Optional[Tuple["ndarray", float]],
+    check_every: int,
+) -> Tuple[Optional["DataFrame"], "ndarray"]:
+    """
+    Run one candidate from the initialized model.
+
+    Arguments:
+
+        base: initialized model
+
+        params: irrigation management parameters of the candidate
+
+        reference: (trajectory, early_stopping) of the run the candidate \
+            competes with, None to run it to the end
+
+        check_every: number of days between the checks
+
+    Returns:
+
+        final_stats: final stats of the run, None if it was stopped early
+
+        trajectory: irrigation, yield and biomass totals at every check
+    """
+    model = base.fork()[0]
+    irr_mngt = model._param_struct.IrrMngt
+    for name, value in params.items():
+        setattr(irr_mngt, name, np.array(value, dtype=float) if name == "SMT" else value)
+
+    trajectory = []
+    while model._clock_struct.model_is_finished is False:
+        model.run_model(num_steps=check_every, initialize_model=False)
+        trajectory.append(_totals(model))
+        if reference is not None:
+            ref_trajectory, margin = reference
+            check = len(trajectory) - 1
+            if check < len(ref_trajectory) and _is_dominated(
+                trajectory[check], ref_trajectory[check], margin
+            ):
+                return None, np.array(trajectory)
+
+    return model._outputs.final_stats, np.array(trajectory)
+
+
+def _totals(model: "AquaCropModel") -> Tuple[float, float, float]:
+    """
+    Irrigation applied so far (mm), dry yield of the finished seasons
+    (tonne/ha) and biomass of the current season
+    """
+    final_stats = model._outputs.final_stats
+    cond = model._init_cond
+    current = bool(cond.growing_season) and not cond.harvest_flag
+    irrigation = float(final_stats["Seasonal irrigation (mm)"].sum())
+    return (
+        irrigation + (cond.irr_cum if current else 0.0),
+        float(final_stats["Dry yield (tonne/ha)"].sum()),
+        cond.biomass if current else 0.0,
+    )
+
+
+def _is_dominated(totals, reference, margin: float) -> bool:
+    """
+    True if a run is clearly worse than the reference run on the same day
+    """
+    irrigation, crop_yield, biomass = totals
+    ref_irrigation, ref_yield, ref_biomass = reference
+    return (
+        irrigation >= ref_irrigation
+        and crop_yield <= ref_yield
+        and biomass <= ref_biomass
+        and (crop_yield < (1 - margin) * ref_yield or biomass < (1 - margin) * ref_biomass)
+    )
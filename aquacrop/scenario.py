@@ -0,0 +1,143 @@
+"""
+This file contains the ScenarioTemplate class that initializes a model
+setup once for scenarios that only differ in their management.
+"""
+import copy
+from typing import Dict, List, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from pandas import DataFrame
+    from aquacrop.entities.co2 import CO2
+    from aquacrop.entities.crop import Crop
+    from aquacrop.entities.fieldManagement import FieldMngt
+    from aquacrop.entities.groundWater import GroundWater
+    from aquacrop.entities.inititalWaterContent import InitialWaterContent
+    from aquacrop.entities.irrigationManagement import IrrigationManagement
+    from aquacrop.entities.outputSink import OutputSink
+    from aquacrop.entities.soil import Soil
+
+# pylint: disable=wrong-import-position
+from .core import AquaCropModel
+from .initialize.read_field_managment import read_field_management
+from .initialize.read_irrigation_management import read_irrigation_management
+from .initialize.read_model_initial_conditions import initial_surface_storage
+
+
+class ScenarioTemplate:
+    """
+    Initialize one model setup and create models from it that only differ
+    in their irrigation management, field management or fallow field
+    management.
+
+    The clock, weather, crop calendar, CO2 concentrations, soil profile and
+    initial conditions are computed once, by the template. Each model
+    returned by `model()` shares the soil profile, crop parameters, weather
+    arrays and the rest of the parameters with the template (as
+    `AquaCropModel.fork` does), and gets its own clock, initial conditions,
+    outputs and management. Run it with
+    `run_model(till_termination=True, initialize_model=False)`: the results
+    are the same as those of an `AquaCropModel` created with the same
+    arguments (initializing it again also works, but recomputes everything).
+
+    Parameters:
+
+        Same as AquaCropModel, except output_sink which is given to each model.
+        irrigation_management, field_management and fallow_field_management
+        are the defaults of the models.
+
+    """
+
+    def __init__(
+        self,
+        sim_start_time: str,
+        sim_end_time: str,
+        weather_df: "DataFrame",
+        soil: "Soil",
+        crop: "Crop",
+        initial_water_content: "InitialWaterContent",
+        irrigation_management: Optional["IrrigationManagement"] = None,
+        field_management: Optional["FieldMngt"] = None,
+        fallow_field_management: Optional["FieldMngt"] = None,
+        groundwater: Optional["GroundWater"] = None,
+        co2_concentration: Optional["CO2"] = None,
+        off_season: bool = False,
+        backend: Optional[str] = None,
+        output_level: Optional[Union[str, Dict[str, List[str]]]] = None,
+        evap_tolerance: Optional[float] = None,
+    ) -> None:
+
+        # the CO2 concentration of the template must not change when other
+        # models given the same CO2 object run
+        self._model = AquaCropModel(
+            sim_start_time,
+            sim_end_time,
+            weather_df,
+            soil,
+            crop,
+            initial_water_content,
+            irrigation_management=irrigation_management,
+            field_management=field_management,
+            fallow_field_management=fallow_field_management,
+            groundwater=groundwater,
+            co2_concentration=copy.deepcopy(co2_concentration),
+            off_season=off_season,
+            backend=backend,
+            output_level=output_level,
+            evap_tolerance=evap_tolerance,
+        )
+        self._model._initialize()
+
+    def model(
+        self,
+        irrigation_management: Optional["IrrigationManagement"] = None,
+        field_management: Optional["FieldMngt"] = None,
+        fallow_field_management: Optional["FieldMngt"] = None,
+        output_sink: Optional["OutputSink"] = None,
+    ) -> AquaCropModel:
+        """
+        Create an initialized model with the given management.
+
+        Arguments:
+
+            irrigation_management: irrigation strategy, the template's if None
+
+            field_management: field management options, the template's if None
+
+            fallow_field_management: field management options during fallow \
+                periods, the template's if None
+
+            output_sink: destination of the daily outputs, in memory if None
+
+        Returns:
+            model ready to run with `run_model(..., initialize_model=False)`
+        """
+        model = self._model.fork()[0]
+        param_struct = model._param_struct
+
+        if irrigation_management is not None:
+            model.irrigation_management = irrigation_management
+            # the schedule and targets are converted on a copy, so the same
+            # management can be given to many models
+            read_irrigation_management(
+                param_struct, copy.copy(irrigation_management), model._clock_struct
+            )
+
+        if field_management is not None or fallow_field_management is not None:
+            if field_management is not None:
+                model.field_management = field_management
+            if fallow_field_management is not None:
+                model.fallow_field_management = fallow_field_management
+            read_field_management(
+                param_struct, model.field_management, model.fallow_field_management
+            )
+            model._init_cond.surface_storage = initial_surface_storage(
+                param_struct, model._clock_struct
+            )
+
+        # the fork has its own copy of the template's (in memory) outputs
+        if output_sink is not None:
+            model.output_sink = output_sink
+            model._outputs = model._create_outputs()
+
+        return model
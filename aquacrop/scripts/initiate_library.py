@@ -1,5 +1,11 @@
 from subprocess import call
-from tqdm.autonotebook import tqdm
+
+try:
+    from tqdm.autonotebook import tqdm
+except ImportError:
+    # progress bar is optional (pip install aquacrop[progress])
+    def tqdm(iterable):
+        return iterable
 
 modules_to_compile = [
     "aquacrop.solution.water_stress",
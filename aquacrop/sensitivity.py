@@ -0,0 +1,447 @@
+"""
+This file contains run_sensitivity, which estimates the global sensitivity
+(Sobol or Morris indices) of a model output to crop parameters.
+"""
+import copy
+import numbers
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from .initialize.compute_crop_calendar import CALENDAR_PARAMS
+from .optimize import mean_yield
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
+    from numpy import ndarray
+    from pandas import DataFrame
+    from aquacrop.entities.crop import Crop
+    from aquacrop.initialize.compute_gdd_cache import GDDCache
+
+METHODS = ("sobol", "morris")
+
+# crop parameters that change the crop calendar (CC0 is computed from
+# PlantPop and SeedSize)
+_CALENDAR_INPUTS = frozenset(CALENDAR_PARAMS) | {"PlantPop", "SeedSize"}
+
+# bootstrap resamples of the Sobol confidence intervals, and the normal
+# quantile of their 95% level
+_BOOTSTRAP_RESAMPLES = 100
+_Z_95 = 1.959964
+
+# runner of the samples evaluated in a worker process
+_worker_runner: Optional["_Runner"] = None
+
+
+class SensitivityResult:
+    """
+    Sensitivity indices estimated from the runs finished so far.
+
+    Attributes:
+
+        method (str): "sobol" or "morris"
+
+        indices (DataFrame): one row per parameter. Sobol: first-order (S1) \
+            and total-order (ST) indices with the half-width of their 95% \
+            bootstrap confidence intervals (S1_conf, ST_conf). Morris: mean \
+            (mu), mean absolute value (mu_star) and standard deviation \
+            (sigma) of the elementary effects, per fraction of the \
+            parameter range
+
+        samples (DataFrame): parameters and output of every finished run, \
+            with the sample block (Sobol base sample or Morris trajectory) \
+            it belongs to
+
+        n_blocks (int): number of finished sample blocks used by the estimates
+
+        n_runs (int): number of finished runs
+
+        complete (bool): True once every sample block has been run
+
+    """
+
+    def __init__(self, method: str, indices: "DataFrame", samples: "DataFrame", n_blocks: int, complete: bool):
+        self.method = method
+        self.indices = indices
+        self.samples = samples
+        self.n_blocks = n_blocks
+        self.n_runs = len(samples)
+        self.complete = complete
+
+    def __repr__(self):
+        return (
+            f"SensitivityResult(method={self.method!r}, n_blocks={self.n_blocks}, "
+            + f"complete={self.complete})"
+        )
+
+
+def run_sensitivity(
+    config: Dict[str, Any],
+    params: Union[Sequence[str], Mapping[str, Tuple[float, float]]],
+    method: str = "sobol",
+    n: int = 64,
+    output: Callable[["DataFrame"], float] = mean_yield,
+    levels: int = 4,
+    spread: float = 0.1,
+    batch_size: int = 8,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    mp_context=None,
+) -> Iterator[SensitivityResult]:
+    """
+    Estimate the sensitivity of a model output to crop parameters.
+
+    The sample design has n blocks of runs. With method "sobol" each block
+    is a Saltelli base sample (d + 2 runs for d parameters: A, B and A with
+    each column taken from B), giving the first-order (Saltelli 2010) and
+    total-order (Jansen) indices. With method "morris" each block is a
+    trajectory of d + 1 runs on a grid of levels that changes one
+    parameter at a time, giving the statistics of the elementary effects.
+
+    The blocks are run in batches of batch_size on a pool of worker
+    processes, and the indices estimated from all the finished blocks are
+    yielded after each batch: stopping the iteration early leaves usable
+    (if less accurate) estimates. Within a batch, runs that only differ in
+    parameters that do not change the crop calendar (e.g. WP, HI0, p_up1)
+    are evaluated together by one worker, which copies the calendar computed
+    for the first of them (see compute_crop_calendar).
+
+    Arguments:
+
+        config (dict): AquaCropModel arguments. The daily outputs are not \
+            kept (output_level="final_only"). Its crop provides the \
+            parameters that are not sampled
+
+        params: names of the sampled numeric Crop parameters (e.g. "CGC", \
+            "WP", "p_up2", "Tbase"), sampled within spread of the crop's \
+            value, or a dict of their (low, high) bounds
+
+        method (str): "sobol" or "morris"
+
+        n (int): number of Sobol base samples or Morris trajectories, at least 2
+
+        output: function of the final stats of a run, whose sensitivity is estimated
+
+        levels (int): number of levels of the Morris grid, an even number
+
+        spread (float): fraction of the crop's value on each side of it, \
+            used when params are names
+
+        batch_size (int): number of blocks run between two estimates
+
+        seed (int): seed of the random number generator
+
+        workers (int): number of worker processes, number of CPUs if None, \
+            runs are done in this process if 1
+
+        mp_context: multiprocessing context used to start the workers
+
+    Returns:
+
+        iterator of SensitivityResult, one per batch
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be in {METHODS}, not '{method}'")
+    if n < 2:
+        raise ValueError("n must be equal to or greater than 2.")
+    if method == "morris" and (levels < 2 or levels % 2 != 0):
+        raise ValueError("levels must be an even number, equal to or greater than 2.")
+    if batch_size < 1:
+        raise ValueError("batch_size must be equal to or greater than 1.")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be equal to or greater than 1.")
+
+    names, lower, upper = _param_bounds(config["crop"], params, spread)
+    config = dict(config, output_level="final_only", output_sink=None)
+
+    rng = np.random.default_rng(seed)
+    if method == "sobol":
+        design, steps = sobol_design(len(names), n, rng), None
+    else:
+        design, steps = morris_design(len(names), n, levels, rng)
+    values = lower + design * (upper - lower)
+    is_int = np.array([isinstance(getattr(config["crop"], name), numbers.Integral) for name in names])
+    values[..., is_int] = np.round(values[..., is_int])
+
+    return _run_sensitivity(
+        config, names, method, values, steps, output, batch_size, workers, mp_context
+    )
+
+
+def sobol_design(d: int, n: int, rng: "np.random.Generator") -> "ndarray":
+    """
+    Saltelli sample design in the unit hypercube
+
+    Returns:
+
+        design (numpy.ndarray): shape (n, d + 2, d), block i holds A_i, \
+            A_i with column j from B_i (j = 1 to d), then B_i
+    """
+    a = rng.random((n, d))
+    b = rng.random((n, d))
+    design = np.repeat(a[:, None, :], d + 2, axis=1)
+    for j in range(d):
+        design[:, j + 1, j] = b[:, j]
+    design[:, -1] = b
+    return design
+
+
+def morris_design(d: int, r: int, levels: int, rng: "np.random.Generator") -> Tuple["ndarray", "ndarray"]:
+    """
+    Morris trajectories on a grid of levels in the unit hypercube
+
+    Each trajectory starts from a random point of the grid and moves every
+    parameter once, in a random order, by delta = levels / (2 (levels - 1))
+    up or down.
+
+    Returns:
+
+        design (numpy.ndarray): shape (r, d + 1, d), the points of each trajectory
+
+        steps (numpy.ndarray): shape (r, d, 2), parameter moved at each step \
+            and signed delta of the move
+    """
+    delta = levels / (2 * (levels - 1))
+    low = rng.integers(0, levels // 2, (r, d)) / (levels - 1)
+    signs = rng.choice([-1.0, 1.0], (r, d))
+    start = np.where(signs > 0, low, low + delta)
+
+    design = np.repeat(start[:, None, :], d + 1, axis=1)
+    steps = np.empty((r, d, 2))
+    for t in range(r):
+        for k, j in enumerate(rng.permutation(d)):
+            design[t, k + 1:, j] += signs[t, j] * delta
+            steps[t, k] = (j, signs[t, j] * delta)
+    return design, steps
+
+
+def sobol_indices(y: "ndarray", names: Sequence[str]) -> "DataFrame":
+    """
+    First-order and total-order Sobol indices of the outputs of a Saltelli design
+
+    Arguments:
+
+        y (numpy.ndarray): outputs, shape (n, d + 2), in the order of sobol_design
+
+        names: name of each parameter
+
+    Returns:
+
+        indices (DataFrame): S1, S1_conf, ST and ST_conf of each parameter
+    """
+    s1, st = _sobol_estimates(y)
+    # the bootstrap uses its own generator, so the same runs give the same intervals
+    rng = np.random.default_rng(0)
+    resamples = [
+        _sobol_estimates(y[rng.integers(0, len(y), len(y))])
+        for _ in range(_BOOTSTRAP_RESAMPLES)
+    ]
+    s1_boot, st_boot = np.array(resamples).transpose(1, 0, 2)
+    return pd.DataFrame(
+        {
+            "S1": s1,
+            "S1_conf": _Z_95 * np.std(s1_boot, axis=0, ddof=1),
+            "ST": st,
+            "ST_conf": _Z_95 * np.std(st_boot, axis=0, ddof=1),
+        },
+        index=pd.Index(names, name="parameter"),
+    )
+
+
+def morris_indices(y: "ndarray", steps: "ndarray", names: Sequence[str]) -> "DataFrame":
+    """
+    Statistics of the elementary effects of the outputs of Morris trajectories
+
+    Arguments:
+
+        y (numpy.ndarray): outputs, shape (r, d + 1), in the order of morris_design
+
+        steps (numpy.ndarray): steps of the trajectories returned by morris_design
+
+        names: name of each parameter
+
+    Returns:
+
+        indices (DataFrame): mu, mu_star and sigma of each parameter
+    """
+    r, d = steps.shape[:2]
+    effects = np.empty((r, d))
+    rows = np.arange(r)[:, None]
+    effects[rows, steps[:, :, 0].astype(int)] = np.diff(y, axis=1) / steps[:, :, 1]
+    return pd.DataFrame(
+        {
+            "mu": effects.mean(axis=0),
+            "mu_star": np.abs(effects).mean(axis=0),
+            "sigma": effects.std(axis=0, ddof=1) if r > 1 else np.full(d, np.nan),
+        },
+        index=pd.Index(names, name="parameter"),
+    )
+
+
+def _sobol_estimates(y: "ndarray") -> Tuple["ndarray", "ndarray"]:
+    """
+    First-order (Saltelli 2010) and total-order (Jansen) estimates
+    """
+    # centred outputs make the first-order estimate less noisy when the
+    # mean is large compared to the spread
+    f_a, f_b = y[:, :1], y[:, -1:]
+    y = y - np.mean(np.concatenate([f_a, f_b]))
+    f_a, f_ab, f_b = y[:, :1], y[:, 1:-1], y[:, -1:]
+    variance = np.var(np.concatenate([f_a, f_b]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s1 = np.mean(f_b * (f_ab - f_a), axis=0) / variance
+        st = 0.5 * np.mean((f_a - f_ab) ** 2, axis=0) / variance
+    return s1, st
+
+
+def _param_bounds(
+    crop: "Crop", params: Union[Sequence[str], Mapping[str, Tuple[float, float]]], spread: float
+) -> Tuple[List[str], "ndarray", "ndarray"]:
+    """
+    Names and bounds of the sampled crop parameters
+    """
+    if len(params) == 0:
+        raise ValueError("params must contain at least one parameter.")
+
+    names = list(params)
+    for name in names:
+        value = getattr(crop, name, None)
+        if not isinstance(value, numbers.Real) or isinstance(value, bool):
+            raise ValueError(f"'{name}' is not a numeric crop parameter.")
+        if crop.CalendarType == 1 and name in ("CGC", "CDC"):
+            # the calendar sets them from their values in calendar days
+            raise ValueError(f"the crop is in calendar days, sample '{name}_CD' instead of '{name}'.")
+
+    if isinstance(params, Mapping):
+        lower, upper = np.array([params[name] for name in names], dtype=float).T
+    else:
+        if not 0 < spread < 1:
+            raise ValueError("spread must be between 0 and 1.")
+        values = np.array([getattr(crop, name) for name in names], dtype=float)
+        lower = np.minimum(values * (1 - spread), values * (1 + spread))
+        upper = np.maximum(values * (1 - spread), values * (1 + spread))
+
+    for name, low, high in zip(names, lower, upper):
+        if low >= high:
+            raise ValueError(f"the lower bound of '{name}' must be less than its upper bound.")
+    return names, lower, upper
+
+
+def _run_sensitivity(config, names, method, values, steps, output, batch_size, workers, mp_context):
+    """
+    Run the sample blocks batch by batch and yield the estimates
+    """
+    n_blocks, block_size = values.shape[:2]
+    y = np.full((n_blocks, block_size), np.nan)
+    samples = []
+    calendar_columns = [j for j, name in enumerate(names) if name in _CALENDAR_INPUTS]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    runner, pool = None, None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(config,),
+        )
+    else:
+        runner = _Runner(config)
+
+    try:
+        for first in range(0, n_blocks, batch_size):
+            batch = values[first:first + batch_size].reshape(-1, len(names))
+            groups = _calendar_groups(batch, calendar_columns)
+            tasks = [[dict(zip(names, batch[i].tolist())) for i in group] for group in groups]
+            if pool is None:
+                results = [runner.run_group(task) for task in tasks]
+            else:
+                results = list(pool.map(_run_group_in_worker, tasks))
+
+            batch_y = np.empty(len(batch))
+            for group, group_stats in zip(groups, results):
+                for i, final_stats in zip(group, group_stats):
+                    batch_y[i] = output(final_stats)
+            y[first:first + batch_size] = batch_y.reshape(-1, block_size)
+
+            for i, row in enumerate(batch):
+                samples.append({"block": first + i // block_size, **dict(zip(names, row)), "output": batch_y[i]})
+
+            done = min(first + batch_size, n_blocks)
+            if method == "sobol":
+                indices = sobol_indices(y[:done], names)
+            else:
+                indices = morris_indices(y[:done], steps[:done], names)
+            yield SensitivityResult(method, indices, pd.DataFrame(samples), done, done == n_blocks)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _calendar_groups(batch: "ndarray", calendar_columns: Sequence[int]) -> List[List[int]]:
+    """
+    Rows of a batch grouped by the values of the parameters that change the crop calendar
+    """
+    groups: Dict[tuple, List[int]] = {}
+    for i, row in enumerate(batch):
+        groups.setdefault(tuple(row[calendar_columns]), []).append(i)
+    return list(groups.values())
+
+
+class _Runner:
+    """
+    Runs samples of a study, sharing one GDDCache (and so the crop
+    calendars it keeps) between their models
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.gdd_cache: Optional["GDDCache"] = None
+
+    def run_group(self, group: List[Dict[str, float]]) -> List["DataFrame"]:
+        """
+        Run the samples of a group, in order, and return their final stats
+        """
+        return [self.run(params) for params in group]
+
+    def run(self, params: Dict[str, float]) -> "DataFrame":
+        """
+        Run the model with the crop parameters of one sample
+        """
+        # pylint: disable=import-outside-toplevel
+        from .core import AquaCropModel
+
+        # the model changes its soil, crop and management, so each run has its own copies
+        config = {
+            name: value if name == "weather_df" else copy.deepcopy(value)
+            for name, value in self.config.items()
+        }
+        crop = config["crop"]
+        for name, value in params.items():
+            setattr(crop, name, int(value) if isinstance(getattr(crop, name), numbers.Integral) else value)
+        crop.calculate_additional_params()
+
+        model = AquaCropModel(**config)
+        model._initialize(self.gdd_cache)
+        self.gdd_cache = model._param_struct.gdd_cache
+        model.run_model(till_termination=True, initialize_model=False)
+        return model.get_simulation_results()
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """
+    Keep the runner of the study in a worker process
+    """
+    global _worker_runner  # pylint: disable=global-statement
+    _worker_runner = _Runner(config)
+
+
+def _run_group_in_worker(group: List[Dict[str, float]]) -> List["DataFrame"]:
+    """
+    Run a group of samples in a worker process
+    """
+    return _worker_runner.run_group(group)
@@ -12,7 +12,8 @@ def adjust_CCx(
     dt: float,
     tSum: float,
     Crop_CanopyDevEnd: float,
-    Crop_CCx: float
+    Crop_CCx: float,
+    backend: str = "python",
     ) -> float:
     """
     Function to adjust CCx value for changes in CGC due to water stress during the growing season
@@ -40,6 +41,8 @@ def adjust_CCx(
 
         Crop_CCx (float): Maximum canopy cover (fraction of soil cover)
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
     Returns:
 
         CCxAdj (float): Adjusted CCx
@@ -54,7 +57,7 @@ def adjust_CCx(
     ## Determine CCx adjusted ##
     if tCCtmp > 0:
         tCCtmp = tCCtmp + (Crop_CanopyDevEnd - tSum) + dt
-        CCxAdj = cc_development(CCo, CCx, CGC, CDC, tCCtmp, "Growth", Crop_CCx)
+        CCxAdj = cc_development(CCo, CCx, CGC, CDC, tCCtmp, "Growth", Crop_CCx, backend=backend)
     else:
         CCxAdj = 0
 
@@ -0,0 +1,104 @@
+"""
+Selection of the backend used to run the hot kernels of the daily solution.
+
+The kernels are plain Python functions written against numpy arrays and
+scalars only. With the "python" backend (default) they are interpreted as
+usual. With the "numba" backend they are JIT-compiled the first time they
+are called and the compiled version is used from then on. If numba is not
+installed the model falls back to the python backend.
+
+The backend belongs to each model (AquaCropModel.backend, copied to
+ParamStruct.backend): it is passed down to every kernel call, so models
+with different backends can run side by side in the same process.
+"""
+import functools
+import os
+import warnings
+
+from typing import Callable, Optional
+
+BACKEND_ENV = "AQUACROP_BACKEND"
+BACKENDS = ("python", "numba")
+
+_numba = None
+_helpers = []
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Work out the backend to use for a model
+
+    Arguments:
+
+        backend (str): "python", "numba" or None to read the AQUACROP_BACKEND \
+            environment variable (defaults to "python")
+
+    Returns:
+
+        backend (str): backend that will be used
+    """
+    if backend is None:
+        backend = os.environ.get(BACKEND_ENV, "python")
+
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, not '{backend}'")
+
+    if backend == "numba" and _load_numba() is None:
+        warnings.warn("numba is not installed, using the python backend instead.")
+        backend = "python"
+
+    return backend
+
+
+def jitable(func: Callable) -> Callable:
+    """
+    Mark a helper function so that compiled kernels can call it.
+
+    The function itself is returned unchanged.
+    """
+    _helpers.append(func)
+    if _numba is not None:
+        _numba.extending.register_jitable(func)
+    return func
+
+
+def compiled(func: Callable) -> Callable:
+    """
+    Wrap a kernel so that it runs on the backend given by its caller.
+
+    The wrapped kernel takes the keyword argument backend ("python" by
+    default) after its own arguments, and is only compiled the first time
+    it is called with backend="numba".
+    """
+    kernel = None
+
+    @functools.wraps(func)
+    def dispatch(*args, backend: str = "python"):
+        nonlocal kernel
+        if backend == "python":
+            return func(*args)
+        if kernel is None:
+            kernel = _numba.njit(cache=True)(func)
+        return kernel(*args)
+
+    return dispatch
+
+
+def _load_numba():
+    """
+    Import numba (if installed) and register the helper functions
+    """
+    global _numba
+    if _numba is None:
+        try:
+            import numba
+            import numba.extending
+        except ImportError:
+            return None
+
+        for helper in _helpers:
+            numba.extending.register_jitable(helper)
+        _numba = numba
+
+    return _numba
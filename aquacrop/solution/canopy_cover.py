@@ -32,6 +32,7 @@ def canopy_cover(
     gdd: float,
     et0: float,
     growing_season: bool,
+    backend: str = "python",
     ):
     # def CCCrop,Soil_Profile,Soil_zTop,InitCond,gdd,et0,growing_season):
 
@@ -57,6 +58,8 @@ def canopy_cover(
 
         growing_season (bool): is it currently within the growing season (True, Flase)
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
     Returns:
 
         NewCond (InitialCondition): updated InitCond object
@@ -91,6 +94,7 @@ def canopy_cover(
             Soil_zTop,
             float(Crop.Zmin),
             Crop.Aer,
+            backend=backend,
         )
 
         # _,root_zone_depletion,taw,_ = root_zone_water(Soil_Profile,float(NewCond.z_root),NewCond.th,Soil_zTop,float(Crop.Zmin),Crop.Aer)
@@ -119,6 +123,7 @@ def canopy_cover(
             taw,
             et0,
             beta,
+            backend=backend,
         )
 
         # water_stress(Crop, NewCond, root_zone_depletion, taw, et0, beta)
@@ -147,7 +152,7 @@ def canopy_cover(
                 # Canopy growing
                 tmp_tCC = tCCadj - Crop.Emergence
                 NewCond.canopy_cover_ns = cc_development(
-                    Crop.CC0, 0.98 * Crop.CCx, Crop.CGC, Crop.CDC, tmp_tCC, "Growth", Crop.CCx
+                    Crop.CC0, 0.98 * Crop.CCx, Crop.CGC, Crop.CDC, tmp_tCC, "Growth", Crop.CCx, backend=backend
                 )
 
             # Update maximum canopy cover size in growing season
@@ -172,6 +177,7 @@ def canopy_cover(
                     tmp_tCC,
                     "Decline",
                     NewCond.ccx_act_ns,
+                    backend=backend,
                 )
 
         ## Canopy development (actual) ##
@@ -190,7 +196,7 @@ def canopy_cover(
                 if InitCond_ProtectedSeed == True:
                     tmp_tCC = tCCadj - Crop.Emergence
                     NewCond.canopy_cover = cc_development(
-                        Crop.CC0, Crop.CCx, Crop.CGC, Crop.CDC, tmp_tCC, "Growth", Crop.CCx
+                        Crop.CC0, Crop.CCx, Crop.CGC, Crop.CDC, tmp_tCC, "Growth", Crop.CCx, backend=backend
                     )
                     # Check if seed protection should be turned off
                     if NewCond.canopy_cover > (1.25 * NewCond.cc0_adj):
@@ -220,6 +226,7 @@ def canopy_cover(
                             tCCadj,
                             Crop.CanopyDevEnd,
                             Crop.CCx,
+                            backend=backend,
                         )
                         if CCXadj < 0:
 
@@ -229,7 +236,7 @@ def canopy_cover(
                             # Approaching maximum canopy cover size
                             tmp_tCC = tCCadj - Crop.Emergence
                             NewCond.canopy_cover = cc_development(
-                                Crop.CC0, Crop.CCx, Crop.CGC, Crop.CDC, tmp_tCC, "Growth", Crop.CCx
+                                Crop.CC0, Crop.CCx, Crop.CGC, Crop.CDC, tmp_tCC, "Growth", Crop.CCx, backend=backend
                             )
                         else:
 
@@ -251,6 +258,7 @@ def canopy_cover(
                                     tmp_tCC,
                                     "Growth",
                                     Crop.CCx,
+                                    backend=backend,
                                 )
                                 # print(NewCond.dap,CCXadj,tReq)
 
@@ -271,7 +279,7 @@ def canopy_cover(
                     # Canopy approaching maximum size
                     tmp_tCC = tCCadj - Crop.Emergence
                     NewCond.canopy_cover = cc_development(
-                        Crop.CC0, Crop.CCx, Crop.CGC, Crop.CDC, tmp_tCC, "Growth", Crop.CCx
+                        Crop.CC0, Crop.CCx, Crop.CGC, Crop.CDC, tmp_tCC, "Growth", Crop.CCx, backend=backend
                     )
                     NewCond.cc0_adj = Crop.CC0
 
@@ -304,6 +312,7 @@ def canopy_cover(
                     tmp_tCC,
                     "Decline",
                     NewCond.ccx_act,
+                    backend=backend,
                 )
 
             # Check for crop growth termination
@@ -342,6 +351,7 @@ def canopy_cover(
                         taw,
                         et0,
                         beta,
+                        backend=backend,
                     )
 
                     # water_stress_coef = water_stress(Crop, NewCond, root_zone_depletion, taw, et0, beta)
@@ -418,7 +428,7 @@ def canopy_cover(
                         # Get new canopy_cover value for end of current day
                         tmp_tCC = tCCadj - Crop.Senescence
                         NewCond.canopy_cover = cc_development(
-                            NewCond.cc0_adj, CCXadj, Crop.CGC, CDCadj, tmp_tCC, "Decline", CCXadj
+                            NewCond.cc0_adj, CCXadj, Crop.CGC, CDCadj, tmp_tCC, "Decline", CCXadj, backend=backend
                         )
                         # Check for crop growth termination
                         if (NewCond.canopy_cover < 0.001) and (InitCond_CropDead == False):
@@ -1,4 +1,6 @@
 import numpy as np
+
+from .backend import compiled
 from typing import TYPE_CHECKING, Tuple
 
 if TYPE_CHECKING:
@@ -17,6 +19,7 @@ def capillary_rise(
     NewCond: "InitialCondition",
     FluxOut: "ndarray",
     water_table_presence: int,
+    backend: str = "python",
     ) -> Tuple["InitialCondition", float]:
     """
     Function to calculate capillary rise from a shallow groundwater table
@@ -40,6 +43,8 @@ def capillary_rise(
 
         water_table_presence (int): water_table present (1:yes, 0:no)
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
 
     Returns:
 
@@ -79,13 +84,7 @@ def capillary_rise(
         ######################### this needs fixing, will currently break####################
 
         # # Find top of next soil layer that is not within modelled soil profile
-        zTopLayer = 0
-        for layeri in np.sort(np.unique(prof.Layer)):
-            # Calculate layer thickness
-            l_idx = np.argwhere(prof.Layer==layeri).flatten()
-
-            LayThk = prof.dz[l_idx].sum()
-            zTopLayer = zTopLayer+LayThk
+        zTopLayer = prof.z_top_layer
 
         # Check for restrictions on upward flow caused by properties of
         # compartments that are not modelled in the soil water balance
@@ -119,81 +118,141 @@ def capillary_rise(
         #####################################################################################
 
         # Calculate capillary rise
-        compi = len(prof.Comp) - 1  # Start at bottom of root zone
-        WCr = 0  # Capillary rise counter
-        while (round(MaxCR * 1000) > 0) and (compi > -1) and (round(FluxOut[compi] * 1000) == 0):
-            # Proceed upwards until maximum capillary rise occurs, soil surface
-            # is reached, or encounter a compartment where downward
-            # drainage/infiltration has already occurred on current day
-            # Find layer of current compartment
-            # Calculate driving force
-            if (NewCond.th[compi] >= prof.th_wp[compi]) and (Soil_fshape_cr > 0):
-                Df = 1 - (
-                    (
-                        (NewCond.th[compi] - prof.th_wp[compi])
-                        / (NewCond.th_fc_Adj[compi] - prof.th_wp[compi])
-                    )
-                    ** Soil_fshape_cr
-                )
-                if Df > 1:
-                    Df = 1
-                elif Df < 0:
-                    Df = 0
+        CrTot = _capillary_rise(
+            prof.dz,
+            prof.th_wp,
+            prof.th_thr,
+            prof.Ksat,
+            prof.aCR,
+            prof.bCR,
+            NewCond.th,
+            NewCond.th_fc_Adj,
+            FluxOut,
+            Soil_fshape_cr,
+            z_gw,
+            zBot,
+            MaxCR,
+            backend=backend,
+        )
 
-            else:
+    return NewCond, CrTot
+
+
+@compiled
+def _capillary_rise(
+    dz: "ndarray",
+    th_wp: "ndarray",
+    th_thr: "ndarray",
+    Ksat: "ndarray",
+    aCR: "ndarray",
+    bCR: "ndarray",
+    th: "ndarray",
+    th_fc_Adj: "ndarray",
+    FluxOut: "ndarray",
+    Soil_fshape_cr: float,
+    z_gw: float,
+    zBot: float,
+    MaxCR: float,
+    ) -> float:
+    """
+    Array kernel of capillary_rise that moves water up from the water table
+
+    Arguments:
+
+        dz, th_wp, th_thr, Ksat, aCR, bCR (numpy.array): soil profile paramaters
+
+        th (numpy.array): soil water content, updated in place
+
+        th_fc_Adj (numpy.array): adjusted water content at field capacity
+
+        FluxOut (numpy.array): Flux of water out of each soil compartment
+
+        Soil_fshape_cr (float): Capillary rise shape factor
+
+        z_gw (float): groundwater table depth
+
+        zBot (float): depth of the bottom of the soil profile
+
+        MaxCR (float): maximum capillary rise from the bottom compartment
+
+    Returns:
+
+        WCr (float): Total Capillary rise
+
+    """
+    # Calculate capillary rise
+    compi = len(dz) - 1  # Start at bottom of root zone
+    WCr = 0  # Capillary rise counter
+    while (round(MaxCR * 1000) > 0) and (compi > -1) and (round(FluxOut[compi] * 1000) == 0):
+        # Proceed upwards until maximum capillary rise occurs, soil surface
+        # is reached, or encounter a compartment where downward
+        # drainage/infiltration has already occurred on current day
+        # Find layer of current compartment
+        # Calculate driving force
+        if (th[compi] >= th_wp[compi]) and (Soil_fshape_cr > 0):
+            Df = 1 - (
+                (
+                    (th[compi] - th_wp[compi])
+                    / (th_fc_Adj[compi] - th_wp[compi])
+                )
+                ** Soil_fshape_cr
+            )
+            if Df > 1:
                 Df = 1
+            elif Df < 0:
+                Df = 0
 
-            # Calculate relative hydraulic conductivity
-            thThr = (prof.th_wp[compi] + prof.th_fc[compi]) / 2
-            if NewCond.th[compi] < thThr:
-                if (NewCond.th[compi] <= prof.th_wp[compi]) or (thThr <= prof.th_wp[compi]):
-                    Krel = 0
-                else:
-                    Krel = (NewCond.th[compi] - prof.th_wp[compi]) / (thThr - prof.th_wp[compi])
+        else:
+            Df = 1
 
+        # Calculate relative hydraulic conductivity
+        thThr = th_thr[compi]
+        if th[compi] < thThr:
+            if (th[compi] <= th_wp[compi]) or (thThr <= th_wp[compi]):
+                Krel = 0
             else:
-                Krel = 1
-
-            # Check if room is available to store water from capillary rise
-            dth = round(NewCond.th_fc_Adj[compi] - NewCond.th[compi],4)
-
-            # Store water if room is available
-            if (dth > 0) and ((zBot - prof.dz[compi] / 2) < z_gw):
-                dthMax = Krel * Df * MaxCR / (1000 * prof.dz[compi])
-                if dth >= dthMax:
-                    NewCond.th[compi] = NewCond.th[compi] + dthMax
-                    CRcomp = dthMax * 1000 * prof.dz[compi]
-                    MaxCR = 0
-                else:
-                    NewCond.th[compi] = NewCond.th_fc_Adj[compi]
-                    CRcomp = dth * 1000 * prof.dz[compi]
-                    MaxCR = (Krel * MaxCR) - CRcomp
-
-                WCr = WCr + CRcomp
-
-            # Update bottom elevation of compartment
-            zBot = zBot - prof.dz[compi]
-            # Update compartment and layer counters
-            compi = compi - 1
-            # Update restriction on maximum capillary rise
-            if compi > -1:
-
-                zBotMid = zBot - (prof.dz[compi] / 2)
-                if (prof.Ksat[compi] > 0) and (z_gw > 0) and ((z_gw - zBotMid) < 4):
-                    if zBotMid >= z_gw:
-                        LimCR = 99
-                    else:
-                        LimCR = np.exp((np.log(z_gw - zBotMid) - prof.bCR[compi]) / prof.aCR[compi])
-                        if LimCR > 99:
-                            LimCR = 99
+                Krel = (th[compi] - th_wp[compi]) / (thThr - th_wp[compi])
 
+        else:
+            Krel = 1
+
+        # Check if room is available to store water from capillary rise
+        dth = round(th_fc_Adj[compi] - th[compi],4)
+
+        # Store water if room is available
+        if (dth > 0) and ((zBot - dz[compi] / 2) < z_gw):
+            dthMax = Krel * Df * MaxCR / (1000 * dz[compi])
+            if dth >= dthMax:
+                th[compi] = th[compi] + dthMax
+                CRcomp = dthMax * 1000 * dz[compi]
+                MaxCR = 0
+            else:
+                th[compi] = th_fc_Adj[compi]
+                CRcomp = dth * 1000 * dz[compi]
+                MaxCR = (Krel * MaxCR) - CRcomp
+
+            WCr = WCr + CRcomp
+
+        # Update bottom elevation of compartment
+        zBot = zBot - dz[compi]
+        # Update compartment and layer counters
+        compi = compi - 1
+        # Update restriction on maximum capillary rise
+        if compi > -1:
+
+            zBotMid = zBot - (dz[compi] / 2)
+            if (Ksat[compi] > 0) and (z_gw > 0) and ((z_gw - zBotMid) < 4):
+                if zBotMid >= z_gw:
+                    LimCR = 99
                 else:
-                    LimCR = 0
+                    LimCR = np.exp((np.log(z_gw - zBotMid) - bCR[compi]) / aCR[compi])
+                    if LimCR > 99:
+                        LimCR = 99
 
-                if MaxCR > LimCR:
-                    MaxCR = LimCR
+            else:
+                LimCR = 0
 
-        # Store total depth of capillary rise
-        CrTot = WCr
+            if MaxCR > LimCR:
+                MaxCR = LimCR
 
-    return NewCond, CrTot
+    return WCr
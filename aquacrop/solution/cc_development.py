@@ -1,6 +1,9 @@
 import numpy as np
 import sys
 
+from .backend import compiled
+
+@compiled
 def cc_development(
     CCo: float,
     CCx: float,
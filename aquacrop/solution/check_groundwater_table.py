@@ -10,6 +10,8 @@ if TYPE_CHECKING:
     from aquacrop.entities.initParamVariables import InitialCondition
     from numpy import ndarray
 
+# number of groundwater depths for which the adjusted field capacity is kept
+FC_ADJ_CACHE_SIZE = 64
 
 
 def check_groundwater_table(
@@ -45,9 +47,12 @@ def check_groundwater_table(
 
         NewCond_th_fc_Adj (ndarray): adjusted water content at field capacity
 
-        thfcAdj (ndarray): adjusted water content at field capacity
+        NewCond_WTinSoil (bool): water table is within the modelled soil profile
 
+        NewCond_zGW (float): groundwater depth
 
+    The adjusted profile is kept on the soil profile for each depth and shared
+    by the days with that depth, it must not be modified in place.
 
     """
     
@@ -57,58 +62,83 @@ def check_groundwater_table(
         # Update groundwater conditions for current day
         NewCond_zGW = z_gw
 
-        # Find compartment mid-points
-        zMid = prof.zMid
+        # The adjusted profile only depends on the soil and the groundwater
+        # depth, which stays the same for many days, so it is kept by depth
+        cache = prof._fc_adj_cache
+        if NewCond_zGW not in cache:
+            if len(cache) >= FC_ADJ_CACHE_SIZE:
+                # drop the depth added first
+                del cache[next(iter(cache))]
+            cache[NewCond_zGW] = _adjust_field_capacity(prof, NewCond_zGW)
 
-        # Check if water table is within modelled soil profile
-        if NewCond_zGW >= 0:
-            if len(zMid[zMid >= NewCond_zGW]) == 0:
-                NewCond_WTinSoil = False
-            else:
-                NewCond_WTinSoil = True
-
-        # If water table is in soil profile, adjust water contents
-        # if NewCond_WTinSoil == True:
-        #     idx = np.argwhere(zMid >= NewCond_zGW).flatten()[0]
-        #     for ii in range(idx, len(prof.Comp)):
-        #         NewCond_th[ii] = prof.th_s[ii]
-
-        # Adjust compartment field capacity
-        compi = len(prof.Comp) - 1
-        thfcAdj = np.zeros(compi + 1)
-        # Find thFCadj for all compartments
-        while compi >= 0:
-            if prof.th_fc[compi] <= 0.1:
-                Xmax = 1
-            else:
-                if prof.th_fc[compi] >= 0.3:
-                    Xmax = 2
-                else:
-                    pF = 2 + 0.3 * (prof.th_fc[compi] - 0.1) / 0.2
-                    Xmax = (np.exp(pF * np.log(10))) / 100
+        # Store adjusted field capacity values
+        NewCond_th_fc_Adj, NewCond_WTinSoil = cache[NewCond_zGW]
+        return (NewCond_th_fc_Adj, NewCond_WTinSoil, NewCond_zGW)
+
+    return (NewCond_th_fc_Adj, None, None)
+
+
+def _adjust_field_capacity(
+    prof: "SoilProfile",
+    NewCond_zGW: float,
+) -> Tuple["ndarray", bool]:
+    """
+    Compute the field capacity of each compartment raised by a water table
 
-            if (NewCond_zGW < 0) or ((NewCond_zGW - zMid[compi]) >= Xmax):
-                for ii in range(compi + 1):
+    Arguments:
+
+        prof (SoilProfile): soil profile paramaters
+
+        NewCond_zGW (float): groundwater depth
+
+    Returns:
 
-                    thfcAdj[ii] = prof.th_fc[ii]
+        thfcAdj (ndarray): adjusted water content at field capacity
+
+        NewCond_WTinSoil (bool): water table is within the modelled soil profile
 
-                compi = -1
+    """
+    # Find compartment mid-points
+    zMid = prof.zMid
+
+    # Check if water table is within modelled soil profile
+    NewCond_WTinSoil = False
+    if NewCond_zGW >= 0:
+        if len(zMid[zMid >= NewCond_zGW]) == 0:
+            NewCond_WTinSoil = False
+        else:
+            NewCond_WTinSoil = True
+
+    # If water table is in soil profile, adjust water contents
+    # if NewCond_WTinSoil == True:
+    #     idx = np.argwhere(zMid >= NewCond_zGW).flatten()[0]
+    #     for ii in range(idx, len(prof.Comp)):
+    #         NewCond_th[ii] = prof.th_s[ii]
+
+    # Adjust compartment field capacity
+    compi = len(prof.Comp) - 1
+    thfcAdj = np.zeros(compi + 1)
+    # Find thFCadj for all compartments
+    while compi >= 0:
+        Xmax = prof.xmax[compi]
+
+        if (NewCond_zGW < 0) or ((NewCond_zGW - zMid[compi]) >= Xmax):
+            for ii in range(compi + 1):
+
+                thfcAdj[ii] = prof.th_fc[ii]
+
+            compi = -1
+        else:
+            if prof.th_fc[compi] >= prof.th_s[compi]:
+                thfcAdj[compi] = prof.th_fc[compi]
             else:
-                if prof.th_fc[compi] >= prof.th_s[compi]:
-                    thfcAdj[compi] = prof.th_fc[compi]
+                if zMid[compi] >= NewCond_zGW:
+                    thfcAdj[compi] = prof.th_s[compi]
                 else:
-                    if zMid[compi] >= NewCond_zGW:
-                        thfcAdj[compi] = prof.th_s[compi]
-                    else:
-                        dV = prof.th_s[compi] - prof.th_fc[compi]
-                        dFC = (dV / (Xmax * Xmax)) * ((zMid[compi] - (NewCond_zGW - Xmax)) ** 2)
-                        thfcAdj[compi] = prof.th_fc[compi] + dFC
+                    dV = prof.th_s[compi] - prof.th_fc[compi]
+                    dFC = (dV / (Xmax * Xmax)) * ((zMid[compi] - (NewCond_zGW - Xmax)) ** 2)
+                    thfcAdj[compi] = prof.th_fc[compi] + dFC
 
-                compi = compi - 1
+            compi = compi - 1
 
-        # Store adjusted field capacity values
-        NewCond_th_fc_Adj = thfcAdj
-        # prof.th_fc_Adj = thfcAdj
-        return (NewCond_th_fc_Adj, NewCond_WTinSoil, NewCond_zGW)
-
-    return (NewCond_th_fc_Adj, None, None)
+    return (thfcAdj, NewCond_WTinSoil)
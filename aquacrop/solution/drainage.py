@@ -3,6 +3,7 @@ import numpy as np
 from typing import Tuple,TYPE_CHECKING
 
 from ..entities.soilProfile import SoilProfile
+from .backend import compiled
 
 if TYPE_CHECKING:
     # Important: classes are only imported when types are checked, not in production.
@@ -14,6 +15,7 @@ def drainage(
     prof: "SoilProfile",
     th_init: "ndarray",
     th_fc_Adj_init: "ndarray",
+    backend: str = "python",
     ) -> Tuple["ndarray", float, float]:
     """
     Function to redistribute stored soil water
@@ -30,6 +32,8 @@ def drainage(
 
         th_fc_Adj_init (numpy.array): adjusted water content at field capacity
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
 
     Returns:
 
@@ -42,6 +46,39 @@ def drainage(
 
 
 
+    """
+
+    return _drainage(
+        prof.th_fc,
+        prof.th_s,
+        prof.tau,
+        prof.dz,
+        prof.dzsum,
+        prof.Ksat,
+        prof.drain_sat,
+        prof.exp_sat,
+        th_init,
+        th_fc_Adj_init,
+        backend=backend,
+    )
+
+
+@compiled
+def _drainage(
+    th_fc: "ndarray",
+    th_s: "ndarray",
+    tau: "ndarray",
+    dz: "ndarray",
+    dzsum: "ndarray",
+    Ksat: "ndarray",
+    drain_sat: "ndarray",
+    exp_sat: "ndarray",
+    th_init: "ndarray",
+    th_fc_Adj_init: "ndarray",
+    ) -> Tuple["ndarray", float, "ndarray"]:
+    """
+    Array kernel of drainage (see drainage for the arguments, drain_sat
+    and exp_sat are the derived constants of the soil profile)
     """
 
     # Store initial conditions in new structure for updating %%
@@ -54,47 +91,72 @@ def drainage(
     thnew = np.zeros(th_init.shape[0])
     FluxOut = np.zeros(th_init.shape[0])
 
+    # Drainage ability of each compartment at its initial water content,
+    # which does not depend on the compartments above
+    drainable = th_init > th_fc_Adj_init
+    saturated = th_init >= th_s
+    dthdt_init = np.where(
+        saturated,
+        drain_sat,
+        drain_sat * ((np.exp(th_init - th_fc) - 1) / exp_sat),
+    )
+    dthdt_init = np.where(
+        (th_init - dthdt_init) < th_fc_Adj_init, th_init - th_fc_Adj_init, dthdt_init
+    )
+    dthdt_init = np.where(drainable, dthdt_init, 0.0)
+
+    # Drainage of each compartment (mm) and drainage ability of the
+    # compartments above it
+    draincomp_init = dthdt_init * dz * 1000
+    prethick_init = dzsum - dz
+    drainmax_init = dthdt_init * 1000 * prethick_init
+
+    # While each compartment can drain what comes from above and the
+    # cumulative drainage stays below Ksat, the cumulative drainage is a
+    # prefix sum. The compartments from the first one where this fails are
+    # solved one by one below.
+    drainsum_init = np.cumsum(draincomp_init)
+    drainsum_above = np.zeros(th_init.shape[0])
+    drainsum_above[1:] = drainsum_init[:-1]
+    sequential = np.nonzero(
+        (drainsum_above > drainmax_init) | (drainsum_init > Ksat)
+    )[0]
+    if sequential.shape[0] == 0:
+        first = th_init.shape[0]
+    else:
+        first = sequential[0]
+
+    thnew[:first] = th_init[:first] - dthdt_init[:first]
+    FluxOut[:first] = drainsum_init[:first]
+
     # Initialise counters and states %%
-    drainsum = 0
+    if first > 0:
+        drainsum = drainsum_init[first - 1]
+    else:
+        drainsum = 0
 
     # Calculate drainage and updated water contents %%
-    for ii in range(th_init.shape[0]):
+    for ii in range(first, th_init.shape[0]):
         # Specify layer for compartment
-        cth_fc = prof.th_fc[ii]
-        cth_s = prof.th_s[ii]
-        ctau = prof.tau[ii]
-        cdz = prof.dz[ii]
-        cdzsum = prof.dzsum[ii]
-        cKsat = prof.Ksat[ii]
-
-        # Calculate drainage ability of compartment ii
-        if th_init[ii] <= th_fc_Adj_init[ii]:
-            dthdt = 0
-
-        elif th_init[ii] >= cth_s:
-            dthdt = ctau * (cth_s - cth_fc)
-
-            if (th_init[ii] - dthdt) < th_fc_Adj_init[ii]:
-                dthdt = th_init[ii] - th_fc_Adj_init[ii]
-
-        else:
-            dthdt = (
-                ctau
-                * (cth_s - cth_fc)
-                * ((np.exp(th_init[ii] - cth_fc) - 1) / (np.exp(cth_s - cth_fc) - 1))
-            )
+        cth_fc = th_fc[ii]
+        cth_s = th_s[ii]
+        ctau = tau[ii]
+        cdz = dz[ii]
+        cKsat = Ksat[ii]
+        cdrain_sat = drain_sat[ii]
+        cexp_sat = exp_sat[ii]
 
-            if (th_init[ii] - dthdt) < th_fc_Adj_init[ii]:
-                dthdt = th_init[ii] - th_fc_Adj_init[ii]
+        # Drainage ability of compartment ii
+        dthdt = dthdt_init[ii]
 
         # Drainage from compartment ii (mm)
-        draincomp = dthdt * cdz * 1000
+        draincomp = draincomp_init[ii]
 
         # Check drainage ability of compartment ii against cumulative drainage
         # from compartments above
         excess = 0
-        prethick = cdzsum - cdz
-        drainmax = dthdt * 1000 * prethick
+        prethick = prethick_init[ii]
+        drainmax = drainmax_init[ii]
         if drainsum <= drainmax:
             drainability = True
         else:
@@ -123,9 +185,7 @@ def drainage(
             if dthdt <= 0:
                 thX = th_fc_Adj_init[ii]
             elif ctau > 0:
-                A = 1 + (
-                    (dthdt * (np.exp(cth_s - cth_fc) - 1)) / (ctau * (cth_s - cth_fc))
-                )
+                A = 1 + ((dthdt * cexp_sat) / cdrain_sat)
                 thX = cth_fc + np.log(A)
                 if thX < th_fc_Adj_init[ii]:
                     thX = th_fc_Adj_init[ii]
@@ -148,17 +208,16 @@ def drainage(
                     if thX <= th_fc_Adj_init[ii]:
                         dthdt = 0
                     elif thX >= cth_s:
-                        dthdt = ctau * (cth_s - cth_fc)
+                        dthdt = cdrain_sat
                         if (thX - dthdt) < th_fc_Adj_init[ii]:
                             dthdt = thX - th_fc_Adj_init[ii]
 
                     else:
                         dthdt = (
-                            ctau
-                            * (cth_s - cth_fc)
+                            cdrain_sat
                             * (
                                 (np.exp(thX - cth_fc) - 1)
-                                / (np.exp(cth_s - cth_fc) - 1)
+                                / cexp_sat
                             )
                         )
 
@@ -181,17 +240,16 @@ def drainage(
                     if thnew[ii] <= th_fc_Adj_init[ii]:
                         dthdt = 0
                     elif thnew[ii] >= cth_s:
-                        dthdt = ctau * (cth_s - cth_fc)
+                        dthdt = cdrain_sat
                         if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
                             dthdt = thnew[ii] - th_fc_Adj_init[ii]
 
                     else:
                         dthdt = (
-                            ctau
-                            * (cth_s - cth_fc)
+                            cdrain_sat
                             * (
                                 (np.exp(thnew[ii] - cth_fc) - 1)
-                                / (np.exp(cth_s - cth_fc) - 1)
+                                / cexp_sat
                             )
                         )
                         if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
@@ -225,17 +283,16 @@ def drainage(
                         if thnew[ii] <= th_fc_Adj_init[ii]:
                             dthdt = 0
                         elif thnew[ii] >= cth_s:
-                            dthdt = ctau * (cth_s - cth_fc)
+                            dthdt = cdrain_sat
                             if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
                                 dthdt = thnew[ii] - th_fc_Adj_init[ii]
 
                         else:
                             dthdt = (
-                                ctau
-                                * (cth_s - cth_fc)
+                                cdrain_sat
                                 * (
                                     (np.exp(thnew[ii] - cth_fc) - 1)
-                                    / (np.exp(cth_s - cth_fc) - 1)
+                                    / cexp_sat
                                 )
                             )
                             if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
@@ -261,17 +318,16 @@ def drainage(
                     if thnew[ii] <= th_fc_Adj_init[ii]:
                         dthdt = 0
                     elif thnew[ii] >= cth_s:
-                        dthdt = ctau * (cth_s - cth_fc)
+                        dthdt = cdrain_sat
                         if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
                             dthdt = thnew[ii] - th_fc_Adj_init[ii]
 
                     else:
                         dthdt = (
-                            ctau
-                            * (cth_s - cth_fc)
+                            cdrain_sat
                             * (
                                 (np.exp(thnew[ii] - cth_fc) - 1)
-                                / (np.exp(cth_s - cth_fc) - 1)
+                                / cexp_sat
                             )
                         )
                         if (thnew[ii] - dthdt) < th_fc_Adj_init[ii]:
@@ -314,14 +370,14 @@ def drainage(
                     FluxOut[precomp] = FluxOut[precomp] - excess
 
                 # Increase water content to store excess
-                thnew[precomp] = thnew[precomp] + (excess / (1000 * prof.dz[precomp]))
+                thnew[precomp] = thnew[precomp] + (excess / (1000 * dz[precomp]))
 
                 # Limit water content to saturation and adjust excess counter
-                if thnew[precomp] > prof.th_s[precomp]:
+                if thnew[precomp] > th_s[precomp]:
                     excess = (
-                        (thnew[precomp] - prof.th_s[precomp]) * 1000 * prof.dz[precomp]
+                        (thnew[precomp] - th_s[precomp]) * 1000 * dz[precomp]
                     )
-                    thnew[precomp] = prof.th_s[precomp]
+                    thnew[precomp] = th_s[precomp]
                 else:
                     excess = 0
 
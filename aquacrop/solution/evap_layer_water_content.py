@@ -9,6 +9,7 @@ if TYPE_CHECKING:
 
 
 from ..entities.soilProfile import SoilProfile
+from .backend import jitable
     
 def evap_layer_water_content(
     InitCond_th: "ndarray",
@@ -45,10 +46,37 @@ def evap_layer_water_content(
 
 
 
+    """
+
+    return _evap_layer_water_content(
+        InitCond_th,
+        InitCond_EvapZ,
+        prof.dz,
+        prof.dzsum,
+        prof.th_s,
+        prof.th_fc,
+        prof.th_wp,
+        prof.th_dry,
+    )
+
+
+@jitable
+def _evap_layer_water_content(
+    InitCond_th: "ndarray",
+    InitCond_EvapZ: float,
+    dz: "ndarray",
+    dzsum: "ndarray",
+    th_s: "ndarray",
+    th_fc: "ndarray",
+    th_wp: "ndarray",
+    th_dry: "ndarray",
+) -> Tuple[float, float, float, float, float]:
+    """
+    Array kernel of evap_layer_water_content (see evap_layer_water_content for the arguments)
     """
 
     # Find soil compartments covered by evaporation layer
-    comp_sto = np.sum(prof.dzsum < InitCond_EvapZ) + 1
+    comp_sto = np.sum(dzsum < InitCond_EvapZ) + 1
 
     Wevap_Sat = 0
     Wevap_Fc = 0
@@ -59,21 +87,21 @@ def evap_layer_water_content(
     for ii in range(int(comp_sto)):
 
         # Determine fraction of soil compartment covered by evaporation layer
-        if prof.dzsum[ii] > InitCond_EvapZ:
-            factor = 1 - ((prof.dzsum[ii] - InitCond_EvapZ) / prof.dz[ii])
+        if dzsum[ii] > InitCond_EvapZ:
+            factor = 1 - ((dzsum[ii] - InitCond_EvapZ) / dz[ii])
         else:
             factor = 1
 
         # Actual water storage in evaporation layer (mm)
-        Wevap_Act += factor * 1000 * InitCond_th[ii] * prof.dz[ii]
+        Wevap_Act += factor * 1000 * InitCond_th[ii] * dz[ii]
         # Water storage in evaporation layer at saturation (mm)
-        Wevap_Sat += factor * 1000 * prof.th_s[ii] * prof.dz[ii]
+        Wevap_Sat += factor * 1000 * th_s[ii] * dz[ii]
         # Water storage in evaporation layer at field capacity (mm)
-        Wevap_Fc += factor * 1000 * prof.th_fc[ii] * prof.dz[ii]
+        Wevap_Fc += factor * 1000 * th_fc[ii] * dz[ii]
         # Water storage in evaporation layer at permanent wilting point (mm)
-        Wevap_Wp += factor * 1000 * prof.th_wp[ii] * prof.dz[ii]
+        Wevap_Wp += factor * 1000 * th_wp[ii] * dz[ii]
         # Water storage in evaporation layer at air dry (mm)
-        Wevap_Dry += factor * 1000 * prof.th_dry[ii] * prof.dz[ii]
+        Wevap_Dry += factor * 1000 * th_dry[ii] * dz[ii]
 
     if Wevap_Act < 0:
         Wevap_Act = 0
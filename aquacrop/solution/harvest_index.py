@@ -34,6 +34,7 @@ def harvest_index(
     temp_max: float,
     temp_min: float,
     growing_season: bool,
+    backend: str = "python",
     ) -> "InitialCondition":
 
     """
@@ -61,6 +62,8 @@ def harvest_index(
 
         growing_season (bool): is growing season (True or Flase)
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
 
     Returns:
 
@@ -92,6 +95,7 @@ def harvest_index(
             Soil_zTop,
             float(Crop.Zmin),
             Crop.Aer,
+            backend=backend,
         )
 
         # _,water_root_depletion,taw,_ = root_zone_water(Soil_Profile,float(NewCond.z_root),NewCond.th,Soil_zTop,float(Crop.Zmin),Crop.Aer)
@@ -120,6 +124,7 @@ def harvest_index(
             taw,
             et0,
             beta,
+            backend=backend,
         )
         ksw = Ksw()
         ksw.exp, ksw.sto, ksw.sen, ksw.pol, ksw.sto_lin = Ksw_Exp, Ksw_Sto, Ksw_Sen, Ksw_Pol, Ksw_StoLin
@@ -1,6 +1,7 @@
 import numpy as np
 
 from ..entities.soilProfile import SoilProfile
+from .backend import compiled
 
 
 from typing import TYPE_CHECKING, Tuple
@@ -24,6 +25,7 @@ def infiltration(
      DeepPerc0: float, 
      Runoff0: float, 
      growing_season: bool,
+     backend: str = "python",
 ) -> Tuple["ndarray", float, float, float, float, "ndarray"]:
     """
     Function to infiltrate incoming water (rainfall and irrigation)
@@ -60,6 +62,8 @@ def infiltration(
 
         growing_season (bool): is growing season (True or Flase)
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
 
     Returns:
 
@@ -78,6 +82,57 @@ def infiltration(
 
 
 
+    """
+    return _infiltration(
+        prof.th_fc,
+        prof.th_s,
+        prof.dz,
+        prof.Ksat,
+        prof.drain_sat,
+        prof.exp_sat,
+        prof.infl_factor,
+        NewCond_SurfaceStorage,
+        NewCond_th_fc_Adj,
+        NewCond_th,
+        Infl,
+        Irr,
+        IrrMngt_AppEff,
+        FieldMngt_Bunds,
+        FieldMngt_zBund,
+        FluxOut,
+        DeepPerc0,
+        Runoff0,
+        growing_season,
+        backend=backend,
+    )
+
+
+@compiled
+def _infiltration(
+     th_fc: "ndarray",
+     th_s: "ndarray",
+     dz: "ndarray",
+     Ksat: "ndarray",
+     drain_sat: "ndarray",
+     exp_sat: "ndarray",
+     infl_factor: "ndarray",
+     NewCond_SurfaceStorage: float,
+     NewCond_th_fc_Adj: "ndarray",
+     NewCond_th: "ndarray",
+     Infl: float,
+     Irr: float,
+     IrrMngt_AppEff: float,
+     FieldMngt_Bunds: bool,
+     FieldMngt_zBund: float,
+     FluxOut: "ndarray",
+     DeepPerc0: float,
+     Runoff0: float,
+     growing_season: bool,
+) -> Tuple["ndarray", float, float, float, float, "ndarray"]:
+    """
+    Array kernel of infiltration (see infiltration for the arguments,
+    drain_sat, exp_sat and infl_factor are the derived constants of the soil
+    profile)
     """
     ## Store initial conditions in new structure for updating ##
     # NewCond = InitCond
@@ -107,12 +162,12 @@ def infiltration(
             InflTot = Infl + NewCond_SurfaceStorage
             if InflTot > 0:
                 # Update surface storage and infiltration storage
-                if InflTot > prof.Ksat[0]:
+                if InflTot > Ksat[0]:
                     # Infiltration limited by saturated hydraulic conductivity
                     # of surface soil layer
-                    ToStore = prof.Ksat[0]
+                    ToStore = Ksat[0]
                     # Additional water ponds on surface
-                    NewCond_SurfaceStorage = InflTot - prof.Ksat[0]
+                    NewCond_SurfaceStorage = InflTot - Ksat[0]
                 else:
                     # All water infiltrates
                     ToStore = InflTot
@@ -134,14 +189,17 @@ def infiltration(
                 ToStore = 0
                 RunoffIni = 0
 
+        else:
+            raise ValueError("Bund height must be greater than 0.001 mm when bunds are present")
+
     elif FieldMngt_Bunds == False:
         # No bunds on field
-        if Infl > prof.Ksat[0]:
+        if Infl > Ksat[0]:
             # Infiltration limited by saturated hydraulic conductivity of top
             # soil layer
-            ToStore = prof.Ksat[0]
+            ToStore = Ksat[0]
             # Additional water runs off
-            RunoffIni = Infl - prof.Ksat[0]
+            RunoffIni = Infl - Ksat[0]
         else:
             # All water infiltrates
             ToStore = Infl
@@ -164,12 +222,12 @@ def infiltration(
             # Get soil layer
 
             # Calculate saturated drainage ability
-            dthdtS = prof.tau[ii] * (prof.th_s[ii] - prof.th_fc[ii])
+            dthdtS = drain_sat[ii]
             # Calculate drainage factor
-            factor = prof.Ksat[ii] / (dthdtS * 1000 * prof.dz[ii])
+            factor = infl_factor[ii]
 
             # Calculate drainage ability required
-            dthdt0 = ToStore / (1000 * prof.dz[ii])
+            dthdt0 = ToStore / (1000 * dz[ii])
 
             # Check drainage ability
             if dthdt0 < dthdtS:
@@ -177,42 +235,39 @@ def infiltration(
                 if dthdt0 <= 0:
                     theta0 = InitCond_th_fc_Adj[ii]
                 else:
-                    A = 1 + (
-                        (dthdt0 * (np.exp(prof.th_s[ii] - prof.th_fc[ii]) - 1))
-                        / (prof.tau[ii] * (prof.th_s[ii] - prof.th_fc[ii]))
-                    )
+                    A = 1 + ((dthdt0 * exp_sat[ii]) / drain_sat[ii])
 
-                    theta0 = prof.th_fc[ii] + np.log(A)
+                    theta0 = th_fc[ii] + np.log(A)
 
                 # Limit thX to between saturation and field capacity
-                if theta0 > prof.th_s[ii]:
-                    theta0 = prof.th_s[ii]
+                if theta0 > th_s[ii]:
+                    theta0 = th_s[ii]
                 elif theta0 <= InitCond_th_fc_Adj[ii]:
                     theta0 = InitCond_th_fc_Adj[ii]
                     dthdt0 = 0
 
             else:
                 # Limit water content and drainage to saturation
-                theta0 = prof.th_s[ii]
+                theta0 = th_s[ii]
                 dthdt0 = dthdtS
 
             # Calculate maximum water flow through compartment ii
-            drainmax = factor * dthdt0 * 1000 * prof.dz[ii]
+            drainmax = factor * dthdt0 * 1000 * dz[ii]
             # Calculate total drainage from compartment ii
             drainage = drainmax + FluxOut[ii]
             # Limit drainage to saturated hydraulic conductivity
-            if drainage > prof.Ksat[ii]:
-                drainmax = prof.Ksat[ii] - FluxOut[ii]
+            if drainage > Ksat[ii]:
+                drainmax = Ksat[ii] - FluxOut[ii]
 
             # Calculate difference between threshold and current water contents
             diff = theta0 - InitCond_th[ii]
 
             if diff > 0:
                 # Increase water content of compartment ii
-                thnew[ii] = thnew[ii] + (ToStore / (1000 * prof.dz[ii]))
+                thnew[ii] = thnew[ii] + (ToStore / (1000 * dz[ii]))
                 if thnew[ii] > theta0:
                     # Water remaining that can infiltrate to compartments below
-                    ToStore = (thnew[ii] - theta0) * 1000 * prof.dz[ii]
+                    ToStore = (thnew[ii] - theta0) * 1000 * dz[ii]
                     thnew[ii] = theta0
                 else:
                     # All infiltrating water has been stored
@@ -243,13 +298,13 @@ def infiltration(
                     # Update outflow from compartment
                     FluxOut[precomp] = FluxOut[precomp] - excess
                     # Update water content
-                    thnew[precomp] = thnew[precomp] + (excess / (prof.dz[precomp] * 1000))
+                    thnew[precomp] = thnew[precomp] + (excess / (dz[precomp] * 1000))
                     # Limit water content to saturation
-                    if thnew[precomp] > prof.th_s[precomp]:
+                    if thnew[precomp] > th_s[precomp]:
                         # Update excess to store
-                        excess = (thnew[precomp] - prof.th_s[precomp]) * 1000 * prof.dz[precomp]
+                        excess = (thnew[precomp] - th_s[precomp]) * 1000 * dz[precomp]
                         # Set water content to saturation
-                        thnew[precomp] = prof.th_s[precomp]
+                        thnew[precomp] = th_s[precomp]
                     else:
                         # All excess stored
                         excess = 0
@@ -42,6 +42,7 @@ def irrigation(
     growing_season: bool,
     Rain: float,
     Runoff: float,
+    backend: str = "python",
     ) -> Tuple[float,float,float, float]:
     """
     Function to get irrigation depth for current day
@@ -95,6 +96,8 @@ def irrigation(
 
         Runoff (float): surface runoff on current day
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
 
     Returns:
 
@@ -136,6 +139,7 @@ def irrigation(
             Soil_zTop,
             float(Crop.Zmin),
             Crop.Aer,
+            backend=backend,
         )
         # WrAct,Dr_,TAW_,thRZ = root_zone_water(prof,float(NewCond.z_root),NewCond.th,Soil_zTop,float(Crop.Zmin),Crop.Aer)
         # Use root zone depletions and taw only for triggering irrigation
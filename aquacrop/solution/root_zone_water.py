@@ -1,6 +1,7 @@
 import numpy as np
 
 from ..entities.soilProfile import SoilProfile
+from .backend import compiled
 
 from typing import TYPE_CHECKING, Tuple
 
@@ -16,6 +17,7 @@ def root_zone_water(
     Soil_zTop: float,
     Crop_Zmin: float,
     Crop_Aer: float,
+    backend: str = "python",
 ) -> Tuple[float, float, float, float, float, float, float, float, float, float, float]:
     """
     Function to calculate actual and total available water in the rootzone at current time step
@@ -38,6 +40,8 @@ def root_zone_water(
 
         Crop_Aer (int): number of aeration stress days
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
     Returns:
 
         WrAct (float):  Actual rootzone water content
@@ -65,37 +69,94 @@ def root_zone_water(
 
     """
 
+    # the result only depends on the arguments and the (static) soil, so a
+    # call repeated with unchanged water contents and root depth is a lookup
+    key = (
+        InitCond_Zroot,
+        InitCond_th.tobytes(),
+        prof.dzsum.tobytes(),
+        Soil_zTop,
+        Crop_Zmin,
+        Crop_Aer,
+        backend,
+    )
+    memo = prof._root_zone_memo
+    if memo is not None and memo[0] == key:
+        return memo[1]
+
+    result = _root_zone_water(
+        prof.dz,
+        prof.dzsum,
+        prof.th_s,
+        prof.th_fc,
+        prof.th_wp,
+        prof.th_dry,
+        prof.root_zone_storage(Crop_Aer),
+        InitCond_Zroot,
+        InitCond_th,
+        Soil_zTop,
+        Crop_Zmin,
+        Crop_Aer,
+        backend=backend,
+    )
+    prof._root_zone_memo = (key, result)
+
+    return result
+
+
+@compiled
+def _root_zone_water(
+    dz: "ndarray",
+    dzsum: "ndarray",
+    th_s: "ndarray",
+    th_fc: "ndarray",
+    th_wp: "ndarray",
+    th_dry: "ndarray",
+    storage: "ndarray",
+    InitCond_Zroot: float,
+    InitCond_th: "ndarray",
+    Soil_zTop: float,
+    Crop_Zmin: float,
+    Crop_Aer: float,
+) -> Tuple[float, float, float, float, float, float, float, float, float, float, float]:
+    """
+    Array kernel of root_zone_water (see root_zone_water for the arguments,
+    storage is the table of SoilProfile.root_zone_storage)
+    """
+
     ## Calculate root zone water content and available water ##
     # Compartments covered by the root zone
     rootdepth = round(np.maximum(InitCond_Zroot, Crop_Zmin), 2)
-    comp_sto = np.argwhere(prof.dzsum >= rootdepth).flatten()[0]
+    comp_sto = np.argwhere(dzsum >= rootdepth).flatten()[0]
 
-    # Initialise counters
+    # Actual water storage in root zone (mm) of the compartments fully
+    # covered by the root zone
     WrAct = 0
-    WrS = 0
-    WrFC = 0
-    WrWP = 0
-    WrDry = 0
-    WrAer = 0
-    for ii in range(comp_sto + 1):
-        # Fraction of compartment covered by root zone
-        if prof.dzsum[ii] > rootdepth:
-            factor = 1 - ((prof.dzsum[ii] - rootdepth) / prof.dz[ii])
-        else:
-            factor = 1
-
-        # Actual water storage in root zone (mm)
-        WrAct = WrAct + round(factor * 1000 * InitCond_th[ii] * prof.dz[ii], 2)
-        # Water storage in root zone at saturation (mm)
-        WrS = WrS + round(factor * 1000 * prof.th_s[ii] * prof.dz[ii], 2)
-        # Water storage in root zone at field capacity (mm)
-        WrFC = WrFC + round(factor * 1000 * prof.th_fc[ii] * prof.dz[ii], 2)
-        # Water storage in root zone at permanent wilting point (mm)
-        WrWP = WrWP + round(factor * 1000 * prof.th_wp[ii] * prof.dz[ii], 2)
-        # Water storage in root zone at air dry (mm)
-        WrDry = WrDry + round(factor * 1000 * prof.th_dry[ii] * prof.dz[ii], 2)
-        # Water storage in root zone at aeration stress threshold (mm)
-        WrAer = WrAer + round(factor * 1000 * (prof.th_s[ii] - (Crop_Aer / 100)) * prof.dz[ii], 2)
+    for ii in range(comp_sto):
+        WrAct = WrAct + round(1000 * InitCond_th[ii] * dz[ii], 2)
+
+    # Static water storages of the compartments fully covered by the root
+    # zone (mm), at saturation, field capacity, permanent wilting point, air
+    # dry and aeration stress threshold
+    WrS = storage[0, comp_sto]
+    WrFC = storage[1, comp_sto]
+    WrWP = storage[2, comp_sto]
+    WrDry = storage[3, comp_sto]
+    WrAer = storage[4, comp_sto]
+
+    # Last compartment, fraction covered by root zone
+    ii = comp_sto
+    if dzsum[ii] > rootdepth:
+        factor = 1 - ((dzsum[ii] - rootdepth) / dz[ii])
+    else:
+        factor = 1
+
+    WrAct = WrAct + round(factor * 1000 * InitCond_th[ii] * dz[ii], 2)
+    WrS = WrS + round(factor * 1000 * th_s[ii] * dz[ii], 2)
+    WrFC = WrFC + round(factor * 1000 * th_fc[ii] * dz[ii], 2)
+    WrWP = WrWP + round(factor * 1000 * th_wp[ii] * dz[ii], 2)
+    WrDry = WrDry + round(factor * 1000 * th_dry[ii] * dz[ii], 2)
+    WrAer = WrAer + round(factor * 1000 * (th_s[ii] - (Crop_Aer / 100)) * dz[ii], 2)
 
     if WrAct < 0:
         WrAct = 0
@@ -140,28 +201,19 @@ def root_zone_water(
     if rootdepth > Soil_zTop:
         # Determine compartments covered by the top soil
         ztopdepth = round(Soil_zTop, 2)
-        comp_sto = np.sum(prof.dzsum <= ztopdepth)
-        # Initialise counters
-        WrAct_Zt = 0
-        WrFC_Zt = 0
-        WrWP_Zt = 0
+        comp_sto = np.sum(dzsum <= ztopdepth)
         # Calculate water storage in top soil
         assert comp_sto > 0
 
+        # compartments are fully covered by the top soil (dzsum <= ztopdepth)
+        WrAct_Zt = 0
         for ii in range(comp_sto):
-
-            # Fraction of compartment covered by root zone
-            if prof.dzsum[ii] > ztopdepth:
-                factor = 1 - ((prof.dzsum[ii] - ztopdepth) / prof.dz[ii])
-            else:
-                factor = 1
-
             # Actual water storage in top soil (mm)
-            WrAct_Zt = WrAct_Zt + (factor * 1000 * InitCond_th[ii] * prof.dz[ii])
-            # Water storage in top soil at field capacity (mm)
-            WrFC_Zt = WrFC_Zt + (factor * 1000 * prof.th_fc[ii] * prof.dz[ii])
-            # Water storage in top soil at permanent wilting point (mm)
-            WrWP_Zt = WrWP_Zt + (factor * 1000 * prof.th_wp[ii] * prof.dz[ii])
+            WrAct_Zt = WrAct_Zt + (1000 * InitCond_th[ii] * dz[ii])
+        # Water storage in top soil at field capacity (mm)
+        WrFC_Zt = storage[5, comp_sto]
+        # Water storage in top soil at permanent wilting point (mm)
+        WrWP_Zt = storage[6, comp_sto]
 
         # Ensure available water in top soil is not less than zero
         if WrAct_Zt < 0:
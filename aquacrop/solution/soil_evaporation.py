@@ -4,7 +4,8 @@ import numpy as np
 from ..entities.soilProfile import SoilProfile
 
 
-from .evap_layer_water_content import evap_layer_water_content
+from .backend import compiled
+from .evap_layer_water_content import evap_layer_water_content, _evap_layer_water_content
 
 from typing import TYPE_CHECKING, Tuple
 
@@ -15,6 +16,7 @@ if TYPE_CHECKING:
 
 def soil_evaporation(
     ClockStruct_EvapTimeSteps: int,
+    ClockStruct_EvapTolerance: float,
     ClockStruct_SimOffSeason: bool,
     ClockStruct_TimeStepCounter: int,
     prof: "SoilProfile",
@@ -53,6 +55,7 @@ def soil_evaporation(
     Rain: float,
     Irr: float,
     growing_season: bool,
+    backend: str = "python",
 ) -> Tuple[float, "ndarray", bool, float, float, float, float, float, float]:
 
     """
@@ -65,6 +68,8 @@ def soil_evaporation(
 
         ClockStruct_EvapTimeSteps (int): number of evaportation time steps
 
+        ClockStruct_EvapTolerance (float): error tolerance (mm) of adaptive stage 2 sub-steps, 0 for fixed sub-steps
+
         ClockStruct_SimOffSeason (bool): simulate off season? (False=no, True=yes)
         
         ClockStruct_TimeStepCounter (int): time step counter
@@ -141,6 +146,8 @@ def soil_evaporation(
 
         growing_season (bool): is growing season (True or Flase)
 
+        backend (str): backend of the compiled kernels, "python" or "numba"
+
 
     Returns:
 
@@ -390,95 +397,27 @@ def soil_evaporation(
     if ToExtract > 0:
         # Start stage 2
         NewCond_Stage2 = True
-        # Get sub-daily evaporative demand
-        Edt = ToExtract / ClockStruct_EvapTimeSteps
-        # Loop sub-daily steps
-        for jj in range(int(ClockStruct_EvapTimeSteps)):
-            # Get current water storage (mm)
-            Wevap_Sat, Wevap_Fc, Wevap_Wp, Wevap_Dry, Wevap_Act = evap_layer_water_content(
-                NewCond_th,
-                NewCond_EvapZ,
-                prof,
-            )
-            # Get water storage (mm) at start of stage 2 evaporation
-            Wupper = NewCond_Wstage2 * (Wevap_Sat - (Wevap_Fc - Soil_REW)) + (Wevap_Fc - Soil_REW)
-            # Get water storage (mm) when there is no evaporation
-            Wlower = Wevap_Dry
-            # Get relative depletion of evaporation storage in stage 2
-            Wrel = (Wevap_Act - Wlower) / (Wupper - Wlower)
-            # Check if need to expand evaporation layer
-            if Soil_EvapZmax > Soil_EvapZmin:
-                Wcheck = Soil_fWrelExp * (
-                    (Soil_EvapZmax - NewCond_EvapZ) / (Soil_EvapZmax - Soil_EvapZmin)
-                )
-                while (Wrel < Wcheck) and (NewCond_EvapZ < Soil_EvapZmax):
-                    # Expand evaporation layer by 1 mm
-                    NewCond_EvapZ = NewCond_EvapZ + 0.001
-                    # Update water storage (mm) in evaporation layer
-                    Wevap_Sat, Wevap_Fc, Wevap_Wp, Wevap_Dry, Wevap_Act = evap_layer_water_content(
-                        NewCond_th,
-                        NewCond_EvapZ,
-                        prof,
-                    )
-                    Wupper = NewCond_Wstage2 * (Wevap_Sat - (Wevap_Fc - Soil_REW)) + (
-                        Wevap_Fc - Soil_REW
-                    )
-                    Wlower = Wevap_Dry
-                    # Update relative depletion of evaporation storage
-                    Wrel = (Wevap_Act - Wlower) / (Wupper - Wlower)
-                    Wcheck = Soil_fWrelExp * (
-                        (Soil_EvapZmax - NewCond_EvapZ) / (Soil_EvapZmax - Soil_EvapZmin)
-                    )
-
-            # Get stage 2 evaporation reduction coefficient
-            Kr = (np.exp(Soil_fevap * Wrel) - 1) / (np.exp(Soil_fevap) - 1)
-            if Kr > 1:
-                Kr = 1
-
-            # Get water to extract (mm)
-            ToExtractStg2 = Kr * Edt
-
-            # Extract water from compartments
-            comp_sto = np.sum(prof.dzsum < NewCond_EvapZ) + 1
-            comp = -1
-            # prof = Soil_Profile
-            while (ToExtractStg2 > 0) and (comp < comp_sto):
-                # Increment compartment counter
-                comp = comp + 1
-                # Specify layer number
-                # Determine proportion of compartment in evaporation layer
-                if prof.dzsum[comp] > NewCond_EvapZ:
-                    factor = 1 - ((prof.dzsum[comp] - NewCond_EvapZ) / prof.dz[comp])
-                else:
-                    factor = 1
-
-                # Water storage (mm) at air dry
-                Wdry = 1000 * prof.th_dry[comp] * prof.dz[comp]
-                # Available water (mm)
-                W = 1000 * NewCond_th[comp] * prof.dz[comp]
-                # Water available in compartment for extraction (mm)
-                AvW = (W - Wdry) * factor
-                if AvW >= ToExtractStg2:
-                    # Update actual evaporation
-                    EsAct = EsAct + ToExtractStg2
-                    # Update depth of water in current compartment
-                    W = W - ToExtractStg2
-                    # Update total water to be extracted
-                    ToExtract = ToExtract - ToExtractStg2
-                    # Update water to be extracted from surface layer (stage 1)
-                    ToExtractStg2 = 0
-                else:
-                    # Update actual evaporation
-                    EsAct = EsAct + AvW
-                    # Update depth of water in current compartment
-                    W = W - AvW
-                    # Update water to be extracted from surface layer (stage 1)
-                    ToExtractStg2 = ToExtractStg2 - AvW
-                    # Update total water to be extracted
-                    ToExtract = ToExtract - AvW
-
-                # Update water content
-                NewCond_th[comp] = W / (1000 * prof.dz[comp])
+        NewCond_EvapZ, EsAct = _stage_two_evaporation(
+            ClockStruct_EvapTimeSteps,
+            ClockStruct_EvapTolerance,
+            prof.dz,
+            prof.dzsum,
+            prof.th_s,
+            prof.th_fc,
+            prof.th_wp,
+            prof.th_dry,
+            Soil_EvapZmin,
+            Soil_EvapZmax,
+            Soil_REW,
+            Soil_fWrelExp,
+            Soil_fevap,
+            NewCond_th,
+            NewCond_EvapZ,
+            NewCond_Wstage2,
+            ToExtract,
+            EsAct,
+            backend=backend,
+        )
 
     ## Store potential evaporation for irrigation calculations on next day ##
     NewCond_Epot = EsPot
@@ -494,3 +433,175 @@ def soil_evaporation(
         EsAct,
         EsPot,
     )
+
+
+@compiled
+def _stage_two_evaporation(
+    ClockStruct_EvapTimeSteps: int,
+    ClockStruct_EvapTolerance: float,
+    dz: "ndarray",
+    dzsum: "ndarray",
+    th_s: "ndarray",
+    th_fc: "ndarray",
+    th_wp: "ndarray",
+    th_dry: "ndarray",
+    Soil_EvapZmin: float,
+    Soil_EvapZmax: float,
+    Soil_REW: float,
+    Soil_fWrelExp: float,
+    Soil_fevap: float,
+    NewCond_th: "ndarray",
+    NewCond_EvapZ: float,
+    NewCond_Wstage2: float,
+    ToExtract: float,
+    EsAct: float,
+) -> Tuple[float, float]:
+    """
+    Array kernel of the stage 2 evaporation in soil_evaporation
+
+    With a tolerance of 0 the day is split into ClockStruct_EvapTimeSteps
+    equal sub-steps. Otherwise consecutive sub-steps are merged into one
+    step as long as the reduction coefficient Kr, estimated at the end of
+    the step from the water it extracts, changes the extracted water by
+    less than the tolerance. Days on which Kr is flat (e.g. Kr = 1, or a
+    dry layer with Kr close to 0) take a single step, and steps are halved
+    where Wrel falls quickly.
+
+    Arguments:
+
+        ClockStruct_EvapTimeSteps (int): number of sub-daily steps
+
+        ClockStruct_EvapTolerance (float): error tolerance (mm) of adaptive sub-steps, 0 for fixed sub-steps
+
+        dz, dzsum, th_s, th_fc, th_wp, th_dry (numpy.array): soil profile paramaters
+
+        Soil_EvapZmin, Soil_EvapZmax, Soil_REW, Soil_fWrelExp, Soil_fevap (float): soil evaporation paramaters
+
+        NewCond_th (numpy.array): soil water content, updated in place
+
+        NewCond_EvapZ (float): depth of the evaporation layer
+
+        NewCond_Wstage2 (float): proportional water storage for start of stage two evaporation
+
+        ToExtract (float): water left to extract on the current day
+
+        EsAct (float): evaporation so far on the current day
+
+    Returns:
+
+        NewCond_EvapZ (float): updated depth of the evaporation layer
+
+        EsAct (float): actual evaporation on the current day
+
+    """
+    # Get sub-daily evaporative demand
+    Edt = ToExtract / ClockStruct_EvapTimeSteps
+    # Number of sub-daily steps left and merged in the current step
+    StepsLeft = int(ClockStruct_EvapTimeSteps)
+    if ClockStruct_EvapTolerance > 0:
+        Steps = StepsLeft
+    else:
+        Steps = 1
+    # Loop sub-daily steps
+    while StepsLeft > 0:
+        if Steps > StepsLeft:
+            Steps = StepsLeft
+        # Get current water storage (mm)
+        Wevap_Sat, Wevap_Fc, Wevap_Wp, Wevap_Dry, Wevap_Act = _evap_layer_water_content(
+            NewCond_th, NewCond_EvapZ, dz, dzsum, th_s, th_fc, th_wp, th_dry
+        )
+        # Get water storage (mm) at start of stage 2 evaporation
+        Wupper = NewCond_Wstage2 * (Wevap_Sat - (Wevap_Fc - Soil_REW)) + (Wevap_Fc - Soil_REW)
+        # Get water storage (mm) when there is no evaporation
+        Wlower = Wevap_Dry
+        # Get relative depletion of evaporation storage in stage 2
+        Wrel = (Wevap_Act - Wlower) / (Wupper - Wlower)
+        # Check if need to expand evaporation layer
+        if Soil_EvapZmax > Soil_EvapZmin:
+            Wcheck = Soil_fWrelExp * (
+                (Soil_EvapZmax - NewCond_EvapZ) / (Soil_EvapZmax - Soil_EvapZmin)
+            )
+            while (Wrel < Wcheck) and (NewCond_EvapZ < Soil_EvapZmax):
+                # Expand evaporation layer by 1 mm
+                NewCond_EvapZ = NewCond_EvapZ + 0.001
+                # Update water storage (mm) in evaporation layer
+                Wevap_Sat, Wevap_Fc, Wevap_Wp, Wevap_Dry, Wevap_Act = _evap_layer_water_content(
+                    NewCond_th, NewCond_EvapZ, dz, dzsum, th_s, th_fc, th_wp, th_dry
+                )
+                Wupper = NewCond_Wstage2 * (Wevap_Sat - (Wevap_Fc - Soil_REW)) + (
+                    Wevap_Fc - Soil_REW
+                )
+                Wlower = Wevap_Dry
+                # Update relative depletion of evaporation storage
+                Wrel = (Wevap_Act - Wlower) / (Wupper - Wlower)
+                Wcheck = Soil_fWrelExp * (
+                    (Soil_EvapZmax - NewCond_EvapZ) / (Soil_EvapZmax - Soil_EvapZmin)
+                )
+
+        # Get stage 2 evaporation reduction coefficient
+        Kr = (np.exp(Soil_fevap * Wrel) - 1) / (np.exp(Soil_fevap) - 1)
+        if Kr > 1:
+            Kr = 1
+
+        # Merge sub-steps while Kr changes by less than the tolerance
+        if ClockStruct_EvapTolerance > 0:
+            while Steps > 1:
+                # Relative depletion once the water of the step is extracted
+                WrelEnd = (Wevap_Act - Kr * Edt * Steps - Wlower) / (Wupper - Wlower)
+                KrEnd = (np.exp(Soil_fevap * WrelEnd) - 1) / (np.exp(Soil_fevap) - 1)
+                if KrEnd > 1:
+                    KrEnd = 1
+                if abs(Kr - KrEnd) * Edt * Steps <= ClockStruct_EvapTolerance:
+                    break
+                Steps = Steps // 2
+
+        # Get water to extract (mm)
+        ToExtractStg2 = Kr * Edt * Steps
+
+        # Extract water from compartments
+        comp_sto = np.sum(dzsum < NewCond_EvapZ) + 1
+        comp = -1
+        while (ToExtractStg2 > 0) and (comp < comp_sto):
+            # Increment compartment counter
+            comp = comp + 1
+            # Specify layer number
+            # Determine proportion of compartment in evaporation layer
+            if dzsum[comp] > NewCond_EvapZ:
+                factor = 1 - ((dzsum[comp] - NewCond_EvapZ) / dz[comp])
+            else:
+                factor = 1
+
+            # Water storage (mm) at air dry
+            Wdry = 1000 * th_dry[comp] * dz[comp]
+            # Available water (mm)
+            W = 1000 * NewCond_th[comp] * dz[comp]
+            # Water available in compartment for extraction (mm)
+            AvW = (W - Wdry) * factor
+            if AvW >= ToExtractStg2:
+                # Update actual evaporation
+                EsAct = EsAct + ToExtractStg2
+                # Update depth of water in current compartment
+                W = W - ToExtractStg2
+                # Update total water to be extracted
+                ToExtract = ToExtract - ToExtractStg2
+                # Update water to be extracted from surface layer (stage 1)
+                ToExtractStg2 = 0
+            else:
+                # Update actual evaporation
+                EsAct = EsAct + AvW
+                # Update depth of water in current compartment
+                W = W - AvW
+                # Update water to be extracted from surface layer (stage 1)
+                ToExtractStg2 = ToExtractStg2 - AvW
+                # Update total water to be extracted
+                ToExtract = ToExtract - AvW
+
+            # Update water content
+            NewCond_th[comp] = W / (1000 * dz[comp])
+
+        StepsLeft = StepsLeft - Steps
+        if ClockStruct_EvapTolerance > 0:
+            # Try a longer step next
+            Steps = 2 * Steps
+
+    return NewCond_EvapZ, EsAct
@@ -1,11 +1,14 @@
 import numpy as np
 
+from .backend import compiled
+
 from typing import TYPE_CHECKING, Tuple
 
 if TYPE_CHECKING:
     # Important: classes are only imported when types are checked, not in production.
     from numpy import ndarray
 
+@compiled
 def water_stress(
     Crop_p_up: "ndarray",
     Crop_p_lo: "ndarray",
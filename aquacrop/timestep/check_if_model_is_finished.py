@@ -1,6 +1,6 @@
 def check_model_is_finished(
-    step_end_time: str,
-    simulation_end_date: str,
+    next_step: int,
+    last_step: int,
     model_is_finished: bool,
     season_counter: int,
     n_seasons: int,
@@ -12,9 +12,9 @@ def check_model_is_finished(
 
     Arguments:
 
-        step_end_time (str):  date of next step
+        next_step (int):  day index (from the start of simulation) of the next step
 
-        simulation_end_date (str):  date of end of simulation
+        last_step (int):  day index of the last step of the simulation
 
         model_is_finished (bool):  is model finished
 
@@ -32,10 +32,9 @@ def check_model_is_finished(
     """
 
     # Check if current time-step is the last
-    current_time = step_end_time
-    if current_time < simulation_end_date:
+    if next_step < last_step:
         model_is_finished = False
-    elif current_time >= simulation_end_date:
+    elif next_step >= last_step:
         model_is_finished = True
 
     # Check if at the end of last growing season ##
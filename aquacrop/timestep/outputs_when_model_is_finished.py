@@ -1,6 +1,12 @@
 import pandas as pd
 from typing import TYPE_CHECKING
 
+from ..entities.output import (
+    CROP_GROWTH_COLUMNS,
+    WATER_FLUX_COLUMNS,
+    water_storage_columns,
+)
+
 if TYPE_CHECKING:
     # Important: classes are only imported when types are checked, not in production.
     from numpy import ndarray
@@ -15,6 +21,8 @@ def outputs_when_model_is_finished(
     """
     Function that turns numpy array outputs into pandas dataframes
 
+    Outputs that are not kept (None) stay None.
+
     Arguments:
 
         model_is_finished (bool):  is model finished
@@ -42,54 +50,20 @@ def outputs_when_model_is_finished(
     if model_is_finished is True or steps_are_finished is True:
         # ClockStruct.step_start_time = ClockStruct.step_end_time
         # ClockStruct.step_end_time = ClockStruct.step_end_time + np.timedelta64(1, "D")
-        flux_output_df = pd.DataFrame(
-            flux_output,
-            columns=[
-                "time_step_counter",
-                "season_counter",
-                "dap",
-                "Wr",
-                "z_gw",
-                "surface_storage",
-                "IrrDay",
-                "Infl",
-                "Runoff",
-                "DeepPerc",
-                "CR",
-                "GwIn",
-                "Es",
-                "EsPot",
-                "Tr",
-                "TrPot",
-            ],
-        )
-
-        water_output_df = pd.DataFrame(
-            water_output,
-            columns=["time_step_counter", "growing_season", "dap"]
-            + ["th" + str(i) for i in range(1, water_output.shape[1] - 2)],
-        )
-
-        growth_outputs_df = pd.DataFrame(
-            growth_outputs,
-            columns=[
-                "time_step_counter",
-                "season_counter",
-                "dap",
-                "gdd",
-                "gdd_cum",
-                "z_root",
-                "canopy_cover",
-                "canopy_cover_ns",
-                "biomass",
-                "biomass_ns",
-                "harvest_index",
-                "harvest_index_adj",
-                "DryYield",
-                "FreshYield",
-                "YieldPot",
-            ],
-        )
+        flux_output_df = None
+        if flux_output is not None:
+            flux_output_df = pd.DataFrame(flux_output, columns=WATER_FLUX_COLUMNS)
+
+        water_output_df = None
+        if water_output is not None:
+            water_output_df = pd.DataFrame(
+                water_output,
+                columns=water_storage_columns(water_output.shape[1] - 3),
+            )
+
+        growth_outputs_df = None
+        if growth_outputs is not None:
+            growth_outputs_df = pd.DataFrame(growth_outputs, columns=CROP_GROWTH_COLUMNS)
 
         return flux_output_df, water_output_df, growth_outputs_df
 
@@ -1,15 +1,15 @@
 import numpy as np
-import pandas as pd
 
 from ..entities.modelConstants import ModelConstants
 from ..initialize.calculate_HI_linear import calculate_HI_linear
 from ..initialize.calculate_HIGC import calculate_HIGC
+from ..initialize.compute_gdd_cache import calendar_days
+from ..initialize.compute_weather_arrays import day_ordinal
 
 from typing import Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     # Important: classes are only imported when types are checked, not in production.
-    from numpy import ndarray
     from aquacrop.entities.clockStruct import ClockStruct
     from aquacrop.entities.initParamVariables import InitialCondition
     from aquacrop.entities.paramStruct import ParamStruct
@@ -19,7 +19,6 @@ def reset_initial_conditions(
     ClockStruct: "ClockStruct",
     InitCond: "InitialCondition",
     ParamStruct: "ParamStruct",
-    weather: "ndarray",
     crop: "Crop") -> Tuple["InitialCondition", "ParamStruct"]:
 
     """
@@ -34,7 +33,7 @@ def reset_initial_conditions(
 
         ParamStruct (ParamStruct):  containing current model paramaters
 
-        weather (numpy.ndarray):  weather data for simulation period
+        crop (Crop):  crop parameters
 
 
     Returns:
@@ -53,7 +52,7 @@ def reset_initial_conditions(
 
     # Extract structures for updating
     Soil = ParamStruct.Soil
-    crop = ParamStruct.Seasonal_Crop_List[ClockStruct.season_counter]
+    crop = ParamStruct.Seasonal_Crops.season(ClockStruct.season_counter)
     FieldMngt = ParamStruct.FieldMngt
 
     # Reset counters
@@ -132,10 +131,10 @@ def reset_initial_conditions(
         if ParamStruct.CO2.current_concentration > 0.:
             CO2conc = ParamStruct.CO2.current_concentration
         else:
-            CO2conc = ParamStruct.CO2.co2_data_processed.iloc[0]
+            CO2conc = ParamStruct.CO2.co2_data_processed[0]
     else:
-        Yri = pd.DatetimeIndex([ClockStruct.step_start_time]).year[0]
-        CO2conc = ParamStruct.CO2.co2_data_processed.loc[Yri]
+        Yri = ClockStruct.step_start_time.year
+        CO2conc = ParamStruct.CO2.co2_data_processed[Yri - ParamStruct.CO2.co2_data_years[0]]
 
     ParamStruct.CO2.current_concentration = CO2conc
 
@@ -217,58 +216,37 @@ def reset_initial_conditions(
 
     # Update crop parameters (if in gdd mode)
     if crop.CalendarType == 2:
-        # Extract weather data for upcoming growing season
-        weather_df = weather[
-            weather[:, 4] >= ClockStruct.planting_dates[ClockStruct.season_counter]
-        ]
-
-        temp_min = weather_df[:, 0]
-        temp_max = weather_df[:, 1]
-
-        # Calculate gdd's
-        if crop.GDDmethod == 1:
-            Tmean = (temp_max + temp_min) / 2
-            Tmean[Tmean > crop.Tupp] = crop.Tupp
-            Tmean[Tmean < crop.Tbase] = crop.Tbase
-            gdd = Tmean - crop.Tbase
-        elif crop.GDDmethod == 2:
-            temp_max[temp_max > crop.Tupp] = crop.Tupp
-            temp_max[temp_max < crop.Tbase] = crop.Tbase
-            temp_min[temp_min > crop.Tupp] = crop.Tupp
-            temp_min[temp_min < crop.Tbase] = crop.Tbase
-            Tmean = (temp_max + temp_min) / 2
-            gdd = Tmean - crop.Tbase
-        elif crop.GDDmethod == 3:
-            temp_max[temp_max > crop.Tupp] = crop.Tupp
-            temp_max[temp_max < crop.Tbase] = crop.Tbase
-            temp_min[temp_min > crop.Tupp] = crop.Tupp
-            Tmean = (temp_max + temp_min) / 2
-            Tmean[Tmean < crop.Tbase] = crop.Tbase
-            gdd = Tmean - crop.Tbase
-
-        gdd_cum = np.cumsum(gdd)
+        # Cumulative gdd's of the upcoming growing season
+        gdd_cache = ParamStruct.gdd_cache
+        start = gdd_cache.day_index(
+            day_ordinal(ClockStruct.planting_dates[ClockStruct.season_counter])
+        )
+        targets = [crop.Maturity, crop.MaxCanopy, crop.CanopyDevEnd, crop.HIstart, crop.HIend]
+        if crop.CropType == 3:
+            targets.append(crop.FloweringEnd)
+        gdd_cum = gdd_cache.season_gdd_cum(start, crop, targets)
 
         assert (
             gdd_cum[-1] > crop.Maturity
         ), f"not enough growing degree days in simulation ({gdd_cum[-1]}) to reach maturity ({crop.Maturity})"
 
-        crop.MaturityCD = np.argmax((gdd_cum > crop.Maturity)) + 1
+        crop.MaturityCD = calendar_days(gdd_cum, crop.Maturity)
 
         assert crop.MaturityCD < 365, "crop will take longer than 1 year to mature"
 
         # 1. gdd's from sowing to maximum canopy cover
-        crop.MaxCanopyCD = (gdd_cum > crop.MaxCanopy).argmax() + 1
+        crop.MaxCanopyCD = calendar_days(gdd_cum, crop.MaxCanopy)
         # 2. gdd's from sowing to end of vegetative growth
-        crop.CanopyDevEndCD = (gdd_cum > crop.CanopyDevEnd).argmax() + 1
+        crop.CanopyDevEndCD = calendar_days(gdd_cum, crop.CanopyDevEnd)
         # 3. Calendar days from sowing to start of yield_ formation
-        crop.HIstartCD = (gdd_cum > crop.HIstart).argmax() + 1
+        crop.HIstartCD = calendar_days(gdd_cum, crop.HIstart)
         # 4. Calendar days from sowing to end of yield_ formation
-        crop.HIendCD = (gdd_cum > crop.HIend).argmax() + 1
+        crop.HIendCD = calendar_days(gdd_cum, crop.HIend)
         # 5. Duration of yield_ formation in calendar days
         crop.YldFormCD = crop.HIendCD - crop.HIstartCD
         if crop.CropType == 3:
             # 1. Calendar days from sowing to end of flowering
-            FloweringEnd = (gdd_cum > crop.FloweringEnd).argmax() + 1
+            FloweringEnd = calendar_days(gdd_cum, crop.FloweringEnd)
             # 2. Duration of flowering in calendar days
             crop.FloweringCD = FloweringEnd - crop.HIstartCD
         else:
@@ -294,6 +272,6 @@ def reset_initial_conditions(
             crop.dHILinear = 0.0
 
     # Update global variables
-    ParamStruct.Seasonal_Crop_List[ClockStruct.season_counter] = crop
+    ParamStruct.Seasonal_Crops.save_season(ClockStruct.season_counter)
 
     return InitCond, ParamStruct
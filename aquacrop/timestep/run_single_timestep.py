@@ -92,13 +92,13 @@ def solution_single_time_step(
     # Check if growing season is active on current time step %%
     if clock_struct.season_counter >= 0:
         # Check if in growing season
-        CurrentDate = clock_struct.step_start_time
-        planting_date = clock_struct.planting_dates[clock_struct.season_counter]
-        harvest_date = clock_struct.harvest_dates[clock_struct.season_counter]
+        current_step = clock_struct.time_step_counter
+        planting_step = clock_struct.planting_steps[clock_struct.season_counter]
+        harvest_step = clock_struct.harvest_steps[clock_struct.season_counter]
 
         if (
-            (planting_date <= CurrentDate)
-            and (harvest_date >= CurrentDate)
+            (planting_step <= current_step)
+            and (harvest_step >= current_step)
             and (NewCond.crop_mature is False)
             and (NewCond.crop_dead is False)
         ):
@@ -106,7 +106,7 @@ def solution_single_time_step(
         else:
             growing_season = False
         # Assign crop, irrigation management, and field management structures
-        Crop_ = param_struct.Seasonal_Crop_List[clock_struct.season_counter]
+        Crop_ = param_struct.Seasonal_Crops.season(clock_struct.season_counter)
         Crop_Name = param_struct.CropChoices[clock_struct.season_counter]
         IrrMngt = param_struct.IrrMngt
 
@@ -204,6 +204,7 @@ def solution_single_time_step(
         Soil.Profile,
         NewCond.th,
         NewCond.th_fc_Adj,
+        backend=param_struct.backend,
     )
 
     # 5. Surface runoff
@@ -246,6 +247,7 @@ def solution_single_time_step(
         growing_season,
         precipitation,
         Runoff,
+        backend=param_struct.backend,
     )
 
     # 7. Infiltration
@@ -270,6 +272,7 @@ def solution_single_time_step(
         DeepPerc,
         Runoff,
         growing_season,
+        backend=param_struct.backend,
     )
     # 8. Capillary Rise
     NewCond, CR = capillary_rise(
@@ -279,6 +282,7 @@ def solution_single_time_step(
         NewCond,
         FluxOut,
         param_struct.water_table,
+        backend=param_struct.backend,
     )
 
     # 9. Check germination
@@ -297,7 +301,7 @@ def solution_single_time_step(
 
     # 11. Canopy cover development
     NewCond = canopy_cover(
-        crop, Soil.Profile, Soil.z_top, NewCond, gdd, et0, growing_season
+        crop, Soil.Profile, Soil.z_top, NewCond, gdd, et0, growing_season, backend=param_struct.backend
     )
 
     # 12. Soil evaporation
@@ -313,6 +317,7 @@ def solution_single_time_step(
         EsPot,
     ) = soil_evaporation(
         clock_struct.evap_time_steps,
+        clock_struct.evap_tolerance,
         clock_struct.sim_off_season,
         clock_struct.time_step_counter,
         Soil.Profile,
@@ -351,6 +356,7 @@ def solution_single_time_step(
         precipitation,
         Irr,
         growing_season,
+        backend=param_struct.backend,
     )
 
     # 13. Crop transpiration
@@ -366,6 +372,7 @@ def solution_single_time_step(
         CO2,
         growing_season,
         gdd,
+        backend=param_struct.backend,
     )
 
     # 14. Groundwater inflow
@@ -403,7 +410,7 @@ def solution_single_time_step(
 
     # 17. Harvest index
     NewCond = harvest_index(
-        Soil.Profile, Soil.z_top, crop, NewCond, et0, temp_max, temp_min, growing_season
+        Soil.Profile, Soil.z_top, crop, NewCond, et0, temp_max, temp_min, growing_season, backend=param_struct.backend
     )
 
     # 18. Yield potential
@@ -439,6 +446,7 @@ def solution_single_time_step(
         Soil.z_top,
         float(crop.Zmin),
         crop.Aer,
+        backend=param_struct.backend,
     )
 
     # 21. Update net irrigation to add any pre irrigation
@@ -446,7 +454,8 @@ def solution_single_time_step(
     NewCond.irr_net_cum = NewCond.irr_net_cum + PreIrr
 
     # Update model outputs %%
-    row_day = clock_struct.time_step_counter
+    if outputs.daily is True:
+        row_day = outputs.row(clock_struct.time_step_counter)
     row_gs = clock_struct.season_counter
 
     # Irrigation
@@ -468,50 +477,69 @@ def solution_single_time_step(
         NewCond.taw = _TAW.Rz
 
     # Water contents
-    outputs.water_storage[row_day, :3] = np.array(
-        [clock_struct.time_step_counter, growing_season, NewCond.dap]
-    )
-    outputs.water_storage[row_day, 3:] = NewCond.th
+    if outputs.water_storage is not None:
+        outputs.water_storage[row_day, :3] = np.array(
+            [clock_struct.time_step_counter, growing_season, NewCond.dap]
+        )
+        outputs.water_storage[row_day, 3:] = NewCond.th
 
     # Water fluxes
-    # print(f'Saving NewCond.z_gw to outputs: {NewCond.z_gw}')
-    outputs.water_flux[row_day, :] = [
-        clock_struct.time_step_counter,
-        clock_struct.season_counter,
-        NewCond.dap,
-        Wr,
-        NewCond.z_gw,
-        NewCond.surface_storage,
-        IrrDay,
-        Infl,
-        Runoff,
-        DeepPerc,
-        CR,
-        GwIn,
-        Es,
-        EsPot,
-        Tr,
-        TrPot,
-    ]
+    if outputs.water_flux is not None:
+        # print(f'Saving NewCond.z_gw to outputs: {NewCond.z_gw}')
+        outputs.water_flux[row_day, :] = [
+            clock_struct.time_step_counter,
+            clock_struct.season_counter,
+            NewCond.dap,
+            Wr,
+            NewCond.z_gw,
+            NewCond.surface_storage,
+            IrrDay,
+            Infl,
+            Runoff,
+            DeepPerc,
+            CR,
+            GwIn,
+            Es,
+            EsPot,
+            Tr,
+            TrPot,
+        ]
 
     # Crop growth
-    outputs.crop_growth[row_day, :] = [
-        clock_struct.time_step_counter,
-        clock_struct.season_counter,
-        NewCond.dap,
-        gdd,
-        NewCond.gdd_cum,
-        NewCond.z_root,
-        NewCond.canopy_cover,
-        NewCond.canopy_cover_ns,
-        NewCond.biomass,
-        NewCond.biomass_ns,
-        NewCond.harvest_index,
-        NewCond.harvest_index_adj,
-        NewCond.DryYield,
-        NewCond.FreshYield,
-        NewCond.YieldPot,
-    ]
+    if outputs.crop_growth is not None:
+        outputs.crop_growth[row_day, :] = [
+            clock_struct.time_step_counter,
+            clock_struct.season_counter,
+            NewCond.dap,
+            gdd,
+            NewCond.gdd_cum,
+            NewCond.z_root,
+            NewCond.canopy_cover,
+            NewCond.canopy_cover_ns,
+            NewCond.biomass,
+            NewCond.biomass_ns,
+            NewCond.harvest_index,
+            NewCond.harvest_index_adj,
+            NewCond.DryYield,
+            NewCond.FreshYield,
+            NewCond.YieldPot,
+        ]
+
+    # Growing season totals
+    if outputs.seasonal_aggregates is not None and growing_season is True:
+        outputs.seasonal_aggregates[row_gs, :] += [
+            1,
+            IrrDay,
+            Infl,
+            Runoff,
+            DeepPerc,
+            CR,
+            GwIn,
+            Es,
+            EsPot,
+            Tr,
+            TrPot,
+        ]
 
     # Final output (if at end of growing season)
     if clock_struct.season_counter > -1:
@@ -519,8 +547,8 @@ def solution_single_time_step(
             (NewCond.crop_mature is True)
             or (NewCond.crop_dead is True)
             or (
-                clock_struct.harvest_dates[clock_struct.season_counter]
-                == clock_struct.step_end_time
+                clock_struct.harvest_steps[clock_struct.season_counter]
+                == clock_struct.time_step_counter + 1
             )
         ) and (NewCond.harvest_flag is False):
 
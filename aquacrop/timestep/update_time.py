@@ -7,7 +7,6 @@ from typing import Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     # Important: classes are only imported when types are checked, not in production.
-    from numpy import ndarray
     from aquacrop.entities.clockStruct import ClockStruct
     from aquacrop.entities.initParamVariables import InitialCondition
     from aquacrop.entities.paramStruct import ParamStruct
@@ -17,7 +16,6 @@ def update_time(
     clock_struct: "ClockStruct",
     init_cond: "InitialCondition",
     param_struct: "ParamStruct",
-    weather: "ndarray",
     crop: "Crop",
     ) -> Tuple["ClockStruct","InitialCondition", "ParamStruct"]:
     """
@@ -31,7 +29,7 @@ def update_time(
 
         param_struct (ParamStruct):  containing model paramaters
 
-        weather (numpy.array):  weather data for simulation period
+        crop (Crop):  crop parameters
 
     Returns:
 
@@ -55,50 +53,32 @@ def update_time(
             if clock_struct.season_counter < clock_struct.n_seasons - 1:
                 # Update growing season counter
                 clock_struct.season_counter = clock_struct.season_counter + 1
-                # Update time-step counter
-
-                clock_struct.time_step_counter = clock_struct.time_span.get_loc(
-                    clock_struct.planting_dates[clock_struct.season_counter]
-                )
-                # Update start time of time-step
-                clock_struct.step_start_time = clock_struct.time_span[
-                    clock_struct.time_step_counter
-                ]
-                # Update end time of time-step
-                clock_struct.step_end_time = clock_struct.time_span[
-                    clock_struct.time_step_counter + 1
+                # Update time-step counter (start and end time of time-step follow)
+                clock_struct.time_step_counter = clock_struct.planting_steps[
+                    clock_struct.season_counter
                 ]
                 # Reset initial conditions for start of growing season
                 init_cond, param_struct = reset_initial_conditions(
-                    clock_struct, init_cond, param_struct, weather, crop
+                    clock_struct, init_cond, param_struct, crop
                 )
 
         else:
             # Simulation considers off-season, so progress by one time-step
             # (one day)
-            # Time-step counter
+            # Time-step counter (start and end time of time-step follow)
             clock_struct.time_step_counter = clock_struct.time_step_counter + 1
-            # Start of time step (beginning of current day)
-            # clock_struct.time_span = pd.Series(clock_struct.time_span)
-            clock_struct.step_start_time = clock_struct.time_span[
-                clock_struct.time_step_counter
-            ]
-            # End of time step (beginning of next day)
-            clock_struct.step_end_time = clock_struct.time_span[
-                clock_struct.time_step_counter + 1
-            ]
             # Check if it is not the last growing season
             if clock_struct.season_counter < clock_struct.n_seasons - 1:
                 # Check if upcoming day is the start of a new growing season
                 if (
-                    clock_struct.step_start_time
-                    == clock_struct.planting_dates[clock_struct.season_counter + 1]
+                    clock_struct.time_step_counter
+                    == clock_struct.planting_steps[clock_struct.season_counter + 1]
                 ):
                     # Update growing season counter
                     clock_struct.season_counter = clock_struct.season_counter + 1
                     # Reset initial conditions for start of growing season
                     init_cond, param_struct = reset_initial_conditions(
-                        clock_struct, init_cond, param_struct, weather, crop
+                        clock_struct, init_cond, param_struct, crop
                     )
 
     return clock_struct, init_cond, param_struct
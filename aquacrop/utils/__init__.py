@@ -1,6 +1,35 @@
-import sys
+"""
+Weather and data helpers, imported on first access (PEP 562).
+"""
+import importlib
 
-if not "-m" in sys.argv:
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Important: classes are only imported when types are checked, not in production.
     from .prepare_weather import prepare_weather
     from .data import get_filepath
     from .lars import prepare_lars_weather, select_lars_wdf
+
+# public name -> module it is defined in
+_LAZY = {
+    "prepare_weather": ".prepare_weather",
+    "get_filepath": ".data",
+    "prepare_lars_weather": ".lars",
+    "select_lars_wdf": ".lars",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from ..initialize.compute_weather_arrays import day_ordinal
+
 def prepare_gdd(weather_df, sim_start, sim_end, gdd, crop, sum_fun):
     """
     function to read in GDD and crop data to return
@@ -29,7 +31,9 @@ def prepare_gdd(weather_df, sim_start, sim_end, gdd, crop, sum_fun):
 
     # add gdd as column
     assert len(gdd) == len(weather_df), "The length of 'gdd' does not match the number of rows in 'weather_df', check planting date is on or after simulation start date in first year."
+    gdd = np.asarray(gdd, dtype=float)
     weather_df['gdd']=gdd
+    days = day_ordinal(weather_df['Date'].values)
 
     # Convert mm/dd formatted dates to datetime objects
     def parse_mmdd_to_datetime(mmdd_date, year):
@@ -48,7 +52,10 @@ def prepare_gdd(weather_df, sim_start, sim_end, gdd, crop, sum_fun):
         current_year += 1
         first_planting_date = parse_mmdd_to_datetime(planting_date, current_year)
 
-    # Loop through each year to assign seasons
+    # Loop through each year to assign seasons, the rows of a season are
+    # found by binary search on the (sorted) dates
+    season = np.full(len(weather_df), np.nan)
+    season_rows = []
     while first_planting_date <= sim_end_date:
         # Determine the end date of the season (a day before the next planting date)
         next_planting_date = parse_mmdd_to_datetime(planting_date, current_year + 1)
@@ -59,7 +66,11 @@ def prepare_gdd(weather_df, sim_start, sim_end, gdd, crop, sum_fun):
             season_end_date = sim_end_date
 
         # Update the 'season' column for the current season
-        weather_df.loc[(weather_df['Date'] >= first_planting_date) & (weather_df['Date'] <= season_end_date), 'season'] = season_counter
+        first_row = np.searchsorted(days, day_ordinal(first_planting_date))
+        last_row = np.searchsorted(days, day_ordinal(season_end_date), side='right')
+        season[first_row:last_row] = season_counter
+        if last_row > first_row:
+            season_rows.append((first_row, last_row))
 
         # Increment the season counter
         season_counter += 1
@@ -68,6 +79,8 @@ def prepare_gdd(weather_df, sim_start, sim_end, gdd, crop, sum_fun):
         current_year += 1
         first_planting_date = next_planting_date
 
+    weather_df['season'] = season
+
     # List of growth stages
     growth_stages = [
         'Emergence', 'Canopy10Pct', 'MaxRooting', 'MaxCanopy', 'CanopyDevEnd',
@@ -81,33 +94,27 @@ def prepare_gdd(weather_df, sim_start, sim_end, gdd, crop, sum_fun):
     # named with the values in 'growth_stages' in a dictionary
     gdd_lists = {f'{stage}': [] for stage in growth_stages}
 
-    # get list of season numbers to iterate across
-    seasons=weather_df['season'].unique()
-
     # iterate across seasons, calculating GDD to each CD growth stage
     # per season and storing in the gdd_lists lists
-    for season in seasons:
-        # filter to current season
-        season_data = weather_df[weather_df['season']==season]
-
+    for first_row, last_row in season_rows:
         # get cumulative GDD for current season
-        gdd_cum=np.cumsum(season_data['gdd'])
+        gdd_cum=np.cumsum(gdd[first_row:last_row])
 
         # Find GDD equivalent for each crop calendar day growth stage
-        gdd_lists['Emergence'].append(gdd_cum.iloc[int(crop.EmergenceCD)])
-        gdd_lists['Canopy10Pct'].append(gdd_cum.iloc[int(crop.Canopy10PctCD)])
-        gdd_lists['MaxRooting'].append(gdd_cum.iloc[int(crop.MaxRootingCD)])
-        gdd_lists['MaxCanopy'].append(gdd_cum.iloc[int(crop.MaxCanopyCD)])
-        gdd_lists['CanopyDevEnd'].append(gdd_cum.iloc[int(crop.CanopyDevEndCD)])
-        gdd_lists['Senescence'].append(gdd_cum.iloc[int(crop.SenescenceCD)])
-        gdd_lists['Maturity'].append(gdd_cum.iloc[int(crop.MaturityCD)])
-        gdd_lists['HIstart'].append(gdd_cum.iloc[int(crop.HIstartCD)])
-        gdd_lists['HIend'].append(gdd_cum.iloc[int(crop.HIendCD)])
+        gdd_lists['Emergence'].append(gdd_cum[int(crop.EmergenceCD)])
+        gdd_lists['Canopy10Pct'].append(gdd_cum[int(crop.Canopy10PctCD)])
+        gdd_lists['MaxRooting'].append(gdd_cum[int(crop.MaxRootingCD)])
+        gdd_lists['MaxCanopy'].append(gdd_cum[int(crop.MaxCanopyCD)])
+        gdd_lists['CanopyDevEnd'].append(gdd_cum[int(crop.CanopyDevEndCD)])
+        gdd_lists['Senescence'].append(gdd_cum[int(crop.SenescenceCD)])
+        gdd_lists['Maturity'].append(gdd_cum[int(crop.MaturityCD)])
+        gdd_lists['HIstart'].append(gdd_cum[int(crop.HIstartCD)])
+        gdd_lists['HIend'].append(gdd_cum[int(crop.HIendCD)])
         gdd_lists['YieldFormation'].append(crop.HIend - crop.HIstart)
 
         # Duration of flowering (gdd's) - (fruit/grain crops only)
         if crop.CropType == 3:
-            flowering_end=gdd_cum.iloc[int(crop.FloweringEndCD)]
+            flowering_end=gdd_cum[int(crop.FloweringEndCD)]
             # gdd's from sowing to end of flowering
             gdd_lists['FloweringEnd'].append(flowering_end)
             # Duration of flowering (gdd's)
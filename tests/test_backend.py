@@ -0,0 +1,115 @@
+"""
+Test the compiled kernel backend.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.solution import backend
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+_weather_data = prepare_weather(get_filepath("tunis_climate.txt"))
+
+
+def _model(backend_name):
+    return AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1982}/05/30",
+        weather_df=_weather_data,
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        backend=backend_name,
+    )
+
+
+class TestBackend(unittest.TestCase):
+    """
+    The numba backend must give the same results as the python backend.
+    """
+
+    _results = {}
+    for _backend in ("python", "numba"):
+        _results[_backend] = _model(_backend)
+        _results[_backend].run_model(till_termination=True)
+
+    def test_yield(self):
+        """
+        Seasonal yields match
+        """
+        expected = self._results["python"].get_simulation_results()
+        returned = self._results["numba"].get_simulation_results()
+        self.assertEqual(
+            list(expected["Dry yield (tonne/ha)"].round(6)),
+            list(returned["Dry yield (tonne/ha)"].round(6)),
+        )
+        self.assertEqual(
+            list(expected["Harvest Date (Step)"]), list(returned["Harvest Date (Step)"])
+        )
+
+    def test_water_flux(self):
+        """
+        Daily water fluxes match
+        """
+        expected = self._results["python"].get_water_flux()
+        returned = self._results["numba"].get_water_flux()
+        self.assertTrue(
+            np.allclose(expected.values, returned.values, rtol=0, atol=1e-9, equal_nan=True)
+        )
+
+    def test_models_side_by_side(self):
+        """
+        Models with different backends stepped in turn each keep their own backend
+        """
+        models = {name: _model(name) for name in ("python", "numba")}
+        for model in models.values():
+            model._initialize()
+        while not all(model._clock_struct.model_is_finished for model in models.values()):
+            for model in models.values():
+                if not model._clock_struct.model_is_finished:
+                    model.run_model(num_steps=1, initialize_model=False)
+
+        for name, model in models.items():
+            self.assertTrue(model.get_water_flux().equals(self._results[name].get_water_flux()))
+
+    def test_backend_per_call(self):
+        """
+        A kernel runs on the backend given by each call, not on a shared setting
+        """
+        kernel = backend.compiled(lambda a, b: a + b)
+        with mock.patch.object(backend, "_numba") as numba:
+            numba.njit.return_value = lambda func: lambda *args: "compiled"
+            self.assertEqual(kernel(1, 2), 3)
+            self.assertEqual(kernel(1, 2, backend="numba"), "compiled")
+            self.assertEqual(kernel(1, 2), 3)
+
+    def test_environment_variable(self):
+        """
+        Backend is read from the environment variable when not given
+        """
+        with mock.patch.dict(os.environ, {backend.BACKEND_ENV: "python"}):
+            self.assertEqual(backend.resolve_backend(), "python")
+
+    def test_unknown_backend(self):
+        """
+        Unknown backends are rejected
+        """
+        with self.assertRaises(ValueError):
+            backend.resolve_backend("fortran")
+
+    def test_fallback(self):
+        """
+        Python backend is used when numba cannot be imported
+        """
+        with mock.patch.object(backend, "_load_numba", return_value=None):
+            with self.assertWarns(UserWarning):
+                self.assertEqual(backend.resolve_backend("numba"), "python")
+
+
+if __name__ == "__main__":
+    unittest.main()
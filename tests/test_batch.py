@@ -0,0 +1,228 @@
+"""
+Test the multi-site batch engine against scalar model runs.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from aquacrop import (
+    AquaCropModel,
+    AquaCropBatch,
+    Soil,
+    Crop,
+    InitialWaterContent,
+    IrrigationManagement,
+)
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+def _assert_same_results(test, batch, models):
+    """
+    Check the outputs of each site of a batch against its scalar model
+    """
+    for site, model in enumerate(models):
+        # the scalar model keeps a seasonal irrigation of 0 as an integer
+        pd.testing.assert_frame_equal(
+            batch.get_simulation_results()[site],
+            model.get_simulation_results(),
+            check_dtype=False,
+        )
+        test.assertTrue(batch.get_water_flux()[site].equals(model.get_water_flux()))
+        test.assertTrue(batch.get_water_storage()[site].equals(model.get_water_storage()))
+        test.assertTrue(batch.get_crop_growth()[site].equals(model.get_crop_growth()))
+
+
+class TestAquaCropBatch(unittest.TestCase):
+    """
+    Every site of a batch must give the same results as a scalar model.
+    """
+
+    _weather_dry = prepare_weather(get_filepath("tunis_climate.txt"))
+    _weather_wet = _weather_dry.copy()
+    _weather_wet["Precipitation"] = _weather_wet["Precipitation"] * 2
+    _weather = [_weather_dry, _weather_wet]
+    _initial_water_content = [
+        InitialWaterContent(value=["FC"]),
+        InitialWaterContent(value=["WP"]),
+    ]
+
+    _batch = AquaCropBatch(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1982}/05/30",
+        weather_df=_weather,
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=_initial_water_content,
+    )
+    _batch.run_model(till_termination=True)
+
+    _scalar_models = []
+    for _site in range(2):
+        _model = AquaCropModel(
+            sim_start_time=f"{1979}/10/01",
+            sim_end_time=f"{1982}/05/30",
+            weather_df=_weather[_site],
+            soil=Soil(soil_type="SandyLoam"),
+            crop=Crop("Wheat", planting_date="10/01"),
+            initial_water_content=_initial_water_content[_site],
+        )
+        _model.run_model(till_termination=True)
+        _scalar_models.append(_model)
+
+    def test_results(self):
+        """
+        Final stats and daily outputs of each site match the scalar model
+        """
+        _assert_same_results(self, self._batch, self._scalar_models)
+
+    def test_sites_differ(self):
+        """
+        Sites with different weather give different yields
+        """
+        yields = [
+            results["Dry yield (tonne/ha)"].values
+            for results in self._batch.get_simulation_results()
+        ]
+        self.assertFalse(np.array_equal(yields[0], yields[1]))
+
+    def test_state(self):
+        """
+        State is returned as arrays with one row per site
+        """
+        state = self._batch.get_state()
+        self.assertEqual(state["th"].shape, (2, 12))
+        self.assertEqual(state["biomass"].shape, (2,))
+        self.assertEqual(state["crop_mature"].dtype, bool)
+
+        self.assertEqual(list(self._batch.get_state(["dap"])), ["dap"])
+        with self.assertRaises(ValueError):
+            self._batch.get_state(["not_a_state"])
+
+    def test_run_in_steps(self):
+        """
+        Running the batch in several calls gives the same results
+        """
+        batch = AquaCropBatch(
+            sim_start_time=f"{1979}/10/01",
+            sim_end_time=f"{1982}/05/30",
+            weather_df=self._weather,
+            soil=Soil(soil_type="SandyLoam"),
+            crop=Crop("Wheat", planting_date="10/01"),
+            initial_water_content=self._initial_water_content,
+        )
+        self.assertFalse(batch.run_model(num_steps=100))
+        self.assertFalse(batch.get_simulation_results())
+        self.assertTrue(batch.run_model(till_termination=True, initialize_model=False))
+        _assert_same_results(self, batch, self._scalar_models)
+
+
+class TestAquaCropBatchOptions(unittest.TestCase):
+    """
+    Irrigation, off-season simulation and crop calendars in growing degree days
+    """
+
+    _weather = prepare_weather(get_filepath("tunis_climate.txt"))
+
+    def _compare(self, weather, **kwargs):
+        """
+        Run a batch and the scalar model of each site and compare their results
+        """
+        initial_water_content = InitialWaterContent(value=["FC"])
+        batch = AquaCropBatch(
+            weather_df=weather, initial_water_content=initial_water_content, **kwargs
+        )
+        batch.run_model(till_termination=True)
+
+        models = []
+        for site_weather in weather:
+            model = AquaCropModel(
+                weather_df=site_weather,
+                initial_water_content=initial_water_content,
+                **kwargs,
+            )
+            model.run_model(till_termination=True)
+            models.append(model)
+
+        _assert_same_results(self, batch, models)
+
+    def test_irrigation_off_season(self):
+        """
+        Soil moisture irrigation, simulating the off-season
+        """
+        weather_wet = self._weather.copy()
+        weather_wet["Precipitation"] = weather_wet["Precipitation"] * 1.5
+        self._compare(
+            [self._weather, weather_wet],
+            sim_start_time=f"{1979}/10/01",
+            sim_end_time=f"{1981}/05/30",
+            soil=Soil(soil_type="Clay"),
+            crop=Crop("Wheat", planting_date="10/01"),
+            irrigation_management=IrrigationManagement(
+                irrigation_method=1, SMT=[40, 60, 70, 30]
+            ),
+            off_season=True,
+        )
+
+    def test_gdd_calendars(self):
+        """
+        Sites with different temperatures have their own crop calendar
+        """
+        weather_warm = self._weather.copy()
+        weather_warm["MaxTemp"] = weather_warm["MaxTemp"] + 2
+        self._compare(
+            [self._weather, weather_warm, self._weather],
+            sim_start_time=f"{1979}/01/01",
+            sim_end_time=f"{1981}/12/31",
+            soil=Soil(soil_type="SandyLoam"),
+            crop=Crop("Maize", planting_date="05/01"),
+        )
+
+
+class TestAquaCropBatchErrors(unittest.TestCase):
+    """
+    Inputs that cannot be run as a batch
+    """
+
+    _weather = prepare_weather(get_filepath("tunis_climate.txt"))
+
+    def _batch(self, **kwargs):
+        inputs = dict(
+            sim_start_time=f"{1979}/10/01",
+            sim_end_time=f"{1980}/05/30",
+            weather_df=[self._weather, self._weather],
+            soil=Soil(soil_type="SandyLoam"),
+            crop=Crop("Wheat", planting_date="10/01"),
+            initial_water_content=InitialWaterContent(value=["FC"]),
+        )
+        inputs.update(kwargs)
+        return AquaCropBatch(**inputs)
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            self._batch(weather_df=[])
+        with self.assertRaises(ValueError):
+            self._batch(soil=[Soil(soil_type="SandyLoam"), Soil(soil_type="Clay")])
+        with self.assertRaises(ValueError):
+            self._batch(initial_water_content=[InitialWaterContent(value=["FC"])])
+        with self.assertRaises(ValueError):
+            self._batch(output_level="seasonal_aggregates")
+
+    def test_results_before_run(self):
+        batch = self._batch()
+        with self.assertRaises(ValueError):
+            batch.get_simulation_results()
+        with self.assertRaises(ValueError):
+            batch.get_state()
+
+    def test_final_only(self):
+        batch = self._batch(output_level="final_only")
+        batch.run_model(till_termination=True)
+        self.assertEqual(batch.get_water_flux(), [None, None])
+        self.assertEqual(len(batch.get_simulation_results()[0]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Test the benchmark harness on its fastest scenario.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+
+from aquacrop.bench import SCENARIOS, compare_results, import_times, main, run_benchmarks
+
+
+class TestBench(unittest.TestCase):
+    """
+    Results must hold the timings of each part of the run and be comparable
+    once saved as JSON.
+    """
+
+    _tmp = tempfile.TemporaryDirectory()
+    _path = os.path.join(_tmp.name, "results.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        _code = main(["--scenarios", "paddy_bunds", "--output", _path])
+    with open(_path) as _file:
+        _results = json.load(_file)
+
+    def test_results(self):
+        self.assertEqual(self._code, 0)
+        result = self._results["scenarios"]["paddy_bunds"]
+        self.assertEqual(result["runs"], 1)
+        self.assertEqual(result["seasons"], 11)
+        self.assertGreater(result["days"], 0)
+        for part in ["init", "step", "output"]:
+            self.assertGreater(result[part], 0)
+        self.assertAlmostEqual(
+            result["total"], result["init"] + result["step"] + result["output"]
+        )
+        self.assertIn("backend", self._results["metadata"])
+
+    def test_compare(self):
+        slower = json.loads(json.dumps(self._results))
+        slower["scenarios"]["paddy_bunds"]["total"] *= 2
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(compare_results(self._results, slower), ["paddy_bunds"])
+            self.assertEqual(compare_results(slower, self._results), [])
+
+    def test_import_times(self):
+        results = import_times(["aquacrop"], repeat=1)
+        self.assertGreater(results["imports"]["aquacrop"], 0)
+        with self.assertRaises(ValueError):
+            import_times(["unknown"])
+
+    def test_unknown_scenario(self):
+        self.assertIn("cmip6_woolpit", SCENARIOS)
+        with self.assertRaises(ValueError):
+            run_benchmarks(["unknown"])
+
+
+if __name__ == '__main__':
+    unittest.main()
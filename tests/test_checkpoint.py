@@ -0,0 +1,130 @@
+"""
+Test checkpoint and restore of a running simulation.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from aquacrop import (
+    AquaCropModel, Soil, Crop, InitialWaterContent, IrrigationManagement, CSVSink
+)
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+def _model(**kwargs):
+    return AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1981}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        irrigation_management=IrrigationManagement(irrigation_method=1, SMT=[70] * 4),
+        **kwargs,
+    )
+
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    A model restored mid-season must finish exactly like the original.
+    """
+
+    _model = _model()
+    _model.run_model(num_steps=100)
+    _blob = _model.checkpoint()
+    _model.run_model(till_termination=True, initialize_model=False)
+
+    def _assert_same_results(self, model):
+        self.assertTrue(
+            model.get_simulation_results().equals(self._model.get_simulation_results())
+        )
+        self.assertTrue(np.array_equal(
+            model.get_water_flux().values,
+            self._model.get_water_flux().values,
+            equal_nan=True,
+        ))
+
+    def test_restore_bytes(self):
+        """
+        Restoring from bytes skips initialization and continues the season
+        """
+        model = _model()
+        with mock.patch.object(AquaCropModel, "_initialize") as initialize:
+            model.restore(self._blob)
+            initialize.assert_not_called()
+        self.assertEqual(model._clock_struct.time_step_counter, 100)
+        model.run_model(till_termination=True, initialize_model=False)
+        self._assert_same_results(model)
+
+    def test_restore_file(self):
+        """
+        Checkpoint can be written to and restored from a file
+        """
+        model = _model()
+        model.run_model(num_steps=100)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state.ckpt")
+            self.assertIsNone(model.checkpoint(path))
+            restored = _model()
+            restored.restore(path)
+        restored.run_model(till_termination=True, initialize_model=False)
+        self._assert_same_results(restored)
+
+    def test_restore_is_independent(self):
+        """
+        One blob can be restored many times without the copies sharing state
+        """
+        first, second = _model(), _model()
+        first.restore(self._blob)
+        second.restore(self._blob)
+        first.run_model(num_steps=10, initialize_model=False)
+        self.assertEqual(second._clock_struct.time_step_counter, 100)
+
+    def test_restore_sink(self):
+        """
+        A restored model streams the days after the checkpoint to its own sink
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            first, second, full = (
+                os.path.join(directory, name) for name in ["first", "second", "full"]
+            )
+            model = _model(output_sink=CSVSink(first))
+            model.run_model(num_steps=100)
+            blob = model.checkpoint()
+
+            restored = _model(output_sink=CSVSink(second))
+            restored.restore(blob)
+            restored.run_model(till_termination=True, initialize_model=False)
+
+            reference = _model(output_sink=CSVSink(full))
+            reference.run_model(till_termination=True)
+
+            # the checkpointed model has not written anything yet
+            self.assertFalse(os.path.exists(os.path.join(first, "water_flux.csv")))
+            water_flux = pd.read_csv(os.path.join(second, "water_flux.csv"))
+            expected = pd.read_csv(os.path.join(full, "water_flux.csv"))
+            expected = expected[expected.time_step_counter >= 100].reset_index(drop=True)
+            pd.testing.assert_frame_equal(water_flux, expected)
+            self.assertTrue(
+                restored.get_simulation_results().equals(reference.get_simulation_results())
+            )
+
+            # the days before the checkpoint are not in it
+            with self.assertRaises(ValueError):
+                _model().restore(blob)
+
+    def test_checkpoint_before_run(self):
+        """
+        A model that has not run cannot be checkpointed
+        """
+        with self.assertRaises(ValueError):
+            _model().checkpoint()
+
+
+if __name__ == "__main__":
+    unittest.main()
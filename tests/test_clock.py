@@ -0,0 +1,65 @@
+"""
+Test the day-index clock of the time-step loop.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import pandas as pd
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestClock(unittest.TestCase):
+    """
+    Planting and harvest dates are resolved to day indices, dates follow the counter.
+    """
+
+    model = AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1982}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/15", harvest_date="05/30"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+    )
+    model._initialize()
+    clock = model._clock_struct
+
+    def test_steps(self):
+        start = self.clock.simulation_start_date
+        for dates, steps in [
+            (self.clock.planting_dates, self.clock.planting_steps),
+            (self.clock.harvest_dates, self.clock.harvest_steps),
+        ]:
+            self.assertEqual(len(steps), self.clock.n_seasons)
+            for date, step in zip(dates, steps):
+                self.assertEqual(start + pd.Timedelta(days=step), date)
+        self.assertEqual(self.clock.season_counter, -1)
+
+    def test_step_times(self):
+        model = AquaCropModel(**{
+            key: getattr(self.model, key)
+            for key in ["sim_start_time", "sim_end_time", "weather_df", "soil", "crop",
+                        "initial_water_content"]
+        })
+        model.run_model(num_steps=20)
+        clock = model._clock_struct
+        self.assertEqual(clock.time_step_counter, 20)
+        self.assertEqual(clock.step_start_time, clock.time_span[20])
+        self.assertEqual(clock.step_end_time, clock.time_span[21])
+        # the first season starts on its planting day
+        self.assertEqual(clock.season_counter, 0)
+
+        model.run_model(till_termination=True, initialize_model=False)
+        final = model._outputs.final_stats
+        self.assertEqual(len(final), self.clock.n_seasons)
+        # seasons end at maturity, at the latest on the harvest date
+        for season, date in enumerate(final["Harvest Date (YYYY/MM/DD)"]):
+            self.assertGreater(date, clock.planting_dates[season])
+            self.assertLessEqual(date, clock.harvest_dates[season])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Test the registry of the built-in crop parameters.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+from aquacrop import Crop
+from aquacrop.entities.crops.crop_registry import crop_names, get_crop_record
+
+
+class TestCropRegistry(unittest.TestCase):
+    """
+    Records are read-only, cached, and copied into Crop attributes.
+    """
+
+    def test_record(self):
+        record = get_crop_record("Maize")
+        self.assertIs(get_crop_record("Maize"), record)
+        self.assertEqual(record["Name"], "Maize")
+        with self.assertRaises(TypeError):
+            record["CCx"] = 1.0
+
+    def test_missing_params_keep_defaults(self):
+        # LagAer is not in the table for most crops, Crop keeps its default
+        self.assertNotIn("LagAer", get_crop_record("Maize"))
+        self.assertEqual(Crop("Maize", planting_date="05/01").LagAer, 3)
+
+    def test_crop_attributes(self):
+        for c_name in crop_names():
+            crop = Crop(c_name, planting_date="05/01", CCx=0.5)
+            for param, value in get_crop_record(c_name).items():
+                if param != "CCx":
+                    self.assertEqual(getattr(crop, param), value)
+            self.assertEqual(crop.CCx, 0.5)
+
+        # user values do not leak into the record
+        self.assertNotEqual(get_crop_record("Maize")["CCx"], 0.5)
+
+    def test_crop_params(self):
+        from aquacrop.entities.crops.crop_params import crop_params
+        self.assertEqual(list(crop_params), list(crop_names()))
+        self.assertEqual(crop_params["Wheat"], dict(get_crop_record("Wheat")))
+
+    def test_unknown_crop(self):
+        with self.assertRaises(KeyError):
+            get_crop_record("NotACrop")
+        with self.assertRaises(AssertionError):
+            Crop("NotACrop", planting_date="05/01")
+
+
+if __name__ == '__main__':
+    unittest.main()
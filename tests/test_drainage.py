@@ -0,0 +1,59 @@
+"""
+Test the drainage of the soil profile, with and without storage in the compartments.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.solution.drainage import drainage
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestDrainage(unittest.TestCase):
+    """
+    Water drained out of the profile equals the water lost by the compartments.
+    """
+
+    model = AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1980}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+    )
+    model._initialize()
+    prof = model._param_struct.Soil.Profile
+
+    def _check_balance(self, th):
+        thnew, DeepPerc, FluxOut = drainage(self.prof, th, self.prof.th_fc_Adj)
+        lost = ((th - thnew) * 1000 * self.prof.dz).sum()
+        self.assertAlmostEqual(lost, DeepPerc)
+        self.assertEqual(FluxOut[-1], DeepPerc)
+        self.assertTrue(np.all(thnew <= self.prof.th_s))
+        return thnew, DeepPerc
+
+    def test_below_field_capacity(self):
+        th = self.prof.th_wp + 0.5 * (self.prof.th_fc - self.prof.th_wp)
+        thnew, DeepPerc = self._check_balance(th)
+        self.assertTrue(np.array_equal(thnew, th))
+        self.assertEqual(DeepPerc, 0)
+
+    def test_free_drainage(self):
+        # wet top compartments drain freely through the dry ones below
+        th = self.prof.th_fc.copy()
+        th[:3] = self.prof.th_s[:3]
+        self._check_balance(th)
+
+    def test_saturated(self):
+        th = self.prof.th_s.copy()
+        thnew, DeepPerc = self._check_balance(th)
+        self.assertGreater(DeepPerc, 0)
+        self.assertLessEqual(DeepPerc, self.prof.Ksat[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Test the process-pool ensemble runner against scalar model runs.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop import run_ensemble
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestRunEnsemble(unittest.TestCase):
+    """
+    Scenarios run on the pool must give the same results as scalar models
+    and a failing scenario must not stop the others.
+    """
+
+    _weather = prepare_weather(get_filepath("tunis_climate.txt"))
+    _configs = {}
+    for _planting_date in ["10/01", "11/01"]:
+        _configs[_planting_date] = dict(
+            sim_start_time=f"{1979}/10/01",
+            sim_end_time=f"{1982}/05/30",
+            weather_df=_weather,
+            soil=Soil(soil_type="SandyLoam"),
+            crop=Crop("Wheat", planting_date=_planting_date),
+            initial_water_content=InitialWaterContent(value=["FC"]),
+        )
+    # simulation ends after the last day of weather
+    _configs["bad"] = dict(_configs["10/01"], sim_end_time=f"{2030}/05/30")
+
+    _results = {
+        result.key: result
+        for result in run_ensemble(_configs, workers=2, outputs=["final_stats", "water_flux"])
+    }
+
+    def test_all_scenarios_returned(self):
+        """
+        Every scenario gives a result
+        """
+        self.assertEqual(set(self._results), set(self._configs))
+
+    def test_matches_scalar_model(self):
+        """
+        Results of the pool match a scalar run of the same config
+        """
+        for planting_date in ["10/01", "11/01"]:
+            model = AquaCropModel(**self._configs[planting_date])
+            model.run_model(till_termination=True)
+            result = self._results[planting_date]
+            self.assertTrue(result.succeeded)
+            self.assertTrue(result.final_stats.equals(model._outputs.final_stats))
+            self.assertTrue(result.water_flux.equals(model._outputs.water_flux))
+            self.assertIsNone(result.crop_growth)
+
+    def test_failure_is_isolated(self):
+        """
+        The failing scenario returns its error instead of raising
+        """
+        result = self._results["bad"]
+        self.assertFalse(result.succeeded)
+        self.assertIn("ValueError", result.error)
+        self.assertIsNone(result.final_stats)
+
+    def test_unknown_output(self):
+        """
+        Unknown output names are rejected before any scenario runs
+        """
+        with self.assertRaises(ValueError):
+            run_ensemble(self._configs, outputs=["yield"])
+
+
+if __name__ == "__main__":
+    unittest.main()
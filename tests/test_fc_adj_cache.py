@@ -0,0 +1,94 @@
+"""
+Test the adjusted field capacity kept by groundwater depth.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+from copy import copy
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent, GroundWater
+from aquacrop.solution.check_groundwater_table import (
+    FC_ADJ_CACHE_SIZE,
+    check_groundwater_table,
+)
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestGroundwaterTable(unittest.TestCase):
+    """
+    The adjusted profile is computed once per depth and matches the profile computed day by day.
+    """
+
+    model = AquaCropModel(
+        sim_start_time=f"{1979}/10/15",
+        sim_end_time=f"{1980}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/15"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        groundwater=GroundWater(water_table="Y", dates=["1979/10/15"], values=[1.5]),
+    )
+    model.run_model(till_termination=True)
+    prof = model._param_struct.Soil.Profile
+
+    def _reference(self, z_gw):
+        # the field capacity adjustment as written in the reference manual
+        th_fc_adj = self.prof.th_fc.copy()
+        for compi in range(len(self.prof.Comp)):
+            th_fc, th_s, z_mid = self.prof.th_fc[compi], self.prof.th_s[compi], self.prof.zMid[compi]
+            if th_fc <= 0.1:
+                xmax = 1
+            elif th_fc >= 0.3:
+                xmax = 2
+            else:
+                xmax = np.exp((2 + 0.3 * (th_fc - 0.1) / 0.2) * np.log(10)) / 100
+            if z_gw - z_mid >= xmax or th_fc >= th_s:
+                continue
+            if z_mid >= z_gw:
+                th_fc_adj[compi] = th_s
+            else:
+                th_fc_adj[compi] = th_fc + (th_s - th_fc) / (xmax * xmax) * (z_mid - (z_gw - xmax)) ** 2
+        return th_fc_adj
+
+    def _profile(self):
+        # a profile with its own cache, so the tests leave the model's one as it is
+        prof = copy(self.prof)
+        prof._fc_adj_cache = {}
+        return prof
+
+    def test_constant_depth(self):
+        # a single depth for the whole run is computed once
+        self.assertEqual(list(self.prof._fc_adj_cache), [1.5])
+        th_fc_adj, wt_in_soil = self.prof._fc_adj_cache[1.5]
+        np.testing.assert_array_equal(th_fc_adj, self._reference(1.5))
+        self.assertIs(self.model._init_cond.th_fc_Adj, th_fc_adj)
+        self.assertFalse(wt_in_soil)
+
+    def test_depths(self):
+        prof = self._profile()
+        th = self.model._init_cond.th
+        for z_gw in [0.2, 0.9, 3.5, 0.2]:
+            th_fc_adj, wt_in_soil, z = check_groundwater_table(prof, 0, th, th, 1, z_gw)
+            np.testing.assert_array_equal(th_fc_adj, self._reference(z_gw))
+            self.assertEqual(wt_in_soil, z_gw <= self.prof.zMid[-1])
+            self.assertEqual(z, z_gw)
+        self.assertIs(check_groundwater_table(prof, 0, th, th, 1, 0.9)[0],
+                      prof._fc_adj_cache[0.9][0])
+
+        # no water table leaves the field capacity unchanged
+        self.assertIs(check_groundwater_table(prof, 0, th, th, 0, 0.9)[0], th)
+
+    def test_bounded(self):
+        prof = self._profile()
+        th = self.model._init_cond.th
+        for z_gw in np.linspace(0.1, 3.0, 2 * FC_ADJ_CACHE_SIZE):
+            check_groundwater_table(prof, 0, th, th, 1, z_gw)
+        self.assertEqual(len(prof._fc_adj_cache), FC_ADJ_CACHE_SIZE)
+        self.assertIn(3.0, prof._fc_adj_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Test mid-season forking of a running simulation.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from aquacrop import (
+    AquaCropModel, Soil, Crop, InitialWaterContent, IrrigationManagement, CO2
+)
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+def _model():
+    return AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1980}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        irrigation_management=IrrigationManagement(irrigation_method=5),
+    )
+
+
+class TestFork(unittest.TestCase):
+    """
+    Each fork must behave like a model run from the start with the same
+    irrigation decisions, without touching the parent or the other forks.
+    """
+
+    _depths = [0, 10, 30]
+    _parent = _model()
+    _parent.run_model(num_steps=120)
+    _forks = _parent.fork(len(_depths))
+    for _fork, _depth in zip(_forks, _depths):
+        _fork._param_struct.IrrMngt.depth = _depth
+        _fork.run_model(num_steps=30, initialize_model=False)
+
+    def test_forks_match_rerun(self):
+        """
+        A fork gives the same state as re-simulating from the start
+        """
+        for fork, depth in zip(self._forks, self._depths):
+            model = _model()
+            model.run_model(num_steps=120)
+            model._param_struct.IrrMngt.depth = depth
+            model.run_model(num_steps=30, initialize_model=False)
+            self.assertTrue(np.array_equal(fork._init_cond.th, model._init_cond.th))
+            self.assertEqual(fork._init_cond.biomass, model._init_cond.biomass)
+            self.assertTrue(np.array_equal(
+                fork._outputs.water_flux, model._outputs.water_flux, equal_nan=True
+            ))
+
+    def test_forks_are_independent(self):
+        """
+        Branches diverge and the parent stays where it was forked
+        """
+        irr = [fork._init_cond.irr_cum for fork in self._forks]
+        self.assertEqual(irr[0], 0)
+        self.assertLess(irr[1], irr[2])
+        self.assertEqual(self._parent._clock_struct.time_step_counter, 120)
+        self.assertEqual(self._parent._param_struct.IrrMngt.depth, 0)
+        self.assertFalse(self._parent._outputs.water_flux[120:].any())
+
+    def test_parameters_are_shared(self):
+        """
+        Immutable parameters and weather are not copied
+        """
+        fork = self._forks[0]
+        self.assertIs(fork._param_struct.Soil, self._parent._param_struct.Soil)
+        self.assertIs(fork._weather, self._parent._weather)
+        self.assertIsNot(fork._init_cond, self._parent._init_cond)
+
+
+def _multi_season_model():
+    return AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1982}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        co2_concentration=CO2(
+            co2_data=pd.DataFrame(
+                {"year": [1979, 1980, 1981, 1982], "ppm": [340, 450, 600, 800]}
+            )
+        ),
+    )
+
+
+class TestForkSeasons(unittest.TestCase):
+    """
+    Branches run out of sync over several seasons, with a CO2 concentration
+    that changes at the start of each season.
+    """
+
+    _model = _multi_season_model()
+    _model.run_model(till_termination=True)
+
+    def test_forks_out_of_sync(self):
+        """
+        A branch crossing a season boundary does not change the others
+        """
+        parent = _multi_season_model()
+        parent.run_model(num_steps=10)
+        forks = parent.fork(2)
+        forks[0].run_model(num_steps=500, initialize_model=False)
+        forks[1].run_model(num_steps=50, initialize_model=False)
+        forks[0].run_model(till_termination=True, initialize_model=False)
+        forks[1].run_model(till_termination=True, initialize_model=False)
+        parent.run_model(till_termination=True, initialize_model=False)
+
+        expected = self._model.get_simulation_results()
+        for model in forks + [parent]:
+            self.assertTrue(model.get_simulation_results().equals(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Test the growing degree day cache used by the crop calendar and season resets.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+
+from aquacrop import Crop
+from aquacrop.initialize.compute_gdd_cache import GDDCache, calendar_days, growing_degree_days
+from aquacrop.initialize.compute_weather_arrays import compute_weather_arrays, day_ordinal
+from aquacrop.solution.growing_degree_day import growing_degree_day
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestGDDCache(unittest.TestCase):
+    """
+    Cached gdd must match the daily calculation and the season windows must
+    give the same calendar days as summing all the remaining weather.
+    """
+
+    _weather, _weather_days = compute_weather_arrays(
+        prepare_weather(get_filepath("tunis_climate.txt"))
+    )
+
+    def test_daily(self):
+        """
+        Vectorised gdd equal the daily gdd of the time-step for every method
+        """
+        temp_min = self._weather[:400, 0]
+        temp_max = self._weather[:400, 1]
+        for method in [1, 2, 3]:
+            gdd = growing_degree_days(temp_min, temp_max, method, 5.0, 30.0)
+            expected = [
+                growing_degree_day(method, 30.0, 5.0, tmax, tmin)
+                for tmin, tmax in zip(temp_min, temp_max)
+            ]
+            self.assertTrue(np.array_equal(gdd, expected))
+
+    def test_season_window(self):
+        """
+        Season cumulative gdd are the start of the cumulative gdd of the remaining weather
+        """
+        cache = GDDCache(self._weather, self._weather_days)
+        crop = Crop("WheatGDD", planting_date="10/15")
+        start = cache.day_index(day_ordinal(np.datetime64("1990-10-15")))
+        gdd_cum = cache.season_gdd_cum(start, crop, [crop.Maturity])
+        full = np.cumsum(cache.daily(crop)[start:])
+
+        self.assertLess(len(gdd_cum), len(full))
+        self.assertTrue(np.array_equal(gdd_cum, full[: len(gdd_cum)]))
+        self.assertGreater(gdd_cum[-1], crop.Maturity)
+        self.assertEqual(
+            calendar_days(gdd_cum, crop.Maturity),
+            int(np.argmax(full > crop.Maturity)) + 1,
+        )
+        self.assertIs(cache.daily(crop), cache.daily(crop))
+
+
+if __name__ == '__main__':
+    unittest.main()
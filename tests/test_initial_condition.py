@@ -0,0 +1,43 @@
+"""
+Test the slotted InitialCondition state container.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+
+from aquacrop.entities.initParamVariables import InitialCondition
+
+
+class TestInitialCondition(unittest.TestCase):
+    """
+    State keeps the attribute API without a per-instance __dict__.
+    """
+
+    def test_no_dict(self):
+        """
+        Attributes live in slots and unknown names are rejected
+        """
+        cond = InitialCondition(12)
+        self.assertFalse(hasattr(cond, "__dict__"))
+        with self.assertRaises(AttributeError):
+            cond.not_a_state_variable = 1
+
+    def test_copy(self):
+        """
+        Copies share no arrays with the original
+        """
+        cond = InitialCondition(12)
+        cond.th[:] = 0.3
+        cond.biomass = 5.0
+        copy = cond.copy()
+        cond.th[:] = 0.1
+        cond.biomass = 1.0
+        self.assertTrue(np.array_equal(copy.th, np.full(12, 0.3)))
+        self.assertEqual(copy.biomass, 5.0)
+        self.assertIs(copy.harvest_flag, False)
+
+
+if __name__ == "__main__":
+    unittest.main()
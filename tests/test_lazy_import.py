@@ -0,0 +1,43 @@
+"""
+Test the lazy loading of the public names of the package.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import subprocess
+import sys
+import unittest
+
+import aquacrop
+
+
+class TestLazyImport(unittest.TestCase):
+    """
+    Importing aquacrop loads neither pandas nor the model, public names load on access.
+    """
+
+    def test_import_is_light(self):
+        code = (
+            "import sys, aquacrop; "
+            + "print(any(m in sys.modules for m in ['pandas', 'aquacrop.core', 'aquacrop.solution']))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_public_names(self):
+        from aquacrop.core import AquaCropModel
+        from aquacrop.entities.crop import Crop
+        self.assertIs(aquacrop.AquaCropModel, AquaCropModel)
+        self.assertIs(aquacrop.Crop, Crop)
+        for name in aquacrop.__all__:
+            self.assertIn(name, dir(aquacrop))
+            self.assertTrue(callable(getattr(aquacrop, name)))
+
+    def test_unknown_name(self):
+        with self.assertRaises(AttributeError):
+            aquacrop.NotAName
+        with self.assertRaises(ImportError):
+            from aquacrop import NotAName  # noqa: F401
+
+
+if __name__ == '__main__':
+    unittest.main()
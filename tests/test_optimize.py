@@ -0,0 +1,145 @@
+"""
+Test the irrigation management optimizer.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import pandas as pd
+
+from aquacrop import (
+    AquaCropModel, Soil, Crop, InitialWaterContent, IrrigationManagement, CO2
+)
+from aquacrop.optimize import optimize_irrigation, mean_yield, _is_dominated
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+def _profit(final_stats):
+    return (
+        180 * final_stats["Dry yield (tonne/ha)"].mean()
+        - final_stats["Seasonal irrigation (mm)"].mean()
+    )
+
+
+class TestOptimize(unittest.TestCase):
+    """
+    Candidates are forks of one initialized model, the best one matches a full re-run.
+    """
+
+    config = dict(
+        sim_start_time=f"{1979}/10/15",
+        sim_end_time=f"{1980}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/15"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+    )
+    space = {"SMT": [(0, 100)] * 4}
+    result = optimize_irrigation(
+        config, space, objective=_profit, popsize=5, maxiter=2, seed=42, workers=1
+    )
+
+    def test_result(self):
+        history = self.result.history
+        self.assertEqual(self.result.n_evaluations, 15)
+        self.assertEqual(list(history.generation.unique()), [0, 1, 2])
+        # the best candidate is at least as good as every one fully run
+        self.assertEqual(self.result.objective, history.objective.max())
+        for smt in self.result.params["SMT"]:
+            self.assertTrue(0 <= smt <= 100)
+
+        # the best candidate gives the same results when run from the start
+        model = AquaCropModel(**dict(
+            self.config,
+            irrigation_management=IrrigationManagement(1, SMT=self.result.params["SMT"]),
+        ))
+        model.run_model(till_termination=True)
+        final_stats = model.get_simulation_results()
+        self.assertEqual(_profit(final_stats), self.result.objective)
+        self.assertTrue(final_stats.equals(self.result.final_stats))
+
+    def test_reproducible(self):
+        result = optimize_irrigation(
+            self.config, self.space, objective=_profit, popsize=5, maxiter=2, seed=42,
+            workers=2,
+        )
+        self.assertEqual(result.params, self.result.params)
+        self.assertTrue(result.history.equals(self.result.history))
+
+    def test_interval(self):
+        result = optimize_irrigation(
+            self.config, {"IrrInterval": (1, 20), "MaxIrrSeason": (0, 300)},
+            popsize=4, maxiter=0, seed=0, workers=1,
+        )
+        self.assertIsInstance(result.params["IrrInterval"], int)
+        self.assertLessEqual(
+            result.final_stats["Seasonal irrigation (mm)"].max(),
+            result.params["MaxIrrSeason"],
+        )
+
+    def test_dominated(self):
+        # (irrigation, yield of the finished seasons, current biomass)
+        reference = (100.0, 5.0, 200.0)
+        self.assertTrue(_is_dominated((120.0, 5.0, 150.0), reference, 0.1))
+        # a small difference is not enough
+        self.assertFalse(_is_dominated((120.0, 5.0, 190.0), reference, 0.1))
+        # less irrigation may be worth the smaller biomass
+        self.assertFalse(_is_dominated((80.0, 5.0, 150.0), reference, 0.1))
+        self.assertFalse(_is_dominated((120.0, 6.0, 150.0), reference, 0.1))
+
+    def test_errors(self):
+        for space, irrigation_management in [
+            ({"AppEff": (50, 100)}, None),
+            ({"SMT": [(0, 100)] * 3}, None),
+            ({"SMT": [(0, 100)] * 4, "IrrInterval": (1, 10)}, None),
+            ({"SMT": [(0, 100)] * 4}, IrrigationManagement(2)),
+            ({"MaxIrrSeason": (0, 300)}, None),
+            ({"IrrInterval": (0, 10)}, None),
+        ]:
+            with self.assertRaises(ValueError):
+                optimize_irrigation(
+                    dict(self.config, irrigation_management=irrigation_management), space
+                )
+        with self.assertRaises(ValueError):
+            optimize_irrigation(self.config, self.space, popsize=3)
+
+
+class TestOptimizeSeasons(unittest.TestCase):
+    """
+    Candidates run one after the other over several seasons, with a CO2
+    concentration that changes at the start of each season.
+    """
+
+    config = dict(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1982}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        co2_concentration=CO2(
+            co2_data=pd.DataFrame(
+                {"year": [1979, 1980, 1981, 1982], "ppm": [340, 450, 600, 800]}
+            )
+        ),
+    )
+
+    def test_candidates_match_rerun(self):
+        """
+        Every candidate has the objective of a model run from the start
+        """
+        result = optimize_irrigation(
+            self.config, {"SMT": [(0, 100)] * 4}, popsize=4, maxiter=1, seed=0,
+            workers=1, early_stopping=None,
+        )
+        for _, row in result.history.iterrows():
+            smt = [row[f"SMT{stage + 1}"] for stage in range(4)]
+            model = AquaCropModel(**dict(
+                self.config, irrigation_management=IrrigationManagement(1, SMT=smt),
+            ))
+            model.run_model(till_termination=True)
+            self.assertEqual(mean_yield(model.get_simulation_results()), row["objective"])
+
+
+if __name__ == '__main__':
+    unittest.main()
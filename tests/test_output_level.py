@@ -0,0 +1,93 @@
+"""
+Test the output levels of AquaCropModel.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent, IrrigationManagement, CSVSink
+from aquacrop.entities.output import SEASONAL_AGGREGATES_COLUMNS
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+def _run(**kwargs):
+    model = AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1983}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        irrigation_management=IrrigationManagement(irrigation_method=1, SMT=[60] * 4),
+        **kwargs,
+    )
+    model.run_model(till_termination=True)
+    return model
+
+
+class TestOutputLevel(unittest.TestCase):
+    """
+    Reduced output levels keep the same final stats as daily outputs.
+    """
+
+    _daily = _run()
+
+    def test_final_only(self):
+        """
+        No daily table is built
+        """
+        model = _run(output_level="final_only")
+        self.assertTrue(
+            model.get_simulation_results().equals(self._daily.get_simulation_results())
+        )
+        self.assertIsNone(model.get_water_flux())
+        self.assertIsNone(model.get_water_storage())
+        self.assertIsNone(model.get_crop_growth())
+        self.assertIsNone(model.get_seasonal_aggregates())
+
+    def test_seasonal_aggregates(self):
+        """
+        Seasonal totals match the sums of the daily water fluxes
+        """
+        model = _run(output_level="seasonal_aggregates")
+        aggregates = model.get_seasonal_aggregates()
+        self.assertIsNone(model.get_water_flux())
+        self.assertEqual(len(aggregates), len(model.get_simulation_results()))
+
+        flux = self._daily.get_water_flux()
+        growing = self._daily.get_water_storage().growing_season == 1
+        expected = flux[growing].groupby("season_counter").sum()
+        expected["growing_days"] = flux[growing].groupby("season_counter").size()
+        self.assertTrue(np.allclose(
+            aggregates[SEASONAL_AGGREGATES_COLUMNS].values,
+            expected[SEASONAL_AGGREGATES_COLUMNS].values,
+        ))
+        self.assertTrue(np.allclose(
+            aggregates.IrrDay.values,
+            self._daily.get_simulation_results()["Seasonal irrigation (mm)"].values.astype(float),
+        ))
+
+    def test_column_subset(self):
+        """
+        Only the selected tables and columns are kept
+        """
+        model = _run(output_level={"crop_growth": ["dap", "biomass"]})
+        self.assertIsNone(model.get_water_flux())
+        self.assertTrue(model.get_crop_growth().equals(
+            self._daily.get_crop_growth()[["dap", "biomass"]]
+        ))
+
+    def test_invalid(self):
+        """
+        Unknown levels and conflicting sinks are rejected
+        """
+        with self.assertRaises(ValueError):
+            _run(output_level="weekly")
+        with self.assertRaises(ValueError):
+            _run(output_level="final_only", output_sink=CSVSink("unused"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Test the pluggable sinks of the daily outputs.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import importlib.util
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from aquacrop import (
+    AquaCropModel,
+    Soil,
+    Crop,
+    InitialWaterContent,
+    MemorySink,
+    CSVSink,
+    ParquetSink,
+    CallbackSink,
+    DiscardSink,
+)
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+def _model(output_sink=None):
+    return AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1982}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        output_sink=output_sink,
+    )
+
+
+def _run(output_sink=None):
+    model = _model(output_sink)
+    model.run_model(till_termination=True)
+    return model
+
+
+class TestOutputSink(unittest.TestCase):
+    """
+    Streamed rows must match the rows kept in memory.
+    """
+
+    _memory = _run()
+
+    def _expected(self, table, columns=None):
+        """
+        Rows of the in-memory table for the days that were simulated
+        """
+        # days skipped between seasons are left as rows of zeros in memory
+        df = getattr(self._memory._outputs, table)
+        counter = self._memory._outputs.water_flux.time_step_counter
+        df = df[counter.index == counter.values].reset_index(drop=True)
+        return df if columns is None else df[columns]
+
+    def test_callback_blocks(self):
+        """
+        Callback receives blocks of at most block_size days, in order
+        """
+        blocks = {"water_flux": [], "water_storage": [], "crop_growth": []}
+        model = _run(CallbackSink(lambda table, block: blocks[table].append(block), block_size=100))
+        self.assertTrue(max(len(block) for block in blocks["water_flux"]) <= 100)
+        for table, table_blocks in blocks.items():
+            streamed = pd.concat(table_blocks, ignore_index=True)
+            self.assertTrue(np.array_equal(
+                streamed.values, self._expected(table).values, equal_nan=True
+            ))
+        self.assertIsNone(model.get_water_flux())
+        self.assertTrue(
+            model.get_simulation_results().equals(self._memory.get_simulation_results())
+        )
+
+    def test_csv(self):
+        """
+        CSV files hold the selected tables and columns
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            sink = CSVSink(
+                directory,
+                prefix="tunis_",
+                tables=["water_flux"],
+                columns={"water_flux": ["dap", "Tr", "Es"]},
+            )
+            _run(sink)
+            self.assertEqual(os.listdir(directory), ["tunis_water_flux.csv"])
+            streamed = pd.read_csv(sink.path("water_flux"))
+        expected = self._expected("water_flux", ["dap", "Tr", "Es"])
+        self.assertEqual(list(streamed.columns), ["dap", "Tr", "Es"])
+        self.assertTrue(np.allclose(streamed.values, expected.values, rtol=1e-12))
+
+    @unittest.skipIf(importlib.util.find_spec("pyarrow") is None, "pyarrow not installed")
+    def test_parquet(self):
+        """
+        Parquet files hold the same rows as the memory outputs
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            sink = ParquetSink(directory, tables=["crop_growth"])
+            _run(sink)
+            streamed = pd.read_parquet(sink.path("crop_growth"))
+        self.assertTrue(np.array_equal(
+            streamed.values, self._expected("crop_growth").values, equal_nan=True
+        ))
+
+    def test_memory_selection(self):
+        """
+        Memory sink keeps only the selected tables and columns
+        """
+        model = _run(MemorySink(tables=["water_flux"], columns={"water_flux": ["dap", "Tr"]}))
+        self.assertEqual(list(model.get_water_flux().columns), ["dap", "Tr"])
+        self.assertTrue(
+            model.get_water_flux().equals(self._memory.get_water_flux()[["dap", "Tr"]])
+        )
+        self.assertIsNone(model.get_crop_growth())
+
+    def test_discard(self):
+        """
+        Final stats are kept when the daily rows are discarded
+        """
+        model = _run(DiscardSink())
+        self.assertTrue(
+            model.get_simulation_results().equals(self._memory.get_simulation_results())
+        )
+
+    def test_fork(self):
+        """
+        Each branch of a streaming model writes the days after the fork to its own sink
+        """
+        blocks = {"parent": [], 0: [], 1: []}
+
+        def _sink(key):
+            return CallbackSink(
+                lambda table, block: table == "water_flux" and blocks[key].append(block),
+                block_size=50,
+            )
+
+        model = _model(_sink("parent"))
+        model.run_model(num_steps=100)
+        with self.assertRaises(ValueError):
+            model.fork(2)
+        with self.assertRaises(ValueError):
+            model.fork(2, output_sinks=[_sink(0)])
+
+        branches = model.fork(2, output_sinks=[_sink(0), _sink(1)])
+        model.run_model(till_termination=True, initialize_model=False)
+        for branch in branches:
+            branch.run_model(till_termination=True, initialize_model=False)
+
+        expected = self._expected("water_flux")
+        streamed = pd.concat(blocks["parent"], ignore_index=True)
+        self.assertTrue(np.array_equal(streamed.values, expected.values, equal_nan=True))
+        after_fork = expected[expected.time_step_counter >= 100].values
+        for key in [0, 1]:
+            streamed = pd.concat(blocks[key], ignore_index=True)
+            self.assertTrue(np.array_equal(streamed.values, after_fork, equal_nan=True))
+
+    def test_unknown_column(self):
+        """
+        Unknown columns are rejected when the model is initialized
+        """
+        with self.assertRaises(ValueError):
+            _run(MemorySink(columns={"water_flux": ["not_a_column"]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
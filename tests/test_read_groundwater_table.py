@@ -0,0 +1,64 @@
+"""
+Test the daily groundwater depths built from the water table observations.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from aquacrop import GroundWater
+from aquacrop.entities.clockStruct import ClockStruct
+from aquacrop.entities.paramStruct import ParamStruct
+from aquacrop.initialize.read_groundwater_table import read_groundwater_table
+
+
+class TestReadGroundwaterTable(unittest.TestCase):
+    """
+    Depths are held (Constant) or interpolated (Variable) for each simulation day.
+    """
+
+    clock = ClockStruct()
+    clock.time_span = pd.date_range("2000-01-01", "2000-01-31")
+
+    def _depths(self, method, dates, values):
+        groundwater = GroundWater(water_table="Y", method=method, dates=dates, values=values)
+        param_struct = read_groundwater_table(ParamStruct(), groundwater, self.clock)
+        self.assertEqual(len(param_struct.z_gw), len(self.clock.time_span))
+        self.assertTrue((param_struct.zGW_dates == self.clock.time_span.values).all())
+        return param_struct.z_gw
+
+    def test_single(self):
+        for method in ["Constant", "Variable"]:
+            np.testing.assert_array_equal(self._depths(method, ["2000/01/10"], [1.5]), 1.5)
+
+    def test_constant(self):
+        z_gw = self._depths("Constant", ["2000/01/21", "2000/01/05", "2000/01/11"], [3, 1, 2])
+        np.testing.assert_array_equal(z_gw[:10], 1)
+        np.testing.assert_array_equal(z_gw[10:20], 2)
+        np.testing.assert_array_equal(z_gw[20:], 3)
+
+        # the last depth given for a date is used
+        z_gw = self._depths("Constant", ["2000/01/01", "2000/01/11", "2000/01/11"], [1, 2, 4])
+        np.testing.assert_array_equal(z_gw[10:], 4)
+
+    def test_variable(self):
+        z_gw = self._depths("Variable", ["2000/01/01", "2000/01/11", "2000/01/21"], [1, 2, 4])
+        np.testing.assert_allclose(z_gw[:11], np.linspace(1, 2, 11))
+        np.testing.assert_allclose(z_gw[10:21], np.linspace(2, 4, 11))
+        np.testing.assert_array_equal(z_gw[20:], 4)
+
+        # observations outside the simulation are interpolated in time
+        z_gw = self._depths("Variable", ["1999/12/22", "2000/02/10"], [1, 6])
+        self.assertAlmostEqual(z_gw[0], 2)
+        self.assertAlmostEqual(z_gw[-1], 5)
+
+    def test_no_water_table(self):
+        param_struct = read_groundwater_table(ParamStruct(), GroundWater(), self.clock)
+        self.assertEqual(param_struct.water_table, 0)
+        np.testing.assert_array_equal(param_struct.z_gw, 999)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Test the root zone water aggregates computed from the cumulative storage of the soil profile.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.solution.root_zone_water import root_zone_water
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+def _reference(prof, Zroot, th, zTop, Zmin, Aer):
+    # root zone storages summed compartment by compartment
+    rootdepth = round(max(Zroot, Zmin), 2)
+    comp_sto = np.argwhere(prof.dzsum >= rootdepth).flatten()[0]
+    Wr = np.zeros(6)
+    for ii in range(comp_sto + 1):
+        if prof.dzsum[ii] > rootdepth:
+            factor = 1 - ((prof.dzsum[ii] - rootdepth) / prof.dz[ii])
+        else:
+            factor = 1
+        for jj, th_ii in enumerate([
+            th[ii], prof.th_s[ii], prof.th_fc[ii], prof.th_wp[ii],
+            prof.th_dry[ii], prof.th_s[ii] - (Aer / 100),
+        ]):
+            Wr[jj] += round(factor * 1000 * th_ii * prof.dz[ii], 2)
+
+    return [max(Wr[0], 0)] + list(Wr[1:] / (rootdepth * 1000))
+
+
+class TestRootZoneWater(unittest.TestCase):
+    """
+    Aggregates match a compartment by compartment sum, repeated calls are memoized.
+    """
+
+    model = AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1980}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+    )
+    model._initialize()
+    prof = model._param_struct.Soil.Profile
+    crop = model._param_struct.Seasonal_Crops.season(0)
+    zTop = model._param_struct.Soil.z_top
+
+    def test_matches_compartment_sum(self):
+        rng = np.random.default_rng(42)
+        for Zroot in [0.0, 0.3, 0.47, 0.8, 1.03, self.prof.dzsum[-1]]:
+            th = self.prof.th_wp + rng.random(len(self.prof.dz)) * (
+                self.prof.th_s - self.prof.th_wp
+            )
+            result = root_zone_water(
+                self.prof, Zroot, th, self.zTop, self.crop.Zmin, self.crop.Aer
+            )
+            expected = _reference(
+                self.prof, Zroot, th, self.zTop, self.crop.Zmin, self.crop.Aer
+            )
+            self.assertEqual(result[0], expected[0])
+            self.assertEqual(list(result[6:]), expected[1:])
+
+    def test_memoized(self):
+        th = self.prof.th_fc.copy()
+        args = (self.prof, 0.6, th, self.zTop, self.crop.Zmin, self.crop.Aer)
+        first = root_zone_water(*args)
+        self.assertIs(root_zone_water(*args), first)
+
+        # an in-place change of the water content is not served from the memo
+        th[0] = self.prof.th_wp[0]
+        second = root_zone_water(*args)
+        self.assertIsNot(second, first)
+        self.assertLess(second[0], first[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Test models created from a shared initialization.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from aquacrop import (
+    AquaCropModel, Soil, Crop, InitialWaterContent, IrrigationManagement, FieldMngt,
+    ScenarioTemplate, MemorySink, CO2,
+)
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestScenarioTemplate(unittest.TestCase):
+    """
+    A model created by the template gives the same results as a model
+    initialized from scratch with the same management.
+    """
+
+    config = dict(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1981}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/15"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+    )
+    template = ScenarioTemplate(**config)
+
+    def _compare(self, **management):
+        model = self.template.model(**management)
+        model.run_model(till_termination=True, initialize_model=False)
+
+        reference = AquaCropModel(**dict(self.config, **management))
+        reference.run_model(till_termination=True)
+
+        pd.testing.assert_frame_equal(model.get_simulation_results(), reference.get_simulation_results())
+        pd.testing.assert_frame_equal(model.get_water_flux(), reference.get_water_flux())
+        return model
+
+    def test_irrigation(self):
+        # the management given to the template is left as it was
+        smt = IrrigationManagement(irrigation_method=1, SMT=[70] * 4)
+        self.template.model(irrigation_management=smt)
+        self.assertIsInstance(smt.SMT, list)
+
+        for management in [smt, IrrigationManagement(irrigation_method=2, IrrInterval=5)]:
+            model = self._compare(irrigation_management=management)
+        self.assertGreater(model.get_simulation_results()["Seasonal irrigation (mm)"].sum(), 0)
+
+    def test_field_management(self):
+        # the simulation starts in a fallow period with water between the bunds
+        bunds = FieldMngt(bunds=True, z_bund=0.2, bund_water=50)
+        self.assertGreater(
+            self.template.model(fallow_field_management=bunds)._init_cond.surface_storage, 0
+        )
+        self._compare(
+            field_management=FieldMngt(mulches=True, mulch_pct=50, f_mulch=0.5),
+            fallow_field_management=bunds,
+        )
+
+        # the template and its other models are not changed
+        self.assertEqual(self.template.model()._init_cond.surface_storage, 0)
+        self._compare()
+
+    def test_models_are_independent(self):
+        first, second = self.template.model(), self.template.model(output_sink=MemorySink())
+        first.run_model(num_steps=30, initialize_model=False)
+        self.assertEqual(second._clock_struct.time_step_counter, 0)
+        self.assertIs(first._param_struct.Soil, second._param_struct.Soil)
+        self.assertIs(first._weather, second._weather)
+        self.assertIsNot(first._outputs, second._outputs)
+        self.assertFalse(np.any(second._outputs.water_flux[:30, 2] > 0))
+
+
+class TestScenarioTemplateSeasons(unittest.TestCase):
+    """
+    Template models run one after the other over several seasons, with a
+    CO2 concentration that changes at the start of each season.
+    """
+
+    config = dict(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1982}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        co2_concentration=CO2(
+            co2_data=pd.DataFrame(
+                {"year": [1979, 1980, 1981, 1982], "ppm": [340, 450, 600, 800]}
+            )
+        ),
+    )
+
+    def test_models_in_sequence(self):
+        template = ScenarioTemplate(**self.config)
+        for management in [
+            IrrigationManagement(irrigation_method=0),
+            IrrigationManagement(irrigation_method=1, SMT=[70] * 4),
+            IrrigationManagement(irrigation_method=0),
+        ]:
+            model = template.model(irrigation_management=management)
+            model.run_model(till_termination=True, initialize_model=False)
+
+            reference = AquaCropModel(**dict(self.config, irrigation_management=management))
+            reference.run_model(till_termination=True)
+            pd.testing.assert_frame_equal(
+                model.get_simulation_results(), reference.get_simulation_results()
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Test the crop parameters kept for each growing season.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import pickle
+import unittest
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.entities.seasonalCrop import SEASON_PARAMS
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestSeasonalCrops(unittest.TestCase):
+    """
+    Seasons share the base parameters and only keep the ones set when they start.
+    """
+
+    model = AquaCropModel(
+        sim_start_time=f"{1979}/01/01",
+        sim_end_time=f"{1986}/05/31",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("WheatGDD", planting_date="10/15"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+    )
+    model.run_model(till_termination=True)
+    crops = model._param_struct.Seasonal_Crops
+
+    def test_overrides(self):
+        self.assertEqual(len(self.crops), 7)
+        maturities = set()
+        # the simulation starts before the first season, so every season is set up
+        for overrides in self.crops.overrides:
+            self.assertEqual(set(overrides), set(SEASON_PARAMS))
+            maturities.add(overrides["MaturityCD"])
+        # the calendar days of each season follow its weather
+        self.assertGreater(len(maturities), 1)
+
+        with self.assertRaises(TypeError):
+            self.crops.base["CCx"] = 1.0
+
+    def test_season(self):
+        crops = self.crops.copy()
+        for season in [3, 0, 5]:
+            crop = crops.season(season)
+            self.assertIs(crop, crops.crop)
+            for name in SEASON_PARAMS:
+                expected = crops.overrides[season].get(name, crops.base[name])
+                self.assertEqual(getattr(crop, name), expected)
+            self.assertEqual(crop.CCx, crops.base["CCx"])
+
+        # the copy moves independently of the model's crops
+        self.assertIsNot(crops.crop, self.crops.crop)
+
+    def test_pickle(self):
+        crops = pickle.loads(pickle.dumps(self.crops))
+        self.assertEqual(set(crops.base), set(self.crops.base))
+        self.assertEqual(crops.base["CCx"], self.crops.base["CCx"])
+        self.assertEqual(crops.season(2).MaturityCD, self.crops.overrides[2]["MaturityCD"])
+
+
+if __name__ == '__main__':
+    unittest.main()
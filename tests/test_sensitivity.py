@@ -0,0 +1,108 @@
+"""
+Test the sensitivity analysis of crop parameters.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import copy
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.sensitivity import (
+    run_sensitivity, sobol_design, sobol_indices, morris_design, morris_indices, _Runner,
+)
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestSensitivity(unittest.TestCase):
+    """
+    Indices of known functions, and estimates updated batch by batch from model runs.
+    """
+
+    config = dict(
+        sim_start_time=f"{1979}/10/15",
+        sim_end_time=f"{1980}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/15"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+    )
+    params = {"CGC_CD": (0.004, 0.006), "WP": (13, 17), "HI0": (0.4, 0.5)}
+    results = list(run_sensitivity(config, params, n=4, batch_size=2, seed=1, workers=1))
+
+    def test_sobol_indices(self):
+        # y = x1 + 2 x2: the variance shares are 1/5 and 4/5, x3 has no effect
+        design = sobol_design(3, 20000, np.random.default_rng(0))
+        y = design[..., 0] + 2 * design[..., 1]
+        indices = sobol_indices(y, ["x1", "x2", "x3"])
+        np.testing.assert_allclose(indices.S1, [0.2, 0.8, 0], atol=0.03)
+        np.testing.assert_allclose(indices.ST, [0.2, 0.8, 0], atol=0.03)
+
+    def test_morris_indices(self):
+        design, steps = morris_design(3, 10, 4, np.random.default_rng(0))
+        self.assertTrue(np.all((design >= 0) & (design <= 1)))
+        # one parameter changes at each step of a trajectory
+        self.assertTrue(np.all((np.diff(design, axis=1) != 0).sum(axis=2) == 1))
+        indices = morris_indices(3 * design[..., 0] - design[..., 1], steps, ["x1", "x2", "x3"])
+        np.testing.assert_allclose(indices.mu, [3, -1, 0])
+        np.testing.assert_allclose(indices.mu_star, [3, 1, 0])
+        np.testing.assert_allclose(indices.sigma, [0, 0, 0], atol=1e-12)
+
+    def test_incremental(self):
+        first, last = self.results
+        self.assertEqual((first.n_blocks, first.n_runs, first.complete), (2, 10, False))
+        self.assertEqual((last.n_blocks, last.n_runs, last.complete), (4, 20, True))
+        self.assertEqual(list(last.indices.index), list(self.params))
+        self.assertTrue(np.isfinite(first.indices.values).all())
+        # the first batch's runs are kept as they were
+        self.assertTrue(last.samples.iloc[:10].equals(first.samples))
+
+        # a sample gives the output of a model run from the start
+        sample = last.samples.iloc[13]
+        crop = copy.deepcopy(self.config["crop"])
+        for name in self.params:
+            setattr(crop, name, sample[name])
+        crop.calculate_additional_params()
+        model = AquaCropModel(**dict(self.config, crop=crop))
+        model.run_model(till_termination=True)
+        final_stats = model.get_simulation_results()
+        self.assertEqual(final_stats["Dry yield (tonne/ha)"].mean(), sample["output"])
+
+    def test_shared_calendar(self):
+        runner = _Runner(dict(self.config, output_level="final_only"))
+        runner.run({"WP": 15.0})
+        n_calendars = len(runner.gdd_cache.calendars)
+        # a parameter that does not change the calendar reuses it
+        runner.run({"WP": 16.0, "HI0": 0.45})
+        self.assertEqual(len(runner.gdd_cache.calendars), n_calendars)
+        runner.run({"CGC_CD": 0.0055})
+        self.assertGreater(len(runner.gdd_cache.calendars), n_calendars)
+
+    def test_workers(self):
+        serial = list(run_sensitivity(
+            self.config, ["WP", "Tupp"], method="morris", n=2, spread=0.2, seed=0, workers=1
+        ))
+        pooled = list(run_sensitivity(
+            self.config, ["WP", "Tupp"], method="morris", n=2, spread=0.2, seed=0, workers=2
+        ))
+        self.assertTrue(pooled[-1].samples.equals(serial[-1].samples))
+        self.assertTrue(pooled[-1].indices.equals(serial[-1].indices))
+
+    def test_errors(self):
+        for params, kwargs in [
+            (["WP"], {"method": "fast"}),
+            (["WP"], {"n": 1}),
+            (["WP"], {"method": "morris", "levels": 3}),
+            ([], {}),
+            (["Name"], {}),
+            (["CGC"], {}),
+            ({"WP": (17, 13)}, {}),
+        ]:
+            with self.assertRaises(ValueError):
+                run_sensitivity(self.config, params, **kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Test the soil profile columns used to initialize the model without pandas.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from aquacrop import Soil
+from aquacrop.initialize.parse_dates import month_day, parse_date
+
+
+class TestSoilColumns(unittest.TestCase):
+    """
+    The columns and the profile DataFrame hold the same values, whichever was changed last.
+    """
+
+    def _soil(self):
+        soil = Soil(soil_type="custom", dz=[0.05] * 4 + [0.1] * 6 + [0.25] * 2)
+        soil.add_layer_from_texture(0.35, 40, 20, 2.5, 100)
+        soil.add_layer(0.4, 0.1, 0.25, 0.4, 300, 80)
+        return soil
+
+    def test_layers(self):
+        soil = self._soil()
+        # the compartments below the last layer are left empty until fill_nan
+        self.assertTrue(np.isnan(soil.column("Layer")[-1]))
+        soil.fill_nan()
+        self.assertEqual(soil.column("Layer").tolist(), [1] * 5 + [2] * 7)
+        self.assertEqual(soil.column("th_fc")[-1], 0.25)
+        self.assertEqual(soil.zSoil, 1.3)
+
+    def test_profile_round_trip(self):
+        soil = self._soil()
+        soil.fill_nan()
+        profile = soil.profile
+        self.assertEqual(list(profile.Layer), list(soil.column("Layer")))
+
+        # edits to the DataFrame are seen by the columns
+        profile.loc[0, "th_s"] = 0.6
+        self.assertEqual(soil.column("th_s")[0], 0.6)
+
+        soil.set_column("th_fc_Adj", soil.column("th_fc"))
+        self.assertIn("th_fc_Adj", soil.profile.columns)
+
+    def test_layer_means(self):
+        soil = self._soil()
+        soil.fill_nan()
+        soil.set_column("th_wp", soil.column("th_wp") + np.linspace(0, 0.01, 12))
+        means = soil.profile.groupby("Layer").mean()
+        for layer, mean in soil.layer_means("th_wp").items():
+            self.assertAlmostEqual(mean, means.th_wp.loc[layer], places=12)
+        self.assertEqual(soil.Hydrology.dz.sum(), soil.column("dz").sum())
+
+    def test_dates(self):
+        self.assertEqual(parse_date("1979/10/1"), np.datetime64("1979-10-01"))
+        self.assertEqual(parse_date("1979-10-01"), np.datetime64("1979-10-01"))
+        self.assertEqual(parse_date("1990/05/01"), pd.Timestamp("1990/05/01"))
+        self.assertEqual(month_day(np.datetime64("1990-03-05")), "3/5")
+        with self.assertRaises(ValueError):
+            parse_date("1990/02/30")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Test the adaptive sub-steps of the stage 2 soil evaporation.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+def _run(evap_tolerance):
+    model = AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1981}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=Soil(soil_type="SandyLoam"),
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+        evap_tolerance=evap_tolerance,
+    )
+    model.run_model(till_termination=True)
+    return model
+
+
+class TestAdaptiveEvaporation(unittest.TestCase):
+    """
+    A tolerance of 0 keeps the fixed sub-steps, a small tolerance stays close to them.
+    """
+
+    _fixed = _run(None)
+    _zero = _run(0)
+    _adaptive = _run(0.001)
+
+    def test_zero_tolerance(self):
+        self.assertTrue(
+            np.array_equal(
+                self._fixed.get_water_flux().Es.values, self._zero.get_water_flux().Es.values
+            )
+        )
+
+    def test_small_tolerance(self):
+        fixed = self._fixed.get_water_flux().Es.values
+        adaptive = self._adaptive.get_water_flux().Es.values
+        self.assertFalse(np.array_equal(fixed, adaptive))
+        self.assertLess(np.abs(fixed - adaptive).max(), 0.01)
+        self.assertLess(abs(fixed.sum() - adaptive.sum()), 0.5)
+        yields = "Dry yield (tonne/ha)"
+        self.assertTrue(
+            np.allclose(
+                self._fixed.get_simulation_results()[yields],
+                self._adaptive.get_simulation_results()[yields],
+                atol=0.01,
+            )
+        )
+
+    def test_negative_tolerance(self):
+        with self.assertRaises(ValueError):
+            _run(-1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Test the constants derived once per soil profile.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestDerivedConstants(unittest.TestCase):
+    """
+    Derived constants match the expressions the daily kernels used to evaluate.
+    """
+
+    soil = Soil(soil_type="custom", cn=46, rew=7)
+    soil.add_layer(thickness=0.6, thWP=0.24, thFC=0.40, thS=0.50, Ksat=15, penetrability=100)
+    soil.add_layer(thickness=0.6, thWP=0.10, thFC=0.30, thS=0.41, Ksat=500, penetrability=100)
+    model = AquaCropModel(
+        sim_start_time=f"{1979}/10/01",
+        sim_end_time=f"{1980}/05/30",
+        weather_df=prepare_weather(get_filepath("tunis_climate.txt")),
+        soil=soil,
+        crop=Crop("Wheat", planting_date="10/01"),
+        initial_water_content=InitialWaterContent(value=["FC"]),
+    )
+    model._initialize()
+    prof = model._param_struct.Soil.Profile
+
+    def test_constants(self):
+        prof = self.prof
+        for ii in range(len(prof.dz)):
+            drain_sat = prof.tau[ii] * (prof.th_s[ii] - prof.th_fc[ii])
+            self.assertEqual(prof.drain_sat[ii], drain_sat)
+            self.assertEqual(prof.exp_sat[ii], np.exp(prof.th_s[ii] - prof.th_fc[ii]) - 1)
+            self.assertEqual(
+                prof.infl_factor[ii], prof.Ksat[ii] / (drain_sat * 1000 * prof.dz[ii])
+            )
+            self.assertEqual(prof.th_thr[ii], (prof.th_wp[ii] + prof.th_fc[ii]) / 2)
+
+    def test_layers(self):
+        self.assertEqual(len(np.unique(self.prof.Layer)), 2)
+        self.assertAlmostEqual(self.prof.z_top_layer, self.prof.dz.sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Test the numeric weather arrays read by the daily time-step.
+"""
+import os
+os.environ['DEVELOPMENT'] = 'True'
+import unittest
+
+import numpy as np
+
+from aquacrop import AquaCropModel, Soil, Crop, InitialWaterContent
+from aquacrop.initialize.compute_weather_arrays import compute_weather_arrays, day_ordinal
+from aquacrop.utils import prepare_weather, get_filepath
+
+
+class TestWeatherArrays(unittest.TestCase):
+    """
+    Weather is stored as a float64 matrix plus an int64 day index.
+    """
+
+    _weather_df = prepare_weather(get_filepath("tunis_climate.txt"))
+
+    def test_matrix(self):
+        """
+        Matrix holds the four weather variables as contiguous float64
+        """
+        weather, weather_days = compute_weather_arrays(self._weather_df)
+        self.assertEqual(weather.dtype, np.float64)
+        self.assertTrue(weather.flags.c_contiguous)
+        self.assertEqual(weather.shape, (len(self._weather_df), 4))
+        self.assertTrue(
+            np.array_equal(weather[:, 2], self._weather_df.Precipitation.values)
+        )
+        self.assertEqual(weather_days.dtype, np.int64)
+
+    def test_column_order(self):
+        """
+        Columns are read by name, not by position in the dataframe
+        """
+        shuffled = self._weather_df[["Date", "ReferenceET", "MaxTemp", "Precipitation", "MinTemp"]]
+        weather, _ = compute_weather_arrays(shuffled)
+        expected, _ = compute_weather_arrays(self._weather_df)
+        self.assertTrue(np.array_equal(weather, expected))
+
+    def test_day_ordinal(self):
+        """
+        Day index counts days since 1970-01-01
+        """
+        _, weather_days = compute_weather_arrays(self._weather_df)
+        self.assertEqual(weather_days[0], day_ordinal(self._weather_df.Date.iloc[0]))
+        self.assertTrue((np.diff(weather_days) == 1).all())
+
+    def test_model_uses_arrays(self):
+        """
+        The model keeps the clipped weather as numeric arrays
+        """
+        model = AquaCropModel(
+            sim_start_time=f"{1979}/10/01",
+            sim_end_time=f"{1980}/05/30",
+            weather_df=self._weather_df,
+            soil=Soil(soil_type="SandyLoam"),
+            crop=Crop("Wheat", planting_date="10/01"),
+            initial_water_content=InitialWaterContent(value=["FC"]),
+        )
+        model.run_model(num_steps=1)
+        self.assertEqual(model._weather.dtype, np.float64)
+        self.assertEqual(len(model._weather_days), len(model._clock_struct.time_span))
+        self.assertEqual(
+            model._weather_days[0], day_ordinal(model._clock_struct.simulation_start_date)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()